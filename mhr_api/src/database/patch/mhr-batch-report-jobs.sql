@@ -0,0 +1,18 @@
+-- Batch manufacturer report job progress: one row per report job with the merged registration count and the
+-- document storage names of the merged report chunks, so a job interrupted by a process restart or failure is
+-- resumed by any instance from the last merged chunk. The job key is the sha256 hex digest of the report
+-- registration ids.
+--DROP TABLE public.mhr_batch_report_jobs;
+CREATE TABLE public.mhr_batch_report_jobs (
+  job_id VARCHAR (36) PRIMARY KEY,
+  job_key VARCHAR (64) NOT NULL,
+  status VARCHAR (20) NOT NULL,
+  registration_count INTEGER NOT NULL,
+  merged_count INTEGER NOT NULL,
+  chunk_storage_refs JSON NULL,
+  report_url VARCHAR (1000) NULL,
+  error VARCHAR (2000) NULL,
+  update_ts TIMESTAMP WITH TIME ZONE NOT NULL
+);
+CREATE INDEX ix_mhr_batch_report_jobs_job_key ON public.mhr_batch_report_jobs USING btree (job_key);
+CREATE INDEX ix_mhr_batch_report_jobs_update_ts ON public.mhr_batch_report_jobs USING btree (update_ts);
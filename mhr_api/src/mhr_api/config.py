@@ -170,6 +170,15 @@ class _Config():  # pylint: disable=too-few-public-methods
     # Default 2, set to 1 to revert to original report api client
     REPORT_VERSION = os.getenv('REPORT_VERSION', '2')
     REPORT_API_AUDIENCE = os.getenv('REPORT_API_AUDIENCE', '')
+    # Batch manufacturer report: concurrent registration report renders, retries of a failed render, and the number
+    # of registration reports merged per chunk.
+    BATCH_REPORT_CONCURRENCY: int = int(os.getenv('BATCH_REPORT_CONCURRENCY', '4'))
+    BATCH_REPORT_RETRIES: int = int(os.getenv('BATCH_REPORT_RETRIES', '1'))
+    BATCH_REPORT_MERGE_SIZE: int = int(os.getenv('BATCH_REPORT_MERGE_SIZE', '50'))
+    # A saved batch report job that is pending or running with no progress within this many seconds is resumed.
+    BATCH_REPORT_JOB_STALE_SECONDS: int = int(os.getenv('BATCH_REPORT_JOB_STALE_SECONDS', '600'))
+    # Cached service account, report api, and storage access tokens are refreshed this many seconds before expiry.
+    TOKEN_EXPIRY_MARGIN: int = int(os.getenv('TOKEN_EXPIRY_MARGIN', '60'))
 
     # Google APIs and cloud storage
     GCP_PROJECT_ID = os.getenv('GCP_PROJECT_ID')
@@ -188,6 +197,12 @@ class _Config():  # pylint: disable=too-few-public-methods
     SUBSCRIPTION_API_KEY = os.getenv('SUBSCRIPTION_API_KEY')
     GATEWAY_API_KEY = os.getenv('GATEWAY_API_KEY')
     GATEWAY_LTSA_URL = os.getenv('GATEWAY_LTSA_URL')
+    # LTSA PID lookup request timeout seconds, and the legacy description sync concurrent lookups, maximum lookup
+    # requests per second, and descriptions saved per transaction.
+    LTSA_TIMEOUT: float = float(os.getenv('LTSA_TIMEOUT', '30'))
+    LTSA_SYNC_CONCURRENCY: int = int(os.getenv('LTSA_SYNC_CONCURRENCY', '10'))
+    LTSA_RATE_LIMIT: float = float(os.getenv('LTSA_RATE_LIMIT', '10'))
+    LTSA_SYNC_BATCH_SIZE: int = int(os.getenv('LTSA_SYNC_BATCH_SIZE', '100'))
     DB2_RACF_ID = os.getenv('DB2_DATABASE_USERNAME')
     NOTIFY_MAN_REG_CONFIG = os.getenv('NOTIFY_MAN_REG_CONFIG')
 
@@ -33,6 +33,7 @@ from .event_tracking import EventTracking
 from .financing_statement import FinancingStatement
 from .general_collateral import GeneralCollateral
 from .ltsa_description import LtsaDescription
+from .mhr_batch_report_job import MhrBatchReportJob
 from .mhr_description import MhrDescription
 from .mhr_document import MhrDocument
 from .mhr_draft import MhrDraft
@@ -79,7 +80,7 @@ __all__ = ('db',
            'Db2Cmpserno', 'Db2Descript', 'Db2Docdes', 'Db2Document', 'Db2Location', 'Db2Manufact', 'Db2Manuhome',
            'Db2Mhomnote', 'Db2Owner', 'Db2Owngroup',
            'EventTracking', 'EventTrackingType', 'FinancingStatement', 'GeneralCollateral',
-           'LtsaDescription', 'MhrDraft', 'MhrDocument', 'MhrDescription', 'MhrExtraRegistration',
+           'LtsaDescription', 'MhrBatchReportJob', 'MhrDraft', 'MhrDocument', 'MhrDescription', 'MhrExtraRegistration',
            'MhrLocation', 'MhrManufacturer', 'MhrNote', 'MhrParty', 'MhrRegistration',
            'MhrRegistrationReport', 'MhrDocumentType', 'MhrLocationType', 'MhrNoteStatusType', 'MhrOwnerGroup',
            'MhrOwnerStatusType', 'MhrPartyType', 'MhrQualifiedSupplier',
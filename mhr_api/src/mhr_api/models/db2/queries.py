@@ -17,7 +17,7 @@
 UPDATE_LTSA_PID = """
 UPDATE location
    SET bcaajuri = :status_value
- WHERE pidnumb IN (?)
+ WHERE pidnumb IN :pid_numbers
 """
 QUERY_LTSA_PID = """
 SELECT DISTINCT l.pidnumb
@@ -13,7 +13,7 @@
 # limitations under the License.
 """This module holds common statement registration data."""
 from flask import current_app
-from sqlalchemy.sql import text
+from sqlalchemy.sql import bindparam, text
 
 from mhr_api.exceptions import DatabaseException
 from mhr_api.models import Db2Manuhome, Db2Document, utils as model_utils, registration_utils as reg_utils
@@ -764,18 +764,10 @@ def update_pid_list(pid_list, status: str):
     if not pid_list or not status:
         return
     try:
-        pid_numbers: str = ''
-        count = 0
-        for pid in pid_list:
-            pid_number = pid['pidNumber']
-            count += 1
-            if count > 1:
-                pid_numbers += ','
-            pid_numbers += f"'{pid_number}'"
-        query_text: str = UPDATE_LTSA_PID.replace('?', pid_numbers)
-        # current_app.logger.info('update query=' + query_text)
-        query = text(query_text)
-        db.get_engine(current_app, 'db2').execute(query, {'status_value': status})
+        # One statement for all the pids: the expanding bind parameter becomes the IN list.
+        query = text(UPDATE_LTSA_PID).bindparams(bindparam('pid_numbers', expanding=True))
+        params = {'status_value': status, 'pid_numbers': [pid['pidNumber'] for pid in pid_list]}
+        db.get_engine(current_app, 'db2').execute(query, params)
     except Exception as db_exception:   # noqa: B902; return nicer error
         current_app.logger.error('update_pid_list db exception: ' + str(db_exception))
         raise DatabaseException(db_exception)
@@ -87,3 +87,28 @@ class LtsaDescription(db.Model):  # pylint: disable=too-many-instance-attributes
         if pid_number and len(pid_number.strip()) > 9:
             ltsa_description.pid_number = pid_number.strip().replace('-', '')
         return ltsa_description
+
+    @classmethod
+    def save_descriptions(cls, descriptions: dict):
+        """Create or update the ltsa descriptions by pid number in one transaction."""
+        if not descriptions:
+            return
+        try:
+            pids = [pid.strip().replace('-', '') for pid in descriptions]
+            existing = {ltsa.pid_number: ltsa
+                        for ltsa in cls.query.filter(LtsaDescription.pid_number.in_(pids)).all()}
+            for pid_number, description in descriptions.items():
+                pid: str = pid_number.strip().replace('-', '')
+                ltsa_description = existing.get(pid)
+                if ltsa_description:
+                    ltsa_description.update_ts = now_ts()
+                    ltsa_description.ltsa_description = description
+                else:
+                    ltsa_description = cls.create(pid, description)
+                    existing[pid] = ltsa_description
+                    db.session.add(ltsa_description)
+            db.session.commit()
+        except Exception as db_exception:   # noqa: B902; return nicer error
+            db.session.rollback()
+            current_app.logger.error('DB save_descriptions exception: ' + str(db_exception))
+            raise DatabaseException(db_exception)
@@ -0,0 +1,69 @@
+# Copyright © 2019 Province of British Columbia
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""This module holds model data for batch manufacturer report job progress tracking."""
+import hashlib
+
+from flask import current_app
+
+from mhr_api.exceptions import DatabaseException
+
+from .db import db
+
+
+class MhrBatchReportJob(db.Model):  # pylint: disable=too-many-instance-attributes
+    """This class maintains the progress of a batch manufacturer report job so another process can resume it."""
+
+    __tablename__ = 'mhr_batch_report_jobs'
+
+    job_id = db.Column('job_id', db.String(36), primary_key=True)
+    job_key = db.Column('job_key', db.String(64), nullable=False, index=True)
+    status = db.Column('status', db.String(20), nullable=False)
+    registration_count = db.Column('registration_count', db.Integer, nullable=False)
+    merged_count = db.Column('merged_count', db.Integer, nullable=False)
+    chunk_storage_refs = db.Column('chunk_storage_refs', db.JSON, nullable=True)
+    report_url = db.Column('report_url', db.String(1000), nullable=True)
+    error = db.Column('error', db.String(2000), nullable=True)
+    update_ts = db.Column('update_ts', db.DateTime(timezone=True), nullable=False, index=True)
+
+    def save(self):
+        """Save the job progress to the database immediately."""
+        try:
+            db.session.add(self)
+            db.session.commit()
+        except Exception as db_exception:  # noqa: B902; just logging
+            current_app.logger.error('DB mhr batch report job save exception: ' + str(db_exception))
+            db.session.rollback()
+            raise DatabaseException(db_exception)
+
+    @classmethod
+    def find_by_job_id(cls, job_id: str):
+        """Return the batch report job progress record matching the job id."""
+        job = None
+        if job_id:
+            job = cls.query.get(job_id)
+        return job
+
+    @classmethod
+    def find_by_job_key(cls, job_key: str):
+        """Return the most recently updated batch report job progress record matching the job key."""
+        job = None
+        if job_key:
+            job = cls.query.filter(MhrBatchReportJob.job_key == cls.hash_job_key(job_key)) \
+                           .order_by(MhrBatchReportJob.update_ts.desc()).first()
+        return job
+
+    @staticmethod
+    def hash_job_key(job_key: str) -> str:
+        """Get the stored job key: the job key (the list of registration ids) may be too long to index."""
+        return hashlib.sha256(job_key.encode()).hexdigest()
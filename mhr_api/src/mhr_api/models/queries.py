@@ -46,8 +46,8 @@ select r.id, r.account_id, r.registration_ts, rr.id, rr.report_data, rr.batch_st
 """
 UPDATE_BATCH_REG_REPORT = """
 update mhr_registration_reports
-   set batch_storage_url = '{batch_url}'
- where id in ({report_ids})
+   set batch_storage_url = :batch_url
+ where id = ANY(:report_ids)
 """
 QUERY_PPR_LIEN_COUNT = """
 SELECT COUNT(base_registration_num)
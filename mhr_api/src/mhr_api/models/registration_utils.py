@@ -413,17 +413,11 @@ def update_reg_report_batch_url(json_data: dict, batch_url: str) -> int:
     update_count: int = 0
     if not json_data:
         return update_count
-    query_s = UPDATE_BATCH_REG_REPORT
-    report_ids: str = ''
-    for report in json_data:
-        update_count += 1
-        if report_ids != '':
-            report_ids += ','
-        report_ids += str(report.get('reportId'))
-    query_s = query_s.format(batch_url=batch_url, report_ids=report_ids)
-    current_app.logger.debug(f'Executing update query {query_s}')
-    query = text(query_s)
-    result = db.session.execute(query)
+    report_ids = [int(report.get('reportId')) for report in json_data]
+    update_count = len(report_ids)
+    current_app.logger.debug(f'Executing update batch url query for {update_count} reports')
+    # The report ids are bound as a single array parameter so the statement text is the same for every batch.
+    result = db.session.execute(text(UPDATE_BATCH_REG_REPORT), {'batch_url': batch_url, 'report_ids': report_ids})
     db.session.commit()
     if result:
         current_app.logger.debug(f'Updated {update_count} manufacturer report registrations batch url to {batch_url}.')
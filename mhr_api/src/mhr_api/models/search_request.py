@@ -22,6 +22,8 @@ from enum import Enum
 from http import HTTPStatus
 
 from flask import current_app
+from sqlalchemy import event, inspect
+from sqlalchemy.sql import text
 
 from mhr_api.exceptions import BusinessException, DatabaseException
 from mhr_api.models import utils as model_utils
@@ -365,16 +367,16 @@ class SearchRequest(db.Model):  # pylint: disable=too-many-instance-attributes
         """Return a search history summary list of searches executed by an account."""
         history_list = []
         if account_id:
-            query = search_utils.ACCOUNT_SEARCH_HISTORY_DATE_QUERY.replace('?', account_id)
+            query = search_utils.ACCOUNT_SEARCH_HISTORY_DATE_QUERY
             if from_ui:
-                query = search_utils.ACCOUNT_SEARCH_HISTORY_DATE_QUERY_NEW.replace('?', account_id)
+                query = search_utils.ACCOUNT_SEARCH_HISTORY_DATE_QUERY_NEW
             if search_utils.GET_HISTORY_DAYS_LIMIT <= 0:
-                query = search_utils.ACCOUNT_SEARCH_HISTORY_QUERY.replace('?', account_id)
+                query = search_utils.ACCOUNT_SEARCH_HISTORY_QUERY
                 if from_ui:
-                    query = search_utils.ACCOUNT_SEARCH_HISTORY_QUERY_NEW.replace('?', account_id)
+                    query = search_utils.ACCOUNT_SEARCH_HISTORY_QUERY_NEW
             rows = None
             try:
-                result = db.session.execute(query)
+                result = db.session.execute(text(query), {'query_account': account_id})
                 rows = result.fetchall()
             except Exception as db_exception:   # noqa: B902; return nicer error
                 current_app.logger.error('DB find_all_by_account_id exception: ' + str(db_exception))
@@ -384,11 +386,8 @@ class SearchRequest(db.Model):  # pylint: disable=too-many-instance-attributes
                     mapping = row._mapping  # pylint: disable=protected-access; follows documentation
                     search_id = str(mapping['id'])
                     # Set to pending if async report is not yet available.
-                    callback_url = str(mapping['callback_url'])
                     search_ts = mapping['search_ts']
-                    doc_storage_url = str(mapping['doc_storage_url'])
-                    if callback_url is not None and callback_url.lower() != 'none' and \
-                            (doc_storage_url is None or doc_storage_url.lower() == 'none'):
+                    if mapping['report_pending']:
                         search_id += '_' + REPORT_STATUS_PENDING
                     search = {
                         'searchId': search_id,
@@ -400,13 +399,10 @@ class SearchRequest(db.Model):  # pylint: disable=too-many-instance-attributes
                     }
                     history_list.append(search)
                     if from_ui:
-                        # if api_result is null then the selections have not been finished
-                        search['inProgress'] = not mapping['api_result'] and \
-                            mapping['api_result'] != [] and search['totalResultsSize'] > 0
+                        search['inProgress'] = bool(mapping['selection_pending']) and search['totalResultsSize'] > 0
                         search['userId'] = str(mapping['user_id'])
                         if not search.get('inProgress') and \
-                                ((doc_storage_url and doc_storage_url.lower() != 'none') or \
-                                  model_utils.report_retry_elapsed(search_ts)):
+                                (mapping['report_stored'] or model_utils.report_retry_elapsed(search_ts)):
                             search['reportAvailable'] = True
                         else:
                             search['reportAvailable'] = False
@@ -456,3 +452,11 @@ class SearchRequest(db.Model):  # pylint: disable=too-many-instance-attributes
                 error=error_msg,
                 status_code=HTTPStatus.BAD_REQUEST
             )
+
+
+@event.listens_for(SearchRequest, 'after_update')
+def search_request_after_update_listener(mapper, connection, target):   # pylint: disable=unused-argument
+    """Update the account search history summary when the UI search selection is saved."""
+    if inspect(target).attrs.updated_selection.history.has_changes():
+        params = search_utils.get_history_selection_summary(target.id, target.updated_selection)
+        connection.execute(text(search_utils.SEARCH_HISTORY_SUMMARY_SELECTION_UPDATE), params)
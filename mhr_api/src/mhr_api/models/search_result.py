@@ -19,6 +19,7 @@ from http import HTTPStatus
 import json
 
 from flask import current_app
+from sqlalchemy import event
 from sqlalchemy.sql import text
 
 from mhr_api.exceptions import BusinessException, DatabaseException, ResourceErrorCodes
@@ -137,16 +138,13 @@ class SearchResult(db.Model):  # pylint: disable=too-many-instance-attributes
     def build_details(self, staff: bool = False):
         """Generate the search selection details."""
         new_results = []
+        added_mhr_nums = set()
         use_legacy_db: bool = current_app.config.get('USE_LEGACY_DB', True)
         for select in self.search_select:
             if 'selected' not in select or select['selected']:
                 mhr_num = select['mhrNumber']
-                found = False
-                if new_results:  # Check for duplicates.
-                    for match in new_results:
-                        if match['mhrNumber'] == mhr_num:
-                            found = True
-                if not found:  # No duplicates.
+                if mhr_num not in added_mhr_nums:  # No duplicates.
+                    added_mhr_nums.add(mhr_num)
                     # Load registration details here.
                     mh_id = select.get('mhId', None)
                     current_app.logger.debug(f'find_by_id for mhr num {mhr_num} start id={mh_id}')
@@ -167,24 +165,27 @@ class SearchResult(db.Model):  # pylint: disable=too-many-instance-attributes
         reg_list = [s['mhrNumber'] for s in update_select]
         # Remove duplicates
         reg_list = list(dict.fromkeys(reg_list))
-        # Update lien info flag
+        lien_info = {}
+        for match in update_select:
+            if match.get('includeLienInfo', False):
+                lien_info[match['mhrNumber']] = match.get('includeLienInfo')
+        # Update lien info flag and index the original matches by MHR number in the original order.
+        original_index = {}
         for result in original_results:
-            for match in update_select:
-                if result['mhrNumber'] == match['mhrNumber']:
-                    if match.get('includeLienInfo', False):
-                        result['includeLienInfo'] = match.get('includeLienInfo')
+            if result['mhrNumber'] in lien_info:
+                result['includeLienInfo'] = lien_info[result['mhrNumber']]
+            original_index.setdefault(result['mhrNumber'], []).append(result)
 
         final_selection = []
         for reg_num in reg_list:
             # current_app.logger.info(f'reg_num={reg_num}')
             result = None
-            for original in original_results:
-                if original['mhrNumber'] == reg_num:
-                    if not result:
-                        result = original
-                        result['extraMatches'] = []
-                    else:  # Combine matches
-                        result['extraMatches'].append(original)
+            for original in original_index.get(reg_num, []):
+                if not result:
+                    result = original
+                    result['extraMatches'] = []
+                else:  # Combine matches
+                    result['extraMatches'].append(original)
             if result:
                 if not result.get('extraMatches'):
                     del result['extraMatches']
@@ -358,13 +359,9 @@ class SearchResult(db.Model):  # pylint: disable=too-many-instance-attributes
             # Check selection MHR numbers are all in the initial search matches.
             original_results = search_result.search.search_response
             if original_results:
+                original_mhr_nums = {result.get('mhrNumber') for result in original_results}
                 for match in select_json:
-                    exists: bool = False
-                    for result in original_results:
-                        if match.get('mhrNumber') == result.get('mhrNumber'):
-                            exists = True
-                            break
-                    if not exists:
+                    if match.get('mhrNumber') not in original_mhr_nums:
                         error_msg = model_utils.ERR_SEARCH_INVALID.format(code=ResourceErrorCodes.VALIDATION_ERR)
                         current_app.logger.info(f'Search {search_id} invalid mhr number in search selection: ' +
                                                 match.get('mhrNumber'))
@@ -414,3 +411,19 @@ class SearchResult(db.Model):  # pylint: disable=too-many-instance-attributes
 
         current_app.logger.info('Search_ppr_by_mhr_number results length=' + str(len(results_json)))
         return results_json
+
+
+@event.listens_for(SearchResult, 'after_insert')
+def search_result_after_insert_listener(mapper, connection, target):   # pylint: disable=unused-argument
+    """Create the account search history summary of the search."""
+    params = search_utils.get_history_result_summary(target.search_id, target.search_select, target.callback_url,
+                                                     target.doc_storage_url)
+    connection.execute(text(search_utils.SEARCH_HISTORY_SUMMARY_INSERT), params)
+
+
+@event.listens_for(SearchResult, 'after_update')
+def search_result_after_update_listener(mapper, connection, target):   # pylint: disable=unused-argument
+    """Update the account search history summary selection and report state of the search."""
+    params = search_utils.get_history_result_summary(target.search_id, target.search_select, target.callback_url,
+                                                     target.doc_storage_url)
+    connection.execute(text(search_utils.SEARCH_HISTORY_SUMMARY_RESULT_UPDATE), params)
@@ -42,17 +42,54 @@ SEARCH_RESULTS_MAX_SIZE = 5000
 # Result set size limit clause
 RESULTS_SIZE_LIMIT_CLAUSE = 'FETCH FIRST :max_results_size ROWS ONLY'
 
+# Search history summary: maintained when search requests and search results are saved (see the search_results
+# and search_requests after insert/update listeners) so the account search history never reads the results JSON.
+SEARCH_HISTORY_SUMMARY_INSERT = """
+INSERT INTO search_history_summaries (search_id, username, selected_match_count, exact_match_count,
+                                      selection_match_count, selection_exact_count, selection_pending,
+                                      report_pending, report_stored)
+SELECT sc.id,
+       CASE WHEN sc.user_id IS NULL THEN ''
+            ELSE (SELECT u.firstname || ' ' || u.lastname FROM users u WHERE u.username = sc.user_id
+                  FETCH FIRST 1 ROWS ONLY) END,
+       :selected_match_count, :exact_match_count,
+       CASE WHEN json_typeof(sc.updated_selection) = 'array' THEN json_array_length(sc.updated_selection) END,
+       CASE WHEN json_typeof(sc.updated_selection) = 'array'
+            THEN (SELECT COUNT(*) FROM json_array_elements(sc.updated_selection) sc2
+                   WHERE sc2 ->> 'matchType' = 'EXACT')
+            ELSE 0 END,
+       :selection_pending, :report_pending, :report_stored
+  FROM search_requests sc
+ WHERE sc.id = :search_id
+ON CONFLICT (search_id) DO UPDATE
+   SET selected_match_count = EXCLUDED.selected_match_count,
+       exact_match_count = EXCLUDED.exact_match_count,
+       selection_pending = EXCLUDED.selection_pending,
+       report_pending = EXCLUDED.report_pending,
+       report_stored = EXCLUDED.report_stored
+"""
+SEARCH_HISTORY_SUMMARY_RESULT_UPDATE = """
+UPDATE search_history_summaries
+   SET selected_match_count = :selected_match_count,
+       exact_match_count = :exact_match_count,
+       selection_pending = :selection_pending,
+       report_pending = :report_pending,
+       report_stored = :report_stored
+ WHERE search_id = :search_id
+"""
+SEARCH_HISTORY_SUMMARY_SELECTION_UPDATE = """
+UPDATE search_history_summaries
+   SET selection_match_count = :selection_match_count,
+       selection_exact_count = :selection_exact_count
+ WHERE search_id = :search_id
+"""
+
 ACCOUNT_SEARCH_HISTORY_DATE_QUERY = f"""
 SELECT sc.id, sc.search_ts, sc.api_criteria, sc.total_results_size, sc.returned_results_size,
-       sr.callback_url, sr.doc_storage_url,
-       json_array_length(sr.api_result) as selected_match_count,
-       (SELECT CASE WHEN sc.user_id IS NULL THEN ''
-         ELSE (SELECT u.firstname || ' ' || u.lastname FROM users u WHERE u.username = sc.user_id
-               FETCH FIRST 1 ROWS ONLY)
-         END) AS username
-FROM search_requests sc, search_results sr
-WHERE sc.id = sr.search_id
-  AND sc.account_id = '?'
+       sh.selected_match_count, sh.username, sh.report_pending, sh.report_stored
+FROM search_requests sc, search_history_summaries sh
+WHERE sc.id = sh.search_id
+  AND sc.account_id = :query_account
   AND sc.search_ts > ((now() at time zone 'utc') - interval '{str(GET_HISTORY_DAYS_LIMIT)} days')
   AND sc.search_type IN ('MI', 'MO', 'MS', 'MM')
 ORDER BY sc.search_ts DESC
@@ -61,15 +98,10 @@ FETCH FIRST {str(ACCOUNT_SEARCH_HISTORY_MAX_SIZE)} ROWS ONLY
 
 ACCOUNT_SEARCH_HISTORY_QUERY = f"""
 SELECT sc.id, sc.search_ts, sc.api_criteria, sc.total_results_size, sc.returned_results_size,
-       sr.callback_url, sr.doc_storage_url,
-       json_array_length(sr.api_result) as selected_match_count,
-       (SELECT CASE WHEN sc.user_id IS NULL THEN ''
-         ELSE (SELECT u.firstname || ' ' || u.lastname FROM users u WHERE u.username = sc.user_id
-               FETCH FIRST 1 ROWS ONLY)
-         END) AS username
-FROM search_requests sc, search_results sr
-WHERE sc.id = sr.search_id
-  AND sc.account_id = '?'
+       sh.selected_match_count, sh.username, sh.report_pending, sh.report_stored
+FROM search_requests sc, search_history_summaries sh
+WHERE sc.id = sh.search_id
+  AND sc.account_id = :query_account
   AND sc.search_type IN ('MI', 'MO', 'MS', 'MM')
 ORDER BY sc.search_ts DESC
 FETCH FIRST {str(ACCOUNT_SEARCH_HISTORY_MAX_SIZE)} ROWS ONLY
@@ -77,15 +109,10 @@ FETCH FIRST {str(ACCOUNT_SEARCH_HISTORY_MAX_SIZE)} ROWS ONLY
 
 ACCOUNT_SEARCH_HISTORY_DATE_QUERY_NEW = f"""
 SELECT sc.id, sc.search_ts, sc.api_criteria, sc.total_results_size, sc.returned_results_size, sc.user_id,
-       sr.callback_url, sr.doc_storage_url, sr.api_result,
-       json_array_length(sr.api_result) as selected_match_count,
-       (SELECT CASE WHEN sc.user_id IS NULL THEN ''
-         ELSE (SELECT u.firstname || ' ' || u.lastname FROM users u WHERE u.username = sc.user_id
-               FETCH FIRST 1 ROWS ONLY)
-         END) AS username
-FROM search_requests sc, search_results sr
-WHERE sc.id = sr.search_id
-  AND sc.account_id = '?'
+       sh.selected_match_count, sh.username, sh.selection_pending, sh.report_pending, sh.report_stored
+FROM search_requests sc, search_history_summaries sh
+WHERE sc.id = sh.search_id
+  AND sc.account_id = :query_account
   AND sc.search_type IN ('MI', 'MO', 'MS', 'MM')
   AND sc.search_ts > ((now() at time zone 'utc') - interval '{str(GET_HISTORY_DAYS_LIMIT)} days')
 ORDER BY sc.search_ts DESC
@@ -94,37 +121,22 @@ FETCH FIRST {str(ACCOUNT_SEARCH_HISTORY_MAX_SIZE)} ROWS ONLY
 
 ACCOUNT_SEARCH_HISTORY_QUERY_NEW = f"""
 SELECT sc.id, sc.search_ts, sc.api_criteria, sc.total_results_size, sc.returned_results_size, sc.user_id,
-       sr.callback_url, sr.doc_storage_url, sr.api_result,
-       json_array_length(sr.api_result) as selected_match_count,
-       (SELECT CASE WHEN sc.user_id IS NULL THEN ''
-         ELSE (SELECT u.firstname || ' ' || u.lastname FROM users u WHERE u.username = sc.user_id
-               FETCH FIRST 1 ROWS ONLY)
-         END) AS username
-FROM search_requests sc, search_results sr
-WHERE sc.id = sr.search_id
-  AND sc.account_id = '?'
+       sh.selected_match_count, sh.username, sh.selection_pending, sh.report_pending, sh.report_stored
+FROM search_requests sc, search_history_summaries sh
+WHERE sc.id = sh.search_id
+  AND sc.account_id = :query_account
   AND sc.search_type IN ('MI', 'MO', 'MS', 'MM')
 ORDER BY sc.search_ts DESC
 FETCH FIRST {str(ACCOUNT_SEARCH_HISTORY_MAX_SIZE)} ROWS ONLY
 """
 
 PPR_MHR_NUMBER_QUERY = """
-SELECT DISTINCT fs.id
-  FROM registrations r, financing_statements fs, serial_collateral sc 
- WHERE r.financing_id = fs.id
-   AND r.registration_type_cl IN ('PPSALIEN', 'MISCLIEN', 'CROWNLIEN')
-   AND r.base_reg_number IS NULL
-   AND (fs.expire_date IS NULL OR fs.expire_date > ((now() at time zone 'utc') - interval '30 days'))
-   AND NOT EXISTS (SELECT r3.id 
-                     FROM registrations r3
-                    WHERE r3.financing_id = fs.id
-                      AND r3.registration_type_cl = 'DISCHARGE'
-                      AND r3.registration_ts < ((now() at time zone 'utc') - interval '30 days'))
-   AND sc.financing_id = fs.id
-   AND sc.registration_id_end IS NULL
-   AND sc.serial_type = 'MH'
-   AND sc.mhr_number = (SELECT searchkey_mhr(:query_value))
-ORDER BY fs.id ASC
+SELECT DISTINCT si.financing_id
+  FROM serial_search_index si
+ WHERE (si.searchable_until IS NULL OR si.searchable_until > (now() at time zone 'utc'))
+   AND si.serial_type = 'MH'
+   AND si.mhr_number = (SELECT searchkey_mhr(:query_value))
+ORDER BY si.financing_id ASC
 """
 SEARCH_MHR_NUMBER_QUERY = """
 SELECT mhr_number, status_type, registration_ts, city, serial_number, year_made, make, model, id, owner_info
@@ -151,6 +163,43 @@ SELECT mhr_number, status_type, registration_ts, city, serial_number, year_made,
 """
 
 
+def get_exact_match_count(matches) -> int:
+    """Count the exact matches in a search selection list."""
+    return sum(1 for match in matches if isinstance(match, dict) and match.get('matchType') == 'EXACT')
+
+
+def get_history_result_summary(search_id: int, search_select, callback_url: str, doc_storage_url: str) -> dict:
+    """Get the search history summary values of a search result (search step 2) as query parameters."""
+    selected_count = None
+    exact_count = 0
+    if isinstance(search_select, list):
+        selected_count = len(search_select)
+        exact_count = get_exact_match_count(search_select)
+    return {
+        'search_id': search_id,
+        'selected_match_count': selected_count,
+        'exact_match_count': exact_count,
+        # If api_result is null then the selections have not been finished.
+        'selection_pending': search_select is None,
+        'report_pending': callback_url is not None and doc_storage_url is None,
+        'report_stored': bool(doc_storage_url)
+    }
+
+
+def get_history_selection_summary(search_id: int, updated_selection) -> dict:
+    """Get the search history summary values of a search request selection update as query parameters."""
+    selection_count = None
+    exact_count = 0
+    if isinstance(updated_selection, list):
+        selection_count = len(updated_selection)
+        exact_count = get_exact_match_count(updated_selection)
+    return {
+        'search_id': search_id,
+        'selection_match_count': selection_count,
+        'selection_exact_count': exact_count
+    }
+
+
 def format_mhr_number(request_json):
     """Trim and pad with zeroes search query mhr number query."""
     mhr_num: str = request_json['criteria']['value']
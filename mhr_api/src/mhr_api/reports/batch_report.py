@@ -0,0 +1,327 @@
+# Copyright © 2019 Province of British Columbia
+#
+# Licensed under the Apache License, Version 2.0 (the 'License');
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an 'AS IS' BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Concurrent rendering and incremental merging of the batch manufacturer registrations report.
+
+The registration reports are rendered by a bounded pool of threads. They are merged in report order one chunk at a
+time as soon as the chunk reports are rendered, so the final merge combines a few chunk documents. A job keeps its
+merged chunks: running a failed job again only renders the registrations that were not merged. Jobs may run in a
+background thread with their progress available by job id. The progress of a job with a job key is saved in the
+database with the merged chunks in document storage, so a job interrupted by a failure or a restart is resumed by any
+process from the last merged chunk.
+"""
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from threading import Lock, Thread
+
+from flask import current_app
+
+from mhr_api.exceptions import DatabaseException
+from mhr_api.models import MhrBatchReportJob
+from mhr_api.models import utils as model_utils
+from mhr_api.reports import get_callback_pdf
+from mhr_api.reports.v2.report import Report
+from mhr_api.reports.v2.report_utils import ReportTypes
+from mhr_api.services.abstract_storage_service import DocumentTypes
+from mhr_api.services.document_storage.storage_service import GoogleStorageService
+
+
+STATUS_PENDING = 'PENDING'
+STATUS_RUNNING = 'RUNNING'
+STATUS_COMPLETED = 'COMPLETED'
+STATUS_FAILED = 'FAILED'
+PDF_HEADERS = {'Content-Type': 'application/pdf'}
+JOB_RETENTION_SECONDS: int = 24 * 60 * 60
+CHUNK_STORAGE_NAME = 'batch-report-jobs/{job_id}/chunk-{chunk}.pdf'
+
+_jobs = {}
+_jobs_lock = Lock()
+
+
+def render_registration_report(registration: dict):
+    """Generate a single registration report with a cover letter: return the report api response tuple."""
+    return get_callback_pdf(registration.get('reportData'),
+                            registration.get('accountId'),
+                            ReportTypes.MHR_REGISTRATION_STAFF,
+                            None,
+                            None)
+
+
+class BatchReportJob():  # pylint: disable=too-many-instance-attributes
+    """Generate the batch manufacturer registrations report, tracking progress so a failed job can be resumed."""
+
+    def __init__(self, registrations: list, job_key: str = None):
+        """Create the job for the registrations in report order."""
+        self.job_id: str = str(uuid.uuid4())
+        self.job_key: str = job_key
+        self.registrations = registrations
+        self.registration_count: int = len(registrations)
+        self.status: str = STATUS_PENDING
+        self.rendered_count: int = 0
+        self.merged_count: int = 0
+        self.retry_count: int = 0
+        self.chunks = []
+        self.chunk_refs = []
+        self.report_url: str = None
+        self.error: str = None
+        self.update_time: float = time.time()
+        self._lock = Lock()
+
+    @classmethod
+    def from_record(cls, record: MhrBatchReportJob, registrations: list = None, job_key: str = None):
+        """Create the job from the saved job progress: the merged chunks are fetched from storage when needed."""
+        job = cls(registrations or [], job_key)
+        job.job_id = record.job_id
+        job.registration_count = record.registration_count
+        job.status = record.status
+        job.merged_count = record.merged_count
+        job.rendered_count = record.merged_count
+        job.chunk_refs = list(record.chunk_storage_refs or [])
+        job.chunks = [None] * len(job.chunk_refs)
+        job.report_url = record.report_url
+        job.error = record.error
+        job.update_time = record.update_ts.timestamp()
+        return job
+
+    @property
+    def json(self) -> dict:
+        """Return the job progress as a json/dict."""
+        job = {
+            'jobId': self.job_id,
+            'status': self.status,
+            'registrationCount': self.registration_count,
+            'renderedCount': self.rendered_count,
+            'mergedCount': self.merged_count,
+            'retryCount': self.retry_count
+        }
+        if self.report_url:
+            job['reportDownloadUrl'] = self.report_url
+        if self.error:
+            job['error'] = self.error
+        return job
+
+    def _render(self, app, index: int):
+        """Render the registration report in an app context, retrying a failed report."""
+        retries: int = int(app.config.get('BATCH_REPORT_RETRIES', 1))
+        registration = self.registrations[index]
+        with app.app_context():
+            attempt: int = 0
+            while True:
+                try:
+                    raw_data, status_code, headers = render_registration_report(registration)
+                    if status_code in (HTTPStatus.OK, HTTPStatus.CREATED) or attempt >= retries:
+                        return raw_data, status_code, headers
+                    app.logger.info(f'Retrying {registration.get("registrationId")} report status={status_code}.')
+                except Exception as err:  # noqa: B902; retry then raise
+                    if attempt >= retries:
+                        raise err
+                    app.logger.info(f'Retrying {registration.get("registrationId")} report error: {str(err)}.')
+                attempt += 1
+                with self._lock:  # Reports are rendered by the pool threads.
+                    self.retry_count += 1
+
+    def save_progress(self):
+        """Save the progress of a job with a job key so another process can resume it: a failed save is logged."""
+        if not self.job_key:
+            return
+        try:
+            record = MhrBatchReportJob.find_by_job_id(self.job_id)
+            if not record:
+                record = MhrBatchReportJob(job_id=self.job_id, job_key=MhrBatchReportJob.hash_job_key(self.job_key))
+            record.status = self.status
+            record.registration_count = self.registration_count
+            record.merged_count = self.merged_count
+            record.chunk_storage_refs = list(self.chunk_refs)
+            record.report_url = self.report_url
+            record.error = self.error[:2000] if self.error else None
+            record.update_ts = model_utils.now_ts()
+            record.save()
+        except DatabaseException as db_err:
+            current_app.logger.error(f'Batch report job {self.job_id} progress save failed: ' + str(db_err))
+
+    def remove_chunks(self):
+        """Remove the merged chunks from memory and document storage once the report is saved."""
+        for name in self.chunk_refs:
+            GoogleStorageService.delete_document(name, DocumentTypes.BATCH_REGISTRATION)
+        self.chunk_refs = []
+        self.chunks = []
+
+    def _failed(self, response, message: str):
+        """Record the job failure and return the failed report api response tuple."""
+        current_app.logger.error(message)
+        self.status = STATUS_FAILED
+        self.error = message
+        self.update_time = time.time()
+        self.save_progress()
+        return response
+
+    def _save_chunk(self, chunk):
+        """Keep the merged chunk, saving it to document storage when the job progress is saved."""
+        if self.job_key:
+            name: str = CHUNK_STORAGE_NAME.format(job_id=self.job_id, chunk=len(self.chunks) + 1)
+            GoogleStorageService.save_document(name, chunk, DocumentTypes.BATCH_REGISTRATION)
+            self.chunk_refs.append(name)
+        self.chunks.append(chunk)
+
+    def _load_chunks(self):
+        """Fetch the chunks merged by a previous run of the job in another process from document storage."""
+        for index, chunk in enumerate(self.chunks):
+            if chunk is None:
+                self.chunks[index] = GoogleStorageService.get_document(self.chunk_refs[index],
+                                                                       DocumentTypes.BATCH_REGISTRATION)
+
+    def _merge_chunk(self, pdfs: list, registration_count: int):
+        """Merge the rendered chunk reports, saving the merged chunk: return an error response if the merge fails."""
+        if len(pdfs) == 1:
+            self._save_chunk(pdfs[0])
+        else:
+            raw_data, status_code, headers = Report.batch_merge(pdfs)
+            if status_code not in (HTTPStatus.OK, HTTPStatus.CREATED):
+                return self._failed((raw_data, status_code, headers),
+                                    'Batch manufacturer report chunk merge failed: ' + raw_data.get_data(as_text=True))
+            self._save_chunk(raw_data)
+        self.merged_count += registration_count
+        self.update_time = time.time()
+        self.save_progress()
+        return None
+
+    def run(self):
+        """Render and merge the reports that have not been merged: return the merged report response tuple.
+
+        The completed job progress is saved by the caller once the report is saved.
+        """
+        app = current_app._get_current_object()  # pylint: disable=protected-access
+        concurrency: int = max(1, int(app.config.get('BATCH_REPORT_CONCURRENCY', 4)))
+        chunk_size: int = max(1, int(app.config.get('BATCH_REPORT_MERGE_SIZE', 50)))
+        self.status = STATUS_RUNNING
+        self.error = None
+        self.rendered_count = self.merged_count
+        self.update_time = time.time()
+        self.save_progress()
+        start: int = self.merged_count
+        total: int = len(self.registrations)
+        app.logger.info(f'Batch manufacturer report rendering {total - start} of {total} registrations ' +
+                        f'concurrency={concurrency}.')
+        try:
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                futures = [executor.submit(self._render, app, index) for index in range(start, total)]
+                try:
+                    pdfs = []
+                    for index, future in zip(range(start, total), futures):
+                        raw_data, status_code, headers = future.result()
+                        if status_code not in (HTTPStatus.OK, HTTPStatus.CREATED):
+                            reg_id = self.registrations[index].get('registrationId')
+                            return self._failed((raw_data, status_code, headers),
+                                                f'{reg_id} report api call failed: ' + raw_data.get_data(as_text=True))
+                        pdfs.append(raw_data)
+                        self.rendered_count += 1
+                        if len(pdfs) == chunk_size or index == total - 1:
+                            error_response = self._merge_chunk(pdfs, len(pdfs))
+                            if error_response:
+                                return error_response
+                            pdfs = []
+                finally:
+                    for future in futures:
+                        future.cancel()
+            self._load_chunks()
+            if len(self.chunks) == 1:
+                response = self.chunks[0], HTTPStatus.OK, PDF_HEADERS
+            else:
+                response = Report.batch_merge(self.chunks)
+                if response[1] not in (HTTPStatus.OK, HTTPStatus.CREATED):
+                    return self._failed(response, 'Batch manufacturer report merge failed: ' +
+                                        response[0].get_data(as_text=True))
+            self.status = STATUS_COMPLETED
+            self.update_time = time.time()
+            return response
+        except Exception as err:  # noqa: B902; record the failure then raise
+            self._failed(None, 'Batch manufacturer report failed: ' + str(err))
+            raise err
+
+
+def get_job(job_id: str) -> BatchReportJob:
+    """Get the batch report job by job id: a job run by another process is created from the saved job progress."""
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+    if job is None:
+        record = MhrBatchReportJob.find_by_job_id(job_id)
+        if record:
+            job = BatchReportJob.from_record(record)
+    return job
+
+
+def remove_job(job_id: str):
+    """Remove the process batch report job by job id."""
+    with _jobs_lock:
+        _jobs.pop(job_id, None)
+
+
+def find_saved_job(registrations: list, job_key: str) -> BatchReportJob:
+    """Get the most recent saved job for the job key: a job run by another process or before a restart."""
+    record = MhrBatchReportJob.find_by_job_key(job_key)
+    if record and record.registration_count == len(registrations):
+        return BatchReportJob.from_record(record, registrations, job_key)
+    return None
+
+
+def start_job(registrations: list, job_key: str, on_complete) -> BatchReportJob:
+    """Start the report job in a background thread, or resume the failed job for the same job key.
+
+    When the report is generated on_complete is called with the report and returns the report download url. A job
+    that is pending, running, or completed for the job key is returned without starting a new one. A job saved by
+    another process is resumed if it failed, or if it is pending or running with no progress saved within
+    BATCH_REPORT_JOB_STALE_SECONDS because the process stopped.
+    """
+    app = current_app._get_current_object()  # pylint: disable=protected-access
+    stale_seconds: int = int(app.config.get('BATCH_REPORT_JOB_STALE_SECONDS', 600))
+    with _jobs_lock:
+        now = time.time()
+        for job_id in [job_id for job_id, job in _jobs.items()
+                       if job.status in (STATUS_COMPLETED, STATUS_FAILED) and
+                       now - job.update_time > JOB_RETENTION_SECONDS]:
+            del _jobs[job_id]
+        job = next((job for job in _jobs.values() if job.job_key == job_key), None)
+        if job and job.status != STATUS_FAILED:
+            return job
+        if job is None:
+            job = find_saved_job(registrations, job_key)
+            if job and (job.status == STATUS_COMPLETED or
+                        (job.status != STATUS_FAILED and now - job.update_time <= stale_seconds)):
+                return job
+            if job:
+                app.logger.info(f'Resuming batch report job {job.job_id} status={job.status} ' +
+                                f'merged={job.merged_count}.')
+        if job is None:
+            job = BatchReportJob(registrations, job_key)
+        _jobs[job.job_id] = job
+        job.status = STATUS_PENDING
+    job.save_progress()
+
+    def run_job():
+        with app.app_context():
+            try:
+                raw_data, status_code, headers = job.run()  # pylint: disable=unused-variable
+                if job.status == STATUS_COMPLETED:
+                    job.report_url = on_complete(raw_data)
+                    job.remove_chunks()
+            except Exception as err:  # noqa: B902; the job records the error
+                app.logger.error(f'Batch report job {job.job_id} failed: ' + str(err))
+                job.status = STATUS_FAILED
+                job.error = job.error or str(err)
+            job.update_time = time.time()
+            job.save_progress()
+
+    Thread(target=run_job, daemon=True).start()
+    return job
@@ -15,7 +15,8 @@
 
 If a legacy registration location contains a pid and it does not exist in the modernized database,
 make an ltsa api call to fetch the legal description and store it for search results as the
-legacy database does not store it. This api limits the update to 500 pids at a time.
+legacy database does not store it. This api limits the update to 500 pids at a time. The pids are looked up
+concurrently at a limited rate.
 """
 from http import HTTPStatus
 
@@ -24,7 +25,7 @@ from flask import Blueprint, current_app, request, jsonify
 from flask_cors import cross_origin
 
 from mhr_api.exceptions import DatabaseException
-from mhr_api.models import utils as model_utils, LtsaDescription
+from mhr_api.models import utils as model_utils
 from mhr_api.models.db2 import utils as db2_utils
 from mhr_api.resources import utils as resource_utils
 from mhr_api.services import ltsa
@@ -57,17 +58,7 @@ def post_ltsa_sync():
                 'successPids': []
             }
             return response_json, HTTPStatus.OK
-        error_pids = []
-        success_pids = []
-        for pid in pid_list:
-            try:
-                ltsa_desc: LtsaDescription = ltsa.save_description(pid.get('pidNumber'))
-                if ltsa_desc and ltsa_desc.ltsa_description:
-                    success_pids.append(pid)
-                else:
-                    error_pids.append(pid)
-            except Exception:   # noqa: B902; return nicer default error
-                error_pids.append(pid)
+        success_pids, error_pids = ltsa.sync_descriptions(pid_list)
         current_app.logger.debug(f'LTSA sync completed: success count {len(success_pids)}.')
         current_app.logger.debug(f'LTSA sync error count {len(error_pids)}.')
 
@@ -26,8 +26,7 @@ from mhr_api.services.authz import authorized, authorized_role, is_staff, is_all
 from mhr_api.services.authz import is_reg_staff_account, get_group, MANUFACTURER_GROUP
 from mhr_api.models import EventTracking, MhrRegistration, MhrManufacturer, registration_utils as model_reg_utils
 from mhr_api.models.registration_utils import AccountRegistrationParams
-from mhr_api.reports import get_callback_pdf
-from mhr_api.reports.v2.report import Report
+from mhr_api.reports import batch_report
 from mhr_api.reports.v2.report_utils import ReportTypes
 from mhr_api.resources import utils as resource_utils, registration_utils as reg_utils
 from mhr_api.services.payment import TransactionTypes
@@ -42,6 +41,7 @@ CURRENT_PARAM: str = 'current'
 COLLAPSE_PARAM: str = 'collapse'
 NOTIFY_PARAM: str = 'notify'
 DOWNLOAD_LINK_PARAM: str = 'downloadLink'
+BACKGROUND_PARAM: str = 'background'
 ACCOUNT_MANUFACTURER_ERROR = 'No existing manufacturer information found for account={account_id}.'
 DEFAULT_DOWNLOAD_DAYS: int = 7
 
@@ -274,27 +274,64 @@ def get_batch_manufacturer_registrations():  # pylint: disable=too-many-return-s
 @bp.route('/batch/manufacturer', methods=['POST', 'OPTIONS'])
 @cross_origin(origin='*')
 def post_batch_manufacturer_registrations():  # pylint: disable=too-many-return-statements
-    """Generate the batch manufacturer registrations report for registries staff and optionally email."""
-    return get_batch_manufacturer_registrations()
+    """Generate the batch manufacturer registrations report for registries staff and optionally email.
+
+    With the background parameter the report is generated by a background job: the job progress is returned.
+    """
+    if not get_optional_param(request, BACKGROUND_PARAM, False):
+        return get_batch_manufacturer_registrations()
+    try:
+        current_app.logger.info('starting batch manufacturer registrations report job')
+        if not resource_utils.valid_api_key(request):
+            return resource_utils.unauthorized_error_response('batch manufacturer registrations report')
+        start_ts: str = request.args.get(model_reg_utils.START_TS_PARAM, None)
+        end_ts: str = request.args.get(model_reg_utils.END_TS_PARAM, None)
+        notify: bool = get_optional_param(request, NOTIFY_PARAM, False)
+        if start_ts and end_ts:
+            start_ts = resource_utils.remove_quotes(start_ts)
+            end_ts = resource_utils.remove_quotes(end_ts)
+        registrations = model_reg_utils.get_batch_manufacturer_reg_report_data(start_ts, end_ts)
+        if not registrations:
+            return batch_manufacturer_report_empty(notify, start_ts, end_ts)
+        if registrations[0].get('batchStorageUrl'):  # Report already generated so fetch it.
+            return batch_manufacturer_report_exists(registrations[0].get('batchStorageUrl'), notify, True)
+
+        def save_report(raw_data) -> str:
+            report_url: str = save_batch_manufacturer_report(registrations, raw_data, True)
+            batch_manufacturer_report_response(raw_data, report_url, notify)
+            return report_url
+
+        job_key: str = ','.join(str(reg.get('registrationId')) for reg in registrations)
+        job = batch_report.start_job(registrations, job_key, save_report)
+        return job.json, HTTPStatus.ACCEPTED
+    except DatabaseException as db_exception:
+        return event_error_response(resource_utils.CallbackExceptionCodes.DEFAULT,
+                                    HTTPStatus.INTERNAL_SERVER_ERROR,
+                                    'Batch manufacturer report database error: ' + str(db_exception))
+    except Exception as default_exception:   # noqa: B902; return nicer default error
+        return event_error_response(resource_utils.CallbackExceptionCodes.DEFAULT,
+                                    HTTPStatus.INTERNAL_SERVER_ERROR,
+                                    'Batch manufacturer report default error: ' + str(default_exception))
+
+
+@bp.route('/batch/manufacturer/jobs/<string:job_id>', methods=['GET', 'OPTIONS'])
+@cross_origin(origin='*')
+def get_batch_manufacturer_job(job_id: str):
+    """Get the progress of a batch manufacturer registrations report background job."""
+    if not resource_utils.valid_api_key(request):
+        return resource_utils.unauthorized_error_response('batch manufacturer registrations report')
+    job = batch_report.get_job(job_id)
+    if not job:
+        return resource_utils.not_found_error_response('batch manufacturer report job', job_id)
+    return job.json, HTTPStatus.OK
 
 
 def get_batch_manufacturer_report(registrations):
-    """Build the batch manufacturer registration report from the registrations."""
-    reports = []
-    # Generate individual registration reports with a cover letter
-    for reg in registrations:
-        raw_data, status_code, headers = get_callback_pdf(reg.get('reportData'),
-                                                          reg.get('accountId'),
-                                                          ReportTypes.MHR_REGISTRATION_STAFF,
-                                                          None,
-                                                          None)
-        if status_code in (HTTPStatus.OK, HTTPStatus.CREATED):
-            reports.append(raw_data)
-        else:
-            current_app.logger.error(str(reg.get('registrationId')) +
-                                     ' report api call failed: ' + raw_data.get_data(as_text=True))
-            return raw_data, status_code, headers
-    return Report.batch_merge(reports)
+    """Build the batch manufacturer registration report from the registrations.
+
+    The individual registration reports with a cover letter are rendered concurrently and merged in order.
+    """
+    return batch_report.BatchReportJob(registrations).run()
 
 
 def save_batch_manufacturer_report(registrations, raw_data, return_link: bool) -> str:
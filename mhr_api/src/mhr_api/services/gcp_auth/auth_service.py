@@ -13,6 +13,7 @@
 # limitations under the License.
 """This maintains access tokens for API calls."""
 import base64
+import datetime
 import json
 import os
 
@@ -22,6 +23,7 @@ from google.oauth2 import service_account
 from flask import current_app
 
 from mhr_api.services.abstract_auth_service import AuthService
+from mhr_api.services.token_manager import GCP_ACCESS_TOKEN, REPORT_API_TOKEN, jwt_expires_in, token_manager
 
 
 class GoogleAuthService(AuthService):  # pylint: disable=too-few-public-methods
@@ -45,14 +47,17 @@ class GoogleAuthService(AuthService):  # pylint: disable=too-few-public-methods
 
     @classmethod
     def get_token(cls):
-        """Generate an OAuth access token with cloud storage access."""
-        if cls.credentials is None:
-            cls.credentials = service_account.Credentials.from_service_account_info(cls.service_account_info,
-                                                                                    scopes=cls.GCP_SA_SCOPES)
-        request = google.auth.transport.requests.Request()
-        cls.credentials.refresh(request)
-        current_app.logger.info('Call successful: obtained token.')
-        return cls.credentials.token
+        """Get an OAuth access token with cloud storage access: the token is refreshed shortly before it expires."""
+        def refresh():
+            credentials = cls.get_credentials()
+            request = google.auth.transport.requests.Request()
+            credentials.refresh(request)
+            current_app.logger.info('Call successful: obtained token.')
+            expires_in = (credentials.expiry - datetime.datetime.utcnow()).total_seconds() \
+                if credentials.expiry else 0
+            return credentials.token, expires_in
+
+        return token_manager.get_token(GCP_ACCESS_TOKEN, refresh)
 
     @classmethod
     def get_report_api_token(cls):
@@ -60,10 +65,14 @@ class GoogleAuthService(AuthService):  # pylint: disable=too-few-public-methods
         audience = current_app.config.get('REPORT_API_AUDIENCE')
         if not audience:
             return None
-        auth_req = google.auth.transport.requests.Request()
-        token = google.oauth2.id_token.fetch_id_token(auth_req, audience)
-        current_app.logger.info('Call successful: obtained token.')
-        return token
+
+        def refresh():
+            auth_req = google.auth.transport.requests.Request()
+            token = google.oauth2.id_token.fetch_id_token(auth_req, audience)
+            current_app.logger.info('Call successful: obtained token.')
+            return token, jwt_expires_in(token)
+
+        return token_manager.get_token(REPORT_API_TOKEN, refresh)
 
     @classmethod
     def get_credentials(cls):
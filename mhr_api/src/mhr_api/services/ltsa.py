@@ -11,12 +11,21 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-"""This manages all of the ltsa service integration for the application: PID lookup."""
+"""This manages all of the ltsa service integration for the application: PID lookup.
+
+PID lookups share one keep-alive connection pool with a request timeout. The legacy legal description sync looks up
+pids concurrently, limited by a token bucket so the gateway receives at most LTSA_RATE_LIMIT requests per second, and
+saves the descriptions in batches.
+"""
 import copy
 import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
 
 import requests
 from flask import current_app
+from requests.adapters import HTTPAdapter
 
 from mhr_api.models import LtsaDescription
 
@@ -32,6 +41,60 @@ ORDER_TEMPLATE = {
     }
 }
 
+_session = None  # pylint: disable=invalid-name
+_session_lock = Lock()
+
+
+class TokenBucket():
+    """Thread safe token bucket rate limiter: tokens are added at rate per second up to capacity."""
+
+    def __init__(self, rate: float, capacity: float = None):
+        """Create the bucket full: a rate of 0 or less is unlimited."""
+        self.rate: float = rate
+        self.capacity: float = capacity if capacity else max(rate, 1)
+        self._tokens: float = self.capacity
+        self._updated: float = time.monotonic()
+        self._lock = Lock()
+
+    def acquire(self):
+        """Take a token, waiting until one is available."""
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_seconds = (1 - self._tokens) / self.rate
+            time.sleep(wait_seconds)
+
+
+def get_session() -> requests.Session:
+    """Get the LTSA keep-alive session, creating the connection pool from the app config on first use."""
+    global _session  # pylint: disable=global-statement,invalid-name
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                pool_size: int = max(1, int(current_app.config.get('LTSA_SYNC_CONCURRENCY', 10)))
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                _session = session
+    return _session
+
+
+def close_session():
+    """Close the LTSA session connections: a new session is created on next use."""
+    global _session  # pylint: disable=global-statement,invalid-name
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+
 
 def pid_lookup(pid: str) -> dict:
     """LTSA parcel order lookup by PID."""
@@ -52,12 +115,13 @@ def pid_lookup(pid: str) -> dict:
             'x-apikey': api_key
         }
         # current_app.logger.debug('LTSA PID lookup url=' + api_url)
-        response = requests.request(
+        response = get_session().request(
             'post',
             api_url,
             params=None,
             json=data,
-            headers=headers
+            headers=headers,
+            timeout=current_app.config.get('LTSA_TIMEOUT')
         )
         # if response:
         #    current_app.logger.info('LTSA api response=' + response.text)
@@ -85,3 +149,49 @@ def save_description(pid: str, update: bool = False) -> LtsaDescription:
         description.save()
         # current_app.logger.debug(f'LTSA description saved for pid={pid}')
     return description
+
+
+def lookup_descriptions(pids: list) -> dict:
+    """Look up the legal descriptions of the pids concurrently: return the descriptions found by pid.
+
+    At most LTSA_SYNC_CONCURRENCY lookups run at the same time, and lookups start at no more than LTSA_RATE_LIMIT
+    per second.
+    """
+    descriptions = {}
+    if not pids:
+        return descriptions
+    app = current_app._get_current_object()  # pylint: disable=protected-access
+    concurrency: int = max(1, int(app.config.get('LTSA_SYNC_CONCURRENCY', 10)))
+    bucket = TokenBucket(float(app.config.get('LTSA_RATE_LIMIT', 10)))
+
+    def lookup(pid: str):
+        bucket.acquire()
+        with app.app_context():
+            ltsa_json = pid_lookup(pid)
+        return ltsa_json.get('legalDescription') if ltsa_json else None
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for pid, description in zip(pids, executor.map(lookup, pids)):
+            if description:
+                descriptions[pid] = description
+    return descriptions
+
+
+def sync_descriptions(pid_list: list) -> tuple:
+    """Look up and save the legal descriptions of the legacy pids: return the success and error pid lists."""
+    pids = [pid.get('pidNumber') for pid in pid_list]
+    current_app.logger.info(f'LTSA sync looking up {len(pids)} pids.')
+    descriptions = lookup_descriptions(pids)
+    batch_size: int = max(1, int(current_app.config.get('LTSA_SYNC_BATCH_SIZE', 100)))
+    saved = set()
+    items = list(descriptions.items())
+    for start in range(0, len(items), batch_size):
+        try:
+            batch = dict(items[start:start + batch_size])
+            LtsaDescription.save_descriptions(batch)
+            saved.update(batch.keys())
+        except Exception as err:  # noqa: B902; the batch pids are errors
+            current_app.logger.error('LTSA sync save descriptions failed: ' + str(err))
+    success_pids = [pid for pid in pid_list if pid.get('pidNumber') in saved]
+    error_pids = [pid for pid in pid_list if pid.get('pidNumber') not in saved]
+    return success_pids, error_pids
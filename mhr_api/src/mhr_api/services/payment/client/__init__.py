@@ -23,6 +23,7 @@ import requests
 from flask import current_app
 
 from mhr_api.services.payment import TransactionTypes
+from mhr_api.services.token_manager import SERVICE_ACCOUNT_TOKEN, token_manager
 from mhr_api.utils.base import BaseEnum
 
 
@@ -500,7 +501,12 @@ class SBCPaymentClient(BaseClient):
 
     @staticmethod
     def get_sa_token():
-        """Refunds must be submitted with a PPR service account token. Request one from the OIDC service."""
+        """Refunds must be submitted with a PPR service account token: cached until shortly before it expires."""
+        return token_manager.get_token(SERVICE_ACCOUNT_TOKEN, SBCPaymentClient.request_sa_token)
+
+    @staticmethod
+    def request_sa_token():
+        """Request a new PPR service account token from the OIDC service: return the token and seconds until expiry."""
         oidc_token_url = current_app.config.get('JWT_OIDC_TOKEN_URL')
         client_id = current_app.config.get('ACCOUNT_SVC_CLIENT_ID')
         client_secret = current_app.config.get('ACCOUNT_SVC_CLIENT_SECRET')
@@ -525,7 +531,7 @@ class SBCPaymentClient(BaseClient):
             response_json = json.loads(response.text)
             token = response_json['access_token']
             current_app.logger.info('Have new sa token from OIDC.')
-            return token
+            return token, response_json.get('expires_in', 0)
 
         except (ApiRequestError) as err:
             current_app.logger.error(err.message)
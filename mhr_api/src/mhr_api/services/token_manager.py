@@ -0,0 +1,103 @@
+# Copyright © 2019 Province of British Columbia
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""This module holds the process level cache of the access tokens used for downstream service calls.
+
+Each token is kept until TOKEN_EXPIRY_MARGIN seconds before it expires. When a token needs refreshing only one thread
+refreshes it: concurrent callers wait for and use the new token.
+"""
+import time
+from threading import Lock
+
+from flask import current_app
+from jose import jwt as jose_jwt
+
+
+# Token names.
+GCP_ACCESS_TOKEN = 'GCP_ACCESS'
+REPORT_API_TOKEN = 'REPORT_API'
+SERVICE_ACCOUNT_TOKEN = 'SERVICE_ACCOUNT'
+
+
+def jwt_expires_in(token: str) -> float:
+    """Get the number of seconds until the JWT token expires from the exp claim: 0 if it cannot be read."""
+    try:
+        expiry = jose_jwt.get_unverified_claims(token).get('exp')
+        return float(expiry) - time.time() if expiry else 0
+    except Exception:  # pylint: disable=broad-except # noqa F841;
+        return 0
+
+
+class TokenManager():
+    """Cache of named access tokens, each refreshed shortly before it expires."""
+
+    def __init__(self):
+        """Create the manager with no tokens."""
+        self._tokens = {}
+        self._locks = {}
+        self._lock = Lock()
+        self.refresh_counts = {}
+
+    def _token_lock(self, name: str) -> Lock:
+        """Get the lock that serializes refreshing the named token."""
+        with self._lock:
+            if name not in self._locks:
+                self._locks[name] = Lock()
+            return self._locks[name]
+
+    def _valid_token(self, name: str) -> str:
+        """Get the named token if it is not within the expiry margin."""
+        cached = self._tokens.get(name)
+        if cached and time.monotonic() < cached[1]:
+            return cached[0]
+        return None
+
+    def get_token(self, name: str, refresh) -> str:
+        """Get the named token, calling refresh for a new one if it is missing or about to expire.
+
+        The refresh function returns the new token and the number of seconds until it expires.
+        """
+        token = self._valid_token(name)
+        if token:
+            return token
+        with self._token_lock(name):
+            token = self._valid_token(name)
+            if token:
+                return token
+            token, expires_in = refresh()
+            margin: int = int(current_app.config.get('TOKEN_EXPIRY_MARGIN', 60))
+            with self._lock:
+                self.refresh_counts[name] = self.refresh_counts.get(name, 0) + 1
+                if token and expires_in and expires_in > margin:
+                    self._tokens[name] = (token, time.monotonic() + expires_in - margin)
+                else:
+                    self._tokens.pop(name, None)
+            current_app.logger.info(f'Refreshed {name} token expires in {expires_in}.')
+            return token
+
+    def metrics(self) -> dict:
+        """Get the number of times each token has been refreshed."""
+        with self._lock:
+            return dict(self.refresh_counts)
+
+    def clear(self, name: str = None):
+        """Remove the named token, or all the tokens if no name: they are refreshed on next use."""
+        with self._lock:
+            if name:
+                self._tokens.pop(name, None)
+            else:
+                self._tokens = {}
+                self.refresh_counts = {}
+
+
+token_manager = TokenManager()  # pylint: disable=invalid-name
@@ -25,6 +25,7 @@ from registry_schemas.example_data.mhr import REGISTRATION
 
 from mhr_api.models import MhrRegistration, registration_utils as reg_utils, utils as model_utils
 from mhr_api.models.type_tables import MhrDocumentTypes, MhrRegistrationTypes
+from mhr_api.reports import batch_report
 from mhr_api.resources.registration_utils import (
     notify_man_reg_config,
     email_batch_man_report_data,
@@ -165,6 +166,12 @@ TEST_BATCH_MANUFACTURER_MHREG_DATA = [
     ('Valid data download', '2023-05-25T07:01:00+00:00', '2023-05-26T07:01:00+00:00', HTTPStatus.OK, True, True),
     ('Valid default interval may have data', None, None, HTTPStatus.OK, True, False)
 ]
+# testdata pattern is ({desc}, {start_ts}, {end_ts}, {status}, {has_key})
+TEST_BATCH_MANUFACTURER_JOB_DATA = [
+    ('Unauthorized', None, None, HTTPStatus.UNAUTHORIZED, False),
+    ('Valid no data', '2023-02-25T07:01:00+00:00', '2023-02-26T07:01:00+00:00', HTTPStatus.NO_CONTENT, True),
+    ('Valid data', '2023-05-25T07:01:00+00:00', '2023-05-26T07:01:00+00:00', HTTPStatus.ACCEPTED, True)
+]
 # testdata pattern is ({desc}, {roles}, {status}, {sort_criteria}, {sort_direction})
 TEST_GET_ACCOUNT_DATA_SORT2 = [
     ('Sort mhr number', [MHR_ROLE, STAFF_ROLE], HTTPStatus.OK, reg_utils.MHR_NUMBER_PARAM, None)
@@ -455,6 +462,49 @@ def test_get_batch_mhreg_manufacturer_report(session, client, jwt, desc, start_t
         assert rv.json.get('reportDownloadUrl')
 
 
+@pytest.mark.parametrize('desc,start_ts,end_ts,status,has_key', TEST_BATCH_MANUFACTURER_JOB_DATA)
+def test_batch_mhreg_manufacturer_job(session, client, jwt, monkeypatch, desc, start_ts, end_ts, status, has_key):
+    """Assert that starting and polling a background batch manufacturer registration report job works as expected."""
+    # setup: register the job without running it in a background thread.
+    class PendingThread():
+        """Job thread that is never started."""
+
+        def __init__(self, target, daemon):
+            """Ignore the job."""
+
+        def start(self):
+            """Leave the job pending."""
+
+    monkeypatch.setattr(batch_report, 'Thread', PendingThread)
+    apikey = current_app.config.get('SUBSCRIPTION_API_KEY')
+    params: str = '?background=true&notify=false'
+    if has_key:
+        params += '&x-apikey=' + apikey
+    if start_ts and end_ts:
+        params += f'&{reg_utils.START_TS_PARAM}={start_ts}&{reg_utils.END_TS_PARAM}={end_ts}'
+    # test
+    rv = client.post('/api/v1/registrations/batch/manufacturer' + params)
+    # check
+    if rv.status_code == HTTPStatus.OK:  # Report already generated.
+        assert rv.json.get('reportDownloadUrl')
+        return
+    assert rv.status_code == status
+    if status == HTTPStatus.ACCEPTED:
+        job_id = rv.json['jobId']
+        try:
+            assert job_id
+            assert rv.json['status'] == batch_report.STATUS_PENDING
+            assert rv.json['registrationCount'] > 0
+            rv = client.get(f'/api/v1/registrations/batch/manufacturer/jobs/{job_id}?x-apikey={apikey}')
+            assert rv.status_code == HTTPStatus.OK
+            assert rv.json['jobId'] == job_id
+            assert rv.json['status'] == batch_report.STATUS_PENDING
+            rv = client.get(f'/api/v1/registrations/batch/manufacturer/jobs/JUNK?x-apikey={apikey}')
+            assert rv.status_code == HTTPStatus.NOT_FOUND
+        finally:
+            batch_report.remove_job(job_id)
+
+
 def test_batch_manufacturer_notify_config(session, client, jwt):
     """Assert that building the batch manufacturer registration report notify configuration works as expected."""
     config = notify_man_reg_config()
@@ -20,6 +20,7 @@ results) is working as expected.
 import copy
 from http import HTTPStatus
 import json
+import time
 
 import pytest
 
@@ -479,3 +480,51 @@ def test_search_notes(session, mhr_num, has_notes, ncan_doc_id):
             assert has_ncan
     else:
         assert not reg_json.get('notes')
+
+
+class CountingDict(dict):
+    """Search result dict that counts the reads of its values."""
+
+    reads: int = 0
+
+    def __getitem__(self, key):
+        """Count the read then get the value."""
+        CountingDict.reads += 1
+        return super().__getitem__(key)
+
+    def get(self, key, default=None):
+        """Count the read then get the value."""
+        CountingDict.reads += 1
+        return super().get(key, default)
+
+
+def build_scaling_select(size: int):
+    """Build a synthetic MHR number search selection with size matches: every second match is a duplicate."""
+    matches = []
+    for index in range(size):
+        matches.append(CountingDict({'mhrNumber': str(index // 2).zfill(6), 'status': 'ACTIVE',
+                                     'createDateTime': '1995-11-14T00:00:01+00:00', 'serialNumber': str(index),
+                                     'includeLienInfo': index % 3 == 0}))
+    return matches
+
+
+def count_select_reads(size: int) -> int:
+    """Return the number of result reads setting the search selection for size matches."""
+    select_data = build_scaling_select(size)
+    search_result: SearchResult = SearchResult()
+    search_result.search = SearchRequest(search_response=copy.deepcopy(select_data),
+                                         search_type=SearchRequest.SearchTypes.MANUFACTURED_HOME_NUM)
+    CountingDict.reads = 0
+    start = time.perf_counter()
+    search_result.set_search_selection(select_data)
+    current_app.logger.info(f'Search select {size} results={time.perf_counter() - start}s.')
+    assert len(search_result.search_select) == size / 2
+    return CountingDict.reads
+
+
+def test_search_select_scaling(session):
+    """Assert that the search selection reads scale linearly up to the maximum results size."""
+    reads_small = count_select_reads(1000)
+    reads_max = count_select_reads(5000)
+    # 5 times the results: rescanning the result lists (quadratic) reads about 25 times more.
+    assert reads_max <= reads_small * 5
@@ -0,0 +1,235 @@
+# Copyright © 2019 Province of British Columbia
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests to verify the concurrent batch manufacturer registrations report job.
+
+Test-Suite to ensure that the batch report job renders, retries, merges, and resumes as expected. The report api
+calls are replaced with in-memory renders and merges.
+"""
+from http import HTTPStatus
+import time
+
+import pytest
+from flask import current_app, jsonify
+
+from mhr_api.models import MhrBatchReportJob
+from mhr_api.reports import batch_report
+
+
+PDF_HEADERS = {'Content-Type': 'application/pdf'}
+# testdata pattern is ({description}, {concurrency}, {merge_size}, {registration_count}, {merge_count})
+TEST_ORDER_DATA = [
+    ('Single chunk', 4, 50, 7, 1),
+    ('Chunks merged then combined', 4, 3, 7, 3),
+    ('Serial one report chunks', 1, 1, 3, 1),
+    ('Single report', 4, 50, 1, 0)
+]
+# testdata pattern is ({description}, {retries}, {status}, {retry_count})
+TEST_RETRY_DATA = [
+    ('Retried reports complete', 1, batch_report.STATUS_COMPLETED, 2),
+    ('No retries fails', 0, batch_report.STATUS_FAILED, 0)
+]
+
+
+class FakeReportApi():
+    """In-memory report api: renders a registration as its id and merges by joining the pdfs."""
+
+    def __init__(self, fail_ids=None, error_ids=None):
+        """Set the registration ids to fail with an error status or an exception on the first attempt."""
+        self.fail_ids = set(fail_ids or [])
+        self.error_ids = set(error_ids or [])
+        self.always_fail_ids = set()
+        self.rendered = []
+        self.merges = []
+
+    def render(self, registration: dict):
+        """Render the registration: later registrations finish first so completion order differs from report order."""
+        reg_id = registration['registrationId']
+        time.sleep((10 - reg_id) * 0.002)
+        if reg_id in self.error_ids:
+            self.error_ids.remove(reg_id)
+            raise ValueError(f'Report {reg_id} connection error.')
+        if reg_id in self.fail_ids or reg_id in self.always_fail_ids:
+            self.fail_ids.discard(reg_id)
+            return jsonify(message=f'Report {reg_id} error.'), HTTPStatus.INTERNAL_SERVER_ERROR, None
+        self.rendered.append(reg_id)
+        return f'pdf-{reg_id}'.encode(), HTTPStatus.OK, PDF_HEADERS
+
+    def merge(self, pdfs: list):
+        """Merge the pdfs in list order."""
+        self.merges.append(len(pdfs))
+        return b'|'.join(pdfs), HTTPStatus.OK, PDF_HEADERS
+
+
+class FakeStorage():
+    """In-memory document storage for the merged report chunks."""
+
+    def __init__(self):
+        """Start with no documents."""
+        self.documents = {}
+
+    def save_document(self, name: str, raw_data, doc_type: str = None):  # pylint: disable=unused-argument
+        """Save the document by name."""
+        self.documents[name] = raw_data
+
+    def get_document(self, name: str, doc_type: str = None):  # pylint: disable=unused-argument
+        """Get the document by name."""
+        return self.documents[name]
+
+    def delete_document(self, name: str, doc_type: str = None):  # pylint: disable=unused-argument
+        """Delete the document by name."""
+        self.documents.pop(name, None)
+
+
+class SyncThread():
+    """Run the background job in the calling thread."""
+
+    def __init__(self, target, daemon: bool = False):  # pylint: disable=unused-argument
+        """Set the job function."""
+        self.target = target
+
+    def start(self):
+        """Run the job function."""
+        self.target()
+
+
+def setup_job(monkeypatch, report_api: FakeReportApi, count: int, concurrency: int = 4, merge_size: int = 50,
+              retries: int = 1, storage: FakeStorage = None) -> batch_report.BatchReportJob:
+    """Replace the report api and storage calls and set the job config: return a job for count registrations."""
+    monkeypatch.setattr(batch_report, 'GoogleStorageService', storage or FakeStorage())
+    monkeypatch.setattr(batch_report, 'render_registration_report', report_api.render)
+    monkeypatch.setattr(batch_report.Report, 'batch_merge', staticmethod(report_api.merge))
+    monkeypatch.setitem(current_app.config, 'BATCH_REPORT_CONCURRENCY', concurrency)
+    monkeypatch.setitem(current_app.config, 'BATCH_REPORT_MERGE_SIZE', merge_size)
+    monkeypatch.setitem(current_app.config, 'BATCH_REPORT_RETRIES', retries)
+    registrations = [{'registrationId': reg_id, 'accountId': 'PS12345', 'reportData': {}} for reg_id in range(count)]
+    return batch_report.BatchReportJob(registrations, 'UT-BATCH')
+
+
+def expected_report(reg_ids) -> bytes:
+    """Get the merged report of the registration ids in report order."""
+    return b'|'.join(f'pdf-{reg_id}'.encode() for reg_id in reg_ids)
+
+
+@pytest.mark.parametrize('desc,concurrency,merge_size,registration_count,merge_count', TEST_ORDER_DATA)
+def test_batch_report_order(session, monkeypatch, desc, concurrency, merge_size, registration_count, merge_count):
+    """Assert that the concurrently rendered reports are merged in report order by chunk."""
+    report_api = FakeReportApi()
+    job = setup_job(monkeypatch, report_api, registration_count, concurrency, merge_size)
+    raw_data, status_code, headers = job.run()
+    assert status_code == HTTPStatus.OK
+    assert headers == PDF_HEADERS
+    assert raw_data == expected_report(range(registration_count))
+    assert len(report_api.merges) == merge_count
+    assert job.status == batch_report.STATUS_COMPLETED
+    job_json = job.json
+    assert job_json['registrationCount'] == registration_count
+    assert job_json['renderedCount'] == registration_count
+    assert job_json['mergedCount'] == registration_count
+    assert job_json['retryCount'] == 0
+    assert 'error' not in job_json
+
+
+@pytest.mark.parametrize('desc,retries,status,retry_count', TEST_RETRY_DATA)
+def test_batch_report_retry(session, monkeypatch, desc, retries, status, retry_count):
+    """Assert that failed reports are retried up to the configured retries and otherwise fail the job."""
+    report_api = FakeReportApi(fail_ids=[2])
+    if retries:
+        report_api.error_ids.add(4)
+    job = setup_job(monkeypatch, report_api, 6, retries=retries)
+    raw_data, status_code, headers = job.run()  # pylint: disable=unused-variable
+    assert job.status == status
+    assert job.retry_count == retry_count
+    if status == batch_report.STATUS_COMPLETED:
+        assert status_code == HTTPStatus.OK
+        assert raw_data == expected_report(range(6))
+    else:
+        assert status_code == HTTPStatus.INTERNAL_SERVER_ERROR
+        assert job.error.startswith('2 report api call failed')
+        assert not report_api.merges
+
+
+def test_batch_report_resume(session, monkeypatch):
+    """Assert that running a failed job again only renders the registrations that were not merged."""
+    report_api = FakeReportApi()
+    report_api.always_fail_ids.add(3)
+    job = setup_job(monkeypatch, report_api, 5, merge_size=2, retries=0)
+    raw_data, status_code, headers = job.run()  # pylint: disable=unused-variable
+    assert job.status == batch_report.STATUS_FAILED
+    assert status_code == HTTPStatus.INTERNAL_SERVER_ERROR
+    assert job.merged_count == 2
+    assert len(job.chunks) == 1
+    # Resume: the first chunk is not rendered again.
+    report_api.always_fail_ids.clear()
+    report_api.rendered = []
+    raw_data, status_code, headers = job.run()
+    assert job.status == batch_report.STATUS_COMPLETED
+    assert status_code == HTTPStatus.OK
+    assert sorted(report_api.rendered) == [2, 3, 4]
+    assert raw_data == expected_report(range(5))
+    assert job.merged_count == 5
+    assert 'error' not in job.json
+
+
+def test_batch_report_resume_saved(session, monkeypatch):
+    """Assert that a failed job is resumed from the saved progress and merged chunks by a new process."""
+    report_api = FakeReportApi()
+    report_api.always_fail_ids.add(3)
+    storage = FakeStorage()
+    job = setup_job(monkeypatch, report_api, 5, merge_size=2, retries=0, storage=storage)
+    monkeypatch.setattr(batch_report, 'Thread', SyncThread)
+    reports = []
+
+    def save_report(raw_data) -> str:
+        reports.append(raw_data)
+        return 'https://storage/batch-report.pdf'
+
+    job = batch_report.start_job(job.registrations, 'UT-BATCH-SAVED', save_report)
+    assert job.status == batch_report.STATUS_FAILED
+    record = MhrBatchReportJob.find_by_job_key('UT-BATCH-SAVED')
+    assert record
+    assert record.job_id == job.job_id
+    assert record.status == batch_report.STATUS_FAILED
+    assert record.registration_count == 5
+    assert record.merged_count == 2
+    assert len(record.chunk_storage_refs) == 1
+    assert storage.documents.get(record.chunk_storage_refs[0]) == expected_report(range(2))
+    assert record.error
+    assert not reports
+    # A new process has no job in memory: the job is resumed from the saved progress.
+    batch_report.remove_job(job.job_id)
+    report_api.always_fail_ids.clear()
+    report_api.rendered = []
+    resumed_job = batch_report.start_job(job.registrations, 'UT-BATCH-SAVED', save_report)
+    assert resumed_job is not job
+    assert resumed_job.job_id == job.job_id
+    assert resumed_job.status == batch_report.STATUS_COMPLETED
+    assert sorted(report_api.rendered) == [2, 3, 4]
+    assert reports == [expected_report(range(5))]
+    record = MhrBatchReportJob.find_by_job_id(job.job_id)
+    assert record.status == batch_report.STATUS_COMPLETED
+    assert record.merged_count == 5
+    assert record.report_url == 'https://storage/batch-report.pdf'
+    assert not record.chunk_storage_refs
+    assert not storage.documents
+    # The completed job is returned without running again.
+    batch_report.remove_job(job.job_id)
+    report_api.rendered = []
+    completed_job = batch_report.start_job(job.registrations, 'UT-BATCH-SAVED', save_report)
+    assert completed_job.job_id == job.job_id
+    assert completed_job.status == batch_report.STATUS_COMPLETED
+    assert completed_job.json['reportDownloadUrl'] == 'https://storage/batch-report.pdf'
+    assert not report_api.rendered
+    assert len(reports) == 1
+    batch_report.remove_job(job.job_id)
@@ -0,0 +1,91 @@
+# Copyright © 2019 Province of British Columbia
+#
+# Licensed under the Apache License, Version 2.0 (the 'License');
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an 'AS IS' BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Local stub LTSA parcel order api for the sync tests and benchmarks.
+
+Each order response waits latency seconds, then returns a legal description for the requested parcel identifier.
+Pids starting with 888 return a not found error response. The server counts the requests and the peak number of
+requests in progress at the same time.
+"""
+import json
+import time
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+
+
+class LtsaStubServer():
+    """Run the stub LTSA api in a background thread, counting the order requests."""
+
+    def __init__(self, latency: float = 0.05):
+        """Create the stub server on a free local port."""
+        self.latency: float = latency
+        self.request_count: int = 0
+        self.in_flight: int = 0
+        self.peak_in_flight: int = 0
+        self._lock = Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._server.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        """Return the stub api base url."""
+        return f'http://127.0.0.1:{self._server.server_address[1]}/'
+
+    def _handler(self):
+        """Create the request handler class bound to this server."""
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            """Stub LTSA order request handler."""
+
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self):  # pylint: disable=invalid-name
+                """Return the parcel info order response."""
+                with stub._lock:  # pylint: disable=protected-access
+                    stub.request_count += 1
+                    stub.in_flight += 1
+                    stub.peak_in_flight = max(stub.peak_in_flight, stub.in_flight)
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+                pid: str = body['order']['productOrderParameters']['parcelIdentifier']
+                time.sleep(stub.latency)
+                with stub._lock:  # pylint: disable=protected-access
+                    stub.in_flight -= 1
+                if pid.startswith('888'):
+                    status = HTTPStatus.NOT_FOUND
+                    response = {'errorMessage': f'Parcel {pid} not found.'}
+                else:
+                    status = HTTPStatus.OK
+                    response = {'legalDescription': f'LOT 1 DISTRICT LOT 1 PARCEL {pid}'}
+                data = json.dumps(response).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+                """Do not log requests."""
+
+        return Handler
+
+    def __enter__(self):
+        """Start serving requests."""
+        Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *args):
+        """Stop serving requests."""
+        self._server.shutdown()
+        self._server.server_close()
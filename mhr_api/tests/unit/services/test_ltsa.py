@@ -16,12 +16,16 @@
 
 Test-Suite to ensure that the client for the auth-api service is working as expected.
 """
+import time
+
 import pytest
 from flask import current_app
 
 from mhr_api.models import LtsaDescription
 from mhr_api.services import ltsa
 
+from tests.unit.services.ltsa_stub import LtsaStubServer
+
 
 # testdata pattern is ({description}, {pid}, {valid})
 TEST_LOOKUP_DATA = [
@@ -35,6 +39,64 @@ TEST_SAVE_DATA = [
     ('023270098', False),
     ('008000000', True)
 ]
+# testdata pattern is ({description}, {rate}, {count}, {wait_seconds})
+TEST_BUCKET_DATA = [
+    ('Unlimited', 0, 50, 0),
+    ('Burst capacity', 100, 100, 0),
+    ('Rate limited', 50, 75, 0.5),
+    ('Rate limited below 1 per second', 0.5, 3, 4)
+]
+STUB_PIDS = ['999000001', '999000002', '888000003', '999000004', '999000005']
+
+
+def stub_config(app, url: str, concurrency: int, rate: float) -> dict:
+    """Point the LTSA lookups at the stub server: return the previous config to restore."""
+    keys = ('GATEWAY_LTSA_URL', 'LTSA_SYNC_CONCURRENCY', 'LTSA_RATE_LIMIT')
+    previous = {key: app.config.get(key) for key in keys}
+    app.config.update(dict(zip(keys, (url, concurrency, rate))))
+    ltsa.close_session()
+    return previous
+
+
+def restore_config(app, previous: dict):
+    """Restore the LTSA config after a stub server test."""
+    app.config.update(previous)
+    ltsa.close_session()
+
+
+class FakeClock():
+    """Token bucket clock where sleeping advances the time without waiting."""
+
+    def __init__(self):
+        """Start the clock with no time slept."""
+        self.now: float = 0
+        self.slept: float = 0
+
+    def monotonic(self) -> float:
+        """Return the clock time."""
+        return self.now
+
+    def sleep(self, seconds: float):
+        """Advance the clock time by at least a microsecond, like a real sleep."""
+        seconds = max(seconds, 0.000001)
+        self.now += seconds
+        self.slept += seconds
+
+
+def benchmark_lookup(concurrency: int, pids: list) -> int:
+    """Return the peak number of stub server requests in progress looking up the pids with the concurrency."""
+    with LtsaStubServer(0.05) as stub:
+        previous = stub_config(current_app, stub.url, concurrency, 0)
+        try:
+            start = time.perf_counter()
+            descriptions = ltsa.lookup_descriptions(pids)
+            current_app.logger.info(f'LTSA {len(pids)} pid lookups concurrency {concurrency}=' +
+                                    f'{time.perf_counter() - start}s peak requests {stub.peak_in_flight}.')
+            assert len(descriptions) == len(pids)
+            assert stub.request_count == len(pids)
+            return stub.peak_in_flight
+        finally:
+            restore_config(current_app, previous)
 
 
 @pytest.mark.parametrize('desc,pid,valid', TEST_LOOKUP_DATA)
@@ -61,3 +123,60 @@ def test_save_ltsa_description(session, jwt, pid, update):
     assert result.pid_number == pid
     assert result.ltsa_description
     assert result.update_ts
+
+
+@pytest.mark.parametrize('desc,rate,count,wait_seconds', TEST_BUCKET_DATA)
+def test_token_bucket(monkeypatch, desc, rate, count, wait_seconds):
+    """Assert that the token bucket allows a burst up to capacity then limits the rate."""
+    clock = FakeClock()
+    monkeypatch.setattr(ltsa, 'time', clock)
+    bucket = ltsa.TokenBucket(rate)
+    for _ in range(count):
+        bucket.acquire()
+    assert clock.slept == pytest.approx(wait_seconds, abs=0.001)
+
+
+def test_lookup_descriptions(session):
+    """Assert that the concurrent pid lookups return the descriptions found by pid."""
+    with LtsaStubServer(0.01) as stub:
+        previous = stub_config(current_app, stub.url, 3, 100)
+        try:
+            descriptions = ltsa.lookup_descriptions(STUB_PIDS)
+            assert stub.request_count == len(STUB_PIDS)
+            assert stub.peak_in_flight <= 3
+        finally:
+            restore_config(current_app, previous)
+    assert len(descriptions) == len(STUB_PIDS) - 1
+    assert '888000003' not in descriptions
+    assert descriptions['999000001'] == 'LOT 1 DISTRICT LOT 1 PARCEL 999-000-001'
+    assert not ltsa.lookup_descriptions([])
+
+
+def test_sync_descriptions(session):
+    """Assert that the sync saves the descriptions in batches and returns the success and error pids."""
+    existing = LtsaDescription.create('999000001', 'EXISTING DESCRIPTION')
+    existing.save()
+    pid_list = [{'pidNumber': pid} for pid in STUB_PIDS]
+    batch_size = current_app.config.get('LTSA_SYNC_BATCH_SIZE')
+    current_app.config['LTSA_SYNC_BATCH_SIZE'] = 2
+    with LtsaStubServer(0.01) as stub:
+        previous = stub_config(current_app, stub.url, 3, 100)
+        try:
+            success_pids, error_pids = ltsa.sync_descriptions(pid_list)
+        finally:
+            restore_config(current_app, previous)
+            current_app.config['LTSA_SYNC_BATCH_SIZE'] = batch_size
+    assert error_pids == [{'pidNumber': '888000003'}]
+    assert len(success_pids) == len(STUB_PIDS) - 1
+    for pid in success_pids:
+        description: LtsaDescription = LtsaDescription.find_by_pid_number(pid['pidNumber'])
+        assert description.ltsa_description.endswith(pid['pidNumber'][6:])
+    assert LtsaDescription.find_by_pid_number('999000001').id == existing.id
+    assert not LtsaDescription.find_by_pid_number('888000003')
+
+
+def test_ltsa_sync_benchmark(session):
+    """Assert that the lookups overlap at the stub server up to the concurrency limit."""
+    pids = [str(999100000 + index) for index in range(40)]
+    assert benchmark_lookup(1, pids) == 1
+    assert 1 < benchmark_lookup(10, pids) <= 10
@@ -0,0 +1,86 @@
+# Copyright © 2019 Province of British Columbia
+#
+# Licensed under the Apache License, Version 2.0 (the 'License');
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an 'AS IS' BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Token manager tests.
+
+Test-Suite to ensure that cached access tokens are refreshed only when they are about to expire.
+"""
+import threading
+import time
+
+import pytest
+from flask import current_app
+
+from mhr_api.services.token_manager import TokenManager, jwt_expires_in
+from tests.unit.services.utils import helper_create_jwt
+
+
+# testdata pattern is ({description}, {expires_in}, {get_count}, {refresh_count})
+TEST_TOKEN_DATA = [
+    ('Cached until expiry', 3600, 5, 1),
+    ('Expires within the margin', 30, 3, 3),
+    ('No expiry', 0, 3, 3),
+    ('No token', None, 2, 2)
+]
+
+
+@pytest.mark.parametrize('desc,expires_in,get_count,refresh_count', TEST_TOKEN_DATA)
+def test_get_token(session, desc, expires_in, get_count, refresh_count):
+    """Assert that a token is only refreshed when it is missing or within the expiry margin."""
+    manager = TokenManager()
+    refreshes = []
+
+    def refresh():
+        refreshes.append(desc)
+        return ('token' if expires_in is not None else None), expires_in
+
+    for _ in range(get_count):
+        token = manager.get_token('TEST', refresh)
+        assert token == ('token' if expires_in is not None else None)
+    assert len(refreshes) == refresh_count
+    assert manager.metrics() == {'TEST': refresh_count}
+    manager.clear('TEST')
+    manager.get_token('TEST', refresh)
+    assert len(refreshes) == refresh_count + 1
+
+
+def test_get_token_concurrent(session):
+    """Assert that concurrent callers share a single token refresh."""
+    manager = TokenManager()
+    refreshes = []
+    tokens = []
+    app = current_app._get_current_object()
+
+    def refresh():
+        refreshes.append(1)
+        time.sleep(0.1)
+        return 'token', 3600
+
+    def get_token():
+        with app.app_context():
+            tokens.append(manager.get_token('TEST', refresh))
+
+    threads = [threading.Thread(target=get_token) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(refreshes) == 1
+    assert tokens == ['token'] * 5
+
+
+def test_jwt_expires_in(session, jwt):
+    """Assert that the seconds until a JWT expires is read from the exp claim."""
+    token = helper_create_jwt(jwt)
+    assert jwt_expires_in(token) == pytest.approx(2539722391 - time.time(), abs=5)
+    assert jwt_expires_in('invalid') == 0
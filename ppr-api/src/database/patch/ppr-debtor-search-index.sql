@@ -0,0 +1,79 @@
+-- Debtor search index: business and individual debtor name searches read this table instead of joining the
+-- registrations, financing statements and parties and checking for discharges on every search. One row per current
+-- debtor of a base registration with the party search keys, the first name nickname groups, and the search window.
+-- Maintained when debtors are added or removed, a registration is discharged or renewed, and reconciled nightly.
+--DROP TABLE public.debtor_search_index;
+CREATE TABLE public.debtor_search_index (
+  party_id INTEGER PRIMARY KEY,
+  financing_id INTEGER NOT NULL,
+  party_type VARCHAR (2) NOT NULL,
+  registration_type VARCHAR (2) NOT NULL,
+  base_registration_num VARCHAR (10) NOT NULL,
+  base_registration_ts TIMESTAMP NOT NULL,
+  business_name VARCHAR (150) NULL,
+  business_srch_key VARCHAR (150) NULL,
+  bus_name_base VARCHAR (150) NULL,
+  bus_name_key_char1 VARCHAR (1) NULL,
+  last_name VARCHAR (50) NULL,
+  first_name VARCHAR (50) NULL,
+  middle_initial VARCHAR (50) NULL,
+  birth_date TIMESTAMP NULL,
+  last_name_key VARCHAR (50) NULL,
+  first_name_key VARCHAR (100) NULL,
+  first_name_key_char1 VARCHAR (1) NULL,
+  first_name_char1 VARCHAR (1) NULL,
+  first_name_char2 VARCHAR (1) NULL,
+  first_name_split1 VARCHAR (50) NULL,
+  first_name_split2 VARCHAR (50) NULL,
+  last_name_split1 VARCHAR (50) NULL,
+  last_name_split2 VARCHAR (50) NULL,
+  last_name_split3 VARCHAR (50) NULL,
+  nickname_ids INTEGER[] NULL,
+  searchable_until TIMESTAMP NULL,
+  FOREIGN KEY (party_id)
+      REFERENCES parties (id) ON DELETE CASCADE
+);
+CREATE INDEX ix_debtor_search_index_financing_id ON public.debtor_search_index USING btree (financing_id);
+CREATE INDEX ix_debtor_search_index_bus_key_char1 ON public.debtor_search_index USING btree (bus_name_key_char1);
+CREATE INDEX ix_debtor_search_index_last_name_key ON public.debtor_search_index USING btree (last_name_key);
+CREATE INDEX ix_debtor_search_index_bus_srch_key_trgm ON public.debtor_search_index
+  USING gin (business_srch_key gin_trgm_ops);
+CREATE INDEX ix_debtor_search_index_first_name_key_trgm ON public.debtor_search_index
+  USING gin (first_name_key gin_trgm_ops);
+CREATE INDEX ix_debtor_search_index_first_name_trgm ON public.debtor_search_index
+  USING gin (first_name gin_trgm_ops);
+CREATE INDEX ix_debtor_search_index_last_name_trgm ON public.debtor_search_index
+  USING gin (last_name gin_trgm_ops);
+CREATE INDEX ix_debtor_search_index_nickname_ids ON public.debtor_search_index USING gin (nickname_ids);
+
+-- Create the index rows of the existing searchable registrations.
+INSERT INTO debtor_search_index (party_id, financing_id, party_type, registration_type, base_registration_num,
+                                 base_registration_ts, business_name, business_srch_key, bus_name_base,
+                                 bus_name_key_char1, last_name, first_name, middle_initial, birth_date, last_name_key,
+                                 first_name_key, first_name_key_char1, first_name_char1, first_name_char2,
+                                 first_name_split1, first_name_split2, last_name_split1, last_name_split2,
+                                 last_name_split3, nickname_ids, searchable_until)
+SELECT p.id, fs.id, p.party_type, r.registration_type, r.registration_number, r.registration_ts,
+       p.business_name, p.business_srch_key, p.bus_name_base, p.bus_name_key_char1, p.last_name, p.first_name,
+       p.middle_initial, p.birth_date, p.last_name_key, p.first_name_key, p.first_name_key_char1, p.first_name_char1,
+       p.first_name_char2, p.first_name_split1, p.first_name_split2, p.last_name_split1, p.last_name_split2,
+       p.last_name_split3,
+       CASE WHEN p.party_type = 'DI' THEN ARRAY(SELECT n.name_id FROM nicknames n WHERE n.name = p.first_name) END,
+       LEAST(fs.expire_date, (SELECT MIN(r3.registration_ts)
+                                FROM registrations r3
+                               WHERE r3.financing_id = fs.id
+                                 AND r3.registration_type_cl = 'DISCHARGE')) + interval '30 days'
+  FROM registrations r, financing_statements fs, parties p
+ WHERE r.financing_id = fs.id
+   AND r.registration_type_cl IN ('PPSALIEN', 'MISCLIEN', 'CROWNLIEN')
+   AND r.base_reg_number IS NULL
+   AND p.financing_id = fs.id
+   AND p.registration_id_end IS NULL
+   AND p.party_type IN ('DB', 'DI')
+   AND (fs.expire_date IS NULL OR fs.expire_date > ((now() at time zone 'utc') - interval '30 days'))
+   AND NOT EXISTS (SELECT r3.id
+                     FROM registrations r3
+                    WHERE r3.financing_id = fs.id
+                      AND r3.registration_type_cl = 'DISCHARGE'
+                      AND r3.registration_ts < ((now() at time zone 'utc') - interval '30 days'))
+;
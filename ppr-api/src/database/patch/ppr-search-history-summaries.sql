@@ -0,0 +1,41 @@
+-- Search history summary: the account search history reads this compact summary maintained when the search request
+-- and search results are saved, instead of the search results JSON.
+--DROP TABLE public.search_history_summaries;
+CREATE TABLE public.search_history_summaries (
+  search_id INTEGER PRIMARY KEY,
+  username VARCHAR (1000) NULL,
+  selected_match_count INTEGER NULL,
+  exact_match_count INTEGER NOT NULL DEFAULT 0,
+  selection_match_count INTEGER NULL,
+  selection_exact_count INTEGER NOT NULL DEFAULT 0,
+  selection_pending BOOLEAN NOT NULL DEFAULT FALSE,
+  report_pending BOOLEAN NOT NULL DEFAULT FALSE,
+  report_stored BOOLEAN NOT NULL DEFAULT FALSE,
+  FOREIGN KEY (search_id)
+      REFERENCES search_requests (id) ON DELETE CASCADE
+);
+
+-- Create the summaries of the existing searches.
+INSERT INTO search_history_summaries (search_id, username, selected_match_count, exact_match_count,
+                                      selection_match_count, selection_exact_count, selection_pending,
+                                      report_pending, report_stored)
+SELECT sc.id,
+       CASE WHEN sc.user_id IS NULL THEN ''
+            ELSE (SELECT u.firstname || ' ' || u.lastname FROM users u WHERE u.username = sc.user_id
+                  FETCH FIRST 1 ROWS ONLY) END,
+       CASE WHEN json_typeof(sr.api_result) = 'array' THEN json_array_length(sr.api_result) END,
+       CASE WHEN json_typeof(sr.api_result) = 'array'
+            THEN (SELECT COUNT(*) FROM json_array_elements(sr.api_result) sr2 WHERE sr2 ->> 'matchType' = 'EXACT')
+            ELSE 0 END,
+       CASE WHEN json_typeof(sc.updated_selection) = 'array' THEN json_array_length(sc.updated_selection) END,
+       CASE WHEN json_typeof(sc.updated_selection) = 'array'
+            THEN (SELECT COUNT(*) FROM json_array_elements(sc.updated_selection) sc2
+                   WHERE sc2 ->> 'matchType' = 'EXACT')
+            ELSE 0 END,
+       sr.api_result IS NULL,
+       sr.callback_url IS NOT NULL AND sr.doc_storage_url IS NULL,
+       sr.doc_storage_url IS NOT NULL AND sr.doc_storage_url != ''
+  FROM search_requests sc, search_results sr
+ WHERE sc.id = sr.search_id
+   AND NOT EXISTS (SELECT sh.search_id FROM search_history_summaries sh WHERE sh.search_id = sc.id)
+;
@@ -0,0 +1,49 @@
+-- Serial search index: serial, MHR number and aircraft searches read this table instead of joining the registrations,
+-- financing statements and serial collateral and checking for discharges on every search. One row per current
+-- serial collateral of a base registration, maintained when collateral is added or removed, a registration is
+-- discharged or renewed, and reconciled nightly.
+--DROP TABLE public.serial_search_index;
+CREATE TABLE public.serial_search_index (
+  vehicle_id INTEGER PRIMARY KEY,
+  financing_id INTEGER NOT NULL,
+  registration_type VARCHAR (2) NOT NULL,
+  base_registration_num VARCHAR (10) NOT NULL,
+  base_registration_ts TIMESTAMP NOT NULL,
+  serial_type VARCHAR (2) NOT NULL,
+  serial_number VARCHAR (30) NULL,
+  year INTEGER NULL,
+  make VARCHAR (60) NULL,
+  model VARCHAR (60) NULL,
+  mhr_number VARCHAR (6) NULL,
+  srch_vin VARCHAR (6) NULL,
+  searchable_until TIMESTAMP NULL,
+  FOREIGN KEY (vehicle_id)
+      REFERENCES serial_collateral (id) ON DELETE CASCADE
+);
+CREATE INDEX ix_serial_search_index_srch_vin ON public.serial_search_index USING btree (srch_vin);
+CREATE INDEX ix_serial_search_index_mhr_number ON public.serial_search_index USING btree (mhr_number);
+CREATE INDEX ix_serial_search_index_financing_id ON public.serial_search_index USING btree (financing_id);
+
+-- Create the index rows of the existing searchable registrations.
+INSERT INTO serial_search_index (vehicle_id, financing_id, registration_type, base_registration_num,
+                                 base_registration_ts, serial_type, serial_number, year, make, model, mhr_number,
+                                 srch_vin, searchable_until)
+SELECT sc.id, fs.id, r.registration_type, r.registration_number, r.registration_ts,
+       sc.serial_type, sc.serial_number, sc.year, sc.make, sc.model, sc.mhr_number, sc.srch_vin,
+       LEAST(fs.expire_date, (SELECT MIN(r3.registration_ts)
+                                FROM registrations r3
+                               WHERE r3.financing_id = fs.id
+                                 AND r3.registration_type_cl = 'DISCHARGE')) + interval '30 days'
+  FROM registrations r, financing_statements fs, serial_collateral sc
+ WHERE r.financing_id = fs.id
+   AND r.registration_type_cl IN ('PPSALIEN', 'MISCLIEN', 'CROWNLIEN')
+   AND r.base_reg_number IS NULL
+   AND sc.financing_id = fs.id
+   AND sc.registration_id_end IS NULL
+   AND (fs.expire_date IS NULL OR fs.expire_date > ((now() at time zone 'utc') - interval '30 days'))
+   AND NOT EXISTS (SELECT r3.id
+                     FROM registrations r3
+                    WHERE r3.financing_id = fs.id
+                      AND r3.registration_type_cl = 'DISCHARGE'
+                      AND r3.registration_ts < ((now() at time zone 'utc') - interval '30 days'))
+;
@@ -30,6 +30,7 @@ from registry_schemas.flask import SchemaServices  # noqa: I001
 from ppr_api import config, errorhandlers, models
 from ppr_api.models import db
 from ppr_api.resources import API_BLUEPRINT, OPS_BLUEPRINT
+from ppr_api import reports  # noqa: I001; imported after resources to avoid a circular import.
 from ppr_api.schemas import rsbc_schemas
 from ppr_api.services import flags
 from ppr_api.translations import babel
@@ -59,6 +60,7 @@ def create_app(run_mode=os.getenv('FLASK_ENV', 'production')):
     flags.init_app(app)
 #    queue.init_app(app)
     babel.init_app(app)
+    reports.init_app(app)
 
     app.register_blueprint(API_BLUEPRINT)
     app.register_blueprint(OPS_BLUEPRINT)
@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 """This maintains access tokens for API calls."""
+import datetime
 import os
 from abc import ABC, abstractmethod
 
@@ -20,6 +21,8 @@ import google.oauth2.id_token
 from google.oauth2 import service_account
 from flask import current_app
 
+from ppr_api.services.token_manager import GCP_ACCESS_TOKEN, REPORT_API_TOKEN, jwt_expires_in, token_manager
+
 
 class TokenService(ABC):  # pylint: disable=too-few-public-methods
     """Token Service abstract class with single get_token method."""
@@ -61,14 +64,17 @@ class GoogleStorageTokenService(TokenService):  # pylint: disable=too-few-public
 
     @classmethod
     def get_token(cls):
-        """Generate an OAuth access token with cloud storage access."""
-        if cls.credentials is None:
-            cls.credentials = service_account.Credentials.from_service_account_info(cls.service_account_info,
-                                                                                    scopes=cls.GCP_SA_SCOPES)
-        request = google.auth.transport.requests.Request()
-        cls.credentials.refresh(request)
-        current_app.logger.info('Call successful: obtained token.')
-        return cls.credentials.token
+        """Get an OAuth access token with cloud storage access: the token is refreshed shortly before it expires."""
+        def refresh():
+            credentials = cls.get_credentials()
+            request = google.auth.transport.requests.Request()
+            credentials.refresh(request)
+            current_app.logger.info('Call successful: obtained token.')
+            expires_in = (credentials.expiry - datetime.datetime.utcnow()).total_seconds() \
+                if credentials.expiry else 0
+            return credentials.token, expires_in
+
+        return token_manager.get_token(GCP_ACCESS_TOKEN, refresh)
 
     @classmethod
     def get_credentials(cls):
@@ -85,7 +91,11 @@ class GoogleStorageTokenService(TokenService):  # pylint: disable=too-few-public
         audience = current_app.config.get('REPORT_API_AUDIENCE')
         if not audience:
             return None
-        auth_req = google.auth.transport.requests.Request()
-        token = google.oauth2.id_token.fetch_id_token(auth_req, audience)
-        current_app.logger.info('Call successful: obtained token.')
-        return token
+
+        def refresh():
+            auth_req = google.auth.transport.requests.Request()
+            token = google.oauth2.id_token.fetch_id_token(auth_req, audience)
+            current_app.logger.info('Call successful: obtained token.')
+            return token, jwt_expires_in(token)
+
+        return token_manager.get_token(REPORT_API_TOKEN, refresh)
@@ -15,6 +15,7 @@
 import datetime
 import os
 import json
+import shutil
 import urllib.parse
 from abc import ABC, abstractmethod
 from enum import Enum
@@ -25,11 +26,13 @@ from google.cloud import storage
 
 from ppr_api.callback.auth.token_service import GoogleStorageTokenService
 from ppr_api.callback.utils.exceptions import StorageException
+from ppr_api.services.http_client import storage_client
 
 
 HTTP_DELETE = 'delete'
 HTTP_GET = 'get'
 HTTP_POST = 'post'
+DEFAULT_CHUNK_SIZE = 256 * 1024
 
 
 class DocumentTypes(str, Enum):
@@ -54,6 +57,23 @@ class StorageService(ABC):  # pylint: disable=too-few-public-methods
     def save_document(cls, name: str, raw_data, doc_type: str = None):
         """Save or replace the named document in storage with the binary data as the file contents."""
 
+    @classmethod
+    @abstractmethod
+    def get_document_size(cls, name: str, doc_type: str = None) -> int:
+        """Get the size in bytes of the uniquely named document in storage."""
+
+    @classmethod
+    @abstractmethod
+    def stream_document(cls, name: str, doc_type: str = None, start: int = 0, end: int = None, chunk_size: int = None):
+        """Get an iterator of the binary data chunks of all or a byte range (inclusive) of the named document."""
+
+
+def get_storage_service():
+    """Get the document storage implementation: local file system storage if a storage path is configured."""
+    if current_app.config.get('DOC_STORAGE_LOCAL_PATH'):
+        return LocalStorageService
+    return GoogleStorageService
+
 
 class GoogleStorageService(StorageService):  # pylint: disable=too-few-public-methods
     """Google Cloud Storage implmentation.
@@ -116,7 +136,10 @@ class GoogleStorageService(StorageService):  # pylint: disable=too-few-public-me
 
     @classmethod
     def save_document(cls, name: str, raw_data, doc_type: str = None):
-        """Save or replace the named document in cloud storage with the binary data as the file contents."""
+        """Save or replace the named document in cloud storage with the binary data as the file contents.
+
+        The raw data may be a readable file, in which case the file contents are streamed in the upload request.
+        """
         try:
             bucket_id = cls.__get_bucket_id(doc_type)
             url = cls.UPLOAD_DOC_URL.format(bucket_id=bucket_id, name=urllib.parse.quote(name, safe=""))
@@ -144,6 +167,53 @@ class GoogleStorageService(StorageService):  # pylint: disable=too-few-public-me
             current_app.logger.error(str(err))
             raise StorageException(f'POST document failed for doc type={doc_type}, name={name}.')
 
+    @classmethod
+    def get_document_size(cls, name: str, doc_type: str = None) -> int:
+        """Get the size in bytes of the uniquely named document from the cloud storage object metadata."""
+        try:
+            bucket_id = cls.__get_bucket_id(doc_type)
+            url = cls.DOC_URL.format(bucket_id=bucket_id, name=urllib.parse.quote(name, safe=""))
+            token = GoogleStorageTokenService.get_token()
+            current_app.logger.info('Fetching doc metadata with GET ' + url)
+            metadata = json.loads(cls.__call_api(HTTP_GET, url, token))
+            return int(metadata.get('size'))
+        except StorageException as storage_err:
+            raise storage_err
+        except Exception as err:  # pylint: disable=broad-except # noqa F841;
+            current_app.logger.error('get_document_size failed for url=' + url)
+            current_app.logger.error(repr(err))
+            raise StorageException('GET document metadata failed for url=' + url)
+
+    @classmethod
+    def stream_document(cls, name: str, doc_type: str = None, start: int = 0, end: int = None, chunk_size: int = None):
+        """Get an iterator of the binary data chunks of all or a byte range (inclusive) of the named document.
+
+        The cloud storage request is made before returning so errors are raised before a response is started.
+        """
+        try:
+            bucket_id = cls.__get_bucket_id(doc_type)
+            url = cls.GET_DOC_URL.format(bucket_id=bucket_id, name=urllib.parse.quote(name, safe=""))
+            token = GoogleStorageTokenService.get_token()
+            headers = {
+                'Authorization': 'Bearer ' + token,
+                'Range': f'bytes={start}-{end if end is not None else ""}'
+            }
+            current_app.logger.info(f'Streaming doc with GET {url} range {headers["Range"]}')
+            response = storage_client.get(url, headers=headers, stream=True)
+        except Exception as err:  # pylint: disable=broad-except # noqa F841;
+            current_app.logger.error('stream_document failed for url=' + url)
+            current_app.logger.error(repr(err))
+            raise StorageException('GET document failed for url=' + url)
+        if not response.ok:
+            response.close()
+            current_app.logger.error(HTTP_GET + ' ' + url + ' failed: ' + str(response.status_code))
+            raise StorageException(str(response.status_code) + ': ' + HTTP_GET + ' ' + url + ' failed.')
+
+        def stream():
+            with response:
+                yield from response.iter_content(chunk_size=(chunk_size or DEFAULT_CHUNK_SIZE))
+        return stream()
+
     @classmethod
     def __get_bucket_id(cls, doc_type: str = None):
         """Map the document type to a bucket ID. The default is GCP_BUCKET_ID."""
@@ -205,3 +275,85 @@ class GoogleStorageService(StorageService):  # pylint: disable=too-few-public-me
             method='GET'
         )
         return url
+
+
+class LocalStorageService(StorageService):  # pylint: disable=too-few-public-methods
+    """Local file system implementation for development and unit testing.
+
+    Documents are stored under the DOC_STORAGE_LOCAL_PATH directory, in a sub-directory for each document type.
+    """
+
+    @classmethod
+    def get_document(cls, name: str, doc_type: str = None):
+        """Fetch the uniquely named document from the file system as binary data."""
+        file_path = cls.__get_file_path(name, doc_type)
+        try:
+            with open(file_path, 'rb') as doc_file:
+                return doc_file.read()
+        except Exception as err:  # pylint: disable=broad-except # noqa F841;
+            current_app.logger.error('get_document failed for path=' + file_path)
+            current_app.logger.error(repr(err))
+            raise StorageException('GET document failed for path=' + file_path)
+
+    @classmethod
+    def save_document(cls, name: str, raw_data, doc_type: str = None):
+        """Save or replace the named document on the file system with the binary data or file as the contents."""
+        file_path = cls.__get_file_path(name, doc_type)
+        try:
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            with open(file_path, 'wb') as doc_file:
+                if isinstance(raw_data, bytes):
+                    doc_file.write(raw_data)
+                else:
+                    shutil.copyfileobj(raw_data, doc_file)
+            return {'name': name, 'size': str(os.path.getsize(file_path))}
+        except Exception as err:  # pylint: disable=broad-except # noqa F841;
+            current_app.logger.error('save_document failed for path=' + file_path)
+            current_app.logger.error(repr(err))
+            raise StorageException('POST document failed for path=' + file_path)
+
+    @classmethod
+    def get_document_size(cls, name: str, doc_type: str = None) -> int:
+        """Get the size in bytes of the uniquely named document on the file system."""
+        file_path = cls.__get_file_path(name, doc_type)
+        try:
+            return os.path.getsize(file_path)
+        except Exception as err:  # pylint: disable=broad-except # noqa F841;
+            current_app.logger.error('get_document_size failed for path=' + file_path)
+            current_app.logger.error(repr(err))
+            raise StorageException('GET document metadata failed for path=' + file_path)
+
+    @classmethod
+    def stream_document(cls, name: str, doc_type: str = None, start: int = 0, end: int = None, chunk_size: int = None):
+        """Get an iterator of the binary data chunks of all or a byte range (inclusive) of the named document."""
+        file_path = cls.__get_file_path(name, doc_type)
+        try:
+            doc_file = open(file_path, 'rb')  # pylint: disable=consider-using-with; closed by the stream.
+        except Exception as err:  # pylint: disable=broad-except # noqa F841;
+            current_app.logger.error('stream_document failed for path=' + file_path)
+            current_app.logger.error(repr(err))
+            raise StorageException('GET document failed for path=' + file_path)
+
+        def stream():
+            with doc_file:
+                doc_file.seek(start)
+                remaining = (end - start + 1) if end is not None else None
+                while remaining is None or remaining > 0:
+                    size = chunk_size or DEFAULT_CHUNK_SIZE
+                    if remaining is not None:
+                        size = min(size, remaining)
+                    chunk = doc_file.read(size)
+                    if not chunk:
+                        break
+                    if remaining is not None:
+                        remaining -= len(chunk)
+                    yield chunk
+        return stream()
+
+    @classmethod
+    def __get_file_path(cls, name: str, doc_type: str = None) -> str:
+        """Map the document name and type to a file path under the configured storage directory."""
+        doc_dir = doc_type or DocumentTypes.SEARCH_RESULTS
+        if isinstance(doc_dir, DocumentTypes):
+            doc_dir = doc_dir.value
+        return os.path.join(current_app.config.get('DOC_STORAGE_LOCAL_PATH'), doc_dir, name)
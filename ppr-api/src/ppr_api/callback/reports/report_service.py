@@ -22,7 +22,7 @@ from ppr_api.models import Party, Registration, SearchResult, utils as model_uti
 
 
 def get_search_report(search_id: str):
-    """Generate a search result report."""
+    """Generate a search result report: a large search report is returned as a temporary file to upload."""
     current_app.logger.info('Search report request id=' + search_id)
     search_detail = SearchResult.find_by_search_id(int(search_id), False)
     if search_detail is None:
@@ -34,7 +34,12 @@ def get_search_report(search_id: str):
         account_id = search_detail.search.account_id
         account_name = search_detail.account_name
         token = SBCPaymentClient.get_sa_token()
-        return get_callback_pdf(report_data, account_id, ReportTypes.SEARCH_DETAIL_REPORT.value, token, account_name)
+        return get_callback_pdf(report_data,
+                                account_id,
+                                ReportTypes.SEARCH_DETAIL_REPORT.value,
+                                token,
+                                account_name,
+                                True)
     except Exception as err:  # pylint: disable=broad-except # noqa F841;
         current_app.logger.error('Search report generation failed for id=' + search_id)
         current_app.logger.error(repr(err))
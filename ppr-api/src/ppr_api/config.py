@@ -63,6 +63,20 @@ class _Config():  # pylint: disable=too-few-public-methods
 
     PAYMENT_SVC_URL = os.getenv('PAYMENT_SVC_URL', 'http://')
     AUTH_SVC_URL = os.getenv('AUTH_SVC_URL', 'http://')
+
+    # Pooled http clients: connection pool size, retries on 5xx responses, and timeout in seconds for each service.
+    HTTP_POOL_SIZE_AUTH: int = int(os.getenv('HTTP_POOL_SIZE_AUTH', '10'))
+    HTTP_RETRIES_AUTH: int = int(os.getenv('HTTP_RETRIES_AUTH', '3'))
+    HTTP_TIMEOUT_AUTH: float = float(os.getenv('HTTP_TIMEOUT_AUTH', '30'))
+    HTTP_POOL_SIZE_PAY: int = int(os.getenv('HTTP_POOL_SIZE_PAY', '10'))
+    HTTP_RETRIES_PAY: int = int(os.getenv('HTTP_RETRIES_PAY', '0'))
+    HTTP_TIMEOUT_PAY: float = float(os.getenv('HTTP_TIMEOUT_PAY', '60'))
+    HTTP_POOL_SIZE_REPORT: int = int(os.getenv('HTTP_POOL_SIZE_REPORT', '10'))
+    HTTP_RETRIES_REPORT: int = int(os.getenv('HTTP_RETRIES_REPORT', '0'))
+    HTTP_TIMEOUT_REPORT: float = float(os.getenv('HTTP_TIMEOUT_REPORT', '600'))
+    HTTP_POOL_SIZE_STORAGE: int = int(os.getenv('HTTP_POOL_SIZE_STORAGE', '10'))
+    HTTP_RETRIES_STORAGE: int = int(os.getenv('HTTP_RETRIES_STORAGE', '0'))
+    HTTP_TIMEOUT_STORAGE: float = float(os.getenv('HTTP_TIMEOUT_STORAGE', '60'))
     REPORT_SVC_URL = os.getenv('REPORT_SVC_URL', 'http://')
     REPORT_TEMPLATE_PATH = os.getenv('REPORT_TEMPLATE_PATH', 'report-templates')
 
@@ -180,6 +194,13 @@ class _Config():  # pylint: disable=too-few-public-methods
     GCP_PS_NOTIFICATION_TOPIC = os.getenv('GCP_PS_NOTIFICATION_TOPIC')
     GCP_PS_VERIFICATION_REPORT_TOPIC = os.getenv('GCP_PS_VERIFICATION_REPORT_TOPIC')
     GCP_PS_REGISTRATION_REPORT_TOPIC = os.getenv('GCP_PS_REGISTRATION_REPORT_TOPIC')
+    # Pub/Sub publisher batching: messages are sent when either limit is reached (latency in seconds).
+    GCP_PS_BATCH_MAX_MESSAGES: int = int(os.getenv('GCP_PS_BATCH_MAX_MESSAGES', '100'))
+    GCP_PS_BATCH_MAX_LATENCY: float = float(os.getenv('GCP_PS_BATCH_MAX_LATENCY', '0.01'))
+    # Maximum seconds a registration waits for its secured party verification messages to be published.
+    GCP_PS_PUBLISH_TIMEOUT: float = float(os.getenv('GCP_PS_PUBLISH_TIMEOUT', '10'))
+    # Use the in memory publisher instead of Pub/Sub (unit testing, local development).
+    GCP_PS_LOCAL_PUBLISHER: bool = os.getenv('GCP_PS_LOCAL_PUBLISHER', 'False') == 'True'
 
     GATEWAY_URL = os.getenv('GATEWAY_URL', 'https://bcregistry-dev.apigee.net')
     SUBSCRIPTION_API_KEY = os.getenv('SUBSCRIPTION_API_KEY')
@@ -198,8 +219,35 @@ class _Config():  # pylint: disable=too-few-public-methods
     # Default 2, set to 1 to revert to original report api client
     REPORT_VERSION = os.getenv('REPORT_VERSION', '2')
     REPORT_API_AUDIENCE = os.getenv('REPORT_API_AUDIENCE', '')
+    # Cached service account, report api, and storage access tokens are refreshed this many seconds before expiry.
+    TOKEN_EXPIRY_MARGIN: int = int(os.getenv('TOKEN_EXPIRY_MARGIN', '60'))
     # Number of registrations threshold for search report light format.
     REPORT_SEARCH_LIGHT: int = int(os.getenv('REPORT_SEARCH_LIGHT', '700'))
+    # Set search report TOC page numbers from the pdf named destinations instead of scanning the page text.
+    REPORT_TOC_PAGE_ANCHORS: bool = os.getenv('REPORT_TOC_PAGE_ANCHORS', 'True') == 'True'
+    # Maximum number of large search sub-reports rendered concurrently.
+    REPORT_SUBREPORT_WORKERS: int = int(os.getenv('REPORT_SUBREPORT_WORKERS', '4'))
+
+    # Stored search report streaming response chunk size in bytes.
+    SEARCH_REPORT_CHUNK_SIZE: int = int(os.getenv('SEARCH_REPORT_CHUNK_SIZE', str(256 * 1024)))
+    # Optional local file system document storage directory used instead of Google cloud storage (unit testing).
+    DOC_STORAGE_LOCAL_PATH = os.getenv('DOC_STORAGE_LOCAL_PATH')
+
+    # Financing statement json snapshot cache: maximum number of snapshots (0 disables) and time to live in seconds.
+    FINANCING_JSON_CACHE_SIZE: int = int(os.getenv('FINANCING_JSON_CACHE_SIZE', '500'))
+    FINANCING_JSON_CACHE_TTL: int = int(os.getenv('FINANCING_JSON_CACHE_TTL', '300'))
+    # Account registration summary total count cache: maximum number of accounts (0 disables) and time to live.
+    ACCOUNT_REG_COUNT_CACHE_SIZE: int = int(os.getenv('ACCOUNT_REG_COUNT_CACHE_SIZE', '1000'))
+    ACCOUNT_REG_COUNT_CACHE_TTL: int = int(os.getenv('ACCOUNT_REG_COUNT_CACHE_TTL', '300'))
+    # Individual debtor name search nickname table cache time to live in seconds.
+    NICKNAME_CACHE_TTL: int = int(os.getenv('NICKNAME_CACHE_TTL', '3600'))
+    # Auth API account org type and name cache: maximum number of lookups (0 disables), time to live in seconds, and
+    # the time to live of failed lookups.
+    AUTH_ORG_CACHE_SIZE: int = int(os.getenv('AUTH_ORG_CACHE_SIZE', '1000'))
+    AUTH_ORG_CACHE_TTL: int = int(os.getenv('AUTH_ORG_CACHE_TTL', '300'))
+    AUTH_ORG_CACHE_ERROR_TTL: int = int(os.getenv('AUTH_ORG_CACHE_ERROR_TTL', '30'))
+    # Streaming (NDJSON) debtor name search server-side cursor batch size in rows.
+    SEARCH_STREAM_BATCH_SIZE: int = int(os.getenv('SEARCH_STREAM_BATCH_SIZE', '500'))
 
 
 class DevConfig(_Config):  # pylint: disable=too-few-public-methods
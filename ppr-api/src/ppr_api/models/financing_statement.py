@@ -21,13 +21,18 @@ from enum import Enum
 from http import HTTPStatus
 
 from flask import current_app
+from sqlalchemy import func
+from sqlalchemy.orm import aliased, selectinload
 
 from ppr_api.exceptions import BusinessException, DatabaseException, ResourceErrorCodes
 from ppr_api.models import utils as model_utils
 
 from .db import db
+from .json_cache import financing_json_cache
+from .registration_utils import account_reg_counts
 from .registration import Registration  # noqa: F401 pylint: disable=unused-import; needed by the SQLAlchemy relationship
 from .trust_indenture import TrustIndenture  # noqa: F401 pylint: disable=unused-import; needed by the SQLAlchemy relationship
+from .client_code import ClientCode
 from .party import Party  # noqa: F401 pylint: disable=unused-import; needed by the SQLAlchemy relationship
 from .general_collateral import GeneralCollateral  # noqa: F401 pylint: disable=unused-import; needed by the SQLAlchemy relationship
 from .general_collateral_legacy import GeneralCollateralLegacy  # noqa: F401 pylint: disable=unused-import; see above
@@ -35,6 +40,10 @@ from .user_extra_registration import UserExtraRegistration  # noqa: F401 pylint:
 from .vehicle_collateral import VehicleCollateral  # noqa: F401 pylint: disable=unused-import; needed by the SQLAlchemy relationship
 
 
+# Maximum number of base registration numbers bound in a single bulk load IN list.
+BULK_LOAD_BATCH_SIZE = 500
+
+
 class FinancingStatement(db.Model):  # pylint: disable=too-many-instance-attributes
     """This class maintains financing statement information."""
 
@@ -94,21 +103,88 @@ class FinancingStatement(db.Model):  # pylint: disable=too-many-instance-attribu
     include_changes_json = False
     # Use to include/exclude registration history at the time of the registration for verfication statements.
     verification_reg_id = 0
+    # Parties and collateral bucketed by type and registration id: only set while building the json.
+    __json_index = None
 
     @property
     def json(self) -> dict:
-        """Return the financing statement as a json object."""
+        """Return the financing statement as a json object: use the cached snapshot if it exists."""
+        snapshot_key = self.json_snapshot_key()
+        if snapshot_key:
+            statement = financing_json_cache.get(snapshot_key)
+            if statement:
+                # The expired status depends on the current time.
+                statement['statusType'] = self.__get_status_type()
+                return statement
+        statement = self.build_json()
+        if snapshot_key:
+            financing_json_cache.put(snapshot_key, statement)
+        return statement
+
+    def json_snapshot_key(self):
+        """Build the json snapshot cache key: the statement version and the json view settings."""
+        if not self.id or not self.registration:
+            return None
+        latest_reg_id = max((reg.id for reg in self.registration if reg.id), default=0)
+        return (self.id, latest_reg_id, self.current_view_json, self.mark_update_json, self.include_changes_json,
+                self.verification_reg_id)
+
+    def __get_status_type(self) -> str:
+        """Get the status type for the json view settings: active may be expired."""
+        if not self.current_view_json and self.state_type != model_utils.STATE_ACTIVE:
+            return model_utils.STATE_ACTIVE
+        if self.current_view_json and self.state_type == model_utils.STATE_ACTIVE and self.expire_date and \
+                self.expire_date.timestamp() < model_utils.now_ts().timestamp():
+            return model_utils.STATE_EXPIRED
+        return self.state_type
+
+    def build_json(self) -> dict:
+        """Build the financing statement json from the financing statement, registrations, parties and collateral."""
+        # Bucket the parties and collateral once for all the json builders.
+        self.__json_index = self.__build_json_index()
+        try:
+            return self.__build_statement_json()
+        finally:
+            self.__json_index = None
+
+    def __build_json_index(self) -> dict:
+        """Index parties by type and registration id and general collateral changes by registration id in one pass."""
+        index = {
+            'parties': {},  # Party type to parties in id order.
+            'debtors': [],  # Business and individual debtors in id order.
+            'registering': {},  # Registration id to the registering party.
+            'gc_changes': {}  # (legacy, registration id) to the general collateral [added count, deleted count].
+        }
+        for party in self.parties:
+            index['parties'].setdefault(party.party_type, []).append(party)
+            if party.party_type in (Party.PartyTypes.DEBTOR_COMPANY.value, Party.PartyTypes.DEBTOR_INDIVIDUAL.value):
+                index['debtors'].append(party)
+            elif party.party_type == Party.PartyTypes.REGISTERING_PARTY.value:
+                index['registering'].setdefault(party.registration_id, party)
+        for legacy, collateral_list in ((False, self.general_collateral), (True, self.general_collateral_legacy)):
+            for collateral in collateral_list:
+                if collateral.status:
+                    counts = index['gc_changes'].setdefault((legacy, collateral.registration_id), [0, 0])
+                    if collateral.status == GeneralCollateralLegacy.StatusTypes.ADDED:
+                        counts[0] += 1
+                    elif collateral.status == GeneralCollateralLegacy.StatusTypes.DELETED:
+                        counts[1] += 1
+        return index
+
+    def __get_json_index(self) -> dict:
+        """Get the index shared by the json builders: build it if called outside of build_json."""
+        if self.__json_index is not None:
+            return self.__json_index
+        return self.__build_json_index()
+
+    def __build_statement_json(self) -> dict:
+        """Build the financing statement json using the shared party and collateral index."""
         statement = {
-            'statusType': self.state_type
+            'statusType': self.__get_status_type()
         }
         if self.state_type == model_utils.STATE_DISCHARGED:
             index = len(self.registration) - 1
             statement['dischargedDateTime'] = model_utils.format_ts(self.registration[index].registration_ts)
-        if not self.current_view_json and self.state_type != model_utils.STATE_ACTIVE:
-            statement['statusType'] = model_utils.STATE_ACTIVE
-        elif self.current_view_json and self.state_type == model_utils.STATE_ACTIVE and self.expire_date and \
-                self.expire_date.timestamp() < model_utils.now_ts().timestamp():
-            statement['statusType'] = model_utils.STATE_EXPIRED
 
         if self.registration and self.registration[0]:
             reg = self.registration[0]
@@ -184,7 +260,8 @@ class FinancingStatement(db.Model):  # pylint: disable=too-many-instance-attribu
         """Add court order info to the statement json if generating the current view and court order info exists."""
         if self.current_view_json:
             for registration in self.registration:
-                if registration.court_order:
+                if registration.court_order and \
+                        (self.verification_reg_id < 1 or registration.id <= self.verification_reg_id):
                     statement['courtOrderInformation'] = registration.court_order.json
 
     def set_changes_json(self, statement):
@@ -224,37 +301,37 @@ class FinancingStatement(db.Model):  # pylint: disable=too-many-instance-attribu
 
     def party_json(self, party_type, registration_id):
         """Build party JSON: current_view_json determines if current or original data is included."""
+        index = self.__get_json_index()
         if party_type == Party.PartyTypes.REGISTERING_PARTY.value:
-            for party in self.parties:
-                if party.party_type == party_type and registration_id == party.registration_id:
-                    return party.json
+            party = index['registering'].get(registration_id)
             # No registering party record: legacy data.
-            return {}
+            return party.json if party else {}
 
+        if party_type == Party.PartyTypes.DEBTOR_COMPANY.value:
+            type_parties = index['debtors']
+        else:
+            type_parties = index['parties'].get(party_type, [])
         parties = []
-        for party in self.parties:
+        for party in type_parties:
             party_json = None
-            if party.party_type == party_type or \
-               (party_type == Party.PartyTypes.DEBTOR_COMPANY.value and
-                party.party_type == Party.PartyTypes.DEBTOR_INDIVIDUAL.value):
-                # If not current view only display financing statement registration parties.
-                # If current view and verification registration ID exists, include all active parties at the
-                # time of the registration.
-                # If current view include all active parties.
-                if party.registration_id == registration_id and \
-                   (not party.registration_id_end or not self.current_view_json):
-                    party_json = party.json
-                elif self.current_view_json and party.registration_id_end and \
-                        self.verification_reg_id > 0 and self.verification_reg_id >= party.registration_id and \
-                        self.verification_reg_id < party.registration_id_end:
-                    party_json = party.json
-                    if self.mark_update_json and party.registration_id != registration_id:
-                        party_json['added'] = True
-                elif self.current_view_json and not party.registration_id_end and \
-                        (self.verification_reg_id < 1 or self.verification_reg_id >= party.registration_id):
-                    party_json = party.json
-                    if self.mark_update_json and party.registration_id != registration_id:
-                        party_json['added'] = True
+            # If not current view only display financing statement registration parties.
+            # If current view and verification registration ID exists, include all active parties at the
+            # time of the registration.
+            # If current view include all active parties.
+            if party.registration_id == registration_id and \
+               (not party.registration_id_end or not self.current_view_json):
+                party_json = party.json
+            elif self.current_view_json and party.registration_id_end and \
+                    self.verification_reg_id > 0 and self.verification_reg_id >= party.registration_id and \
+                    self.verification_reg_id < party.registration_id_end:
+                party_json = party.json
+                if self.mark_update_json and party.registration_id != registration_id:
+                    party_json['added'] = True
+            elif self.current_view_json and not party.registration_id_end and \
+                    (self.verification_reg_id < 1 or self.verification_reg_id >= party.registration_id):
+                party_json = party.json
+                if self.mark_update_json and party.registration_id != registration_id:
+                    party_json['added'] = True
 
             if party_json:
                 parties.append(party_json)
@@ -266,11 +343,13 @@ class FinancingStatement(db.Model):  # pylint: disable=too-many-instance-attribu
         if not self.general_collateral and not self.general_collateral_legacy:
             return None
         collateral_json = []
-        collateral_json = self.__build_general_collateral_json(registration_id, collateral_json, False)
-        collateral_json = self.__build_general_collateral_json(registration_id, collateral_json, True)
+        # Collateral json by added timestamp: used to combine amendment edits.
+        added_index = {}
+        collateral_json = self.__build_general_collateral_json(registration_id, collateral_json, added_index, False)
+        collateral_json = self.__build_general_collateral_json(registration_id, collateral_json, added_index, True)
         return collateral_json
 
-    def __build_general_collateral_json(self, registration_id, collateral_json,
+    def __build_general_collateral_json(self, registration_id, collateral_json, added_index: dict,
                                         legacy: bool):  # pylint: disable=too-many-nested-blocks
         """Build general collateral JSON for a financing statement from either the API or legacy table."""
         collateral_list = None
@@ -285,6 +364,7 @@ class FinancingStatement(db.Model):  # pylint: disable=too-many-instance-attribu
             if collateral.registration_id == registration_id or not collateral.status:
                 gc_json = collateral.json
                 collateral_json.append(gc_json)
+                added_index.setdefault(gc_json['addedDateTime'], []).append(gc_json)
             # Add only solution for legacy records: current view shows all records including deleted.
             elif self.current_view_json and \
                     (self.verification_reg_id < 1 or self.verification_reg_id >= collateral.registration_id):
@@ -292,33 +372,25 @@ class FinancingStatement(db.Model):  # pylint: disable=too-many-instance-attribu
                 exists = False
                 # If amendment/change registration is 1 add, 1 remove then combine them.
                 if self.__is_edit_general_collateral(collateral.registration_id, legacy):
-                    for exists_collateral in collateral_json:
-                        if exists_collateral['addedDateTime'] == gc_json['addedDateTime']:
-                            if 'descriptionAdd' in exists_collateral and \
-                                    'descriptionDelete' not in exists_collateral and \
-                                        'descriptionDelete' in gc_json:
-                                exists = True
-                                exists_collateral['descriptionDelete'] = gc_json['descriptionDelete']
-                            elif 'descriptionDelete' in exists_collateral and \
-                                    'descriptionAdd' not in exists_collateral and \
-                                        'descriptionAdd' in gc_json:
-                                exists = True
-                                exists_collateral['descriptionAdd'] = gc_json['descriptionAdd']
+                    for exists_collateral in added_index.get(gc_json['addedDateTime'], []):
+                        if 'descriptionAdd' in exists_collateral and \
+                                'descriptionDelete' not in exists_collateral and \
+                                    'descriptionDelete' in gc_json:
+                            exists = True
+                            exists_collateral['descriptionDelete'] = gc_json['descriptionDelete']
+                        elif 'descriptionDelete' in exists_collateral and \
+                                'descriptionAdd' not in exists_collateral and \
+                                    'descriptionAdd' in gc_json:
+                            exists = True
+                            exists_collateral['descriptionAdd'] = gc_json['descriptionAdd']
                 if not exists:
                     collateral_json.append(gc_json)
+                    added_index.setdefault(gc_json['addedDateTime'], []).append(gc_json)
         return collateral_json
 
     def __is_edit_general_collateral(self, registration_id, legacy: bool):
         """True if an amendment adds 1 gc and removes 1 gc."""
-        add_count = 0
-        delete_count = 0
-        collateral_list = self.general_collateral if not legacy else self.general_collateral_legacy
-        for collateral in collateral_list:
-            if collateral.registration_id == registration_id and collateral.status:
-                if collateral.status == GeneralCollateralLegacy.StatusTypes.ADDED:
-                    add_count += 1
-                elif collateral.status == GeneralCollateralLegacy.StatusTypes.DELETED:
-                    delete_count += 1
+        add_count, delete_count = self.__get_json_index()['gc_changes'].get((legacy, registration_id), [0, 0])
         return add_count == 1 and delete_count == 1
 
     def vehicle_collateral_json(self, registration_id):
@@ -381,6 +453,8 @@ class FinancingStatement(db.Model):  # pylint: disable=too-many-instance-attribu
         """Save the object to the database immediately."""
         db.session.add(self)
         db.session.commit()
+        financing_json_cache.invalidate(self.id)
+        account_reg_counts.increment(self.registration[0].account_id)
 
         # Now save draft
         draft = self.registration[0].draft
@@ -476,6 +550,81 @@ class FinancingStatement(db.Model):  # pylint: disable=too-many-instance-attribu
             )
         return statement
 
+    @classmethod
+    def find_all_by_registration_numbers(cls, registration_nums) -> dict:
+        """Return a dict of financing statements keyed by base registration number with the JSON graph loaded.
+
+        Staff lookup without account id or historical checks. The registrations, parties, collateral and
+        trust indentures are eager loaded with IN list queries, so the number of queries depends on the number
+        of relationships and not the number of statements. Registration numbers with no financing statement
+        are not in the returned dict.
+        """
+        statements = {}
+        if not registration_nums:
+            return statements
+        reg_nums = list(dict.fromkeys(registration_nums))
+        for index in range(0, len(reg_nums), BULK_LOAD_BATCH_SIZE):
+            batch = reg_nums[index:index + BULK_LOAD_BATCH_SIZE]
+            try:
+                results = db.session.query(FinancingStatement).\
+                          filter(FinancingStatement.id == Registration.financing_id,
+                                 Registration.registration_num.in_(batch),
+                                 Registration.registration_type_cl.in_(['PPSALIEN', 'MISCLIEN', 'CROWNLIEN'])).\
+                          options(*FinancingStatement.json_load_options()).all()
+            except Exception as db_exception:   # noqa: B902; return nicer error
+                current_app.logger.error('DB find_all_by_registration_numbers exception: ' + repr(db_exception))
+                raise DatabaseException(db_exception)
+            for statement in results:
+                if statement.registration:
+                    statements[statement.registration[0].registration_num] = statement
+        return statements
+
+    @classmethod
+    def find_last_registration_ids(cls, registration_nums) -> dict:
+        """Return a dict of the latest registration id of each financing statement keyed by base registration number.
+
+        The latest registration id records the financing statement version, so it can be used as the
+        verification_reg_id to build the statement json as it was when the ids were looked up.
+        """
+        last_reg_ids = {}
+        if not registration_nums:
+            return last_reg_ids
+        reg_nums = list(dict.fromkeys(registration_nums))
+        base_registration = aliased(Registration)
+        for index in range(0, len(reg_nums), BULK_LOAD_BATCH_SIZE):
+            batch = reg_nums[index:index + BULK_LOAD_BATCH_SIZE]
+            try:
+                results = db.session.query(base_registration.registration_num, func.max(Registration.id)).\
+                          filter(Registration.financing_id == base_registration.financing_id,
+                                 base_registration.registration_num.in_(batch),
+                                 base_registration.registration_type_cl.in_(['PPSALIEN', 'MISCLIEN', 'CROWNLIEN'])).\
+                          group_by(base_registration.registration_num).all()
+            except Exception as db_exception:   # noqa: B902; return nicer error
+                current_app.logger.error('DB find_last_registration_ids exception: ' + repr(db_exception))
+                raise DatabaseException(db_exception)
+            for reg_num, last_reg_id in results:
+                last_reg_ids[reg_num] = last_reg_id
+        return last_reg_ids
+
+    @staticmethod
+    def json_load_options():
+        """Return the query loader options that eager load every relationship used to build the statement json."""
+        return [
+            selectinload(FinancingStatement.registration).selectinload(Registration.reg_type),
+            selectinload(FinancingStatement.registration).selectinload(Registration.court_order),
+            selectinload(FinancingStatement.registration).selectinload(Registration.parties),
+            selectinload(FinancingStatement.registration).selectinload(Registration.general_collateral),
+            selectinload(FinancingStatement.registration).selectinload(Registration.general_collateral_legacy),
+            selectinload(FinancingStatement.registration).selectinload(Registration.vehicle_collateral),
+            selectinload(FinancingStatement.parties).selectinload(Party.address),
+            selectinload(FinancingStatement.parties).selectinload(Party.client_code).selectinload(ClientCode.address),
+            selectinload(FinancingStatement.vehicle_collateral),
+            selectinload(FinancingStatement.general_collateral),
+            selectinload(FinancingStatement.general_collateral_legacy),
+            selectinload(FinancingStatement.trust_indenture),
+            selectinload(FinancingStatement.previous_statement)
+        ]
+
     @classmethod
     def find_by_financing_id(cls, financing_id: int = None):
         """Return a financing statement by financing statement ID."""
@@ -0,0 +1,89 @@
+# Copyright © 2019 Province of British Columbia
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""This module holds a process level cache of generated json snapshots.
+
+Snapshots are keyed on a versioned tuple where the first item is the owning record id (the financing statement id).
+Including the latest registration id in the key means a new registration always produces a new snapshot, even
+when the registration was created by another process. Entries expire after a configurable time to live, and
+invalidate removes all the entries for an owning record id.
+"""
+import copy
+from threading import Lock
+
+from cachetools import TTLCache
+from flask import current_app
+
+
+class JsonSnapshotCache():
+    """Bounded, time limited cache of json snapshots: values are copied in and out so callers can modify them."""
+
+    def __init__(self, size_config: str, ttl_config: str):
+        """Set the config keys used to size the cache when it is first used."""
+        self.size_config = size_config
+        self.ttl_config = ttl_config
+        self._cache = None
+        self._lock = Lock()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def _get_cache(self):
+        """Create the cache from the app config on first use: return None if caching is disabled."""
+        if self._cache is None:
+            size: int = int(current_app.config.get(self.size_config, 0))
+            if size < 1:
+                return None
+            ttl: int = int(current_app.config.get(self.ttl_config, 300))
+            self._cache = TTLCache(maxsize=size, ttl=ttl)
+        return self._cache
+
+    def get(self, key: tuple):
+        """Return a copy of the snapshot for the key, or None if not cached."""
+        with self._lock:
+            cache = self._get_cache()
+            snapshot = cache.get(key) if cache is not None else None
+            if snapshot is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return copy.deepcopy(snapshot)
+
+    def put(self, key: tuple, json_data: dict):
+        """Save a copy of the json data as the snapshot for the key."""
+        snapshot = copy.deepcopy(json_data)
+        with self._lock:
+            cache = self._get_cache()
+            if cache is not None:
+                cache[key] = snapshot
+
+    def invalidate(self, owner_id: int):
+        """Remove all the snapshots for the owning record id."""
+        if not owner_id:
+            return
+        with self._lock:
+            if self._cache is not None:
+                for key in [key for key in list(self._cache.keys()) if key[0] == owner_id]:
+                    self._cache.pop(key, None)
+
+    def clear(self):
+        """Remove all the snapshots."""
+        with self._lock:
+            if self._cache is not None:
+                self._cache.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+# Current and verification view financing statement json snapshots keyed on the financing statement id.
+financing_json_cache = JsonSnapshotCache('FINANCING_JSON_CACHE_SIZE',  # pylint: disable=invalid-name
+                                         'FINANCING_JSON_CACHE_TTL')
@@ -16,8 +16,9 @@ from __future__ import annotations
 
 from enum import Enum
 
-from sqlalchemy import event, text
+from sqlalchemy import event
 
+from ppr_api.models import search_key_utils
 from ppr_api.models import utils as model_utils
 
 from .db import db
@@ -25,21 +26,6 @@ from .address import Address  # noqa: F401 pylint: disable=unused-import
 from .client_code import ClientCode  # noqa: F401 pylint: disable=unused-import
 
 
-BUSINESS_UPDATE_QUERY = """
-    SELECT (select searchkey_business_name(:actual_name)) AS search_key,
-           (select business_name_strip_designation(:actual_name)) AS bus_name_base
-"""
-INDIVIDUAL_UPDATE_QUERY = """
-    SELECT (select searchkey_individual(:last_name, :first_name)) AS first_search_key,
-           (select searchkey_last_name(:last_name)) AS last_search_key,
-           (select individual_split_1(:first_name)) AS first_split1,
-           (select individual_split_2(:first_name)) AS first_split2,
-           (select individual_split_1(:last_name)) AS last_split1,
-           (select individual_split_2(:last_name)) AS last_split2,
-           (select individual_split_3(:last_name)) AS last_split3
-"""
-
-
 class Party(db.Model):  # pylint: disable=too-many-instance-attributes
     """This class manages all of the parties (people and organizations)."""
 
@@ -312,26 +298,17 @@ class Party(db.Model):  # pylint: disable=too-many-instance-attributes
 def party_before_insert_listener(mapper, connection, target):   # pylint: disable=unused-argument; don't use mapper
     """Conditionally set debtor search key values."""
     if target.party_type == target.PartyTypes.DEBTOR_COMPANY.value:
-        stmt = text(BUSINESS_UPDATE_QUERY)
-        stmt = stmt.bindparams(actual_name=target.business_name)
-        result = connection.execute(stmt)
-        row = result.first()
-        mapping = row._mapping  # pylint: disable=protected-access; follows documentation
-        target.business_search_key = str(mapping['search_key'])
-        target.bus_name_base = str(mapping['bus_name_base'])
+        common_words = search_key_utils.load_common_words(connection)
+        target.business_search_key = str(search_key_utils.searchkey_business_name(target.business_name, common_words))
+        target.bus_name_base = str(search_key_utils.business_name_strip_designation(target.business_name))
         target.bus_name_key_char1 = target.business_search_key[0:1]
 
     elif target.party_type == target.PartyTypes.DEBTOR_INDIVIDUAL.value:
-        stmt = text(INDIVIDUAL_UPDATE_QUERY)
-        stmt = stmt.bindparams(last_name=target.last_name, first_name=target.first_name)
-        result = connection.execute(stmt)
-        row = result.first()
-        mapping = row._mapping  # pylint: disable=protected-access; follows documentation
-        target.first_name_key = str(mapping['first_search_key'])
-        target.last_name_key = str(mapping['last_search_key'])
-        target.first_name_split1 = str(mapping['first_split1'])
-        target.first_name_split2 = str(mapping['first_split2'])
-        target.last_name_split1 = str(mapping['last_split1'])
-        target.last_name_split2 = str(mapping['last_split2'])
-        target.last_name_split3 = str(mapping['last_split3'])
+        target.first_name_key = str(search_key_utils.searchkey_individual(target.last_name, target.first_name))
+        target.last_name_key = str(search_key_utils.searchkey_last_name(target.last_name))
+        target.first_name_split1 = str(search_key_utils.individual_split_1(target.first_name))
+        target.first_name_split2 = str(search_key_utils.individual_split_2(target.first_name))
+        target.last_name_split1 = str(search_key_utils.individual_split_1(target.last_name))
+        target.last_name_split2 = str(search_key_utils.individual_split_2(target.last_name))
+        target.last_name_split3 = str(search_key_utils.individual_split_3(target.last_name))
         target.first_name_key_char1 = target.first_name_key[0:1]
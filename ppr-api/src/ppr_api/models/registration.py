@@ -19,10 +19,12 @@ from http import HTTPStatus
 import json
 
 from flask import current_app
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
 
 from ppr_api.exceptions import BusinessException, DatabaseException, ResourceErrorCodes
 from ppr_api.models import utils as model_utils
-from ppr_api.models import registration_utils
+from ppr_api.models import registration_utils, search_utils
 from ppr_api.models.registration_utils import AccountRegistrationParams
 
 from .db import db
@@ -31,6 +33,7 @@ from .party import Party
 from .court_order import CourtOrder
 from .general_collateral import GeneralCollateral
 from .general_collateral_legacy import GeneralCollateralLegacy
+from .json_cache import financing_json_cache
 from .type_tables import RegistrationType
 from .trust_indenture import TrustIndenture
 from .user_extra_registration import UserExtraRegistration
@@ -329,6 +332,8 @@ class Registration(db.Model):  # pylint: disable=too-many-instance-attributes, t
         """Render a registration to the local cache."""
         db.session.add(self)
         db.session.commit()
+        # Amendment, change, renewal, and discharge registrations replace the financing statement json snapshots.
+        financing_json_cache.invalidate(self.financing_id)
 
         # Now save draft
         draft = self.draft
@@ -415,11 +420,14 @@ class Registration(db.Model):  # pylint: disable=too-many-instance-attributes, t
 
     @classmethod
     def get_account_reg_count(cls, account_id: str) -> int:
-        """Get the total number of eligible financing statements for an account."""
-        count: int = 0
+        """Get the total number of eligible financing statements for an account: cached between pages."""
+        count = registration_utils.account_reg_counts.get(account_id)
+        if count is not None:
+            return count
         result = db.session.execute(model_utils.QUERY_ACCOUNT_REG_TOTAL, {'query_account': account_id})
         row = result.first()
         count = int(row._mapping['reg_count'])  # pylint: disable=protected-access; follows documentation
+        registration_utils.account_reg_counts.put(account_id, count)
         return count
 
     @classmethod
@@ -489,6 +497,8 @@ class Registration(db.Model):  # pylint: disable=too-many-instance-attributes, t
                             results_json.append(result)
                 if params.collapse:
                     return registration_utils.build_account_collapsed_json(results_json, registrations_json)
+        except BusinessException as b_err:
+            raise b_err
         except Exception as db_exception:   # noqa: B902; return nicer error
             current_app.logger.error('DB find_all_by_account_id exception: ' + str(db_exception))
             raise DatabaseException(db_exception)
@@ -507,6 +517,10 @@ class Registration(db.Model):  # pylint: disable=too-many-instance-attributes, t
         results_json = registration_utils.build_account_base_reg_results(params, rows)
         if results_json:
             results_json[0]['totalRegistrationCount'] = count
+            # A full page: the next page starts after the last registration on this page.
+            if len(rows) >= query_params['page_size']:
+                mapping = rows[-1]._mapping  # pylint: disable=protected-access; follows documentation
+                results_json[0]['nextPageCursor'] = registration_utils.build_cursor(params, mapping)
             # Get change registrations.
             query = registration_utils.build_account_change_query(params, results_json)
             results = db.session.execute(query, query_params)
@@ -520,6 +534,7 @@ class Registration(db.Model):  # pylint: disable=too-many-instance-attributes, t
         results_json = []
         # Restrict filter to client ref id, reg number, or timestamp range.
         params.page_number = 1
+        params.cursor = None
         params.sort_direction = 'desc'
         params.sort_criteria = None
         params.registration_type = None
@@ -988,3 +1003,18 @@ class Registration(db.Model):  # pylint: disable=too-many-instance-attributes, t
             if registration.registration_type == model_utils.REG_TYPE_RENEWAL and registration.id <= self.id:
                 expiry_ts = model_utils.expiry_dt_add_years(expiry_ts, registration.life)
         return model_utils.format_ts(expiry_ts)
+
+
+@event.listens_for(Session, 'after_flush')
+def registration_after_flush_listener(session, flush_context):   # pylint: disable=unused-argument
+    """Update the search indexes of the financing statement of each new registration.
+
+    Runs after the flush so the collateral and debtor changes of the registration are written first: one statement
+    per search index removes the rows of deleted collateral or debtors and adds or updates the current rows.
+    """
+    financing_ids = {target.financing_id for target in session.new
+                     if isinstance(target, Registration) and target.financing_id}
+    for financing_id in sorted(financing_ids):
+        params = {'financing_id': financing_id}
+        session.connection().execute(text(search_utils.SERIAL_INDEX_FINANCING_UPDATE), params)
+        session.connection().execute(text(search_utils.DEBTOR_INDEX_FINANCING_UPDATE), params)
@@ -16,10 +16,16 @@
 
 """This module holds methods to support registration model updates - mostly account registration summary."""
 # from enum import Enum
-# from http import HTTPStatus
-# import json
+from datetime import datetime
+from http import HTTPStatus
+import base64
+import json
+from threading import Lock
 
-# from flask import current_app
+from cachetools import TTLCache
+from flask import current_app
+
+from ppr_api.exceptions import BusinessException, ResourceErrorCodes
 from ppr_api.models import utils as model_utils
 from ppr_api.services.authz import is_all_staff_account
 
@@ -45,6 +51,26 @@ FINANCING_PATH = '/ppr/api/v1/financing-statements/'
 QUERY_ACCOUNT_REG_DEFAULT_ORDER = ' ORDER BY registration_ts DESC'
 QUERY_ACCOUNT_CHANGE_DEFAULT_ORDER = ' ORDER BY arv2.registration_ts DESC'
 QUERY_ACCOUNT_REG_LIMIT = ' LIMIT :page_size OFFSET :page_offset'
+# Keyset pagination: the next page starts after the cursor sort key values of the last row of the previous page.
+QUERY_ACCOUNT_REG_CURSOR_CLAUSE = ' WHERE ({sort_key}, registration_number) {operator} ' + \
+                                  '(:cursor_value, :cursor_reg_num)'
+# Nullable sort keys are compared as empty strings so the keyset comparison is always true or false.
+PARAM_TO_KEYSET_SORT_KEY = {
+    'registrationNumber': 'registration_number',
+    'registrationType': 'registration_type',
+    'registeringName': "COALESCE(registering_name, '')",
+    'clientReferenceId': "COALESCE(client_reference_id, '')",
+    'startDateTime': 'registration_ts',
+    'endDateTime': 'registration_ts'
+}
+PARAM_TO_CURSOR_COLUMN = {
+    'registrationNumber': 'registration_number',
+    'registrationType': 'registration_type',
+    'registeringName': 'registering_name',
+    'clientReferenceId': 'client_reference_id',
+    'startDateTime': 'registration_ts',
+    'endDateTime': 'registration_ts'
+}
 QUERY_ACCOUNT_REG_NUM_CLAUSE = """
  AND (arv.registration_number LIKE :reg_num || '%' OR
       EXISTS (SELECT arv2.financing_id
@@ -105,6 +131,7 @@ class AccountRegistrationParams():
     status_type: str = None
     client_reference_id: str = None
     registering_name: str = None
+    cursor: str = None
 
     def __init__(self, account_id, collapse: bool = False, account_name: str = None, sbc_staff: bool = False):
         """Set common base initialization."""
@@ -114,6 +141,59 @@ class AccountRegistrationParams():
         self.sbc_staff = sbc_staff
 
 
+class AccountRegistrationCounts():
+    """Process level cache of the account registration summary total counts, keyed on the account id.
+
+    Counts are adjusted as this process adds or removes financing statements from an account. The count query
+    depends on the financing statement expiry and discharge dates, so a count is always recalculated after the
+    time to live.
+    """
+
+    def __init__(self):
+        """Create the cache from the app config on first use."""
+        self._cache = None
+        self._lock = Lock()
+
+    def _get_cache(self):
+        """Create the cache from the app config on first use: return None if caching is disabled."""
+        if self._cache is None:
+            size: int = int(current_app.config.get('ACCOUNT_REG_COUNT_CACHE_SIZE', 0))
+            if size < 1:
+                return None
+            ttl: int = int(current_app.config.get('ACCOUNT_REG_COUNT_CACHE_TTL', 300))
+            self._cache = TTLCache(maxsize=size, ttl=ttl)
+        return self._cache
+
+    def get(self, account_id: str) -> int:
+        """Get the cached account registration count: None if not cached."""
+        with self._lock:
+            cache = self._get_cache()
+            return cache.get(account_id) if cache is not None else None
+
+    def put(self, account_id: str, count: int):
+        """Save the account registration count."""
+        with self._lock:
+            cache = self._get_cache()
+            if cache is not None and account_id:
+                cache[account_id] = count
+
+    def increment(self, account_id: str, amount: int = 1):
+        """Adjust a cached account registration count: nothing to do if the count is not cached."""
+        with self._lock:
+            cache = self._get_cache()
+            if cache is not None and account_id and account_id in cache:
+                cache[account_id] = max(0, cache[account_id] + amount)
+
+    def clear(self):
+        """Remove all the cached counts."""
+        with self._lock:
+            if self._cache is not None:
+                self._cache.clear()
+
+
+account_reg_counts = AccountRegistrationCounts()  # pylint: disable=invalid-name
+
+
 def can_access_report(account_id: str, account_name: str, reg_json, sbc_staff: bool = False) -> bool:
     """Determine if request account can view the registration verification statement."""
     # All staff roles can see any verification statement.
@@ -207,16 +287,15 @@ def set_path(params: AccountRegistrationParams, result, reg_num: str, base_reg_n
 
 
 def get_account_reg_query_order(params: AccountRegistrationParams) -> str:
-    """Get the account registration query order by clause from the provided parameters."""
-    order_by: str = QUERY_ACCOUNT_REG_DEFAULT_ORDER
-    if not params.sort_criteria:
-        return order_by
-    if param_order_by := PARAM_TO_ORDER_BY.get(params.sort_criteria, None):
-        sort_order = 'DESC'
-        if params.sort_direction and params.sort_direction in ('asc', 'ascending', 'desc', 'descending'):
-            sort_order = params.sort_direction
-        order_by = ' ORDER BY ' + param_order_by + ' ' + sort_order
-    return order_by
+    """Get the account registration query order by clause from the provided parameters.
+
+    The registration number is the last sort key so the order is unique, which keyset pagination requires.
+    """
+    sort_order = 'ASC' if is_sort_ascending(params) else 'DESC'
+    sort_key: str = get_keyset_sort_key(params)
+    if sort_key == 'registration_number':
+        return ' ORDER BY registration_number ' + sort_order
+    return ' ORDER BY ' + sort_key + ' ' + sort_order + ', registration_number ' + sort_order
 
 
 def get_account_change_query_order(params: AccountRegistrationParams) -> str:
@@ -299,11 +378,76 @@ def build_account_reg_query(params: AccountRegistrationParams, new_feature_enabl
         query = model_utils.QUERY_ACCOUNT_BASE_REG_FILTER.replace('QUERY_ACCOUNT_BASE_REG_SUBQUERY', base_query)
     else:
         query = 'SELECT * FROM (' + base_query + ') AS q '
+    if get_cursor_values(params):
+        query += QUERY_ACCOUNT_REG_CURSOR_CLAUSE.format(sort_key=get_keyset_sort_key(params),
+                                                        operator=('>' if is_sort_ascending(params) else '<'))
     query += order_by
     query += QUERY_ACCOUNT_REG_LIMIT
     return query
 
 
+def is_sort_ascending(params: AccountRegistrationParams) -> bool:
+    """Check if the account registration query sort direction is ascending."""
+    return params.sort_criteria is not None and params.sort_criteria in PARAM_TO_ORDER_BY and \
+        params.sort_direction is not None and params.sort_direction in ('asc', 'ascending')
+
+
+def get_keyset_sort_key(params: AccountRegistrationParams) -> str:
+    """Get the account registration query keyset pagination sort key expression."""
+    if params.sort_criteria:
+        return PARAM_TO_KEYSET_SORT_KEY.get(params.sort_criteria, 'registration_ts')
+    return 'registration_ts'
+
+
+def get_sort_direction(params: AccountRegistrationParams) -> str:
+    """Get the account registration query sort direction as asc or desc."""
+    return 'asc' if is_sort_ascending(params) else 'desc'
+
+
+def get_cursor_values(params: AccountRegistrationParams):
+    """Get the [sort key value, registration number] list from the next page cursor: None if there is no cursor.
+
+    The cursor is only valid for the sort criteria and direction of the page it was built from: an invalid cursor
+    or a cursor for a different sort order is a bad request.
+    """
+    if not params.cursor:
+        return None
+    values = None
+    try:
+        values = json.loads(base64.urlsafe_b64decode(params.cursor.encode('ascii')).decode('utf-8'))
+        if not isinstance(values, list) or len(values) != 4 or not all(isinstance(value, str) for value in values):
+            values = None
+        elif get_keyset_sort_key(params) == 'registration_ts':
+            datetime.fromisoformat(values[2])
+    except Exception as err:  # noqa: B902; reported as a bad request below
+        current_app.logger.info(f'Account registrations invalid page cursor {params.cursor}: {repr(err)}')
+        values = None
+    if not values or values[0] != (params.sort_criteria or '') or values[1] != get_sort_direction(params):
+        raise BusinessException(
+            error=model_utils.ERR_ACCOUNT_REG_CURSOR.format(code=ResourceErrorCodes.VALIDATION_ERR,
+                                                            cursor=params.cursor),
+            status_code=HTTPStatus.BAD_REQUEST
+        )
+    return values[2:]
+
+
+def build_cursor(params: AccountRegistrationParams, mapping) -> str:
+    """Build the next page cursor from the sort order and the sort key values of the last registration on the page."""
+    column: str = 'registration_ts'
+    if params.sort_criteria:
+        column = PARAM_TO_CURSOR_COLUMN.get(params.sort_criteria, 'registration_ts')
+    sort_value = mapping[column]
+    if column == 'registration_ts':
+        sort_value = sort_value.isoformat()
+    elif sort_value is None:
+        sort_value = ''
+    values = [params.sort_criteria or '',
+              get_sort_direction(params),
+              str(sort_value),
+              str(mapping['registration_number'])]
+    return base64.urlsafe_b64encode(json.dumps(values).encode('utf-8')).decode('ascii')
+
+
 def build_account_change_query(params: AccountRegistrationParams, base_json: dict = None) -> str:
     """Build the account registration change query from the provided parameters."""
     if base_json:  # and params.start_date_time and params.end_date_time:
@@ -326,7 +470,8 @@ def build_account_query_params(params: AccountRegistrationParams, api_filter: bo
     page_size: int = model_utils.MAX_ACCOUNT_REGISTRATIONS_DEFAULT if api_filter \
         else model_utils.get_max_registrations_size()
     page_offset: int = params.page_number
-    if page_offset <= 1:
+    cursor_values = get_cursor_values(params)
+    if page_offset <= 1 or cursor_values:
         page_offset = 0
     else:
         page_offset = (page_offset - 1) * page_size
@@ -335,6 +480,9 @@ def build_account_query_params(params: AccountRegistrationParams, api_filter: bo
         'page_size': page_size,
         'page_offset': page_offset
     }
+    if cursor_values:
+        query_params['cursor_value'] = cursor_values[0]
+        query_params['cursor_reg_num'] = cursor_values[1]
     if params.registration_number:
         query_params['reg_num'] = params.registration_number.upper()
     if params.registration_type:
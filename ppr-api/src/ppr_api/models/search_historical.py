@@ -23,8 +23,7 @@ from flask import current_app
 from sqlalchemy.sql import text
 
 from ppr_api.exceptions import DatabaseException
-from ppr_api.models import db, FinancingStatement, utils as model_utils, SearchRequest, SearchResult, Party
-from ppr_api.models import GeneralCollateralLegacy, search_utils
+from ppr_api.models import db, FinancingStatement, utils as model_utils, SearchRequest, SearchResult, search_utils
 
 
 SEARCH_HISTORICAL_ID_QUERY = """
@@ -465,254 +464,55 @@ def create_from_search_query(search_query: SearchRequest, search_reg_id: int) ->
     search_result.search = search_query
     query_results = search_query.search_response
     detail_results = []
-    search_result.search_response = detail_results
+    # Staff lookup for a small performance gain: skip account id/historical checks. Load all the matches at once.
+    statements = FinancingStatement.find_all_by_registration_numbers(
+        [result['baseRegistrationNumber'] for result in query_results])
+    found_reg_nums = set()
     for result in query_results:
         reg_num = result['baseRegistrationNumber']
         match_type = result['matchType']
-        found = False
-        if detail_results:  # Check for duplicates.
-            for statement in detail_results:
-                if statement['financingStatement']['baseRegistrationNumber'] == reg_num:
-                    found = True
-        if not found:  # No duplicates.
-            # Set to staff for small performance gain: skip account id/historical checks.
-            current_app.logger.debug(f'fetching registration for {reg_num}')
-            financing = FinancingStatement.find_by_registration_number(reg_num, None, True, False)
-            financing.mark_update_json = True  # Added for PDF, indicate if party or collateral was added.
-            # Set to true to include change history.
-            financing.include_changes_json = True
-            financing_json = {
-                'matchType': match_type,
-                'financingStatement': get_historical_json(financing, search_reg_id, search_query.search_ts)
-            }
-            detail_results.append(financing_json)
-            if match_type == model_utils.SEARCH_MATCH_EXACT:
-                search_result.exact_match_count += 1
-            else:
-                search_result.similar_match_count += 1
+        if reg_num in found_reg_nums or reg_num not in statements:  # Skip duplicates.
+            continue
+        found_reg_nums.add(reg_num)
+        financing_json = {
+            'matchType': match_type,
+            'financingStatement': get_historical_json(statements[reg_num], search_reg_id, search_query.search_ts)
+        }
+        detail_results.append(financing_json)
+        if match_type == model_utils.SEARCH_MATCH_EXACT:
+            search_result.exact_match_count += 1
+        else:
+            search_result.similar_match_count += 1
 
     search_result.search_response = detail_results
     return search_result
 
 
 def get_historical_json(fin: FinancingStatement, search_reg_id: int, search_ts) -> dict:
-    """Get the reistration JSON with change history at a point in time."""
-    statement = {
-        'statusType': fin.state_type
-    }
-    if fin.state_type == model_utils.STATE_DISCHARGED:
-        index = len(fin.registration) - 1
-        if fin.registration[index].id > search_reg_id:
-            statement['statusType'] = model_utils.STATE_ACTIVE
-        else:
-            statement['dischargedDateTime'] = model_utils.format_ts(fin.registration[index].registration_ts)
+    """Get the registration JSON with change history at a point in time.
+
+    The statement JSON is the current view JSON as of the search registration id, so it is built by the
+    financing statement and served from the json snapshot cache when the same statement is viewed again at the
+    same point in time. Only the point in time status is set here.
+    """
+    fin.current_view_json = True
+    fin.mark_update_json = True  # Added for PDF, indicate if party or collateral was added.
+    fin.include_changes_json = True  # Include the change history up to the search registration id.
+    fin.verification_reg_id = search_reg_id
+    statement = fin.json
+    statement.pop('payment', None)
+    if not statement.get('changes'):
+        statement.pop('changes', None)
+    statement['statusType'] = fin.state_type
+    if fin.state_type == model_utils.STATE_DISCHARGED and fin.registration[-1].id > search_reg_id:
+        statement['statusType'] = model_utils.STATE_ACTIVE
+        statement.pop('dischargedDateTime', None)
     elif fin.state_type == model_utils.STATE_ACTIVE and fin.expire_date and \
             fin.expire_date.timestamp() < search_ts.timestamp():
         statement['statusType'] = model_utils.STATE_EXPIRED
-    set_reg_json(fin, statement)
-    registration_id = fin.registration[0].id
-    statement['registeringParty'] = party_json(fin, Party.PartyTypes.REGISTERING_PARTY.value, registration_id,
-                                               search_reg_id)
-    statement['securedParties'] = party_json(fin, Party.PartyTypes.SECURED_PARTY.value, registration_id, search_reg_id)
-    statement['debtors'] = party_json(fin, Party.PartyTypes.DEBTOR_COMPANY.value, registration_id, search_reg_id)
-
-    general_collateral = general_collateral_json(fin, registration_id, search_reg_id)
-    if general_collateral:
-        statement['generalCollateral'] = general_collateral
-
-    vehicle_collateral = vehicle_collateral_json(fin, registration_id, search_reg_id)
-    if vehicle_collateral:
-        statement['vehicleCollateral'] = vehicle_collateral
-    if fin.trust_indenture:
-        for trust in fin.trust_indenture:
-            if not trust.registration_id_end:
-                if trust.trust_indenture == 'Y':
-                    statement['trustIndenture'] = True
-                else:
-                    statement['trustIndenture'] = False
-    else:
-        statement['trustIndenture'] = False
-    set_court_order_json(fin, statement, search_reg_id)
-    set_transition_json(fin, statement)
-    return set_changes_json(fin, statement, search_reg_id)
-
-
-def set_reg_json(fin: FinancingStatement, statement):
-    """Set the JSON base registration information."""
-    reg = fin.registration[0]
-    statement['type'] = reg.registration_type
-    statement['baseRegistrationNumber'] = reg.registration_num
-    if reg.registration_type:
-        statement['registrationDescription'] = reg.reg_type.registration_desc
-        statement['registrationAct'] = reg.reg_type.registration_act
-        if reg.registration_type == model_utils.REG_TYPE_OTHER and fin.crown_charge_other:
-            statement['otherTypeDescription'] = fin.crown_charge_other
-            statement['registrationDescription'] = \
-                f'CROWN CHARGE - OTHER - FILED PURSUANT TO {fin.crown_charge_other.upper()}'
-    statement['createDateTime'] = model_utils.format_ts(reg.registration_ts)
-    if reg.client_reference_id:
-        statement['clientReferenceId'] = reg.client_reference_id
-    if reg.registration_type == model_utils.REG_TYPE_REPAIRER_LIEN:
-        if reg.lien_value:
-            statement['lienAmount'] = reg.lien_value
-        if reg.surrender_date:
-            statement['surrenderDate'] = model_utils.format_ts(reg.surrender_date)
-    if fin.life and fin.life == model_utils.LIFE_INFINITE:
-        statement['lifeInfinite'] = True
-    elif fin.life:
-        statement['lifeYears'] = fin.life
-    if fin.expire_date:
-        statement['expiryDate'] = model_utils.format_ts(fin.expire_date)
-
-
-def set_court_order_json(fin: FinancingStatement, statement, search_reg_id: int):
-    """Add court order info to the statement json if generating the current view and court order info exists."""
-    for registration in fin.registration:
-        if registration.court_order and registration.id <= search_reg_id:
-            statement['courtOrderInformation'] = registration.court_order.json
-
-
-def set_changes_json(fin: FinancingStatement, statement, search_reg_id: int):
-    """Add history of changes in reverse chronological order to financing statement json."""
-    if len(fin.registration) > 1:
-        changes = []
-        for reg in reversed(fin.registration):
-            if reg.registration_type_cl not in ('PPSALIEN', 'MISCLIEN', 'CROWNLIEN') and reg.id <= search_reg_id:
-                statement_json = reg.json
-                statement_json['statementType'] = \
-                    model_utils.REG_CLASS_TO_STATEMENT_TYPE[reg.registration_type_cl]
-                changes.append(statement_json)
-        if changes:
-            statement['changes'] = changes
     return statement
 
 
-def set_transition_json(fin: FinancingStatement, statement):
-    """Add financing statement transition json if a previous financing statement exists."""
-    if fin.previous_statement and fin.previous_statement[0].registration_type:
-        previous_json = fin.previous_statement[0].json
-        statement['transitionDescription'] = previous_json.get('transitionDescription')
-        if previous_json.get('transitionDate'):
-            statement['transitionDate'] = previous_json.get('transitionDate')
-        if previous_json.get('transitionNumber'):
-            statement['transitionNumber'] = previous_json.get('transitionNumber')
-    return statement
-
-
-def vehicle_collateral_json(fin: FinancingStatement, registration_id: int, search_reg_id: int) -> dict:
-    """Build vehicle collateral JSON: current_view_json determines if current or original data is included."""
-    if not fin.vehicle_collateral:
-        return None
-    collateral_list = []
-    for collateral in fin.vehicle_collateral:
-        collateral_json = None
-        if collateral.registration_id == registration_id and \
-                (not collateral.registration_id_end or collateral.registration_id_end <= search_reg_id):
-            collateral_json = collateral.json
-        elif collateral.registration_id_end and collateral.registation_id_end <= search_reg_id:
-            collateral_json = collateral.json
-            collateral_json['added'] = True
-        elif not collateral.registration_id_end and collateral.registration_id <= search_reg_id:
-            collateral_json = collateral.json
-            collateral_json['added'] = True
-        if collateral_json:
-            collateral_list.append(collateral_json)
-    return collateral_list
-
-
-def party_json(fin: FinancingStatement, party_type: str, registration_id: int, search_reg_id: int) -> dict:
-    """Build party JSON: current_view_json determines if current or original data is included."""
-    if party_type == Party.PartyTypes.REGISTERING_PARTY.value:
-        for party in fin.parties:
-            if party.party_type == party_type and registration_id == party.registration_id:
-                return party.json
-        # No registering party record: legacy data.
-        return {}
-
-    parties = []
-    for party in fin.parties:
-        p_json = None
-        if party.party_type == party_type or \
-                (party_type == Party.PartyTypes.DEBTOR_COMPANY.value and
-                 party.party_type == Party.PartyTypes.DEBTOR_INDIVIDUAL.value):
-            if party.registration_id_end and party.registration_id_end <= search_reg_id:
-                p_json = party.json
-                if party.registration_id != registration_id:
-                    p_json['added'] = True
-            elif not party.registration_id_end and party.registration_id <= search_reg_id:
-                p_json = party.json
-                if party.registration_id != registration_id:
-                    p_json['added'] = True
-        if p_json:
-            parties.append(p_json)
-    return parties
-
-
-def general_collateral_json(fin: FinancingStatement, registration_id: int, search_reg_id: int) -> dict:
-    """Build general collateral JSON: current_view_json determines if current or original data is included."""
-    if not fin.general_collateral and not fin.general_collateral_legacy:
-        return None
-    collateral_json = []
-    collateral_json = __build_general_collateral_json(fin, registration_id, collateral_json, False, search_reg_id)
-    collateral_json = __build_general_collateral_json(fin, registration_id, collateral_json, True, search_reg_id)
-    return collateral_json
-
-
-def __build_general_collateral_json(fin: FinancingStatement,
-                                    registration_id: int,
-                                    collateral_json: dict,
-                                    legacy: bool,
-                                    search_reg_id: int) -> dict:
-    """Build general collateral JSON for a financing statement from either the API or legacy table."""
-    collateral_list = None
-    if (not legacy and not fin.general_collateral) or (legacy and not fin.general_collateral_legacy):
-        return collateral_json
-    if not legacy:
-        collateral_list = reversed(fin.general_collateral)
-    else:
-        collateral_list = reversed(fin.general_collateral_legacy)
-
-    for collateral in collateral_list:  # pylint: disable=too-many-nested-blocks
-        if collateral.registration_id == registration_id or not collateral.status:
-            gc_json = collateral.json
-            collateral_json.append(gc_json)
-        # Add only solution for legacy records: current view shows all records including deleted.
-        elif collateral.registration_id <= search_reg_id:
-            gc_json = collateral.current_json
-            exists = False
-            # If amendment/change registration is 1 add, 1 remove then combine them.
-            if __is_edit_general_collateral(fin, collateral.registration_id, legacy):
-                for exists_collateral in collateral_json:
-                    if exists_collateral['addedDateTime'] == gc_json['addedDateTime']:
-                        if 'descriptionAdd' in exists_collateral and \
-                                'descriptionDelete' not in exists_collateral and \
-                                    'descriptionDelete' in gc_json:
-                            exists = True
-                            exists_collateral['descriptionDelete'] = gc_json['descriptionDelete']
-                        elif 'descriptionDelete' in exists_collateral and \
-                                'descriptionAdd' not in exists_collateral and \
-                                    'descriptionAdd' in gc_json:
-                            exists = True
-                            exists_collateral['descriptionAdd'] = gc_json['descriptionAdd']
-            if not exists:
-                collateral_json.append(gc_json)
-    return collateral_json
-
-
-def __is_edit_general_collateral(fin: FinancingStatement, registration_id: int, legacy: bool):
-    """True if an amendment adds 1 gc and removes 1 gc."""
-    add_count = 0
-    delete_count = 0
-    collateral_list = fin.general_collateral if not legacy else fin.general_collateral_legacy
-    for collateral in collateral_list:
-        if collateral.registration_id == registration_id and collateral.status:
-            if collateral.status == GeneralCollateralLegacy.StatusTypes.ADDED:
-                add_count += 1
-            elif collateral.status == GeneralCollateralLegacy.StatusTypes.DELETED:
-                delete_count += 1
-    return add_count == 1 and delete_count == 1
-
-
 def update_details(search_result: SearchResult) -> dict:
     """Generate the search selection details from the search selection order without duplicates."""
     results = search_result.search_response
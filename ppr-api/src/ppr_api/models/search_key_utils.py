@@ -0,0 +1,306 @@
+# Copyright © 2019 Province of British Columbia
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Search key helper functions equivalent to the database searchkey_* functions.
+
+Each function mirrors the postgres function of the same name in src/database/postgres_functions, step by step, with
+the regular expressions compiled once. Computing the keys here saves a database round trip per party/collateral
+insert and removes the regular expression chains from the search queries: the keys are bound as query parameters.
+Like the database functions, a None (NULL) name returns None.
+"""
+import re
+import time
+from threading import Lock
+
+from flask import current_app
+from sqlalchemy import text
+
+
+COMMON_WORD_QUERY = 'SELECT word FROM common_word'
+NICKNAME_QUERY = 'SELECT name, name_id FROM nicknames'
+
+# Individual name: prefixes and suffixes removed from the name.
+_NAME_NON_WORD = re.compile(r'[^\w]+')
+_NAME_PREFIX = re.compile(r'\b(DR|MR|MRS|MS|CH|DE|DO|DA|LE|LA|MA|JR|SR|I|II|III)\b', re.IGNORECASE)
+_SPACES = re.compile(r'\s+')
+_REPEATING_CHAR = re.compile(r'(.)\1+')
+
+# Business name.
+_UPPER_CASE_LETTERS = re.compile(r'[A-Z]+')
+_LEADING_ZEROES = re.compile(r'^0000|^000|^00|^0')
+_LETTERS = re.compile(r'[A-Za-z]+')
+_NON_WORD_SPACE = re.compile(r'[^\w\s]+', re.IGNORECASE)
+_BRACKETS = re.compile(r'\([^()]*\)', re.IGNORECASE)
+_LEADING_THE = re.compile(r'^THE', re.IGNORECASE)
+_AND_DBA = re.compile(r'\b(AND|DBA)\b')
+_TRAILING_S = re.compile(r'\b( S$)\b', re.IGNORECASE)
+_BUS_SPLIT_WORDS = ('INC', 'LTD', 'LTEE', 'LIMITED', 'INCORPORATED', 'INCORPORATEE', 'INCORPORATION')
+_BUS_DESIGNATIONS = (
+    (re.compile(r'\b(BRITISH COLUMBIA|BRITISHCOLUMBIA)\b', re.IGNORECASE), 'BC'),
+    (re.compile(r'\b(LIMITED|PARTNERSHIP|GP|LLP|LP)\b', re.IGNORECASE), ''),
+    (re.compile(r'\b(SOCIETY|ASSOCIATION|TRUST|TRUSTEE|SOCIETE)\b', re.IGNORECASE), ''),
+    (re.compile(r'\b(INCORPORATED|INCORPOREE|INCORPORATION|INCORP|INC)\b', re.IGNORECASE), ''),
+    (re.compile(r'\b(COMPANY|CORPORATIONS|CORPORATION|CORPS|CORP|CO)\b', re.IGNORECASE), ''),
+    (re.compile(r'\b(LIMITEE|LTEE|LTD|ULC)\b', re.IGNORECASE), ''),
+    (re.compile(r'\b(AND)\b', re.IGNORECASE), 'AN'),
+    (re.compile(r'&'), 'AN'),
+    (_BRACKETS, ''),
+    (_LEADING_THE, ''),
+    (re.compile(r'\b(DBA)\b'), ''),
+    (_NON_WORD_SPACE, '')
+)
+_BUS_STRIP_DESIGNATION = re.compile(r'\b(CORPORATION|INCORPORATED|INCORPOREE|LIMITED|LIMITEE|NON PERSONAL LIABILITY|' +
+                                    r'CORP|INC|LTD|LTEE|NPL|ULC)\b', re.IGNORECASE)
+
+# Serial numbers.
+_NON_ALPHANUMERIC = re.compile(r'[^0-9A-Za-z]')
+_SERIAL_CHAR_MAP = str.maketrans('IiLlZzHhYySsCcGgBbOo', '11112244445566668800')
+_AIRCRAFT_REMOVE = re.compile(r'\s|-')
+_MHR_LETTER = re.compile(r'[$A-Za-z]')
+
+_common_words = None  # pylint: disable=invalid-name
+_common_words_lock = Lock()
+_common_word_patterns = {}
+_nickname_ids = None  # pylint: disable=invalid-name
+_nickname_expiry_time: float = 0  # pylint: disable=invalid-name
+_nickname_lock = Lock()
+
+
+def _upper(value: str) -> str:
+    """Upper case like postgres: characters with a multiple character upper case (ß) are unchanged."""
+    upper_value = value.upper()
+    if len(upper_value) == len(value):
+        return upper_value
+    return ''.join(char if len(char.upper()) > 1 else char.upper() for char in value)
+
+
+def _trim(value: str) -> str:
+    """Trim leading and trailing spaces like postgres TRIM."""
+    return value.strip(' ')
+
+
+def _lpad(value: str, length: int, fill: str) -> str:
+    """Pad or truncate to length like postgres LPAD."""
+    if len(value) >= length:
+        return value[0:length]
+    return value.rjust(length, fill)
+
+
+def _split_part(value: str, delimiter: str, index: int) -> str:
+    """Get the delimited field at the 1 based index like postgres SPLIT_PART: empty if out of range."""
+    parts = value.split(delimiter)
+    return parts[index - 1] if len(parts) >= index else ''
+
+
+def _remove_name_prefix(name: str) -> str:
+    """Replace special characters with a space and remove name prefixes and suffixes."""
+    return _NAME_PREFIX.sub('', _NAME_NON_WORD.sub(' ', name))
+
+
+def load_common_words(connection) -> set:
+    """Get the business name common words, loading them from the common_word table once per process."""
+    global _common_words  # pylint: disable=global-statement,invalid-name
+    if _common_words is None:
+        with _common_words_lock:
+            if _common_words is None:
+                result = connection.execute(text(COMMON_WORD_QUERY))
+                _common_words = frozenset(str(row[0]) for row in result.fetchall() if row[0])
+    return _common_words
+
+
+def set_common_words(words):
+    """Replace the cached business name common words: None reloads them from the database on next use."""
+    global _common_words  # pylint: disable=global-statement,invalid-name
+    with _common_words_lock:
+        _common_words = frozenset(words) if words is not None else None
+
+
+def _load_nickname_ids(connection) -> dict:
+    """Get the nickname group ids by name, loading the nicknames table on first use or after the time to live."""
+    global _nickname_ids, _nickname_expiry_time  # pylint: disable=global-statement,invalid-name
+    if _nickname_ids is None or time.monotonic() >= _nickname_expiry_time:
+        with _nickname_lock:
+            if _nickname_ids is None or time.monotonic() >= _nickname_expiry_time:
+                name_ids = {}
+                result = connection.execute(text(NICKNAME_QUERY))
+                for row in result.fetchall():
+                    if row[0]:
+                        name_ids.setdefault(str(row[0]), set()).add(int(row[1]))
+                _nickname_ids = {name: frozenset(ids) for name, ids in name_ids.items()}
+                _nickname_expiry_time = time.monotonic() + int(current_app.config.get('NICKNAME_CACHE_TTL', 3600))
+    return _nickname_ids
+
+
+def nickname_ids(connection, names) -> list:
+    """Get the sorted nickname group ids of the names, such as the full search first name.
+
+    The nicknames table is cached per process and reloaded when NICKNAME_CACHE_TTL expires, so an individual name
+    search looks the names up once instead of the database probing the table for every candidate debtor.
+    """
+    name_ids = _load_nickname_ids(connection)
+    ids = set()
+    for name in names:
+        if name:
+            ids.update(name_ids.get(name, ()))
+    return sorted(ids)
+
+
+def clear_nicknames():
+    """Remove the cached nicknames: they are reloaded from the database on next use."""
+    global _nickname_ids  # pylint: disable=global-statement,invalid-name
+    with _nickname_lock:
+        _nickname_ids = None
+
+
+def _remove_common_word(search_key: str, word: str) -> str:
+    """Remove all occurrences of the common word as the database function does: the word is a pattern."""
+    pattern = _common_word_patterns.get(word)
+    if pattern is None:
+        pattern = re.compile(word, re.IGNORECASE)
+        _common_word_patterns[word] = pattern
+    return pattern.sub('', search_key)
+
+
+def searchkey_last_name(actual_name: str) -> str:
+    """Get the individual last name search key: equivalent to the searchkey_last_name db function."""
+    if actual_name is None:
+        return None
+    last_name = _trim(_SPACES.sub(' ', _remove_name_prefix(actual_name)))
+    return _upper(_REPEATING_CHAR.sub(r'\1', last_name))
+
+
+def sim_number(actual_name: str) -> float:
+    """Get the individual last name similarity quotient: equivalent to the sim_number db function."""
+    if actual_name is None:
+        return 0.46
+    last_name_key = searchkey_last_name(_REPEATING_CHAR.sub(r'\1', actual_name))
+    return 0.65 if len(last_name_key) <= 3 else 0.46
+
+
+def searchkey_individual(last_name: str, first_name: str) -> str:
+    """Get the individual name search key: equivalent to the searchkey_individual db function."""
+    if last_name is None or first_name is None:
+        return None
+    first_key = _trim(_SPACES.sub(' ', _remove_name_prefix(first_name)))
+    first_key = _REPEATING_CHAR.sub(r'\1', first_key)
+    last_key = _trim(_SPACES.sub(' ', _remove_name_prefix(last_name)))
+    last_key = _REPEATING_CHAR.sub(r'\1', last_key)
+    return _upper(last_key + ' ' + first_key)
+
+
+def individual_split_1(actual_name: str) -> str:
+    """Get the first word of an individual name: equivalent to the individual_split_1 db function."""
+    if actual_name is None:
+        return None
+    return _upper(_split_part(_trim(_remove_name_prefix(actual_name)), ' ', 1))
+
+
+def individual_split_2(actual_name: str) -> str:
+    """Get the second word of an individual name: equivalent to the individual_split_2 db function."""
+    if actual_name is None:
+        return None
+    return _upper(_split_part(_trim(_SPACES.sub(' ', _remove_name_prefix(actual_name))), ' ', 2))
+
+
+def individual_split_3(actual_name: str) -> str:
+    """Get the third word of an individual name: equivalent to the individual_split_3 db function."""
+    if actual_name is None:
+        return None
+    return _upper(_split_part(_trim(_SPACES.sub(' ', _remove_name_prefix(actual_name))), ' ', 3))
+
+
+def business_name_strip_designation(actual_name: str) -> str:
+    """Get the business name without designations: equivalent to the business_name_strip_designation db function."""
+    if actual_name is None:
+        return None
+    base_name = _BUS_STRIP_DESIGNATION.sub('', _NON_WORD_SPACE.sub('', actual_name))
+    return _trim(_SPACES.sub('', base_name))
+
+
+def business_name_word_length(actual_name: str) -> int:
+    """Get the business search query word count used to match on the first word of the debtor name."""
+    if actual_name is None:
+        return None
+    name = _trim(_LEADING_THE.sub('', actual_name))
+    return len(name.split(' ')) if name else None
+
+
+def searchkey_business_name(actual_name: str, common_words) -> str:  # pylint: disable=too-many-branches
+    """Get the business name search key: equivalent to the searchkey_business_name db function.
+
+    The common_words are the words in the common_word table: see load_common_words.
+    """
+    if actual_name is None:
+        return None
+    search_key = None
+    # Names starting with a number: the number is the key.
+    if len(_split_part(_UPPER_CASE_LETTERS.sub('', actual_name), ' ', 1)) >= 5:
+        search_key = _LEADING_ZEROES.sub('', actual_name)
+        search_key = _LETTERS.sub('', _split_part(search_key, ' ', 1))
+        search_key = _NON_WORD_SPACE.sub('', search_key)
+    if search_key:
+        return search_key
+
+    search_key = _upper(actual_name)
+    for split_word in _BUS_SPLIT_WORDS:
+        search_key = _upper(search_key).split(split_word)[0]
+    search_key = _BRACKETS.sub('', search_key)
+    search_key = _LEADING_THE.sub('', search_key)
+    search_key = _AND_DBA.sub('', search_key)
+    search_key = _NON_WORD_SPACE.sub(' ', search_key)
+    search_key = _trim(_SPACES.sub(' ', search_key))
+    search_key = _TRAILING_S.sub('', search_key)
+
+    if search_key[1:2] == ' ' and search_key[3:4] == ' ' and search_key[5:6] != ' ':
+        search_key = _trim(_SPACES.sub('', search_key[0:3])) + search_key[3:149]
+    elif search_key[1:2] == ' ' and search_key[3:4] == ' ' and search_key[5:6] == ' ':
+        search_key = _trim(_SPACES.sub('', search_key[0:3])) + search_key[4:149]
+
+    common_words_found = [_split_part(search_key, ' ', index) for index in (3, 4, 5)]
+    for word in common_words_found:
+        if word and word in common_words:
+            search_key = _remove_common_word(search_key, word)
+
+    if not _trim(search_key):
+        search_key = actual_name
+    for pattern, replacement in _BUS_DESIGNATIONS:
+        search_key = pattern.sub(replacement, search_key)
+    return _trim(_SPACES.sub('', search_key))
+
+
+def searchkey_vehicle(serial_number: str) -> str:
+    """Get the serial number search key: equivalent to the searchkey_vehicle db function."""
+    if serial_number is None:
+        return None
+    search_key = _NON_ALPHANUMERIC.sub('', serial_number)
+    search_key = _lpad(search_key[-6:], 6, '0')
+    search_key = _LETTERS.sub('0', search_key.translate(_SERIAL_CHAR_MAP))
+    return _lpad(search_key, 6, '0')
+
+
+def searchkey_aircraft(aircraft_number: str) -> str:
+    """Get the aircraft airframe DOT number search key: equivalent to the searchkey_aircraft db function."""
+    if aircraft_number is None:
+        return None
+    search_key = _trim(_AIRCRAFT_REMOVE.sub('', aircraft_number))
+    if len(search_key) > 6:
+        search_key = search_key[-6:]
+    return search_key
+
+
+def searchkey_mhr(mhr_number: str) -> str:
+    """Get the manufactured home registration number search key: equivalent to the searchkey_mhr db function."""
+    if mhr_number is None:
+        return None
+    search_key = _trim(_NON_ALPHANUMERIC.sub('', mhr_number))
+    return _lpad(_MHR_LETTER.sub('0', search_key, count=1), 6, '0')
@@ -22,10 +22,12 @@ from enum import Enum
 from http import HTTPStatus
 
 from flask import current_app
+from sqlalchemy import event, inspect
+from sqlalchemy.sql import text
 
 from ppr_api.exceptions import BusinessException, DatabaseException
 from ppr_api.models import utils as model_utils
-from ppr_api.models import search_utils
+from ppr_api.models import search_key_utils, search_utils
 from ppr_api.utils.validators import valid_charset
 
 from .db import db
@@ -162,7 +164,9 @@ class SearchRequest(db.Model):  # pylint: disable=too-many-instance-attributes
             query = search_utils.AIRCRAFT_DOT_QUERY
         rows = None
         try:
-            result = db.session.execute(query, {'query_value': search_value.strip().upper()})
+            query_value: str = search_value.strip().upper()
+            result = db.session.execute(query, {'query_value': query_value,
+                                                'query_search_key': self.get_serial_search_key(query_value)})
             rows = result.fetchall()
         except Exception as db_exception:   # noqa: B902; return nicer error
             current_app.logger.error('DB search_by_serial_type exception: ' + repr(db_exception))
@@ -206,15 +210,99 @@ class SearchRequest(db.Model):  # pylint: disable=too-many-instance-attributes
             self.returned_results_size = 0
             self.total_results_size = 0
 
+    def get_business_name_query(self):
+        """Get the debtor business name search query and query parameters."""
+        search_value = self.request_json['criteria']['debtorName']['business']
+        query_bus_name: str = search_value.strip().upper()
+        common_words = search_key_utils.load_common_words(db.session)
+        params = {
+            'query_bus_key': search_key_utils.searchkey_business_name(query_bus_name, common_words),
+            'query_bus_base': search_key_utils.business_name_strip_designation(query_bus_name),
+            'query_word_length': search_key_utils.business_name_word_length(query_bus_name),
+            'query_bus_quotient': current_app.config.get('SIMILARITY_QUOTIENT_BUSINESS_NAME')
+        }
+        return search_utils.BUSINESS_NAME_QUERY, params
+
+    def get_individual_name_query(self):
+        """Get the debtor individual name search query and query parameters."""
+        middle_name = None
+        last_name = self.request_json['criteria']['debtorName']['last']
+        first_name = self.request_json['criteria']['debtorName']['first']
+        if 'second' in self.request_json['criteria']['debtorName']:
+            middle_name = self.request_json['criteria']['debtorName']['second']
+        query_last: str = last_name.strip().upper()
+        query_first: str = first_name.strip().upper()
+        params = {
+            'query_last': query_last,
+            'query_last_key': search_key_utils.searchkey_last_name(query_last),
+            'query_first': query_first,
+            'query_ind_key': search_key_utils.searchkey_individual(query_last, query_first),
+            'query_sim_number': search_key_utils.sim_number(query_last),
+            'query_last_split1': search_key_utils.individual_split_1(query_last),
+            'query_last_split2': search_key_utils.individual_split_2(query_last),
+            'query_last_split3': search_key_utils.individual_split_3(query_last),
+            'query_first_split1': search_key_utils.individual_split_1(query_first),
+            'query_first_split2': search_key_utils.individual_split_2(query_first),
+            'query_nickname_ids': search_key_utils.nickname_ids(db.session, (query_first,)),
+            'query_first_quotient': current_app.config.get('SIMILARITY_QUOTIENT_FIRST_NAME')
+        }
+        if middle_name is not None and middle_name.strip() != '' and middle_name.strip().upper() != 'NONE':
+            params['query_middle'] = middle_name.strip().upper()
+            return search_utils.INDIVIDUAL_NAME_MIDDLE_QUERY, params
+        return search_utils.INDIVIDUAL_NAME_QUERY, params
+
+    @staticmethod
+    def build_business_name_result(mapping) -> dict:
+        """Build a debtor business name search result from a query result row mapping."""
+        debtor = {
+            'businessName': str(mapping['business_name']),
+            'partyId': int(mapping['id'])
+        }
+        return {
+            'baseRegistrationNumber': str(mapping['base_registration_num']),
+            'matchType': str(mapping['match_type']),
+            'createDateTime': model_utils.format_ts(mapping['base_registration_ts']),
+            'registrationType': str(mapping['registration_type']),
+            'debtor': debtor
+        }
+
+    @staticmethod
+    def build_individual_name_result(mapping) -> dict:
+        """Build a debtor individual name search result from a query result row mapping."""
+        person = {
+            'last': str(mapping['last_name']),
+            'first': str(mapping['first_name'])
+        }
+        middle = str(mapping['middle_initial'])
+        if middle and middle != '' and middle.upper() != 'NONE':
+            person['middle'] = middle
+        debtor = {
+            'personName': person,
+            'partyId': int(mapping['id'])
+        }
+        if mapping['birth_date']:
+            debtor['birthDate'] = model_utils.format_ts(mapping['birth_date'])
+        return {
+            'baseRegistrationNumber': str(mapping['base_registration_num']),
+            'matchType': str(mapping['match_type']),
+            'createDateTime': model_utils.format_ts(mapping['base_registration_ts']),
+            'registrationType': str(mapping['registration_type']),
+            'debtor': debtor
+        }
+
+    def set_results(self, results_json):
+        """Set the search query results and result counts."""
+        self.returned_results_size = len(results_json) if results_json else 0
+        self.total_results_size = self.returned_results_size
+        if self.returned_results_size > 0:
+            self.search_response = results_json
+
     def search_by_business_name(self):
         """Execute a debtor business name search query."""
-        search_value = self.request_json['criteria']['debtorName']['business']
         rows = None
         try:
-            result = db.session.execute(search_utils.BUSINESS_NAME_QUERY,
-                                        {'query_bus_name': search_value.strip().upper(),
-                                         'query_bus_quotient':
-                                         current_app.config.get('SIMILARITY_QUOTIENT_BUSINESS_NAME')})
+            query, params = self.get_business_name_query()
+            result = db.session.execute(query, params)
             rows = result.fetchall()
         except Exception as db_exception:   # noqa: B902; return nicer error
             current_app.logger.error('DB search_by_business_name exception: ' + repr(db_exception))
@@ -223,57 +311,17 @@ class SearchRequest(db.Model):  # pylint: disable=too-many-instance-attributes
             results_json = []
             for row in rows:
                 mapping = row._mapping  # pylint: disable=protected-access; follows documentation
-                registration_type = str(mapping['registration_type'])
-                timestamp = mapping['base_registration_ts']
-                debtor = {
-                    'businessName': str(mapping['business_name']),
-                    'partyId': int(mapping['id'])
-                }
-                result_json = {
-                    'baseRegistrationNumber': str(mapping['base_registration_num']),
-                    'matchType': str(mapping['match_type']),
-                    'createDateTime': model_utils.format_ts(timestamp),
-                    'registrationType': registration_type,
-                    'debtor': debtor
-                }
-                results_json.append(result_json)
-
-            self.returned_results_size = len(results_json)
-            self.total_results_size = self.returned_results_size
-            if self.returned_results_size > 0:
-                self.search_response = results_json
+                results_json.append(SearchRequest.build_business_name_result(mapping))
+            self.set_results(results_json)
         else:
-            self.returned_results_size = 0
-            self.total_results_size = 0
+            self.set_results(None)
 
-    def search_by_individual_name(self):  # pylint: disable=too-many-locals; easier to follow
+    def search_by_individual_name(self):
         """Execute a debtor individual name search query."""
-        result = None
-        middle_name = None
-        last_name = self.request_json['criteria']['debtorName']['last']
-        first_name = self.request_json['criteria']['debtorName']['first']
-        quotient_first = current_app.config.get('SIMILARITY_QUOTIENT_FIRST_NAME')
-        quotient_last = current_app.config.get('SIMILARITY_QUOTIENT_LAST_NAME')
-        quotient_default = current_app.config.get('SIMILARITY_QUOTIENT_DEFAULT')
-        if 'second' in self.request_json['criteria']['debtorName']:
-            middle_name = self.request_json['criteria']['debtorName']['second']
         rows = None
         try:
-            if middle_name is not None and middle_name.strip() != '' and middle_name.strip().upper() != 'NONE':
-                result = db.session.execute(search_utils.INDIVIDUAL_NAME_MIDDLE_QUERY,
-                                            {'query_last': last_name.strip().upper(),
-                                             'query_first': first_name.strip().upper(),
-                                             'query_middle': middle_name.strip().upper(),
-                                             'query_last_quotient': quotient_last,
-                                             'query_first_quotient': quotient_first,
-                                             'query_default_quotient': quotient_default})
-            else:
-                result = db.session.execute(search_utils.INDIVIDUAL_NAME_QUERY,
-                                            {'query_last': last_name.strip().upper(),
-                                             'query_first': first_name.strip().upper(),
-                                             'query_last_quotient': quotient_last,
-                                             'query_first_quotient': quotient_first,
-                                             'query_default_quotient': quotient_default})
+            query, params = self.get_individual_name_query()
+            result = db.session.execute(query, params)
             rows = result.fetchall()
         except Exception as db_exception:   # noqa: B902; return nicer error
             current_app.logger.error('DB search_by_individual_name exception: ' + repr(db_exception))
@@ -282,37 +330,48 @@ class SearchRequest(db.Model):  # pylint: disable=too-many-instance-attributes
             results_json = []
             for row in rows:
                 mapping = row._mapping  # pylint: disable=protected-access; follows documentation
-                registration_type = str(mapping['registration_type'])
-                timestamp = mapping['base_registration_ts']
-                person = {
-                    'last': str(mapping['last_name']),
-                    'first': str(mapping['first_name'])
-                }
-                middle = str(mapping['middle_initial'])
-                if middle and middle != '' and middle.upper() != 'NONE':
-                    person['middle'] = middle
-                debtor = {
-                    'personName': person,
-                    'partyId': int(mapping['id'])
-                }
-                if mapping['birth_date']:
-                    debtor['birthDate'] = model_utils.format_ts(mapping['birth_date'])
-                result_json = {
-                    'baseRegistrationNumber': str(mapping['base_registration_num']),
-                    'matchType': str(mapping['match_type']),
-                    'createDateTime': model_utils.format_ts(timestamp),
-                    'registrationType': registration_type,
-                    'debtor': debtor
-                }
-                results_json.append(result_json)
-
-            self.returned_results_size = len(results_json)
-            self.total_results_size = self.returned_results_size
-            if self.returned_results_size > 0:
-                self.search_response = results_json
+                results_json.append(SearchRequest.build_individual_name_result(mapping))
+            self.set_results(results_json)
         else:
-            self.returned_results_size = 0
-            self.total_results_size = 0
+            self.set_results(None)
+
+    def search_stream(self, batch_size: int = 500):
+        """Execute a search, yielding each search result as it is read.
+
+        The search is saved before the query runs so the search ID is available to the caller, then saved again
+        with the results when all the results are read. Debtor name search query rows are read from a server-side
+        cursor in batches of batch_size rows, so the first results are available before the query result set is
+        complete. The other search types return few results and are executed as usual.
+        """
+        if self.search_type not in (self.SearchTypes.BUSINESS_DEBTOR.value,
+                                    self.SearchTypes.INDIVIDUAL_DEBTOR.value):
+            self.search()
+            for result_json in self.search_response or []:
+                yield result_json
+            return
+
+        self.set_results(None)
+        self.save()
+        results_json = []
+        try:
+            if self.search_type == self.SearchTypes.BUSINESS_DEBTOR.value:
+                query, params = self.get_business_name_query()
+                build_result = SearchRequest.build_business_name_result
+            else:
+                query, params = self.get_individual_name_query()
+                build_result = SearchRequest.build_individual_name_result
+            result = db.session.execute(text(query), params,
+                                        execution_options={'stream_results': True, 'max_row_buffer': batch_size})
+            for rows in result.partitions(batch_size):
+                for row in rows:
+                    result_json = build_result(row._mapping)  # pylint: disable=protected-access; follows documentation
+                    results_json.append(result_json)
+                    yield result_json
+        except Exception as db_exception:   # noqa: B902; return nicer error
+            current_app.logger.error('DB search_stream exception: ' + repr(db_exception))
+            raise DatabaseException(db_exception)
+        self.set_results(results_json)
+        self.save()
 
     def get_total_count(self):
         """Execute a search to get the total match count for the search criteria. Only call if limit reached."""
@@ -320,29 +379,28 @@ class SearchRequest(db.Model):  # pylint: disable=too-many-instance-attributes
         if count_query:
             result = None
             if self.search_type == self.SearchTypes.BUSINESS_DEBTOR.value:
-                search_value = self.request_json['criteria']['debtorName']['business']
-                quotient = current_app.config.get('SIMILARITY_QUOTIENT_BUSINESS_NAME')
-                result = db.session.execute(count_query,
-                                            {'query_bus_name': search_value, 'query_bus_quotient': quotient})
+                _, params = self.get_business_name_query()
+                result = db.session.execute(count_query, params)
             elif self.search_type == self.SearchTypes.INDIVIDUAL_DEBTOR.value:
-                last_name = self.request_json['criteria']['debtorName']['last']
-                first_name = self.request_json['criteria']['debtorName']['first']
-                quotient_first = current_app.config.get('SIMILARITY_QUOTIENT_FIRST_NAME')
-                quotient_last = current_app.config.get('SIMILARITY_QUOTIENT_LAST_NAME')
-                quotient_default = current_app.config.get('SIMILARITY_QUOTIENT_DEFAULT')
-                result = db.session.execute(count_query, {'query_last': last_name.strip().upper(),
-                                                          'query_first': first_name.strip().upper(),
-                                                          'query_first_quotient': quotient_first,
-                                                          'query_last_quotient': quotient_last,
-                                                          'query_default_quotient': quotient_default})
+                _, params = self.get_individual_name_query()
+                result = db.session.execute(count_query, params)
             else:
                 search_value = self.request_json['criteria']['value']
-                result = db.session.execute(count_query, {'query_value': search_value})
+                result = db.session.execute(count_query,
+                                            {'query_search_key': self.get_serial_search_key(search_value)})
 
             if result:
                 row = result.first()
                 self.total_results_size = int(row._mapping['query_count'])  # pylint: disable=protected-access
 
+    def get_serial_search_key(self, search_value: str) -> str:
+        """Get the serial collateral search key for the serial, MHR, or aircraft DOT number search query value."""
+        if self.search_type == self.SearchTypes.MANUFACTURED_HOME_NUM.value:
+            return search_key_utils.searchkey_mhr(search_value)
+        if self.search_type == self.SearchTypes.AIRCRAFT_AIRFRAME_DOT.value:
+            return search_key_utils.searchkey_aircraft(search_value)
+        return search_key_utils.searchkey_vehicle(search_value)
+
     def search(self):
         """Execute a search with the previously set search type and criteria."""
         if self.search_type == self.SearchTypes.REGISTRATION_NUM.value:
@@ -373,16 +431,16 @@ class SearchRequest(db.Model):  # pylint: disable=too-many-instance-attributes
         """Return a search history summary list of searches executed by an account."""
         history_list = []
         if account_id:
-            query = search_utils.ACCOUNT_SEARCH_HISTORY_DATE_QUERY.replace('?', account_id)
+            query = search_utils.ACCOUNT_SEARCH_HISTORY_DATE_QUERY
             if from_ui:
-                query = search_utils.ACCOUNT_SEARCH_HISTORY_DATE_QUERY_NEW.replace('?', account_id)
+                query = search_utils.ACCOUNT_SEARCH_HISTORY_DATE_QUERY_NEW
             if search_utils.GET_HISTORY_DAYS_LIMIT <= 0:
-                query = search_utils.ACCOUNT_SEARCH_HISTORY_QUERY.replace('?', account_id)
+                query = search_utils.ACCOUNT_SEARCH_HISTORY_QUERY
                 if from_ui:
-                    query = search_utils.ACCOUNT_SEARCH_HISTORY_QUERY_NEW.replace('?', account_id)
+                    query = search_utils.ACCOUNT_SEARCH_HISTORY_QUERY_NEW
             rows = None
             try:
-                result = db.session.execute(query)
+                result = db.session.execute(text(query), {'query_account': account_id})
                 rows = result.fetchall()
             except Exception as db_exception:   # noqa: B902; return nicer error
                 current_app.logger.error('DB find_all_by_account_id exception: ' + repr(db_exception))
@@ -391,14 +449,11 @@ class SearchRequest(db.Model):  # pylint: disable=too-many-instance-attributes
                 for row in rows:
                     mapping = row._mapping  # pylint: disable=protected-access; follows documentation
                     search_id = str(mapping['id'])
-                    doc_storage_url = str(mapping['doc_storage_url'])
                     selected_value = mapping['selected_match_count']
                     select_size = int(selected_value) if selected_value else 0
                     search_ts = mapping['search_ts']
-                    callback_url = str(mapping['callback_url'])
                     # Signal UI report pending if async report is not yet available.
-                    if callback_url is not None and callback_url.lower() != 'none' and\
-                            (doc_storage_url is None or doc_storage_url.lower() == 'none'):
+                    if mapping['report_pending']:
                         search_id += '_' + REPORT_STATUS_PENDING
                     search = {
                         'searchId': search_id,
@@ -416,18 +471,41 @@ class SearchRequest(db.Model):  # pylint: disable=too-many-instance-attributes
                         search['exactResultsSize'] = 0
                     history_list.append(search)
                     if from_ui:
-                        # if api_result is null then the selections have not been finished
-                        search['inProgress'] = not mapping['api_result'] and \
-                            mapping['api_result'] != [] and search['totalResultsSize'] > 0
+                        search['inProgress'] = bool(mapping['selection_pending']) and search['totalResultsSize'] > 0
                         search['userId'] = str(mapping['user_id'])
                         if not search.get('inProgress') and \
-                                ((doc_storage_url and doc_storage_url.lower() != 'none') or \
-                                  model_utils.report_retry_elapsed(search_ts)):
+                                (mapping['report_stored'] or model_utils.report_retry_elapsed(search_ts)):
                             search['reportAvailable'] = True
                         else:
                             search['reportAvailable'] = False
         return history_list
 
+    @staticmethod
+    def reconcile_search_indexes() -> dict:
+        """Remove the serial and debtor search index rows no longer searchable and add or update the searchable rows.
+
+        Run nightly: registrations that expire or reach the end of the discharge search window are removed, and
+        changes made outside of the API (legacy data, nickname changes) are applied.
+        """
+        counts = {}
+        try:
+            for index_name, delete_query, upsert_query in (
+                    ('serial', search_utils.SERIAL_INDEX_RECONCILE_DELETE, search_utils.SERIAL_INDEX_RECONCILE_UPSERT),
+                    ('debtor', search_utils.DEBTOR_INDEX_RECONCILE_DELETE, search_utils.DEBTOR_INDEX_RECONCILE_UPSERT)):
+                deleted_count: int = db.session.execute(text(delete_query)).rowcount
+                updated_count: int = db.session.execute(text(upsert_query)).rowcount
+                db.session.commit()
+                current_app.logger.info(f'Reconciled {index_name} search index: deleted={deleted_count} ' +
+                                        f'updated={updated_count}.')
+                counts[index_name] = {
+                    'deletedCount': deleted_count,
+                    'updatedCount': updated_count
+                }
+        except Exception as db_exception:   # noqa: B902; return nicer error
+            current_app.logger.error('DB reconcile_search_indexes exception: ' + repr(db_exception))
+            raise DatabaseException(db_exception)
+        return counts
+
     @staticmethod
     def create_from_json(search_json,
                          account_id: str = None,
@@ -509,3 +587,11 @@ class SearchRequest(db.Model):  # pylint: disable=too-many-instance-attributes
             if name and not valid_charset(name):
                 error_msg += CHARACTER_SET_UNSUPPORTED.format(name)
         return error_msg
+
+
+@event.listens_for(SearchRequest, 'after_update')
+def search_request_after_update_listener(mapper, connection, target):   # pylint: disable=unused-argument
+    """Update the account search history summary when the UI search selection is saved."""
+    if inspect(target).attrs.updated_selection.history.has_changes():
+        params = search_utils.get_history_selection_summary(target.id, target.updated_selection)
+        connection.execute(text(search_utils.SEARCH_HISTORY_SUMMARY_SELECTION_UPDATE), params)
@@ -19,6 +19,8 @@ from http import HTTPStatus
 import json
 
 from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.sql import text
 
 from ppr_api.exceptions import BusinessException, DatabaseException, ResourceErrorCodes
 from ppr_api.models import utils as model_utils
@@ -26,7 +28,8 @@ from ppr_api.models import utils as model_utils
 from .db import db
 from .financing_statement import FinancingStatement
 from .search_request import SearchRequest
-from .search_utils import GET_HISTORY_DAYS_LIMIT
+from .search_utils import GET_HISTORY_DAYS_LIMIT, SEARCH_HISTORY_SUMMARY_INSERT, \
+    SEARCH_HISTORY_SUMMARY_RESULT_UPDATE, get_history_result_summary
 
 
 # PPR UI search detail report callbackURL parameter: skip notification is request originates from UI.
@@ -124,10 +127,19 @@ class SearchResult(db.Model):  # pylint: disable=too-many-instance-attributes
                 self.callback_url = current_app.config.get('UI_SEARCH_CALLBACK_URL')
         self.save()
 
-    def build_details(self):
-        """Generate the search selection details from the search selection order without duplicates."""
+    def build_details(self, mark_added: bool = True):
+        """Generate the search selection details from the search selection order without duplicates.
+
+        Search step 1 only saves the match summary: the financing statement details are built here for the selected
+        registrations only. Details already built are reused.
+        """
         results = self.search_response
-        new_results = []
+        # Index the details by registration number once: keep the first detail for each registration number.
+        results_index = {}
+        for result in results:
+            results_index.setdefault(SearchResult.get_registration_number(result), result)
+        selected_reg_nums = []
+        added_reg_nums = set()
         similar_count = 0
         # Use the same order as the search selection match list in the registration list.
         for select in self.search_select:
@@ -136,18 +148,24 @@ class SearchResult(db.Model):  # pylint: disable=too-many-instance-attributes
                 if select['matchType'] != model_utils.SEARCH_MATCH_EXACT:
                     similar_count += 1
                 reg_num = select['baseRegistrationNumber']
-                found = False
-                if new_results:  # Check for duplicates.
-                    for match in new_results:
-                        if match['financingStatement']['baseRegistrationNumber'] == reg_num:
-                            found = True
-                if not found:  # No duplicates.
-                    for result in results:
-                        if reg_num == result['financingStatement']['baseRegistrationNumber']:
-                            new_results.append(result)
-                            break
+                if reg_num not in added_reg_nums and reg_num in results_index:  # No duplicates.
+                    selected_reg_nums.append(reg_num)
+                    added_reg_nums.add(reg_num)
         self.similar_match_count = similar_count
-        return new_results
+        # Load the selected financing statements not yet built in a fixed number of queries.
+        load_reg_nums = [reg_num for reg_num in selected_reg_nums if 'financingStatement' not in results_index[reg_num]]
+        if load_reg_nums:
+            current_app.logger.debug(f'Search id={self.search_id} building {len(load_reg_nums)} of ' +
+                                     f'{len(results_index)} details.')
+            statements = FinancingStatement.find_all_by_registration_numbers(load_reg_nums)
+            for reg_num in load_reg_nums:
+                summary = results_index[reg_num]
+                results_index[reg_num] = SearchResult.__get_detail(statements,
+                                                                   reg_num,
+                                                                   summary['matchType'],
+                                                                   mark_added,
+                                                                   summary.get('lastRegistrationId', 0))
+        return [results_index[reg_num] for reg_num in selected_reg_nums]
 
     def set_search_selection(self, search_select):
         """Replace the request items with the matching search query items so selection is complete for report TOC."""
@@ -157,16 +175,16 @@ class SearchResult(db.Model):  # pylint: disable=too-many-instance-attributes
         # Remove duplicates
         reg_list = list(dict.fromkeys(reg_list))
         update_select = []
-        # Always use original exact matches
+        similar_index = {}
+        # Always use original exact matches, index similar matches by registration number in the original order.
         for original in original_select:
             if original['matchType'] == model_utils.SEARCH_MATCH_EXACT:
                 update_select.append(original)
+            else:
+                similar_index.setdefault(original['baseRegistrationNumber'], []).append(original)
         # Set similar matches with no duplicates.
         for reg_num in reg_list:
-            for original in original_select:
-                if original['matchType'] != model_utils.SEARCH_MATCH_EXACT and \
-                        original['baseRegistrationNumber'] == reg_num:
-                    update_select.append(original)
+            update_select.extend(similar_index.get(reg_num, []))
 
         # Now sort by search type.
         if self.search.search_type == SearchRequest.SearchTypes.INDIVIDUAL_DEBTOR.value:
@@ -297,41 +315,46 @@ class SearchResult(db.Model):  # pylint: disable=too-many-instance-attributes
         return search_result
 
     @staticmethod
-    def create_from_search_query(search_query, mark_added: bool = True):
-        """Create a search detail object from the initial search query with no search selection criteria."""
+    def create_from_search_query(search_query):
+        """Create a search detail object from the initial search query with no search selection criteria.
+
+        Only the match summary (match type and base registration number) is saved: the financing statement details
+        are built when the search selection is submitted in search step 2. The summary records the latest
+        registration id of each financing statement so the details are built as of the search, not as of step 2.
+        """
         if search_query.total_results_size == 0:  # A search query with no results: build minimal details.
             return SearchResult.create_from_search_query_no_results(search_query)
 
         search_result = SearchResult(search_id=search_query.id, exact_match_count=0, similar_match_count=0)
-        query_results = search_query.search_response
-        detail_results = []
-        for result in query_results:
+        summary_results = []
+        added_reg_nums = set()
+        last_reg_ids = FinancingStatement.find_last_registration_ids(
+            [result['baseRegistrationNumber'] for result in search_query.search_response])
+        for result in search_query.search_response:
             reg_num = result['baseRegistrationNumber']
             match_type = result['matchType']
-            found = False
-            if detail_results:  # Check for duplicates.
-                for statement in detail_results:
-                    if statement['financingStatement']['baseRegistrationNumber'] == reg_num:
-                        found = True
-            if not found:  # No duplicates.
-                # Set to staff for small performance gain: skip account id/historical checks.
-                financing = FinancingStatement.find_by_registration_number(reg_num, None, True, False)
-                financing.mark_update_json = mark_added  # Added for PDF, indicate if party or collateral was added.
-                # Set to true to include change history.
-                financing.include_changes_json = True
-                financing_json = {
+            if reg_num not in added_reg_nums:  # No duplicates.
+                added_reg_nums.add(reg_num)
+                summary_results.append({
                     'matchType': match_type,
-                    'financingStatement': financing.json
-                }
-                detail_results.append(financing_json)
+                    'baseRegistrationNumber': reg_num,
+                    'lastRegistrationId': last_reg_ids.get(reg_num, 0)
+                })
                 if match_type == model_utils.SEARCH_MATCH_EXACT:
                     search_result.exact_match_count += 1
                 else:
                     search_result.similar_match_count += 1
 
-        search_result.search_response = detail_results
+        search_result.search_response = summary_results
         return search_result
 
+    @staticmethod
+    def get_registration_number(result: dict) -> str:
+        """Get the base registration number of a search step 1 match summary or financing statement detail."""
+        if 'financingStatement' in result:
+            return result['financingStatement']['baseRegistrationNumber']
+        return result['baseRegistrationNumber']
+
     @staticmethod
     def create_from_json(search_json, search_id: int):
         """Create a search detail object from dict/json specifying the search selection."""
@@ -339,10 +362,12 @@ class SearchResult(db.Model):  # pylint: disable=too-many-instance-attributes
         search.search_id = search_id
         search.search_select = search_json
         detail_results = []
+        # Load all the financing statements in a fixed number of queries.
+        statements = FinancingStatement.find_all_by_registration_numbers(
+            [result['baseRegistrationNumber'] for result in search_json])
         for result in search_json:
             reg_num = result['baseRegistrationNumber']
-            # Set to staff for small performance gain: skip account id/historical checks.
-            financing = FinancingStatement.find_by_registration_number(reg_num, None, True, False)
+            financing = SearchResult.__get_statement(statements, reg_num)
             # Set to true to include change history.
             financing.include_changes_json = True
             financing_json = {
@@ -353,6 +378,44 @@ class SearchResult(db.Model):  # pylint: disable=too-many-instance-attributes
 
         return search
 
+    @staticmethod
+    def __get_detail(statements: dict,
+                     reg_num: str,
+                     match_type: str,
+                     mark_added: bool = True,
+                     last_reg_id: int = 0) -> dict:
+        """Build the search detail with change history for a bulk loaded financing statement.
+
+        If last_reg_id is set the detail excludes registrations made after search step 1.
+        """
+        financing = SearchResult.__get_statement(statements, reg_num)
+        financing.mark_update_json = mark_added  # Added for PDF, indicate if party or collateral was added.
+        # Set to true to include change history.
+        financing.include_changes_json = True
+        financing.verification_reg_id = last_reg_id
+        statement = financing.json
+        if last_reg_id > 0 and financing.state_type == model_utils.STATE_DISCHARGED and \
+                financing.registration[-1].id > last_reg_id:
+            # Discharged after search step 1.
+            statement['statusType'] = model_utils.STATE_ACTIVE
+            statement.pop('dischargedDateTime', None)
+        return {
+            'matchType': match_type,
+            'financingStatement': statement
+        }
+
+    @staticmethod
+    def __get_statement(statements: dict, reg_num: str):
+        """Get a bulk loaded financing statement by base registration number: not found is an error."""
+        financing = statements.get(reg_num)
+        if not financing:
+            raise BusinessException(
+                error=model_utils.ERR_FINANCING_NOT_FOUND.format(code=ResourceErrorCodes.NOT_FOUND_ERR,
+                                                                 registration_num=reg_num),
+                status_code=HTTPStatus.NOT_FOUND
+            )
+        return financing
+
     @staticmethod
     def validate_search_select(select_json, search_id: int):  # pylint: disable=unused-argument
         """Perform any extra data validation here.
@@ -377,3 +440,19 @@ class SearchResult(db.Model):  # pylint: disable=too-many-instance-attributes
             raise BusinessException(error=error_msg, status_code=status_code)
 
         return search_result
+
+
+@event.listens_for(SearchResult, 'after_insert')
+def search_result_after_insert_listener(mapper, connection, target):   # pylint: disable=unused-argument
+    """Create the account search history summary of the search."""
+    params = get_history_result_summary(target.search_id, target.search_select, target.callback_url,
+                                        target.doc_storage_url)
+    connection.execute(text(SEARCH_HISTORY_SUMMARY_INSERT), params)
+
+
+@event.listens_for(SearchResult, 'after_update')
+def search_result_after_update_listener(mapper, connection, target):   # pylint: disable=unused-argument
+    """Update the account search history summary selection and report state of the search."""
+    params = get_history_result_summary(target.search_id, target.search_select, target.callback_url,
+                                        target.doc_storage_url)
+    connection.execute(text(SEARCH_HISTORY_SUMMARY_RESULT_UPDATE), params)
@@ -32,26 +32,156 @@ SEARCH_RESULTS_MAX_SIZE = 5000
 # Result set size limit clause
 RESULTS_SIZE_LIMIT_CLAUSE = 'FETCH FIRST :max_results_size ROWS ONLY'
 
-# Serial number search base where clause
+# Serial number search base where clause: the serial search index has one row per current serial collateral of a
+# base registration, with the date and time the registration is no longer searchable (null if always searchable).
 SERIAL_SEARCH_BASE = """
-SELECT r.registration_type,r.registration_ts AS base_registration_ts,
-        sc.serial_type,sc.serial_number,sc.year,sc.make,sc.model,
-        r.registration_number AS base_registration_num,
+SELECT si.registration_type,si.base_registration_ts,
+        si.serial_type,si.serial_number,si.year,si.make,si.model,
+        si.base_registration_num,
         CASE WHEN serial_number = :query_value THEN 'EXACT' ELSE 'SIMILAR' END match_type,
-        fs.expire_date,fs.state_type,sc.id AS vehicle_id, sc.mhr_number
-  FROM registrations r, financing_statements fs, serial_collateral sc 
- WHERE r.financing_id = fs.id
-   AND r.registration_type_cl IN ('PPSALIEN', 'MISCLIEN', 'CROWNLIEN')
-   AND r.base_reg_number IS NULL
+        si.vehicle_id, si.mhr_number
+  FROM serial_search_index si
+ WHERE (si.searchable_until IS NULL OR si.searchable_until > (now() at time zone 'utc'))
+"""
+
+# Search index maintenance: registrations are searchable until 30 days after expiry or discharge.
+SEARCH_INDEX_SEARCHABLE_UNTIL = """
+       LEAST(fs.expire_date, (SELECT MIN(r3.registration_ts)
+                                FROM registrations r3
+                               WHERE r3.financing_id = fs.id
+                                 AND r3.registration_type_cl = 'DISCHARGE')) + interval '30 days'
+"""
+SEARCH_INDEX_SEARCHABLE_CLAUSE = """
    AND (fs.expire_date IS NULL OR fs.expire_date > ((now() at time zone 'utc') - interval '30 days'))
-   AND NOT EXISTS (SELECT r3.id 
+   AND NOT EXISTS (SELECT r3.id
                      FROM registrations r3
                     WHERE r3.financing_id = fs.id
                       AND r3.registration_type_cl = 'DISCHARGE'
                       AND r3.registration_ts < ((now() at time zone 'utc') - interval '30 days'))
+"""
+SERIAL_INDEX_INSERT = """
+INSERT INTO serial_search_index (vehicle_id, financing_id, registration_type, base_registration_num,
+                                 base_registration_ts, serial_type, serial_number, year, make, model, mhr_number,
+                                 srch_vin, searchable_until)
+SELECT sc.id, fs.id, r.registration_type, r.registration_number, r.registration_ts,
+       sc.serial_type, sc.serial_number, sc.year, sc.make, sc.model, sc.mhr_number, sc.srch_vin,""" + \
+    SEARCH_INDEX_SEARCHABLE_UNTIL + """  FROM registrations r, financing_statements fs, serial_collateral sc
+ WHERE r.financing_id = fs.id
+   AND r.registration_type_cl IN ('PPSALIEN', 'MISCLIEN', 'CROWNLIEN')
+   AND r.base_reg_number IS NULL
    AND sc.financing_id = fs.id
    AND sc.registration_id_end IS NULL
 """
+SERIAL_INDEX_UPSERT_CLAUSE = """
+ON CONFLICT (vehicle_id) DO UPDATE
+   SET registration_type = EXCLUDED.registration_type,
+       base_registration_num = EXCLUDED.base_registration_num,
+       base_registration_ts = EXCLUDED.base_registration_ts,
+       serial_type = EXCLUDED.serial_type,
+       serial_number = EXCLUDED.serial_number,
+       year = EXCLUDED.year,
+       make = EXCLUDED.make,
+       model = EXCLUDED.model,
+       mhr_number = EXCLUDED.mhr_number,
+       srch_vin = EXCLUDED.srch_vin,
+       searchable_until = EXCLUDED.searchable_until
+ WHERE (serial_search_index.*) IS DISTINCT FROM (EXCLUDED.*)
+"""
+SERIAL_INDEX_FINANCING_UPSERT = SERIAL_INDEX_INSERT + """
+   AND fs.id = :financing_id
+""" + SERIAL_INDEX_UPSERT_CLAUSE
+# Registration changes: remove the rows of deleted collateral and add or update the rows of the financing statement.
+SERIAL_INDEX_FINANCING_UPDATE = """
+WITH removed AS (
+DELETE FROM serial_search_index si
+ WHERE si.financing_id = :financing_id
+   AND NOT EXISTS (SELECT sc.id
+                     FROM serial_collateral sc
+                    WHERE sc.id = si.vehicle_id
+                      AND sc.registration_id_end IS NULL)
+)""" + SERIAL_INDEX_FINANCING_UPSERT
+# Nightly reconciliation: remove rows no longer searchable, add or update the searchable rows.
+SERIAL_INDEX_RECONCILE_DELETE = """
+DELETE FROM serial_search_index si
+ WHERE (si.searchable_until IS NOT NULL AND si.searchable_until <= (now() at time zone 'utc'))
+    OR NOT EXISTS (SELECT sc.id
+                     FROM serial_collateral sc
+                    WHERE sc.id = si.vehicle_id
+                      AND sc.registration_id_end IS NULL)
+"""
+SERIAL_INDEX_RECONCILE_UPSERT = SERIAL_INDEX_INSERT + SEARCH_INDEX_SEARCHABLE_CLAUSE + SERIAL_INDEX_UPSERT_CLAUSE
+
+# Debtor search index maintenance: the first name nickname ids are the nickname groups the first name belongs to.
+DEBTOR_INDEX_INSERT = """
+INSERT INTO debtor_search_index (party_id, financing_id, party_type, registration_type, base_registration_num,
+                                 base_registration_ts, business_name, business_srch_key, bus_name_base,
+                                 bus_name_key_char1, last_name, first_name, middle_initial, birth_date, last_name_key,
+                                 first_name_key, first_name_key_char1, first_name_char1, first_name_char2,
+                                 first_name_split1, first_name_split2, last_name_split1, last_name_split2,
+                                 last_name_split3, nickname_ids, searchable_until)
+SELECT p.id, fs.id, p.party_type, r.registration_type, r.registration_number, r.registration_ts,
+       p.business_name, p.business_srch_key, p.bus_name_base, p.bus_name_key_char1, p.last_name, p.first_name,
+       p.middle_initial, p.birth_date, p.last_name_key, p.first_name_key, p.first_name_key_char1, p.first_name_char1,
+       p.first_name_char2, p.first_name_split1, p.first_name_split2, p.last_name_split1, p.last_name_split2,
+       p.last_name_split3,
+       CASE WHEN p.party_type = 'DI' THEN ARRAY(SELECT n.name_id FROM nicknames n WHERE n.name = p.first_name) END,
+""" + SEARCH_INDEX_SEARCHABLE_UNTIL + """  FROM registrations r, financing_statements fs, parties p
+ WHERE r.financing_id = fs.id
+   AND r.registration_type_cl IN ('PPSALIEN', 'MISCLIEN', 'CROWNLIEN')
+   AND r.base_reg_number IS NULL
+   AND p.financing_id = fs.id
+   AND p.registration_id_end IS NULL
+   AND p.party_type IN ('DB', 'DI')
+"""
+DEBTOR_INDEX_UPSERT_CLAUSE = """
+ON CONFLICT (party_id) DO UPDATE
+   SET party_type = EXCLUDED.party_type,
+       registration_type = EXCLUDED.registration_type,
+       base_registration_num = EXCLUDED.base_registration_num,
+       base_registration_ts = EXCLUDED.base_registration_ts,
+       business_name = EXCLUDED.business_name,
+       business_srch_key = EXCLUDED.business_srch_key,
+       bus_name_base = EXCLUDED.bus_name_base,
+       bus_name_key_char1 = EXCLUDED.bus_name_key_char1,
+       last_name = EXCLUDED.last_name,
+       first_name = EXCLUDED.first_name,
+       middle_initial = EXCLUDED.middle_initial,
+       birth_date = EXCLUDED.birth_date,
+       last_name_key = EXCLUDED.last_name_key,
+       first_name_key = EXCLUDED.first_name_key,
+       first_name_key_char1 = EXCLUDED.first_name_key_char1,
+       first_name_char1 = EXCLUDED.first_name_char1,
+       first_name_char2 = EXCLUDED.first_name_char2,
+       first_name_split1 = EXCLUDED.first_name_split1,
+       first_name_split2 = EXCLUDED.first_name_split2,
+       last_name_split1 = EXCLUDED.last_name_split1,
+       last_name_split2 = EXCLUDED.last_name_split2,
+       last_name_split3 = EXCLUDED.last_name_split3,
+       nickname_ids = EXCLUDED.nickname_ids,
+       searchable_until = EXCLUDED.searchable_until
+ WHERE (debtor_search_index.*) IS DISTINCT FROM (EXCLUDED.*)
+"""
+DEBTOR_INDEX_FINANCING_UPSERT = DEBTOR_INDEX_INSERT + """
+   AND fs.id = :financing_id
+""" + DEBTOR_INDEX_UPSERT_CLAUSE
+DEBTOR_INDEX_FINANCING_UPDATE = """
+WITH removed AS (
+DELETE FROM debtor_search_index di
+ WHERE di.financing_id = :financing_id
+   AND NOT EXISTS (SELECT p.id
+                     FROM parties p
+                    WHERE p.id = di.party_id
+                      AND p.registration_id_end IS NULL)
+)""" + DEBTOR_INDEX_FINANCING_UPSERT
+DEBTOR_INDEX_RECONCILE_DELETE = """
+DELETE FROM debtor_search_index di
+ WHERE (di.searchable_until IS NOT NULL AND di.searchable_until <= (now() at time zone 'utc'))
+    OR NOT EXISTS (SELECT p.id
+                     FROM parties p
+                    WHERE p.id = di.party_id
+                      AND p.registration_id_end IS NULL)
+"""
+DEBTOR_INDEX_RECONCILE_UPSERT = DEBTOR_INDEX_INSERT + SEARCH_INDEX_SEARCHABLE_CLAUSE + DEBTOR_INDEX_UPSERT_CLAUSE
 
 # Equivalent logic as DB view search_by_reg_num_vw, but API determines the where clause.
 REG_NUM_QUERY = """
@@ -73,203 +203,189 @@ SELECT r2.registration_type, r2.registration_ts AS base_registration_ts,
 
 # Equivalent logic as DB view search_by_mhr_num_vw, but API determines the where clause.
 MHR_NUM_QUERY = SERIAL_SEARCH_BASE + """
-   AND sc.serial_type = 'MH' 
-   AND sc.mhr_number = (SELECT searchkey_mhr(:query_value)) 
-ORDER BY match_type, sc.serial_number ASC, sc.year ASC, r.registration_ts ASC
+   AND si.serial_type = 'MH'
+   AND si.mhr_number = :query_search_key
+ORDER BY match_type, si.serial_number ASC, si.year ASC, si.base_registration_ts ASC
 """
 
 # Equivalent logic as DB view search_by_serial_num_vw, but API determines the where clause.
 SERIAL_NUM_QUERY = SERIAL_SEARCH_BASE + """
-   AND sc.serial_type NOT IN ('AC', 'AF', 'AP')
-   AND sc.srch_vin = (SELECT searchkey_vehicle(:query_value)) 
-ORDER BY match_type, sc.serial_number ASC, sc.year ASC, r.registration_ts ASC
+   AND si.serial_type NOT IN ('AC', 'AF', 'AP')
+   AND si.srch_vin = :query_search_key
+ORDER BY match_type, si.serial_number ASC, si.year ASC, si.base_registration_ts ASC
 """
 
 # Equivalent logic as DB view search_by_aircraft_dot_vw, but API determines the where clause.
 AIRCRAFT_DOT_QUERY = SERIAL_SEARCH_BASE + """
-   AND sc.serial_type IN ('AC', 'AF', 'AP')
-   AND sc.srch_vin = (SELECT searchkey_aircraft(:query_value)) 
-ORDER BY match_type, sc.serial_number ASC, sc.year ASC, r.registration_ts ASC
+   AND si.serial_type IN ('AC', 'AF', 'AP')
+   AND si.srch_vin = :query_search_key
+ORDER BY match_type, si.serial_number ASC, si.year ASC, si.base_registration_ts ASC
 """
 
-BUSINESS_NAME_QUERY = """
+# Debtor name search queries: the debtor search index has one row per current debtor of a base registration, with
+# the party search keys, the first name nickname ids, and the date and time the registration is no longer searchable.
+DEBTOR_SEARCHABLE_CLAUSE = """
+ WHERE (di.searchable_until IS NULL OR di.searchable_until > (now() at time zone 'utc'))
+"""
+BUSINESS_NAME_CTE = """
 WITH q AS (
-   SELECT(SELECT searchkey_business_name(:query_bus_name)) AS search_key,
-   SUBSTR((SELECT searchkey_business_name(:query_bus_name)),1,1) AS search_key_char1,
-   (SELECT business_name_strip_designation(:query_bus_name)) AS search_name_base,
-   (SELECT array_length(string_to_array(trim(regexp_replace(:query_bus_name,'^THE','','gi')),' '),1)) AS word_length)
-SELECT r.registration_type,r.registration_ts AS base_registration_ts,
-       p.business_name,
-       r.registration_number AS base_registration_num,
-       CASE WHEN p.bus_name_base = search_name_base THEN 'EXACT'
-            ELSE 'SIMILAR' END match_type,
-       fs.expire_date,fs.state_type,p.id
-  FROM registrations r, financing_statements fs, parties p, q
-WHERE r.financing_id = fs.id
-   AND r.registration_type_cl IN ('PPSALIEN', 'MISCLIEN', 'CROWNLIEN')
-   AND r.base_reg_number IS NULL
-   AND (fs.expire_date IS NULL OR fs.expire_date > ((now() at time zone 'utc') - interval '30 days'))
-   AND NOT EXISTS (SELECT r3.id
-                     FROM registrations r3
-                    WHERE r3.financing_id = fs.id
-                      AND r3.registration_type_cl = 'DISCHARGE'
-                      AND r3.registration_ts < ((now() at time zone 'utc') - interval '30 days'))
-   AND p.financing_id = fs.id
-   AND p.registration_id_end IS NULL
-   AND p.party_type = 'DB'
-   AND p.bus_name_key_char1 = search_key_char1
-   AND ((search_key <% p.business_srch_key AND
-          SIMILARITY(search_key, p.business_srch_key) >= :query_bus_quotient)
-          OR p.business_srch_key = search_key
-          OR word_length=1 and search_key = split_part(business_name,' ',1)
-          OR (LENGTH(search_key) >= 3 AND LEVENSHTEIN(search_key, p.business_srch_key) <= 1) AND 
-              p.bus_name_key_char1 = search_key_char1
+   SELECT CAST(:query_bus_key AS VARCHAR) AS search_key,
+   SUBSTR(CAST(:query_bus_key AS VARCHAR),1,1) AS search_key_char1,
+   CAST(:query_bus_base AS VARCHAR) AS search_name_base,
+   CAST(:query_word_length AS INTEGER) AS word_length)
+"""
+BUSINESS_NAME_MATCH_CLAUSE = """
+   AND di.party_type = 'DB'
+   AND di.bus_name_key_char1 = search_key_char1
+   AND ((search_key <% di.business_srch_key AND
+          SIMILARITY(search_key, di.business_srch_key) >= :query_bus_quotient)
+          OR di.business_srch_key = search_key
+          OR word_length=1 and search_key = split_part(di.business_name,' ',1)
+          OR (LENGTH(search_key) >= 3 AND LEVENSHTEIN(search_key, di.business_srch_key) <= 1)
     )
-ORDER BY match_type, p.business_name ASC, r.registration_ts ASC
+"""
+BUSINESS_NAME_QUERY = BUSINESS_NAME_CTE + """
+SELECT di.registration_type,di.base_registration_ts,
+       di.business_name,
+       di.base_registration_num,
+       CASE WHEN di.bus_name_base = search_name_base THEN 'EXACT'
+            ELSE 'SIMILAR' END match_type,
+       di.party_id AS id
+  FROM debtor_search_index di, q
+""" + DEBTOR_SEARCHABLE_CLAUSE + BUSINESS_NAME_MATCH_CLAUSE + """
+ORDER BY match_type, di.business_name ASC, di.base_registration_ts ASC
 """
 
-INDIVIDUAL_NAME_QUERY = """
-WITH q AS (SELECT(searchkey_last_name(:query_last)) AS search_last_key)
-SELECT r.registration_type,r.registration_ts AS base_registration_ts,
-       p.last_name,p.first_name,p.middle_initial,p.id,
-       r.registration_number AS base_registration_num,
-       CASE WHEN search_last_key = p.last_name_key AND p.first_name = :query_first THEN 'EXACT'
-            WHEN search_last_key = p.last_name_key AND LENGTH(:query_first) = 1 AND
-                 :query_first = p.first_name_char1 THEN 'EXACT'
-            WHEN search_last_key = p.last_name_key AND LENGTH(p.first_name) = 1 AND
-                 p.first_name = LEFT(:query_first, 1) THEN 'EXACT'
-            WHEN search_last_key = p.last_name_key AND p.first_name_char2 IS NOT NULL AND p.first_name_char2 = '-' AND
-                 p.first_name_char1 = LEFT(:query_first, 1) THEN 'EXACT'
-            WHEN search_last_key = p.last_name_key AND LENGTH(:query_first) > 1 AND SUBSTR(:query_first, 2, 1) = '-'
-                 AND p.first_name_char1 = LEFT(:query_first, 1) THEN 'EXACT'
+# Equivalent logic as the match_individual_name db function with the search keys computed by the API.
+INDIVIDUAL_NAME_CTE = """
+WITH q AS (
+   SELECT CAST(:query_last_key AS VARCHAR) AS search_last_key,
+   CAST(:query_ind_key AS VARCHAR) AS search_ind_key,
+   SUBSTR(CAST(:query_ind_key AS VARCHAR),1,1) AS search_ind_key_char1,
+   CAST(:query_last AS VARCHAR) AS search_last,
+   CAST(:query_first AS VARCHAR) AS search_first,
+   LENGTH(CAST(:query_last AS VARCHAR)) AS last_length,
+   LENGTH(CAST(:query_first AS VARCHAR)) AS first_length,
+   SUBSTR(CAST(:query_first AS VARCHAR),1,1) AS first_char1,
+   SUBSTR(CAST(:query_first AS VARCHAR),2,1) AS first_char2,
+   CAST(:query_sim_number AS NUMERIC) AS sim_number,
+   CAST(:query_last_split1 AS VARCHAR) AS last_split1,
+   CAST(:query_last_split2 AS VARCHAR) AS last_split2,
+   CAST(:query_last_split3 AS VARCHAR) AS last_split3,
+   CAST(:query_first_split1 AS VARCHAR) AS first_split1,
+   CAST(:query_first_split2 AS VARCHAR) AS first_split2,
+   CAST(:query_nickname_ids AS INTEGER[]) AS nickname_ids)
+"""
+INDIVIDUAL_NAME_MATCH_CLAUSE = """
+   AND di.party_type = 'DI'
+   AND (di.last_name_key = search_last_key OR
+        (di.first_name_key_char1 = search_ind_key_char1 AND
+         search_ind_key <% di.first_name_key AND
+         LEVENSHTEIN(di.first_name_key, search_ind_key) <= 2))
+   AND (
+        (di.first_name = search_first OR di.middle_initial = search_first)
+    OR  di.nickname_ids && nickname_ids
+    OR  (first_length = 1 AND first_char1 = di.first_name_char1)
+    OR  (first_length > 1 AND first_char1 = di.first_name_char1 AND di.first_name_char2 IS NOT NULL AND
+         di.first_name_char2 = '-')
+    OR  (first_length > 1 AND first_char2 IS NOT NULL AND first_char2 = '-' AND first_char1 = di.first_name_char1)
+    OR  (di.first_name_char1 = first_char1 AND LENGTH(di.first_name) = 1)
+    OR  (search_ind_key <% di.first_name_key AND
+         SIMILARITY(di.first_name_key, search_ind_key) >= sim_number AND
+         di.first_name_key_char1 = search_ind_key_char1 AND
+         ((search_first <% di.first_name AND
+           SIMILARITY(di.first_name, search_first) >= :query_first_quotient AND
+           (last_length BETWEEN LENGTH(di.last_name) - 3 AND LENGTH(di.last_name) + 3 OR last_length >= 10)) OR
+          (di.first_name_char1 = first_char1 OR di.first_name = first_char1))
+        )
+    OR  (search_first <% di.first_name AND
+         SIMILARITY(di.first_name, search_first) >= :query_first_quotient AND
+         (di.last_name_split1 IN (last_split1, last_split2, last_split3) OR
+          di.last_name_split2 != '' AND di.last_name_split2 IN (last_split1, last_split2, last_split3) OR
+          di.last_name_split3 != '' AND di.last_name_split3 IN (last_split1, last_split2, last_split3))
+        )
+    OR  (search_last <% di.last_name AND
+         SIMILARITY(di.last_name, search_last) >= sim_number AND
+         (di.first_name_split1 IN (first_split1, first_split2) OR
+          di.first_name_split2 != '' AND di.first_name_split2 IN (first_split1, first_split2))
+        )
+   )
+"""
+INDIVIDUAL_NAME_QUERY = INDIVIDUAL_NAME_CTE + """
+SELECT di.registration_type,di.base_registration_ts,
+       di.last_name,di.first_name,di.middle_initial,di.party_id AS id,
+       di.base_registration_num,
+       CASE WHEN search_last_key = di.last_name_key AND di.first_name = search_first THEN 'EXACT'
+            WHEN search_last_key = di.last_name_key AND first_length = 1 AND
+                 search_first = di.first_name_char1 THEN 'EXACT'
+            WHEN search_last_key = di.last_name_key AND LENGTH(di.first_name) = 1 AND
+                 di.first_name = first_char1 THEN 'EXACT'
+            WHEN search_last_key = di.last_name_key AND di.first_name_char2 IS NOT NULL AND
+                 di.first_name_char2 = '-' AND di.first_name_char1 = first_char1 THEN 'EXACT'
+            WHEN search_last_key = di.last_name_key AND first_length > 1 AND first_char2 = '-'
+                 AND di.first_name_char1 = first_char1 THEN 'EXACT'
             ELSE 'SIMILAR' END match_type,
-       fs.expire_date,fs.state_type, p.birth_date
-  FROM registrations r, financing_statements fs, parties p, q
-WHERE r.financing_id = fs.id
-   AND r.registration_type_cl IN ('PPSALIEN', 'MISCLIEN', 'CROWNLIEN')
-   AND r.base_reg_number IS NULL
-   AND (fs.expire_date IS NULL OR fs.expire_date > ((now() at time zone 'utc') - interval '30 days'))
-   AND NOT EXISTS (SELECT r3.id
-                     FROM registrations r3
-                    WHERE r3.financing_id = fs.id
-                      AND r3.registration_type_cl = 'DISCHARGE'
-                      AND r3.registration_ts < ((now() at time zone 'utc') - interval '30 days'))
-   AND p.financing_id = fs.id
-   AND p.registration_id_end IS NULL
-   AND p.party_type = 'DI'
-   AND p.id IN (SELECT * FROM unnest(match_individual_name(:query_last, :query_first, :query_last_quotient,
-                                                           :query_first_quotient, :query_default_quotient))) 
-ORDER BY match_type, p.last_name ASC, p.first_name ASC, p.middle_initial ASC, p.birth_date ASC,  r.registration_ts ASC
+       di.birth_date
+  FROM debtor_search_index di, q
+""" + DEBTOR_SEARCHABLE_CLAUSE + INDIVIDUAL_NAME_MATCH_CLAUSE + """
+ORDER BY match_type, di.last_name ASC, di.first_name ASC, di.middle_initial ASC, di.birth_date ASC,
+         di.base_registration_ts ASC
 """
 
-INDIVIDUAL_NAME_MIDDLE_QUERY = """
-WITH q AS (SELECT(searchkey_last_name(:query_last)) AS search_last_key)
-SELECT r.registration_type,r.registration_ts AS base_registration_ts,
-       p.last_name,p.first_name,p.middle_initial,p.id,
-       r.registration_number AS base_registration_num,
-       CASE WHEN search_last_key = p.last_name_key AND p.first_name = :query_first AND
-               (p.middle_initial is NULL OR LEFT(p.middle_initial, 1) = LEFT(:query_middle, 1)) THEN 'EXACT'
-            WHEN search_last_key = p.last_name_key AND LENGTH(:query_first) = 1 AND
-                 :query_first = p.first_name_char1 AND
-                 (p.middle_initial is NULL OR LEFT(p.middle_initial, 1) = LEFT(:query_middle, 1)) THEN 'EXACT'
-            WHEN search_last_key = p.last_name_key AND LENGTH(p.first_name) = 1 AND
-                 p.first_name = LEFT(:query_first, 1) AND
-                 (p.middle_initial is NULL OR LEFT(p.middle_initial, 1) = LEFT(:query_middle, 1)) THEN 'EXACT'
-            WHEN search_last_key = p.last_name_key AND p.first_name_char2 IS NOT NULL AND p.first_name_char2 = '-' AND
-                 p.first_name_char1 = LEFT(:query_first, 1) AND
-                 (p.middle_initial is NULL OR LEFT(p.middle_initial, 1) = LEFT(:query_middle, 1)) THEN 'EXACT'
-            WHEN search_last_key = p.last_name_key AND LENGTH(:query_first) > 1 AND SUBSTR(:query_first, 2, 1) = '-'
-                 AND p.first_name_char1 = LEFT(:query_first, 1) AND
-                 (p.middle_initial is NULL OR LEFT(p.middle_initial, 1) = LEFT(:query_middle, 1)) THEN 'EXACT'
+INDIVIDUAL_NAME_MIDDLE_QUERY = INDIVIDUAL_NAME_CTE + """
+SELECT di.registration_type,di.base_registration_ts,
+       di.last_name,di.first_name,di.middle_initial,di.party_id AS id,
+       di.base_registration_num,
+       CASE WHEN search_last_key = di.last_name_key AND di.first_name = search_first AND
+               (di.middle_initial is NULL OR LEFT(di.middle_initial, 1) = LEFT(:query_middle, 1)) THEN 'EXACT'
+            WHEN search_last_key = di.last_name_key AND first_length = 1 AND
+                 search_first = di.first_name_char1 AND
+                 (di.middle_initial is NULL OR LEFT(di.middle_initial, 1) = LEFT(:query_middle, 1)) THEN 'EXACT'
+            WHEN search_last_key = di.last_name_key AND LENGTH(di.first_name) = 1 AND
+                 di.first_name = first_char1 AND
+                 (di.middle_initial is NULL OR LEFT(di.middle_initial, 1) = LEFT(:query_middle, 1)) THEN 'EXACT'
+            WHEN search_last_key = di.last_name_key AND di.first_name_char2 IS NOT NULL AND
+                 di.first_name_char2 = '-' AND di.first_name_char1 = first_char1 AND
+                 (di.middle_initial is NULL OR LEFT(di.middle_initial, 1) = LEFT(:query_middle, 1)) THEN 'EXACT'
+            WHEN search_last_key = di.last_name_key AND first_length > 1 AND first_char2 = '-'
+                 AND di.first_name_char1 = first_char1 AND
+                 (di.middle_initial is NULL OR LEFT(di.middle_initial, 1) = LEFT(:query_middle, 1)) THEN 'EXACT'
             ELSE 'SIMILAR' END match_type,
-       fs.expire_date,fs.state_type, p.birth_date
-  FROM registrations r, financing_statements fs, parties p, q
-WHERE r.financing_id = fs.id
-   AND r.registration_type_cl IN ('PPSALIEN', 'MISCLIEN', 'CROWNLIEN')
-   AND r.base_reg_number IS NULL
-   AND (fs.expire_date IS NULL OR fs.expire_date > ((now() at time zone 'utc') - interval '30 days'))
-   AND NOT EXISTS (SELECT r3.id
-                     FROM registrations r3
-                    WHERE r3.financing_id = fs.id
-                      AND r3.registration_type_cl = 'DISCHARGE'
-                      AND r3.registration_ts < ((now() at time zone 'utc') - interval '30 days'))
-   AND p.financing_id = fs.id
-   AND p.registration_id_end IS NULL
-   AND p.party_type = 'DI'
-   AND p.id IN (SELECT * FROM unnest(match_individual_name(:query_last, :query_first, :query_last_quotient,
-                                                           :query_first_quotient, :query_default_quotient))) 
-ORDER BY match_type, p.last_name ASC, p.first_name ASC, p.middle_initial ASC, p.birth_date ASC,  r.registration_ts ASC
+       di.birth_date
+  FROM debtor_search_index di, q
+""" + DEBTOR_SEARCHABLE_CLAUSE + INDIVIDUAL_NAME_MATCH_CLAUSE + """
+ORDER BY match_type, di.last_name ASC, di.first_name ASC, di.middle_initial ASC, di.birth_date ASC,
+         di.base_registration_ts ASC
 """
 
 # Total result count queries for serial number, debtor name searches:
-BUSINESS_NAME_TOTAL_COUNT = """
-WITH q AS (
-   SELECT searchkey_business_name(:query_bus_name) AS search_key
-)
-SELECT COUNT(r.id) AS query_count
-  FROM registrations r, financing_statements fs, parties p, q
- WHERE r.financing_id = fs.id
-   AND r.registration_type_cl IN ('PPSALIEN', 'MISCLIEN', 'CROWNLIEN')
-   AND r.base_reg_number IS NULL
-   AND (fs.expire_date IS NULL OR fs.expire_date > ((now() at time zone 'utc') - interval '30 days'))
-   AND NOT EXISTS (SELECT r3.id
-                     FROM registrations r3
-                    WHERE r3.financing_id = fs.id
-                      AND r3.registration_type_cl = 'DISCHARGE'
-                      AND r3.registration_ts < ((now() at time zone 'utc') - interval '30 days'))
-   AND p.financing_id = fs.id
-   AND p.registration_id_end IS NULL
-   AND p.party_type = 'DB'
-   AND SUBSTR(search_key,1,1) = SUBSTR(p.business_name,1,1)
-   AND (SIMILARITY(search_key, p.business_srch_key) >= :query_bus_quotient OR p.business_srch_key = search_key)
-"""
+BUSINESS_NAME_TOTAL_COUNT = BUSINESS_NAME_CTE + """
+SELECT COUNT(di.party_id) AS query_count
+  FROM debtor_search_index di, q
+""" + DEBTOR_SEARCHABLE_CLAUSE + BUSINESS_NAME_MATCH_CLAUSE
 
-INDIVIDUAL_NAME_TOTAL_COUNT = """
-SELECT COUNT(r.id) AS query_count
-  FROM registrations r, financing_statements fs, parties p
- WHERE r.financing_id = fs.id
-   AND r.registration_type_cl IN ('PPSALIEN', 'MISCLIEN', 'CROWNLIEN')
-   AND r.base_reg_number IS NULL
-   AND (fs.expire_date IS NULL OR fs.expire_date > ((now() at time zone 'utc') - interval '30 days'))
-   AND NOT EXISTS (SELECT r3.id
-                     FROM registrations r3
-                    WHERE r3.financing_id = fs.id
-                      AND r3.registration_type_cl = 'DISCHARGE'
-                      AND r3.registration_ts < ((now() at time zone 'utc') - interval '30 days'))
-   AND p.financing_id = fs.id
-   AND p.registration_id_end IS NULL
-   AND p.party_type = 'DI'
-   AND p.id IN (SELECT * FROM unnest(match_individual_name(:query_last, :query_first, :query_last_quotient,
-                                                           :query_first_quotient, :query_default_quotient))) 
-"""
+INDIVIDUAL_NAME_TOTAL_COUNT = INDIVIDUAL_NAME_CTE + """
+SELECT COUNT(di.party_id) AS query_count
+  FROM debtor_search_index di, q
+""" + DEBTOR_SEARCHABLE_CLAUSE + INDIVIDUAL_NAME_MATCH_CLAUSE
 
 SERIAL_SEARCH_COUNT_BASE = """
-SELECT COUNT(r.id) AS query_count
-  FROM registrations r, financing_statements fs, serial_collateral sc
-  WHERE r.financing_id = fs.id
-    AND r.registration_type_cl IN ('PPSALIEN', 'MISCLIEN', 'CROWNLIEN')
-    AND r.base_reg_number IS NULL
-    AND (fs.expire_date IS NULL OR fs.expire_date > ((now() at time zone 'utc') - interval '30 days'))
-    AND NOT EXISTS (SELECT r3.id
-                      FROM registrations r3
-                     WHERE r3.financing_id = fs.id
-                       AND r3.registration_type_cl = 'DISCHARGE'
-                       AND r3.registration_ts < ((now() at time zone 'utc') - interval '30 days'))
-    AND sc.financing_id = fs.id
-    AND sc.registration_id_end IS NULL 
+SELECT COUNT(si.vehicle_id) AS query_count
+  FROM serial_search_index si
+ WHERE (si.searchable_until IS NULL OR si.searchable_until > (now() at time zone 'utc'))
 """
 
 MHR_NUM_TOTAL_COUNT = SERIAL_SEARCH_COUNT_BASE + \
-  " AND sc.serial_type = 'MH' " + \
-   "AND sc.mhr_number = searchkey_mhr(:query_value)"
+  " AND si.serial_type = 'MH' " + \
+   "AND si.mhr_number = :query_search_key"
 
 SERIAL_NUM_TOTAL_COUNT = SERIAL_SEARCH_COUNT_BASE + \
-  " AND sc.serial_type NOT IN ('AC', 'AF') " + \
-   "AND sc.srch_vin = searchkey_vehicle(:query_value)"
+  " AND si.serial_type NOT IN ('AC', 'AF') " + \
+   "AND si.srch_vin = :query_search_key"
 
 AIRCRAFT_DOT_TOTAL_COUNT = SERIAL_SEARCH_COUNT_BASE + \
-  " AND sc.serial_type IN ('AC', 'AF') " + \
-   "AND sc.srch_vin = searchkey_aircraft(:query_value)"
+  " AND si.serial_type IN ('AC', 'AF') " + \
+   "AND si.srch_vin = :query_search_key"
 
 COUNT_QUERY_FROM_SEARCH_TYPE = {
     'AC': AIRCRAFT_DOT_TOTAL_COUNT,
@@ -280,103 +396,139 @@ COUNT_QUERY_FROM_SEARCH_TYPE = {
 }
 
 
+# Search history summary: maintained when search requests and search results are saved (see the search_results
+# and search_requests after insert/update listeners) so the account search history never reads the results JSON.
+SEARCH_HISTORY_SUMMARY_INSERT = """
+INSERT INTO search_history_summaries (search_id, username, selected_match_count, exact_match_count,
+                                      selection_match_count, selection_exact_count, selection_pending,
+                                      report_pending, report_stored)
+SELECT sc.id,
+       CASE WHEN sc.user_id IS NULL THEN ''
+            ELSE (SELECT u.firstname || ' ' || u.lastname FROM users u WHERE u.username = sc.user_id
+                  FETCH FIRST 1 ROWS ONLY) END,
+       :selected_match_count, :exact_match_count,
+       CASE WHEN json_typeof(sc.updated_selection) = 'array' THEN json_array_length(sc.updated_selection) END,
+       CASE WHEN json_typeof(sc.updated_selection) = 'array'
+            THEN (SELECT COUNT(*) FROM json_array_elements(sc.updated_selection) sc2
+                   WHERE sc2 ->> 'matchType' = 'EXACT')
+            ELSE 0 END,
+       :selection_pending, :report_pending, :report_stored
+  FROM search_requests sc
+ WHERE sc.id = :search_id
+ON CONFLICT (search_id) DO UPDATE
+   SET selected_match_count = EXCLUDED.selected_match_count,
+       exact_match_count = EXCLUDED.exact_match_count,
+       selection_pending = EXCLUDED.selection_pending,
+       report_pending = EXCLUDED.report_pending,
+       report_stored = EXCLUDED.report_stored
+"""
+SEARCH_HISTORY_SUMMARY_RESULT_UPDATE = """
+UPDATE search_history_summaries
+   SET selected_match_count = :selected_match_count,
+       exact_match_count = :exact_match_count,
+       selection_pending = :selection_pending,
+       report_pending = :report_pending,
+       report_stored = :report_stored
+ WHERE search_id = :search_id
+"""
+SEARCH_HISTORY_SUMMARY_SELECTION_UPDATE = """
+UPDATE search_history_summaries
+   SET selection_match_count = :selection_match_count,
+       selection_exact_count = :selection_exact_count
+ WHERE search_id = :search_id
+"""
+
 ACCOUNT_SEARCH_HISTORY_DATE_QUERY = f"""
 SELECT sc.id, sc.search_ts, sc.api_criteria, sc.total_results_size, sc.returned_results_size,
-  (SELECT CASE WHEN sc.search_type IN ('MM', 'MI', 'MO', 'MS') THEN -1
-               WHEN sr.api_result IS NULL THEN 0 
-               ELSE (SELECT COUNT(*) 
-                       FROM json_array_elements(sr.api_result) sr2
-                      WHERE sr2 ->> 'matchType' = 'EXACT') END) AS exact_match_count,
-  sr.similar_match_count, sr.callback_url, sr.doc_storage_url,
-  json_array_length(sr.api_result) as selected_match_count,
-  (SELECT CASE WHEN sc.user_id IS NULL THEN ''
-     ELSE (SELECT u.firstname || ' ' || u.lastname FROM users u WHERE u.username = sc.user_id FETCH FIRST 1 ROWS ONLY)
-      END) AS username
-FROM search_requests sc, search_results sr
-WHERE sc.id = sr.search_id
-  AND sc.account_id = '?'
+       CASE WHEN sc.search_type IN ('MM', 'MI', 'MO', 'MS') THEN -1 ELSE sh.exact_match_count END AS exact_match_count,
+       sh.selected_match_count, sh.username, sh.report_pending, sh.report_stored
+FROM search_requests sc, search_history_summaries sh
+WHERE sc.id = sh.search_id
+  AND sc.account_id = :query_account
   AND sc.search_ts > ((now() at time zone 'utc') - interval '{str(GET_HISTORY_DAYS_LIMIT)} days')
-  AND NOT EXISTS (SELECT sc2.id
-                    FROM search_requests sc2
-                   WHERE sc2.id = sc.id
-                     AND sc2.search_type IN ('MM', 'MI', 'MO', 'MS')
-                     AND sc2.pay_path IS NULL)
+  AND NOT (sc.search_type IN ('MM', 'MI', 'MO', 'MS') AND sc.pay_path IS NULL)
 ORDER BY sc.search_ts DESC
 FETCH FIRST {str(ACCOUNT_SEARCH_HISTORY_MAX_SIZE)} ROWS ONLY
 """
 
 ACCOUNT_SEARCH_HISTORY_QUERY = f"""
 SELECT sc.id, sc.search_ts, sc.api_criteria, sc.total_results_size, sc.returned_results_size,
-  (SELECT CASE WHEN sc.search_type IN ('MM', 'MI', 'MO', 'MS') THEN -1
-               WHEN sr.api_result IS NULL THEN 0 
-               ELSE (SELECT COUNT(*) 
-                       FROM json_array_elements(sr.api_result) sr2
-                      WHERE sr2 ->> 'matchType' = 'EXACT') END) AS exact_match_count,
-  sr.similar_match_count, sr.callback_url, sr.doc_storage_url,
-  json_array_length(sr.api_result) as selected_match_count,
-  (SELECT CASE WHEN sc.user_id IS NULL THEN ''
-     ELSE (SELECT u.firstname || ' ' || u.lastname FROM users u WHERE u.username = sc.user_id FETCH FIRST 1 ROWS ONLY)
-      END) AS username
-FROM search_requests sc, search_results sr
-WHERE sc.id = sr.search_id
-  AND sc.account_id = '?'
-  AND NOT EXISTS (SELECT sc2.id
-                    FROM search_requests sc2
-                   WHERE sc2.id = sc.id
-                     AND sc2.search_type IN ('MM', 'MI', 'MO', 'MS')
-                     AND sc2.pay_path IS NULL)
+       CASE WHEN sc.search_type IN ('MM', 'MI', 'MO', 'MS') THEN -1 ELSE sh.exact_match_count END AS exact_match_count,
+       sh.selected_match_count, sh.username, sh.report_pending, sh.report_stored
+FROM search_requests sc, search_history_summaries sh
+WHERE sc.id = sh.search_id
+  AND sc.account_id = :query_account
+  AND NOT (sc.search_type IN ('MM', 'MI', 'MO', 'MS') AND sc.pay_path IS NULL)
 ORDER BY sc.search_ts DESC
 FETCH FIRST {str(ACCOUNT_SEARCH_HISTORY_MAX_SIZE)} ROWS ONLY
 """
 
 ACCOUNT_SEARCH_HISTORY_DATE_QUERY_NEW = f"""
 SELECT sc.id, sc.search_ts, sc.api_criteria, sc.total_results_size, sc.returned_results_size, sc.user_id,
-  (SELECT CASE WHEN sc.search_type IN ('MM', 'MI', 'MO', 'MS') THEN -1
-               ELSE (SELECT COUNT(*) 
-                       FROM json_array_elements(sc.updated_selection) sc2
-                      WHERE sc2 ->> 'matchType' = 'EXACT') END) AS exact_match_count,
-  sr.similar_match_count, sr.callback_url, sr.doc_storage_url, sr.api_result,
-  json_array_length(sr.api_result) as selected_match_count,
-  (SELECT CASE WHEN sc.user_id IS NULL THEN ''
-    ELSE (SELECT u.firstname || ' ' || u.lastname FROM users u WHERE u.username = sc.user_id FETCH FIRST 1 ROWS ONLY)
-      END) AS username
-FROM search_requests sc, search_results sr
-WHERE sc.id = sr.search_id
-  AND sc.account_id = '?'
+       CASE WHEN sc.search_type IN ('MM', 'MI', 'MO', 'MS') THEN -1
+            ELSE sh.selection_exact_count END AS exact_match_count,
+       sh.selected_match_count, sh.username, sh.selection_pending, sh.report_pending, sh.report_stored
+FROM search_requests sc, search_history_summaries sh
+WHERE sc.id = sh.search_id
+  AND sc.account_id = :query_account
   AND sc.search_ts > ((now() at time zone 'utc') - interval '{str(GET_HISTORY_DAYS_LIMIT)} days')
-  AND NOT EXISTS (SELECT sc2.id
-                    FROM search_requests sc2
-                   WHERE sc2.id = sc.id
-                     AND sc2.search_type IN ('MM', 'MI', 'MO', 'MS')
-                     AND sc2.pay_path IS NULL)
+  AND NOT (sc.search_type IN ('MM', 'MI', 'MO', 'MS') AND sc.pay_path IS NULL)
 ORDER BY sc.search_ts DESC
 FETCH FIRST {str(ACCOUNT_SEARCH_HISTORY_MAX_SIZE)} ROWS ONLY
 """
 
 ACCOUNT_SEARCH_HISTORY_QUERY_NEW = f"""
 SELECT sc.id, sc.search_ts, sc.api_criteria, sc.total_results_size, sc.returned_results_size, sc.user_id,
-  (SELECT CASE WHEN sc.search_type IN ('MM', 'MI', 'MO', 'MS') THEN -1
-               ELSE (SELECT COUNT(*) 
-                       FROM json_array_elements(sc.updated_selection) sc2
-                      WHERE sc2 ->> 'matchType' = 'EXACT') END) AS exact_match_count,
-  sr.similar_match_count, sr.callback_url, sr.doc_storage_url, sr.api_result,
-  json_array_length(sc.updated_selection) as selected_match_count,
-  (SELECT CASE WHEN sc.user_id IS NULL THEN ''
-    ELSE (SELECT u.firstname || ' ' || u.lastname FROM users u WHERE u.username = sc.user_id FETCH FIRST 1 ROWS ONLY)
-      END) AS username
-FROM search_requests sc, search_results sr
-WHERE sc.id = sr.search_id
-  AND sc.account_id = '?'
-  AND NOT EXISTS (SELECT sc2.id
-                    FROM search_requests sc2
-                   WHERE sc2.id = sc.id
-                     AND sc2.search_type IN ('MM', 'MI', 'MO', 'MS')
-                     AND sc2.pay_path IS NULL)
+       CASE WHEN sc.search_type IN ('MM', 'MI', 'MO', 'MS') THEN -1
+            ELSE sh.selection_exact_count END AS exact_match_count,
+       sh.selection_match_count AS selected_match_count, sh.username, sh.selection_pending, sh.report_pending,
+       sh.report_stored
+FROM search_requests sc, search_history_summaries sh
+WHERE sc.id = sh.search_id
+  AND sc.account_id = :query_account
+  AND NOT (sc.search_type IN ('MM', 'MI', 'MO', 'MS') AND sc.pay_path IS NULL)
 ORDER BY sc.search_ts DESC
 FETCH FIRST {str(ACCOUNT_SEARCH_HISTORY_MAX_SIZE)} ROWS ONLY
 """
 
 
+def get_exact_match_count(matches) -> int:
+    """Count the exact matches in a search selection list."""
+    return sum(1 for match in matches if isinstance(match, dict) and match.get('matchType') == 'EXACT')
+
+
+def get_history_result_summary(search_id: int, search_select, callback_url: str, doc_storage_url: str) -> dict:
+    """Get the search history summary values of a search result (search step 2) as query parameters."""
+    selected_count = None
+    exact_count = 0
+    if isinstance(search_select, list):
+        selected_count = len(search_select)
+        exact_count = get_exact_match_count(search_select)
+    return {
+        'search_id': search_id,
+        'selected_match_count': selected_count,
+        'exact_match_count': exact_count,
+        # If api_result is null then the selections have not been finished.
+        'selection_pending': search_select is None,
+        'report_pending': callback_url is not None and doc_storage_url is None,
+        'report_stored': bool(doc_storage_url)
+    }
+
+
+def get_history_selection_summary(search_id: int, updated_selection) -> dict:
+    """Get the search history summary values of a search request selection update as query parameters."""
+    selection_count = None
+    exact_count = 0
+    if isinstance(updated_selection, list):
+        selection_count = len(updated_selection)
+        exact_count = get_exact_match_count(updated_selection)
+    return {
+        'search_id': search_id,
+        'selection_match_count': selection_count,
+        'selection_exact_count': exact_count
+    }
+
+
 def format_mhr_number(request_json):
     """Trim and pad with zeroes search query mhr number query."""
     mhr_num: str = request_json['criteria']['value']
@@ -18,6 +18,7 @@ for financing statements that were not created with their account.
 """
 
 from .db import db
+from .registration_utils import account_reg_counts
 
 
 class UserExtraRegistration(db.Model):
@@ -37,6 +38,8 @@ class UserExtraRegistration(db.Model):
         """Store the User into the local cache."""
         db.session.add(self)
         db.session.commit()
+        # Added to or removed from the account registrations list.
+        account_reg_counts.increment(self.account_id, -1 if self.removed_ind == self.REMOVE_IND else 1)
 
     @classmethod
     def find_by_id(cls, extra_registration_id: int):
@@ -63,5 +66,7 @@ class UserExtraRegistration(db.Model):
         if registration:
             db.session.delete(registration)
             db.session.commit()
+            # Removed from or restored to the account registrations list.
+            account_reg_counts.increment(account_id, 1 if registration.removed_ind == cls.REMOVE_IND else -1)
 
         return registration
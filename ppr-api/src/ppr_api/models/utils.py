@@ -575,6 +575,8 @@ ERR_DRAFT_USED = '{code}: Draft Statement for Document ID {document_number} has
 ERR_SEARCH_TOO_OLD = '{code}: search get details search ID {search_id} timestamp too old: must be after {min_ts}.'
 ERR_SEARCH_COMPLETE = '{code}: search select results failed: results already provided for search ID {search_id}.'
 ERR_SEARCH_NOT_FOUND = '{code}: search select results failed: invalid search ID {search_id}.'
+ERR_ACCOUNT_REG_CURSOR = \
+    '{code}: invalid page cursor {cursor}: use the nextPageCursor of a page with the same sort criteria and direction.'
 
 SEARCH_RESULTS_DOC_NAME = 'search-results-report-{search_id}.pdf'
 MAIL_DOC_NAME = 'PPRVER.{rep_date}.{registration_id}.{party_id}.PDF'
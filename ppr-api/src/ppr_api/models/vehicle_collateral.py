@@ -16,12 +16,9 @@ from __future__ import annotations
 
 from enum import Enum
 
-from .db import db
-
+from ppr_api.models import search_key_utils
 
-SEARCH_VIN_STATEMENT = "SELECT searchkey_vehicle(:serial_number) AS search_key"  # noqa: Q000
-SEARCH_VIN_STATEMENT_AC = "SELECT searchkey_aircraft(:serial_number) AS search_key"  # noqa: Q000
-SEARCH_STATEMENT_MH = "SELECT searchkey_mhr(:mhr_number) AS search_key"  # noqa: Q000
+from .db import db
 
 
 class VehicleCollateral(db.Model):  # pylint: disable=too-many-instance-attributes
@@ -181,26 +178,20 @@ class VehicleCollateral(db.Model):  # pylint: disable=too-many-instance-attribut
 
     @staticmethod
     def get_search_vin(vehicle_type: str, serial_number: str):
-        """Conditionally generate the search_vin value from a database function."""
+        """Conditionally generate the search_vin value: equivalent to the searchkey_vehicle/aircraft db functions."""
         if not vehicle_type or not serial_number:
             return None
 
-        statement = SEARCH_VIN_STATEMENT
         if vehicle_type in (VehicleCollateral.SerialTypes.AIRCRAFT.value,
                             VehicleCollateral.SerialTypes.AIRPLANE.value,
                             VehicleCollateral.SerialTypes.AIRCRAFT_AIRFRAME.value):
-            statement = SEARCH_VIN_STATEMENT_AC
-
-        result = db.session.execute(statement, {'serial_number': serial_number})
-        row = result.first()
-        return str(row._mapping['search_key'])  # pylint: disable=protected-access; follows documentation
+            return search_key_utils.searchkey_aircraft(serial_number)
+        return search_key_utils.searchkey_vehicle(serial_number)
 
     @staticmethod
     def get_formatted_mhr_number(mhr_number: str):
-        """Conditionally format the MHR number value from a database function."""
+        """Conditionally format the MHR number value: equivalent to the searchkey_mhr db function."""
         if not mhr_number:  # From Bob
             return 'NR'
 
-        result = db.session.execute(SEARCH_STATEMENT_MH, {'mhr_number': mhr_number})
-        row = result.first()
-        return str(row._mapping['search_key'])  # pylint: disable=protected-access; follows documentation
+        return search_key_utils.searchkey_mhr(mhr_number)
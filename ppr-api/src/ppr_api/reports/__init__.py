@@ -25,6 +25,13 @@ REPORT_VERSION_V2 = '2'
 DEFAULT_ERROR_MSG = '{code}: Data related error generating report.'.format(code=ResourceErrorCodes.REPORT_ERR)
 
 
+def init_app(app):
+    """Warm the report template cache at app start."""
+    if app.config.get('REPORT_VERSION', REPORT_VERSION_V2) == REPORT_VERSION_V2:
+        with app.app_context():
+            ReportV2.warm_template_cache()
+
+
 def get_pdf(report_data, account_id, report_type=None, token=None):
     """Generate a PDF of the provided report type using the provided data."""
     try:
@@ -40,11 +47,14 @@ def get_pdf(report_data, account_id, report_type=None, token=None):
         raise BusinessException(error=DEFAULT_ERROR_MSG, status_code=HTTPStatus.INTERNAL_SERVER_ERROR)
 
 
-def get_callback_pdf(report_data, account_id, report_type, token, account_name):
-    """Event callback generate a PDF of the provided report type using the provided data."""
+def get_callback_pdf(report_data, account_id, report_type, token, account_name, stream: bool = False):
+    """Event callback generate a PDF of the provided report type using the provided data.
+
+    If stream is True a large search report is returned as a readable temporary file the caller closes.
+    """
     try:
         if current_app.config.get('REPORT_VERSION', REPORT_VERSION_V2) == REPORT_VERSION_V2:
-            return ReportV2(report_data, account_id, report_type, account_name).get_pdf()
+            return ReportV2(report_data, account_id, report_type, account_name).get_pdf(stream=stream)
         return Report(report_data, account_id, report_type, account_name).get_pdf(token=token)
     except FileNotFoundError:
         # We don't have a template for it, so it must only be available on paper.
@@ -18,11 +18,11 @@ from pathlib import Path
 
 import markupsafe
 import pycountry
-import requests
 from flask import current_app, jsonify
 
 from ppr_api.exceptions import ResourceErrorCodes
 from ppr_api.models import utils as model_utils
+from ppr_api.services.http_client import report_client
 from ppr_api.utils.auth import jwt
 
 
@@ -124,7 +124,7 @@ class Report:  # pylint: disable=too-few-public-methods
         url = current_app.config.get('REPORT_SVC_URL')
         current_app.logger.debug('Account {0} report type {1} calling report-api {2}.'
                                  .format(self._account_id, self._report_key, url))
-        response = requests.post(url=url, headers=headers, data=json.dumps(data))
+        response = report_client.post(url=url, headers=headers, data=json.dumps(data))
         current_app.logger.debug('Account {0} report type {1} response status: {2}.'
                                  .format(self._account_id, self._report_key, response.status_code))
 
@@ -10,17 +10,19 @@
 # specific language governing permissions and limitations under the License.
 """Produces a PDF output based on templates and JSON messages."""
 import copy
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta
 from http import HTTPStatus
 from pathlib import Path
 
 import markupsafe
 import pycountry
-import requests
 from flask import current_app, jsonify
 
 from ppr_api.exceptions import ResourceErrorCodes
 from ppr_api.models import utils as model_utils
+from ppr_api.services.http_client import report_client
 from ppr_api.reports.v2 import report_utils
 from ppr_api.reports.v2.report_utils import ReportTypes, ReportMeta
 from ppr_api.callback.auth.token_service import GoogleStorageTokenService
@@ -29,6 +31,44 @@ from ppr_api.callback.auth.token_service import GoogleStorageTokenService
 SINGLE_URI = '/forms/chromium/convert/html'
 MERGE_URI = '/forms/pdfengines/merge'
 SUBREPORT_SIZE = 500
+TEMPLATE_PARTS = [
+    'v2/style',
+    'v2/styleMail',
+    'v2/stylePage',
+    'v2/stylePageCover',
+    'v2/stylePageDraft',
+    'v2/stylePageMail',
+    'v2/stylePageRegistration',
+    'v2/stylePageRegistrationDraft',
+    'v2/stylePageLight',
+    'stylePageMail',
+    'logo',
+    'logoGrey',
+    'macros',
+    'registrarSignature',
+    'registration/securedParties',
+    'registration/courtOrderInformation',
+    'registration/debtors',
+    'registration/registeringParty',
+    'registration/vehicleCollateral',
+    'registration/generalCollateral',
+    'registration/amendmentStatement',
+    'registration/changeStatement',
+    'registration/dischargeStatement',
+    'registration/renewalStatement',
+    'v2/search-result/selected',
+    'search-result/financingStatement',
+    'search-result/amendmentStatement',
+    'search-result/changeStatement',
+    'search-result/renewalStatement',
+    'search-result/dischargeStatement',
+    'search-result/securedParties',
+    'search-result/courtOrderInformation',
+    'search-result/debtors',
+    'search-result/registeringParty',
+    'search-result/vehicleCollateral',
+    'search-result/generalCollateral'
+]
 
 
 class Report:  # pylint: disable=too-few-public-methods
@@ -40,13 +80,17 @@ class Report:  # pylint: disable=too-few-public-methods
         self._report_key = report_type
         self._account_id = account_id
         self._account_name = account_name
+        self._body_pdf = None
 
     def get_payload_data(self):
         """Generate report data including template data for report api call."""
         return self._setup_report_data()
 
-    def get_pdf(self, report_type=None):
-        """Render a pdf for the report type and report data."""
+    def get_pdf(self, report_type=None, stream: bool = False):
+        """Render a pdf for the report type and report data.
+
+        If stream is True a large search report is returned as a readable temporary file instead of binary data.
+        """
         if report_type:
             self._report_key = report_type
         if self._report_key == ReportTypes.SEARCH_DETAIL_REPORT:
@@ -57,7 +101,7 @@ class Report:  # pylint: disable=too-few-public-methods
                 current_app.logger.debug('Search report generating as 2 report api calls.')
                 return self.get_search_pdf()
             current_app.logger.debug('Generating large search report.')
-            return self.get_large_search_pdf()
+            return self.get_large_search_pdf(stream)
         if self._report_key == ReportTypes.VERIFICATION_STATEMENT_MAIL_REPORT:
             return self.get_registration_mail_pdf()
         current_app.logger.debug('Account {0} report type {1} setting up report data.'
@@ -72,7 +116,7 @@ class Report:  # pylint: disable=too-few-public-methods
         token = GoogleStorageTokenService.get_report_api_token()
         if token:
             headers['Authorization'] = 'Bearer {}'.format(token)
-        response = requests.post(url=url, headers=headers, data=meta_data, files=files)
+        response = report_client.post(url=url, headers=headers, data=meta_data, files=files)
         current_app.logger.debug('Account {0} report type {1} response status: {2}.'
                                  .format(self._account_id, self._report_key, response.status_code))
         if response.status_code != HTTPStatus.OK:
@@ -83,11 +127,51 @@ class Report:  # pylint: disable=too-few-public-methods
         return response.content, response.status_code, {'Content-Type': 'application/pdf'}
 
     def get_search_pdf(self):
-        """Render a search report with TOC page numbers set in a second report call."""
+        """Render a search report with TOC page numbers set in a second report call that only renders the TOC."""
         current_app.logger.debug('Account {0} report type {1} setting up report data.'
                                  .format(self._account_id, self._report_key))
-        data_copy = copy.deepcopy(self._report_data)
         # 1: Generate the search pdf with no TOC page numbers or total page count.
+        # 2: Set TOC page numbers in report data from initial search pdf page numbering.
+        content, status_code, headers = self._get_search_pdf_page_numbers()
+        if status_code != HTTPStatus.OK:
+            return content, status_code, headers
+        # 3: Generate the TOC pages again with TOC page numbers and total page count, keeping the registration pages.
+        current_app.logger.info('Search report regenerating the TOC with TOC page numbers set.')
+        content, status_code, headers = self._render_search_toc_pdf(content)
+        current_app.logger.info('Search report regeneration with TOC page numbers completed.')
+        return content, status_code, headers
+
+    def _get_search_pdf_page_numbers(self):
+        """Render the search report with no TOC page numbers, then set the TOC page numbers from the pdf."""
+        data_copy = copy.deepcopy(self._report_data)
+        content, status_code, headers = self._render_search_pdf()
+        if status_code == HTTPStatus.OK:
+            self._report_data = report_utils.update_toc_page_numbers(data_copy, content)
+        return content, status_code, headers
+
+    def _render_search_toc_pdf(self, body_pdf):
+        """Render the TOC pages with the TOC page numbers set, then merge them with the first render registrations.
+
+        If the TOC pages do not line up with the registration pages of the first render the whole report is rendered
+        again.
+        """
+        toc_data = {key: value for key, value in self._report_data.items() if key != 'details'}
+        toc_report = Report(copy.deepcopy(toc_data), self._account_id, ReportTypes.SEARCH_TOC_REPORT,
+                            self._account_name)
+        content, status_code, headers = toc_report._render_search_pdf(self._report_data.get('totalPageCount'))
+        if status_code != HTTPStatus.OK:
+            return content, status_code, headers
+        merged_pdf = report_utils.merge_toc_pdf(content, body_pdf)
+        if merged_pdf is None:
+            current_app.logger.info('Search report regenerating with TOC page numbers set.')
+            return self._render_search_pdf()
+        return merged_pdf, status_code, headers
+
+    def _render_search_pdf(self, total_pages: int = None):
+        """Make a single report api call to render the search report from the current report data.
+
+        A TOC only render sets the footer total pages to the page count of the whole report.
+        """
         data = self._setup_report_data()
         url = current_app.config.get('REPORT_SVC_URL') + SINGLE_URI
         current_app.logger.debug('Account {0} report type {1} calling report-api {2}.'
@@ -97,26 +181,12 @@ class Report:  # pylint: disable=too-few-public-methods
         token = GoogleStorageTokenService.get_report_api_token()
         if token:
             headers['Authorization'] = 'Bearer {}'.format(token)
-
         files = report_utils.get_report_files(data, self._report_key, False, False)
-        response_reg = requests.post(url=url, headers=headers, data=meta_data, files=files)
+        if total_pages:
+            files['footer.html'] = report_utils.set_footer_total_pages(files['footer.html'], total_pages)
+        response = report_client.post(url=url, headers=headers, data=meta_data, files=files)
         current_app.logger.debug('Account {0} report type {1} response status: {2}.'
-                                 .format(self._account_id, self._report_key, response_reg.status_code))
-        if response_reg.status_code != HTTPStatus.OK:
-            content = ResourceErrorCodes.REPORT_ERR + ': ' + response_reg.content.decode('ascii')
-            current_app.logger.error('Account {0} response status: {1} error: {2}.'
-                                     .format(self._account_id, response_reg.status_code, content))
-            return jsonify(message=content), response_reg.status_code, None
-        # 2: Set TOC page numbers in report data from initial search pdf page numbering.
-        self._report_data = report_utils.update_toc_page_numbers(data_copy, response_reg.content)
-        # 3: Generate search report again with TOC page numbers and total page count.
-        data_final = self._setup_report_data()
-        current_app.logger.debug('Account {0} report type {1} calling report-api {2}.'
-                                 .format(self._account_id, self._report_key, url))
-        files = report_utils.get_report_files(data_final, self._report_key, False, False)
-        current_app.logger.info('Search report regenerating with TOC page numbers set.')
-        response = requests.post(url=url, headers=headers, data=meta_data, files=files)
-        current_app.logger.info('Search report regeneration with TOC page numbers completed.')
+                                 .format(self._account_id, self._report_key, response.status_code))
         if response.status_code != HTTPStatus.OK:
             content = ResourceErrorCodes.REPORT_ERR + ': ' + response.content.decode('ascii')
             current_app.logger.error('Account {0} response status: {1} error: {2}.'
@@ -124,66 +194,157 @@ class Report:  # pylint: disable=too-few-public-methods
             return jsonify(message=content), response.status_code, None
         return response.content, response.status_code, {'Content-Type': 'application/pdf'}
 
-    def get_large_search_pdf(self):
-        """Render a large search report as concatenated sub-reports."""
+    def get_large_search_pdf(self, stream: bool = False):  # pylint: disable=too-many-locals
+        """Render a large search report as concatenated sub-reports.
+
+        Sub-reports are rendered concurrently by a bounded pool of workers. All first pass renders complete before
+        the sub-report page number offsets are set, then the sub-report TOC pages are rendered again and merged with
+        the first pass registration pages. First pass and final sub-reports are spooled to temporary files and merged
+        into a temporary file to bound memory use. If stream is True the merged report temporary file is returned for
+        the caller to upload and close.
+        """
         current_app.logger.debug(f'Account {self._account_id} large search setting up report data.')
         data_copy = copy.deepcopy(self._report_data)
         data_length = len(data_copy['details'])
         search_ts = data_copy.get('searchDateTime')
-        subreport_count = 0
-        start_index = 0
-        end_index = SUBREPORT_SIZE
-        report_files = {}
         details = data_copy['details']
         selected = data_copy['selected']
-        select_index = 0
+        data_copy['pageNumOffset'] = 0
         rep_count = int(data_length/SUBREPORT_SIZE) + ((data_length/SUBREPORT_SIZE) % 1 > 0)
         rep_summary = []
-        self._report_data['pageNumOffset'] = 0
-        while start_index < data_length:
-            subreport_count += 1
-            current_app.logger.info(f'Account {self._account_id} building subreport {subreport_count}')
-            current_app.logger.debug(f'Start index={start_index} end index={end_index}')
-            self._report_data['details'] = details[start_index:end_index]
-            current_app.logger.debug('Details length=' + str(len(self._report_data['details'])))
-            # current_app.logger.debug(f'Select index={select_index} length=' + str(len(selected)))
-            self._report_data['selected'] = report_utils.get_subreport_selected(selected[select_index:],
-                                                                                self._report_data['details'])
-            current_app.logger.debug(f'Select index={select_index} length=' + str(len(self._report_data['selected'])))
-            self._report_data['searchDateTime'] = search_ts
-            self._report_data['subreport'] = f'{subreport_count} of {rep_count}'
-            rep_summary.append(report_utils.get_report_summary(self._report_data['selected'],
+        subreports = []
+        select_index = 0
+        for start_index in range(0, data_length, SUBREPORT_SIZE):
+            subreport_count = len(subreports) + 1
+            current_app.logger.debug(f'Subreport {subreport_count} start index={start_index}')
+            subreport_data = {key: value for key, value in data_copy.items() if key not in ('details', 'selected')}
+            subreport_data = copy.deepcopy(subreport_data)
+            subreport_data['details'] = details[start_index:(start_index + SUBREPORT_SIZE)]
+            subreport_data['selected'] = report_utils.get_subreport_selected(selected[select_index:],
+                                                                             subreport_data['details'])
+            current_app.logger.debug(f'Select index={select_index} length=' + str(len(subreport_data['selected'])))
+            subreport_data['searchDateTime'] = search_ts
+            subreport_data['subreport'] = f'{subreport_count} of {rep_count}'
+            # The start page is set when the preceding sub-report page counts are known.
+            rep_summary.append(report_utils.get_report_summary(subreport_data['selected'],
                                                                subreport_count,
-                                                               len(self._report_data['details']),
-                                                               self._report_data['pageNumOffset']))
-            content, status_code, headers = self.get_search_pdf()
+                                                               len(subreport_data['details']),
+                                                               0))
+            select_index += len(subreport_data['selected'])
+            subreports.append(Report(subreport_data, self._account_id, self._report_key, self._account_name))
+
+        try:
+            # 1: Generate all the sub-reports with no TOC page numbers to get the sub-report page counts.
+            results = Report._render_subreports(subreports, Report._get_subreport_page_numbers)
+            for content, status_code, headers in results:
+                if status_code != HTTPStatus.OK:
+                    return content, status_code, headers
+            # 2: Add the preceding sub-report page counts to the TOC page numbers.
+            page_offset: int = 0
+            for index, subreport in enumerate(subreports):
+                page_count: int = subreport._report_data.get('totalPageCount', 0)  # pylint: disable=protected-access
+                rep_summary[index]['startPage'] = page_offset if page_offset > 0 else 1
+                report_utils.set_toc_page_offset(subreport._report_data,  # pylint: disable=protected-access
+                                                 page_offset)
+                page_offset += page_count
+            # 3: Generate all the sub-report TOC pages again with the TOC page numbers and sub-report page count.
+            results = Report._render_subreports(subreports, Report._render_subreport_file)
+        finally:
+            for subreport in subreports:
+                subreport._close_body_pdf()  # pylint: disable=protected-access
+        report_files = {}
+        try:
+            for index, (content, status_code, headers) in enumerate(results, start=1):
+                if status_code == HTTPStatus.OK:
+                    report_files[f'pdf{index}.pdf'] = content
+            for content, status_code, headers in results:
+                if status_code != HTTPStatus.OK:
+                    return content, status_code, headers
+            # Build cover summary
+            cover_data = {
+                'searchDateTime': search_ts,
+                'reportCount': len(subreports),
+                'totalResultsSize': data_length,
+                'exactResultsSize': report_utils.get_exact_count(selected),
+                'searchQuery': data_copy['searchQuery'],
+                'reports': rep_summary,
+                'reportPageCount': page_offset
+            }
+            # current_app.logger.info(cover_data)
+            self._report_key = ReportTypes.SEARCH_COVER_REPORT
+            self._report_data = cover_data
+            content, status_code, headers = self.get_pdf()
             if status_code != HTTPStatus.OK:
                 return content, status_code, headers
-            report_key = f'pdf{subreport_count}.pdf'
-            report_files[report_key] = content
-            start_index += SUBREPORT_SIZE
-            end_index += SUBREPORT_SIZE
-            select_index += len(self._report_data['selected'])
-
-        # Build cover summary
-        cover_data = {
-            'searchDateTime': search_ts,
-            'reportCount': subreport_count,
-            'totalResultsSize': data_length,
-            'exactResultsSize': report_utils.get_exact_count(selected),
-            'searchQuery': data_copy['searchQuery'],
-            'reports': rep_summary,
-            'reportPageCount': self._report_data['pageNumOffset']
-        }
-        # current_app.logger.info(cover_data)
-        self._report_key = ReportTypes.SEARCH_COVER_REPORT
-        self._report_data = cover_data
-        content, status_code, headers = self.get_pdf()
-        if status_code != HTTPStatus.OK:
-            return content, status_code, headers
-        report_files['cover.pdf'] = content
-        # Merge subreports
-        return report_utils.merge_pdfs(report_files), status_code, {'Content-Type': 'application/pdf'}
+            report_files['cover.pdf'] = content
+            # Merge subreports
+            output_file = tempfile.TemporaryFile()  # pylint: disable=consider-using-with; closed by the caller.
+            try:
+                report_utils.merge_pdfs(report_files, output_file)
+            except Exception:  # pylint: disable=broad-except; the output file is closed before raising.
+                output_file.close()
+                raise
+        finally:
+            for key, report_file in report_files.items():
+                if key != 'cover.pdf':
+                    report_file.close()
+        if stream:
+            return output_file, status_code, {'Content-Type': 'application/pdf'}
+        with output_file:
+            return output_file.read(), status_code, {'Content-Type': 'application/pdf'}
+
+    def _get_subreport_page_numbers(self):
+        """Set the sub-report TOC page numbers, spooling the first pass pdf to a temporary file for the final merge."""
+        content, status_code, headers = self._get_search_pdf_page_numbers()
+        if status_code == HTTPStatus.OK:
+            self._body_pdf = report_utils.spool_pdf(content)
+            return None, status_code, headers
+        return content, status_code, headers
+
+    def _render_subreport_file(self):
+        """Render the final sub-report TOC pages, spooling the merged sub-report pdf to a temporary file."""
+        content, status_code, headers = self._render_search_toc_pdf(self._body_pdf)
+        if status_code == HTTPStatus.OK:
+            return report_utils.spool_pdf(content), status_code, headers
+        return content, status_code, headers
+
+    def _close_body_pdf(self):
+        """Close the spooled first pass sub-report pdf."""
+        if self._body_pdf is not None:
+            self._body_pdf.close()
+            self._body_pdf = None
+
+    @staticmethod
+    def _render_subreports(subreports, render_function):
+        """Call the render function on each sub-report with a bounded number of workers: results are in order."""
+        app = current_app._get_current_object()  # pylint: disable=protected-access; threads need the app context
+        max_workers: int = max(1, min(int(current_app.config.get('REPORT_SUBREPORT_WORKERS', 1)), len(subreports)))
+        current_app.logger.info(f'Rendering {len(subreports)} sub-reports with {max_workers} workers.')
+
+        def render(subreport):
+            with app.app_context():
+                return render_function(subreport)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(render, subreport) for subreport in subreports]
+        results = []
+        render_error = None
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as err:  # pylint: disable=broad-except; the spooled files are closed before raising.
+                render_error = render_error or err
+        if render_error:
+            Report._close_subreport_files(results)
+            raise render_error
+        return results
+
+    @staticmethod
+    def _close_subreport_files(results):
+        """Close the sub-report pdfs spooled to temporary files."""
+        for content, status_code, headers in results:  # pylint: disable=unused-variable
+            if status_code == HTTPStatus.OK and hasattr(content, 'close'):
+                content.close()
 
     def get_registration_mail_pdf(self):
         """Render a mail registration report with cover letter."""
@@ -199,7 +360,7 @@ class Report:  # pylint: disable=too-few-public-methods
         token = GoogleStorageTokenService.get_report_api_token()
         if token:
             headers['Authorization'] = 'Bearer {}'.format(token)
-        response_cover = requests.post(url=url, headers=headers, data=meta_data, files=files)
+        response_cover = report_client.post(url=url, headers=headers, data=meta_data, files=files)
         current_app.logger.debug('Account {0} report type {1} response status: {2}.'
                                  .format(self._account_id, self._report_key, response_cover.status_code))
         if response_cover.status_code != HTTPStatus.OK:
@@ -216,7 +377,7 @@ class Report:  # pylint: disable=too-few-public-methods
                                  .format(self._account_id, self._report_key, url))
         meta_data = report_utils.get_report_meta_data(self._report_key)
         files = report_utils.get_report_files(data, self._report_key, True)
-        response_reg = requests.post(url=url, headers=headers, data=meta_data, files=files)
+        response_reg = report_client.post(url=url, headers=headers, data=meta_data, files=files)
         current_app.logger.debug('Account {0} report type {1} response status: {2}.'
                                  .format(self._account_id, self._report_key, response_reg.status_code))
         if response_reg.status_code != HTTPStatus.OK:
@@ -230,7 +391,7 @@ class Report:  # pylint: disable=too-few-public-methods
             'pdf1.pdf': response_cover.content,
             'pdf2.pdf': response_reg.content
         }
-        response = requests.post(url=url, headers=headers, files=files)
+        response = report_client.post(url=url, headers=headers, files=files)
         current_app.logger.debug('Merge cover and registration reports response status: {0}.'
                                  .format(response.status_code))
         if response.status_code != HTTPStatus.OK:
@@ -284,19 +445,30 @@ class Report:  # pylint: disable=too-few-public-methods
         return report_id
 
     def _get_template(self):
-        """Load from the local file system the template matching the report type."""
+        """Load from the local file system the template matching the report type.
+
+        Substituted templates are cached until the main template or one of its template parts is modified.
+        """
         try:
             template_path = current_app.config.get('REPORT_TEMPLATE_PATH')
-            template_code = Path(f'{template_path}/{self._get_template_filename()}').read_text()
-            # substitute template parts
-            template_code = self._substitute_template_parts(template_code)
+            file_path = f'{template_path}/{self._get_template_filename()}'
+            template_code = report_utils.TemplateCache.get_template_code(file_path)
+            if template_code is None:
+                current_app.logger.info(f'Loading report template {file_path}.')
+                file_paths = [file_path]
+                template_code = Path(file_path).read_text()
+                # substitute template parts
+                template_code = self._substitute_template_parts(template_code, file_paths)
+                mtimes = report_utils.get_file_mtimes(file_paths)
+                if mtimes:
+                    report_utils.TemplateCache.put(file_path, template_code, file_paths, mtimes)
         except Exception as err:  # noqa: B902; just logging
             current_app.logger.error(err)
             raise err
         return template_code
 
     @staticmethod
-    def _substitute_template_parts(template_code):
+    def _substitute_template_parts(template_code, file_paths: list = None):
         """Substitute template parts in main template.
 
         Template parts are marked by [[partname.html]] in templates.
@@ -307,62 +479,46 @@ class Report:  # pylint: disable=too-few-public-methods
         parts. There is no recursive search and replace.
 
         :param template_code: string
+        :param file_paths: optional list the paths of the template part files read are added to.
         :return: template_code string, modified.
         """
         template_path = current_app.config.get('REPORT_TEMPLATE_PATH')
-        template_parts = [
-            'v2/style',
-            'v2/styleMail',
-            'v2/stylePage',
-            'v2/stylePageCover',
-            'v2/stylePageDraft',
-            'v2/stylePageMail',
-            'v2/stylePageRegistration',
-            'v2/stylePageRegistrationDraft',
-            'v2/stylePageLight',
-            'stylePageMail',
-            'logo',
-            'logoGrey',
-            'macros',
-            'registrarSignature',
-            'registration/securedParties',
-            'registration/courtOrderInformation',
-            'registration/debtors',
-            'registration/registeringParty',
-            'registration/vehicleCollateral',
-            'registration/generalCollateral',
-            'registration/amendmentStatement',
-            'registration/changeStatement',
-            'registration/dischargeStatement',
-            'registration/renewalStatement',
-            'v2/search-result/selected',
-            'search-result/financingStatement',
-            'search-result/amendmentStatement',
-            'search-result/changeStatement',
-            'search-result/renewalStatement',
-            'search-result/dischargeStatement',
-            'search-result/securedParties',
-            'search-result/courtOrderInformation',
-            'search-result/debtors',
-            'search-result/registeringParty',
-            'search-result/vehicleCollateral',
-            'search-result/generalCollateral'
-        ]
+        part_code = {}
+
+        def read_part(template_part: str) -> str:
+            if template_part not in part_code:
+                path = f'{template_path}/template-parts/{template_part}.html'
+                part_code[template_part] = Path(path).read_text()
+                if file_paths is not None:
+                    file_paths.append(path)
+            return part_code[template_part]
 
         # substitute template parts - marked up by [[filename]]
-        for template_part in template_parts:
+        for template_part in TEMPLATE_PARTS:
             if template_code.find('[[{}.html]]'.format(template_part)) >= 0:
-                template_part_code = Path(f'{template_path}/template-parts/{template_part}.html').read_text()
-                for template_part_nested in template_parts:
+                template_part_code = read_part(template_part)
+                for template_part_nested in TEMPLATE_PARTS:
                     template_reference = '[[{}.html]]'.format(template_part_nested)
                     if template_part_code.find(template_reference) >= 0:
-                        path = Path(f'{template_path}/template-parts/{template_part_nested}.html')
-                        template_nested_code = path.read_text()
+                        template_nested_code = read_part(template_part_nested)
                         template_part_code = template_part_code.replace(template_reference, template_nested_code)
                 template_code = template_code.replace('[[{}.html]]'.format(template_part), template_part_code)
 
         return template_code
 
+    @staticmethod
+    def warm_template_cache():
+        """Load and compile the report templates so the first report of each type does not load them."""
+        template_path = current_app.config.get('REPORT_TEMPLATE_PATH')
+        for report_type in ReportMeta.reports:
+            report = Report(None, None, report_type)
+            if not Path(f'{template_path}/{report._get_template_filename()}').exists():
+                continue
+            try:
+                report._get_template()  # pylint: disable=protected-access
+            except Exception as err:  # noqa: B902; just logging, the template is loaded on first use.
+                current_app.logger.error(f'Report template cache warm failed for {report_type}: ' + str(err))
+
     def _get_template_filename(self):
         """Get the report template filename from the report type."""
         file_name = ReportMeta.reports[self._report_key]['fileName']
@@ -374,6 +530,7 @@ class Report:  # pylint: disable=too-few-public-methods
         if self._report_key == ReportTypes.COVER_PAGE_REPORT:
             self._set_cover()
         elif self._report_key == ReportTypes.SEARCH_TOC_REPORT:
+            self._report_data['searchDateTime'] = Report._to_report_datetime(self._report_data['searchDateTime'])
             self._set_selected()
         elif self._report_key == ReportTypes.SEARCH_COVER_REPORT:
             self._report_data['searchDateTime'] = Report._to_report_datetime(self._report_data['searchDateTime'])
@@ -11,11 +11,15 @@
 """Helper/utility functions for report generation."""
 import copy
 import io
+import os
+import tempfile
 from pathlib import Path
+from threading import Lock
 
 from flask import current_app
 from jinja2 import Template
 import PyPDF2
+from PyPDF2.generic import NameObject, TextStringObject
 
 from ppr_api.utils.base import BaseEnum
 
@@ -34,6 +38,7 @@ HEADER_SUBTITLE_REPLACE = '{{SUBTITLE}}'
 HEADER_SUBJECT_REPLACE = '{{SUBJECT}}'
 HEADER_BADGE_REPLACE = '{{BADGE}}'
 FOOTER_TEXT_REPLACE = '{{FOOTER-TEXT}}'
+FOOTER_TOTAL_PAGES = '<span class="totalPages"></span>'
 MARGIN_TOP_REG_REPORT = 1.93
 MARGIN_TOP_COVER_REPORT = 1.45
 # marginTop 1.5 bottom 0.75
@@ -143,7 +148,7 @@ class ReportMeta:  # pylint: disable=too-few-public-methods
         },
         ReportTypes.SEARCH_TOC_REPORT: {
             'reportDescription': 'SearchResult',
-            'fileName': 'searchResultTOCV2',
+            'fileName': 'searchResultV2',
             'metaTitle': 'Personal Property Registry Search Result',
             'metaSubtitle': 'BC Registries and Online Services',
             'metaSubject': ''
@@ -165,6 +170,60 @@ class ReportMeta:  # pylint: disable=too-few-public-methods
     }
 
 
+class TemplateCache:
+    """Process level cache of the substituted report templates and their compiled jinja templates.
+
+    Templates are cached by main template file path and reloaded when the modification time of the main template or
+    any of the template parts it includes changes.
+    """
+
+    _templates: dict = {}
+    _compiled: dict = {}
+    _lock = Lock()
+
+    @classmethod
+    def get_template_code(cls, file_path: str) -> str:
+        """Get the cached substituted template code, or None if not cached or a template file has changed."""
+        entry = cls._templates.get(file_path)
+        if entry and get_file_mtimes(entry[1]) == entry[2]:
+            return entry[0]
+        return None
+
+    @classmethod
+    def put(cls, file_path: str, template_code: str, file_paths: list, mtimes: tuple):
+        """Cache the substituted template code and compiled template with the template file modification times."""
+        compiled = Template(template_code, autoescape=True)
+        with cls._lock:
+            entry = cls._templates.get(file_path)
+            if entry:
+                cls._compiled.pop(entry[0], None)
+            cls._templates[file_path] = (template_code, file_paths, mtimes)
+            cls._compiled[template_code] = compiled
+
+    @classmethod
+    def get_compiled(cls, template_code: str) -> Template:
+        """Get the compiled jinja template for the template code, compiling it if it is not a cached template."""
+        compiled = cls._compiled.get(template_code)
+        if compiled is None:
+            compiled = Template(template_code, autoescape=True)
+        return compiled
+
+    @classmethod
+    def clear(cls):
+        """Remove all the cached templates."""
+        with cls._lock:
+            cls._templates.clear()
+            cls._compiled.clear()
+
+
+def get_file_mtimes(file_paths: list) -> tuple:
+    """Get the file modification times for the file paths: None if a file no longer exists."""
+    try:
+        return tuple(os.stat(file_path).st_mtime_ns for file_path in file_paths)
+    except OSError:
+        return None
+
+
 class Config:  # pylint: disable=too-few-public-methods
     """Configuration that loads report template static data."""
 
@@ -418,7 +477,7 @@ def get_report_files(request_data: dict, report_type: str, mail: bool = False, l
 
 def get_html_from_data(request_data) -> str:
     """Get html by merging the template with the report data."""
-    template_ = Template(request_data['template'], autoescape=True)
+    template_ = TemplateCache.get_compiled(request_data['template'])
     html_output = template_.render(request_data['templateVars'])
     return html_output
 
@@ -432,23 +491,11 @@ def update_toc_page_numbers(json_data, reg_pdf_data):
         bodypdf = PyPDF2.PdfReader(io.BytesIO(reg_pdf_data))
         pagecount = len(bodypdf.pages)
         json_data['totalPageCount'] = pagecount
-        page_index = 0
         current_app.logger.info(f' TOC totalPageCount={pagecount}, getting page numbers')
-        last_num: str = ''
-        for select in json_data['selected']:
-            if select['baseRegistrationNumber'] != last_num:
-                reg_text = REG_PAGE_PREFIX + select['baseRegistrationNumber']
-                last_num = select['baseRegistrationNumber']
-                # current_app.logger.info(f'start page index={page_index} reg_text={reg_text}')
-                for i in range(page_index, pagecount):
-                    # current_app.logger.info(f'{reg_text} scanning page {i}')
-                    page = bodypdf.pages[i]
-                    text = page.extract_text()
-                    if text.find(reg_text) > 0:
-                        # current_app.logger.info(f'{reg_text} found page {i}')
-                        page_index = i + 1
-                        select['pageNumber'] = (i + 1 + page_offset)
-                        break
+        dest_pages = {}
+        if current_app.config.get('REPORT_TOC_PAGE_ANCHORS', True):
+            dest_pages = get_toc_anchor_pages(bodypdf)
+        set_toc_page_numbers(json_data['selected'], bodypdf, page_offset, dest_pages)
         current_app.logger.info('Collecting page numbers completed.')
         if 'pageNumOffset' in json_data:
             json_data['pageNumOffset'] = page_offset + pagecount
@@ -456,6 +503,114 @@ def update_toc_page_numbers(json_data, reg_pdf_data):
     return json_data
 
 
+def get_toc_anchor_pages(bodypdf) -> dict:
+    """Get the page index of the registration anchors the TOC links to from the pdf named destinations.
+
+    The report service writes a named destination for each internal link target, so the page numbers are read
+    from the pdf catalog in one pass without extracting the page text.
+    """
+    dest_pages = {}
+    try:
+        for name, dest in bodypdf.named_destinations.items():
+            dest_pages[name.lstrip('/')] = bodypdf.get_destination_page_number(dest)
+    except Exception as err:  # noqa: B902; fall back to the page text scan.
+        current_app.logger.info(f'TOC named destinations lookup failed: {err}')
+        return {}
+    return dest_pages
+
+
+def set_toc_page_numbers(selected, bodypdf, page_offset: int, dest_pages: dict):
+    """Set toc page numbers from the registration anchor pages, scanning the page text for any without an anchor."""
+    pagecount = len(bodypdf.pages)
+    page_index = 0
+    last_num: str = ''
+    for select in selected:
+        if select['baseRegistrationNumber'] != last_num:
+            last_num = select['baseRegistrationNumber']
+            if last_num in dest_pages:
+                page_index = dest_pages[last_num] + 1
+                select['pageNumber'] = (page_index + page_offset)
+                continue
+            reg_text = REG_PAGE_PREFIX + last_num
+            # current_app.logger.info(f'start page index={page_index} reg_text={reg_text}')
+            for i in range(page_index, pagecount):
+                # current_app.logger.info(f'{reg_text} scanning page {i}')
+                page = bodypdf.pages[i]
+                text = page.extract_text()
+                if text.find(reg_text) > 0:
+                    # current_app.logger.info(f'{reg_text} found page {i}')
+                    page_index = i + 1
+                    select['pageNumber'] = (i + 1 + page_offset)
+                    break
+
+
+def set_toc_page_offset(json_data, page_offset: int):
+    """Add the page count of the preceding sub-reports to sub-report TOC page numbers set with no offset."""
+    if page_offset > 0:
+        for select in json_data.get('selected', []):
+            if select.get('pageNumber'):
+                select['pageNumber'] += page_offset
+    json_data['pageNumOffset'] = page_offset + json_data.get('totalPageCount', 0)
+    return json_data
+
+
+def set_footer_total_pages(footer_data: str, total_pages: int) -> str:
+    """Replace the footer total pages counter with the page count of the whole report for a TOC only render."""
+    if not footer_data:
+        return footer_data
+    return footer_data.replace(FOOTER_TOTAL_PAGES, str(total_pages))
+
+
+def merge_toc_pdf(toc_pdf_data, body_pdf_data) -> bytes:
+    """Replace the TOC pages of the first search report render with the pages of a TOC only render.
+
+    The TOC only render has the TOC page numbers set, so only the TOC pages are rendered twice: the registration pages
+    of the first render are reused. The TOC links are set to the registration anchors of the first render. None is
+    returned if the first render registrations do not start on the page after the TOC, so the caller can render the
+    whole report again.
+    """
+    toc_pdf = PyPDF2.PdfReader(get_pdf_stream(toc_pdf_data))
+    body_pdf = PyPDF2.PdfReader(get_pdf_stream(body_pdf_data))
+    toc_page_count: int = len(toc_pdf.pages)
+    dest_pages = get_toc_anchor_pages(body_pdf)
+    if not dest_pages or min(dest_pages.values()) != toc_page_count:
+        current_app.logger.info(f'TOC render page count {toc_page_count} does not match the first render anchors.')
+        return None
+    writer = PyPDF2.PdfWriter()
+    for page in toc_pdf.pages:
+        set_toc_link_names(page)
+        writer.add_page(page)
+    for page_index in range(toc_page_count, len(body_pdf.pages)):
+        writer.add_page(body_pdf.pages[page_index])
+    page_refs = writer.pages[0][NameObject('/Parent')].get_object()['/Kids']
+    dest_names = writer.get_named_dest_root()
+    for name, dest in sorted(body_pdf.named_destinations.items(), key=lambda item: item[0].lstrip('/')):
+        # The first render pages are at the same page index in the merged pdf.
+        dest_array = dest.dest_array
+        dest_array[0] = page_refs[body_pdf.get_destination_page_number(dest)]
+        dest_names.extend([TextStringObject(name.lstrip('/')), dest_array])
+    if body_pdf.metadata:
+        writer.add_metadata(body_pdf.metadata)
+    writer_buffer = io.BytesIO()
+    writer.write(writer_buffer)
+    current_app.logger.debug(f'merge_toc_pdf final report size={writer_buffer.tell()}')
+    return writer_buffer.getvalue()
+
+
+def set_toc_link_names(page):
+    """Set the page link destination names as strings, which link to the destination name tree of a merged pdf."""
+    annots = page.get('/Annots')
+    if not annots:
+        return
+    for annot in annots.get_object():
+        annot = annot.get_object()
+        if isinstance(annot.get('/Dest'), str):
+            annot[NameObject('/Dest')] = TextStringObject(annot['/Dest'].lstrip('/'))
+        elif '/A' in annot and isinstance(annot['/A'].get_object().get('/D'), str):
+            action = annot['/A'].get_object()
+            action[NameObject('/D')] = TextStringObject(action['/D'].lstrip('/'))
+
+
 def set_cover(report_data):  # pylint: disable=too-many-branches, too-many-statements
     """Add cover page report data. Cover page envelope window lines up to a maximum of 4."""
     cover_info = {}
@@ -560,27 +715,51 @@ def get_exact_count(selected) -> int:
     return exact_count
 
 
-def merge_pdfs(report_files):
-    """Merge pdf content in memory."""
+def merge_pdfs(report_files, output_file=None):
+    """Merge the cover and sub-report pdfs in sub-report order.
+
+    The report files values are either pdf binary data or readable pdf files, so large sub-reports can be spooled to
+    temporary files instead of held in memory. If an output file is provided the merged pdf is written to it,
+    otherwise the merged pdf binary data is returned.
+    """
     current_app.logger.debug('merge_pdfs starting')
     merger = PyPDF2.PdfMerger()
-    merger.append(io.BytesIO(report_files['cover.pdf']))
+    merger.append(get_pdf_stream(report_files['cover.pdf']))
     rep_count = len(report_files) - 1
     count = 0
-    report_size = len(report_files['cover.pdf'])
     while count < rep_count:
         count += 1
-        key = f'pdf{count}.pdf'
-        report_size += len(report_files[key])
-        current_app.logger.debug(f'merge_pdfs running report size={report_size}')
-        merger.append(io.BytesIO(report_files[key]))
+        current_app.logger.debug(f'merge_pdfs appending sub-report {count} of {rep_count}')
+        merger.append(get_pdf_stream(report_files[f'pdf{count}.pdf']))
+    if output_file:
+        merger.write(output_file)
+        merger.close()
+        current_app.logger.debug(f'merge_pdfs final report size={output_file.tell()}')
+        output_file.seek(0)
+        return output_file
     writer_buffer = io.BytesIO()
     merger.write(writer_buffer)
     merger.close()
-    current_app.logger.debug(f'merge_pdfs final report size={report_size}')
+    current_app.logger.debug(f'merge_pdfs final report size={writer_buffer.tell()}')
     return writer_buffer.getvalue()
 
 
+def get_pdf_stream(pdf_data):
+    """Get a readable stream for pdf binary data or a pdf file."""
+    if isinstance(pdf_data, bytes):
+        return io.BytesIO(pdf_data)
+    pdf_data.seek(0)
+    return pdf_data
+
+
+def spool_pdf(pdf_data: bytes):
+    """Write pdf binary data to a temporary file so it is not held in memory until the sub-reports are merged."""
+    pdf_file = tempfile.TemporaryFile()  # pylint: disable=consider-using-with; closed after the merge.
+    pdf_file.write(pdf_data)
+    pdf_file.seek(0)
+    return pdf_file
+
+
 def format_description(description: str) -> str:
     """Format the registration description as title case."""
     if not description:
@@ -19,7 +19,7 @@ from flask import request, current_app, jsonify
 from flask_restx import Namespace, Resource, cors
 
 from ppr_api.exceptions import DatabaseException
-from ppr_api.models import MailReport
+from ppr_api.models import MailReport, SearchRequest
 from ppr_api.models import utils as model_utils
 from ppr_api.resources import utils as resource_utils
 from ppr_api.utils.util import cors_preflight
@@ -123,6 +123,28 @@ class MailReportResource(Resource):
             return resource_utils.default_exception_response(default_err)
 
 
+@cors_preflight('POST,OPTIONS')
+@API.route('/search-index', methods=['POST', 'OPTIONS'])
+class SearchIndexResource(Resource):
+    """Resource to reconcile the serial and debtor search indexes: scheduled to run nightly."""
+
+    @staticmethod
+    @cors.crossdomain(origin='*')
+    def post():
+        """Remove the index rows no longer searchable and add or update the searchable rows."""
+        try:
+            # Authenticate with request api key
+            if not resource_utils.valid_api_key(request):
+                return resource_utils.unauthorized_error_response('Search index callback')
+            return SearchRequest.reconcile_search_indexes(), HTTPStatus.OK
+        except DatabaseException as db_exception:
+            return resource_utils.db_exception_response(db_exception,
+                                                        None,
+                                                        'POST callback search index DB error.')
+        except Exception as default_err:  # noqa: B902; return nicer default error
+            return resource_utils.default_exception_response(default_err)
+
+
 def mail_callback_error(mail_report: MailReport, status_code: int = 500, message: str = None):
     """Update the status and return an error response."""
     current_app.logger.error(message)
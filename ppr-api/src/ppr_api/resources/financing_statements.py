@@ -626,6 +626,8 @@ class GetRegistrationResource(Resource):
             params = resource_utils.get_account_registration_params(request, params)
             statement_list = Registration.find_all_by_account_id(params, new_feature_enabled)
             return jsonify(statement_list), HTTPStatus.OK
+        except BusinessException as exception:
+            return resource_utils.business_exception_response(exception)
         except DatabaseException as db_exception:   # noqa: B902; return nicer error
             return resource_utils.db_exception_response(db_exception, account_id,
                                                         'GET Account Registration Summary id=' + account_id)
@@ -17,6 +17,8 @@ from flask_restx import Namespace, Resource
 from sqlalchemy import text, exc
 
 from ppr_api.models import db
+from ppr_api.services import authz, http_client
+from ppr_api.services.token_manager import token_manager
 
 
 API = Namespace('OPS', description='Service - OPS checks')
@@ -56,3 +58,18 @@ class Readyz(Resource):
         """Return a JSON object that identifies if the service is setupAnd ready to work."""
         # TODO: add a poll to the DB when called
         return {'message': 'api is ready'}, 200
+
+
+@API.route('metricz')
+class Metricz(Resource):
+    """Reports service usage metrics."""
+
+    @staticmethod
+    def get():
+        """Return a JSON object with the downstream service http client, auth org cache, and token usage."""
+        metrics = {
+            'httpClients': http_client.get_metrics(),
+            'authOrgCache': authz.auth_org_cache.metrics(),
+            'tokenRefreshes': token_manager.metrics()
+        }
+        return metrics, 200
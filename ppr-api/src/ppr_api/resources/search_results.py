@@ -33,7 +33,7 @@ from ppr_api.resources import utils as resource_utils
 from ppr_api.reports import ReportTypes, get_pdf
 from ppr_api.callback.reports.report_service import get_search_report
 from ppr_api.callback.utils.exceptions import ReportException, ReportDataException, StorageException
-from ppr_api.callback.document_storage.storage_service import GoogleStorageService
+from ppr_api.callback.document_storage.storage_service import get_storage_service
 
 
 API = Namespace('search-results', description='Endpoints for PPR search details (Search step 2).')
@@ -53,8 +53,6 @@ CALLBACK_MESSAGES = {
 CALLBACK_PARAM = 'callbackURL'
 REPORT_URL = '/ppr/api/v1/search-results/{search_id}'
 USE_CURRENT_PARAM = 'useCurrent'
-STREAMING_THRESHOLD = 31 * 1024 * 1024
-HTTP_OK = '200'
 
 
 @cors_preflight('GET,POST,OPTIONS')
@@ -136,7 +134,7 @@ class SearchResultsResource(Resource):
                 current_app.logger.debug(f'report api call status={status_code}, headers=' + json.dumps(headers))
                 if raw_data and status_code in (HTTPStatus.OK, HTTPStatus.CREATED):
                     doc_name = model_utils.get_search_doc_storage_name(search_detail.search)
-                    response = GoogleStorageService.save_document(doc_name, raw_data)
+                    response = get_storage_service().save_document(doc_name, raw_data)
                     current_app.logger.info(f'Save {doc_name} document storage response: ' + json.dumps(response))
                     search_detail.doc_storage_url = doc_name
                     search_detail.save()
@@ -185,28 +183,9 @@ class SearchResultsResource(Resource):
                     current_app.logger.info(error_msg)
                     return resource_utils.bad_request_response(error_msg)
 
-                # If report in doc storage, fetch and return it.
+                # If report in doc storage, stream it.
                 if search_detail.doc_storage_url is not None:
-                    # Fetch binary data from doc storage.
-                    doc_name = search_detail.doc_storage_url
-                    current_app.logger.info(f'Fetching search report {doc_name} from doc storage.')
-                    raw_data = GoogleStorageService.get_document(doc_name)
-                    size = len(raw_data)
-                    if size < STREAMING_THRESHOLD:
-                        return raw_data, HTTPStatus.OK, {'Content-Type': 'application/pdf'}
-                    current_app.logger.info(f'streaming response report size={size}')
-
-                    def stream(begin, end, raw_data):
-                        offset = max(0, begin)
-                        while offset < end:
-                            end_chunk = offset + (10 * 1024)
-                            buf = raw_data[offset:end_chunk]
-                            offset += len(buf)
-                            yield buf
-                    resp = Response(stream_with_context(stream(0, size, raw_data)))
-                    resp.headers['Content-Type'] = 'application/pdf'
-                    resp.status = HTTP_OK
-                    return resp
+                    return stream_search_report(search_detail.doc_storage_url)
 
                 # If get to here report not yet generated: create, store, return it.
                 current_app.logger.info(f'Generating search report for {search_id}.')
@@ -218,7 +197,7 @@ class SearchResultsResource(Resource):
                 if raw_data and status_code in (HTTPStatus.OK, HTTPStatus.CREATED):
                     doc_name = model_utils.get_search_doc_storage_name(search_detail.search)
                     current_app.logger.info(f'Saving report output to doc storage: name={doc_name}.')
-                    response = GoogleStorageService.save_document(doc_name, raw_data)
+                    response = get_storage_service().save_document(doc_name, raw_data)
                     current_app.logger.info('Save document storage response: ' + json.dumps(response))
                     search_detail.doc_storage_url = doc_name
                     search_detail.save()
@@ -234,6 +213,35 @@ class SearchResultsResource(Resource):
             return resource_utils.default_exception_response(default_exception)
 
 
+def stream_search_report(doc_name: str):
+    """Stream all or the requested byte range of a search report from document storage in chunks."""
+    storage_service = get_storage_service()
+    size: int = storage_service.get_document_size(doc_name)
+    start: int = 0
+    end: int = size - 1
+    status = HTTPStatus.OK
+    if request.range:
+        byte_range = request.range.range_for_length(size)
+        if byte_range is None:
+            current_app.logger.info(f'Search report {doc_name} size={size} range not satisfiable: {request.range}.')
+            return Response(status=HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE,
+                            headers={'Content-Range': f'bytes */{size}'})
+        start, end = byte_range[0], byte_range[1] - 1
+        status = HTTPStatus.PARTIAL_CONTENT
+    current_app.logger.info(f'Streaming search report {doc_name} size={size} bytes {start}-{end}.')
+    chunks = storage_service.stream_document(doc_name,
+                                             None,
+                                             start,
+                                             end if status == HTTPStatus.PARTIAL_CONTENT else None,
+                                             current_app.config.get('SEARCH_REPORT_CHUNK_SIZE'))
+    resp = Response(stream_with_context(chunks), status=status, mimetype='application/pdf')
+    resp.headers['Accept-Ranges'] = 'bytes'
+    resp.headers['Content-Length'] = str(end - start + 1)
+    if status == HTTPStatus.PARTIAL_CONTENT:
+        resp.headers['Content-Range'] = f'bytes {start}-{end}/{size}'
+    return resp
+
+
 @cors_preflight('POST,OPTIONS')
 @API.route('/callback/<path:search_id>', methods=['POST', 'OPTIONS'])
 class PatchSearchResultsResource(Resource):
@@ -295,7 +303,11 @@ class PatchSearchResultsResource(Resource):
 
             doc_name = model_utils.get_search_doc_storage_name(search_detail.search)
             current_app.logger.info(f'Saving report output to doc storage: name={doc_name}.')
-            response = GoogleStorageService.save_document(doc_name, raw_data)
+            try:
+                response = get_storage_service().save_document(doc_name, raw_data)
+            finally:
+                if not isinstance(raw_data, bytes):  # Large search report streamed from a temporary file.
+                    raw_data.close()
             current_app.logger.info('Save document storage response: ' + json.dumps(response))
             search_detail.doc_storage_url = doc_name
             search_detail.save()
@@ -458,7 +470,7 @@ def is_async(search_detail: SearchResult, search_select) -> bool:
         if result['matchType'] == model_utils.SEARCH_MATCH_EXACT:
             exact_count += 1
         else:
-            reg_num = result['financingStatement']['baseRegistrationNumber']
+            reg_num = SearchResult.get_registration_number(result)
             for select in search_select:
                 # Verified: have to explicitly select a similar result to include.
                 if select['baseRegistrationNumber'] == reg_num and \
@@ -471,26 +483,14 @@ def is_async(search_detail: SearchResult, search_select) -> bool:
 
 
 def enqueue_search_report(search_id: str):
-    """Add the search report request to the queue."""
-    try:
-        payload = {
-            'searchId': search_id
-        }
-        apikey = current_app.config.get('SUBSCRIPTION_API_KEY')
-        if apikey:
-            payload['apikey'] = apikey
-        GoogleQueueService().publish_search_report(payload)
-        current_app.logger.info(f'Enqueue search report successful for id={search_id}.')
-    except Exception as err:  # noqa: B902; do not alter app processing
+    """Add the search report request to the queue: a publish failure is recorded as an event tracking record."""
+    def publish_error(err):
         current_app.logger.error(f'Enqueue search report failed for id={search_id}: ' + repr(err))
         EventTracking.create(search_id,
                              EventTracking.EventTrackingTypes.SEARCH_REPORT,
                              int(HTTPStatus.INTERNAL_SERVER_ERROR),
                              'Enqueue search report event failed: ' + repr(err))
 
-
-def enqueue_notification(search_id: str):
-    """Add the notification request to the queue."""
     try:
         payload = {
             'searchId': search_id
@@ -498,11 +498,29 @@ def enqueue_notification(search_id: str):
         apikey = current_app.config.get('SUBSCRIPTION_API_KEY')
         if apikey:
             payload['apikey'] = apikey
-        GoogleQueueService().publish_notification(payload)
-        current_app.logger.info(f'Enqueue notification successful for id={search_id}.')
+        GoogleQueueService().publish_search_report(payload, publish_error)
+        current_app.logger.info(f'Enqueue search report submitted for id={search_id}.')
     except Exception as err:  # noqa: B902; do not alter app processing
+        publish_error(err)
+
+
+def enqueue_notification(search_id: str):
+    """Add the notification request to the queue: a publish failure is recorded as an event tracking record."""
+    def publish_error(err):
         current_app.logger.error(f'Enqueue notification failed for id={search_id}: ' + repr(err))
         EventTracking.create(search_id,
                              EventTracking.EventTrackingTypes.API_NOTIFICATION,
                              int(HTTPStatus.INTERNAL_SERVER_ERROR),
                              'Enqueue api notification event failed: ' + repr(err))
+
+    try:
+        payload = {
+            'searchId': search_id
+        }
+        apikey = current_app.config.get('SUBSCRIPTION_API_KEY')
+        if apikey:
+            payload['apikey'] = apikey
+        GoogleQueueService().publish_notification(payload, publish_error)
+        current_app.logger.info(f'Enqueue notification submitted for id={search_id}.')
+    except Exception as err:  # noqa: B902; do not alter app processing
+        publish_error(err)
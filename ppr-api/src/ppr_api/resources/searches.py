@@ -15,8 +15,9 @@
 # pylint: disable=too-many-return-statements
 
 from http import HTTPStatus
+import json
 
-from flask import current_app, g, jsonify, request
+from flask import Response, current_app, g, jsonify, request, stream_with_context
 from flask_restx import Namespace, Resource, cors
 from registry_schemas import utils as schema_utils
 
@@ -36,6 +37,7 @@ VAL_ERROR = 'Search request data validation errors.'  # Validation error prefix
 SAVE_ERROR_MESSAGE = 'Account {0} search db save failed: {1}'
 PAY_REFUND_MESSAGE = 'Account {0} search refunding payment for invoice {1}.'
 PAY_REFUND_ERROR = 'Account {0} search payment refund failed for invoice {1}: {2}.'
+STREAM_ERROR_MESSAGE = 'Account {0} search {1} streaming failed: {2}'
 # Map api spec search type to payment transaction details description
 TO_SEARCH_TYPE_DESCRIPTION = {
     'AIRCRAFT_DOT': 'Aircraft Airframe DOT Number:',
@@ -108,6 +110,8 @@ class SearchResource(Resource):
             invoice_id = pay_ref['invoiceId']
             query.pay_invoice_id = int(invoice_id)
             query.pay_path = pay_ref['receipt']
+            if resource_utils.is_ndjson(request):
+                return stream_search(query, payment, invoice_id, account_id)
 
             # Execute the search query: treat no results as a success.
             try:
@@ -211,6 +215,8 @@ def staff_search(req: request, request_json, account_id: str):
     invoice_id = pay_ref['invoiceId']
     query.pay_invoice_id = int(invoice_id)
     query.pay_path = pay_ref['receipt']
+    if resource_utils.is_ndjson(req):
+        return stream_search(query, payment, invoice_id, account_id)
 
     # Execute the search query: treat no results as a success.
     try:
@@ -235,6 +241,59 @@ def staff_search(req: request, request_json, account_id: str):
     return query.json, HTTPStatus.CREATED
 
 
+def refund_search_payment(payment: Payment, invoice_id: str, account_id: str):
+    """Cancel the search payment after a search failure."""
+    if invoice_id is not None:
+        current_app.logger.info(PAY_REFUND_MESSAGE.format(account_id, invoice_id))
+        try:
+            payment.cancel_payment(invoice_id)
+        except Exception as cancel_exception:   # noqa: B902; log exception
+            current_app.logger.error(PAY_REFUND_ERROR.format(account_id, invoice_id, repr(cancel_exception)))
+
+
+def stream_search(query: SearchRequest, payment: Payment, invoice_id: str, account_id: str):
+    """Execute the search, streaming the response as newline delimited JSON (NDJSON).
+
+    The first line is the search summary without the results, followed by one line for each search result. The last
+    line has the search ID and the result counts when the search completes, or an error message if the search fails
+    after the first result is sent.
+    """
+    batch_size: int = current_app.config.get('SEARCH_STREAM_BATCH_SIZE', 500)
+    results = query.search_stream(batch_size)
+    try:
+        # Run the query up to the first result: a query failure here is returned as a standard error response.
+        first_result = next(results, None)
+    except Exception as db_exception:   # noqa: B902; handle all db related errors.
+        current_app.logger.error(SAVE_ERROR_MESSAGE.format(account_id, repr(db_exception)))
+        refund_search_payment(payment, invoice_id, account_id)
+        raise db_exception
+
+    def generate():
+        summary = query.json
+        for key in ('results', 'totalResultsSize', 'returnedResultsSize'):
+            summary.pop(key, None)
+        yield json.dumps(summary) + '\n'
+        try:
+            if first_result is not None:
+                yield json.dumps(first_result) + '\n'
+                for result_json in results:
+                    yield json.dumps(result_json) + '\n'
+            # Now save the initial detail results in the search_result table with no search selection criteria.
+            search_result = SearchResult.create_from_search_query(query)
+            search_result.save()
+            yield json.dumps({
+                'searchId': str(query.id),
+                'totalResultsSize': query.total_results_size,
+                'returnedResultsSize': query.returned_results_size
+            }) + '\n'
+        except Exception as db_exception:   # noqa: B902; the response has started: report the error in the stream.
+            current_app.logger.error(STREAM_ERROR_MESSAGE.format(account_id, query.id, repr(db_exception)))
+            refund_search_payment(payment, invoice_id, account_id)
+            yield json.dumps({'searchId': str(query.id), 'message': 'Search failed: results are incomplete.'}) + '\n'
+
+    return Response(stream_with_context(generate()), status=HTTPStatus.CREATED, mimetype=resource_utils.NDJSON_TYPE)
+
+
 def build_staff_payment(req: request, account_id: str):
     """Extract payment information from request parameters."""
     payment_info = {
@@ -20,9 +20,10 @@ from flask import jsonify, current_app, request
 from ppr_api.exceptions import BusinessException, DatabaseException, ResourceErrorCodes
 from ppr_api.models import EventTracking, Party, Registration, utils as model_utils, VerificationReport, MailReport
 from ppr_api.models.registration import AccountRegistrationParams, CrownChargeTypes, MiscellaneousTypes, PPSATypes
-from ppr_api.services.authz import user_orgs, is_reg_staff_account, is_sbc_office_account, is_bcol_help
+from ppr_api.services.authz import account_org_name, is_reg_staff_account, is_sbc_office_account, is_bcol_help
 from ppr_api.services.payment import TransactionTypes
 from ppr_api.services.payment.exceptions import SBCPaymentException
+from ppr_api.services import queue_service
 from ppr_api.services.queue_service import GoogleQueueService
 from ppr_api.utils.validators import financing_validator, party_validator, registration_validator
 
@@ -69,6 +70,8 @@ END_TS_PARAM = 'endDateTime'
 STATUS_PARAM = 'statusType'
 CLIENT_REF_PARAM = 'clientReferenceId'
 REGISTER_NAME_PARAM = 'registeringName'
+PAGE_CURSOR_PARAM = 'pageCursor'
+NDJSON_TYPE = 'application/x-ndjson'
 
 
 class CallbackExceptionCodes(str, Enum):
@@ -111,6 +114,12 @@ def is_pdf(req):
     return accept and accept.upper() == 'APPLICATION/PDF'
 
 
+def is_ndjson(req):
+    """Check if request headers Accept is application/x-ndjson (stream the response)."""
+    accept = req.headers.get('Accept')
+    return accept and accept.lower() == NDJSON_TYPE
+
+
 def get_apikey(req):
     """Get gateway api key from request headers."""
     return req.headers.get('x-apikey')
@@ -301,14 +310,7 @@ def get_account_name(token: str, account_id: str = None):  # pylint: disable=too
         if account_id is not None and is_bcol_help(account_id):
             return BCOL_STAFF_DESC
 
-        orgs = user_orgs(token)
-        if orgs and 'orgs' in orgs and orgs['orgs']:
-            if (len(orgs['orgs']) == 1 or not account_id or not account_id.isdigit()):
-                return orgs['orgs'][0]['name']
-            for org in orgs['orgs']:
-                if org['id'] == int(account_id):
-                    return org['name']
-        return None
+        return account_org_name(token, account_id)
     except Exception as err:  # pylint: disable=broad-except # noqa F841;
         current_app.logger.error('get_account_name failed: ' + str(err))
         return None
@@ -480,7 +482,18 @@ def get_payment_details_financing(registration):
 
 
 def enqueue_verification_report(registration_id: int, party_id: int):
-    """Add the mail verification report request to the mail verification queue."""
+    """Add the mail verification report request to the mail verification queue: return the publish future.
+
+    Publishing does not wait for the message to be sent: a failure is recorded as an event tracking record.
+    """
+    def publish_error(err):
+        msg = f'Enqueue mail verification report failed for id={registration_id}, party={party_id}: ' + str(err)
+        current_app.logger.error(msg)
+        EventTracking.create(registration_id,
+                             EventTracking.EventTrackingTypes.SURFACE_MAIL,
+                             int(HTTPStatus.INTERNAL_SERVER_ERROR),
+                             msg)
+
     try:
         payload = {
             'registrationId': registration_id,
@@ -489,19 +502,29 @@ def enqueue_verification_report(registration_id: int, party_id: int):
         apikey = current_app.config.get('SUBSCRIPTION_API_KEY')
         if apikey:
             payload['apikey'] = apikey
-        GoogleQueueService().publish_verification_report(payload)
-        current_app.logger.info(f'Enqueue mail verification report successful for id={registration_id}.')
+        future = GoogleQueueService().publish_verification_report(payload, publish_error)
+        current_app.logger.info(f'Enqueue mail verification report submitted for id={registration_id}.')
+        return future
     except Exception as err:  # noqa: B902; do not alter app processing
-        msg = f'Enqueue mail verification report failed for id={registration_id}, party={party_id}: ' + str(err)
+        publish_error(err)
+    return None
+
+
+def enqueue_registration_report(registration: Registration, json_data: dict, report_type: str):
+    """Add the registration verification report request to the registration queue.
+
+    Publishing does not wait for the message to be sent: a failure is recorded as an event tracking record.
+    """
+    registration_id = registration.id
+
+    def publish_error(err):
+        msg = f'Enqueue registration report failed for id={registration_id}: ' + str(err)
         current_app.logger.error(msg)
         EventTracking.create(registration_id,
-                             EventTracking.EventTrackingTypes.SURFACE_MAIL,
+                             EventTracking.EventTrackingTypes.REGISTRATION_REPORT,
                              int(HTTPStatus.INTERNAL_SERVER_ERROR),
                              msg)
 
-
-def enqueue_registration_report(registration: Registration, json_data: dict, report_type: str):
-    """Add the registration verification report request to the registration queue."""
     try:
         if json_data and report_type:
             # Signal registration report request is pending: record exists but no doc_storage_url.
@@ -517,19 +540,14 @@ def enqueue_registration_report(registration: Registration, json_data: dict, rep
         apikey = current_app.config.get('SUBSCRIPTION_API_KEY')
         if apikey:
             payload['apikey'] = apikey
-        GoogleQueueService().publish_registration_report(payload)
-        current_app.logger.info(f'Enqueue registration report successful for id={registration.id}.')
+        GoogleQueueService().publish_registration_report(payload, publish_error)
+        current_app.logger.info(f'Enqueue registration report submitted for id={registration.id}.')
     except DatabaseException as db_err:
         # Just log, do not return an error response.
         msg = f'Enqueue registration report db error for id={registration.id}: ' + str(db_err)
         current_app.logger.error(msg)
     except Exception as err:  # noqa: B902; do not alter app processing
-        msg = f'Enqueue registration report failed for id={registration.id}: ' + str(err)
-        current_app.logger.error(msg)
-        EventTracking.create(registration.id,
-                             EventTracking.EventTrackingTypes.REGISTRATION_REPORT,
-                             int(HTTPStatus.INTERNAL_SERVER_ERROR),
-                             msg)
+        publish_error(err)
 
 
 def find_secured_party(registration: Registration, party_id: int):
@@ -563,6 +581,7 @@ def same_party(party_1: dict, party_2: dict) -> bool:
 
 def queue_secured_party_verification(registration: Registration):
     """Set up mail out of verification statements to secured parties."""
+    publish_futures = []
     try:
         registering_json = None
         registration_id = registration.id
@@ -595,7 +614,12 @@ def queue_secured_party_verification(registration: Registration):
                                                      report_data=report_data)
                 mail_report.save()
                 current_app.logger.debug(f'queueing reg_id={registration_id} party id={party.id}')
-                enqueue_verification_report(registration_id, party.id)
+                publish_futures.append(enqueue_verification_report(registration_id, party.id))
+        # Published concurrently in publisher batches: wait once for all the secured parties.
+        not_sent_count = queue_service.wait(publish_futures, current_app.config.get('GCP_PS_PUBLISH_TIMEOUT'))
+        if not_sent_count > 0:
+            current_app.logger.error(f'Queue secured party verification stmt id={registration_id}: ' +
+                                     f'{not_sent_count} of {len(publish_futures)} messages failed or timed out.')
     except Exception as err:  # noqa: B902; do not alter app processing
         msg = f'Queue secured party verification stmt failed for id={registration_id}: ' + str(err)
         current_app.logger.error(msg)
@@ -612,6 +636,7 @@ def get_account_registration_params(req: request, params: AccountRegistrationPar
     params.status_type = req.args.get(STATUS_PARAM, None)
     params.client_reference_id = req.args.get(CLIENT_REF_PARAM, None)
     params.registering_name = req.args.get(REGISTER_NAME_PARAM, None)
+    params.cursor = req.args.get(PAGE_CURSOR_PARAM, None)
     start_ts = req.args.get(START_TS_PARAM, None)
     end_ts = req.args.get(END_TS_PARAM, None)
     if start_ts and end_ts:
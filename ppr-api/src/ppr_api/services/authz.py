@@ -12,14 +12,18 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 """This manages all of the authentication and authorization service."""
+import hashlib
 from http import HTTPStatus
+from threading import Lock
 from typing import List
 
-from flask import current_app
+from cachetools import TTLCache
+from flask import current_app, has_request_context, request
 from flask_jwt_oidc import JwtManager
-from requests import Session, exceptions
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+from jose import jwt as jose_jwt
+from requests import exceptions
+
+from ppr_api.services.http_client import auth_client
 
 
 SYSTEM_ROLE = 'system'
@@ -45,6 +49,85 @@ QUALIFIED_USER_GROUP = 'mhr_qualified_user'
 MANUFACTURER_GROUP = 'mhr_manufacturer'
 GENERAL_USER_GROUP = 'mhr_general_user'
 SEARCH_USER_GROUP = 'mhr_search_user'
+REQUEST_CACHE_KEY = 'ppr_api.auth_org_cache'
+_NOT_CACHED = object()
+
+
+class AuthOrgCache():
+    """Bounded, time limited cache of auth api account organization lookups.
+
+    Keys include the token subject and the account id, so a user only sees the lookups made with their own token.
+    Lookups are also saved for the current request, so a request makes each auth api call at most once even when the
+    process cache is disabled. Failed lookups (None) are cached for a shorter time.
+    """
+
+    def __init__(self):
+        """Create the cache from the app config on first use."""
+        self._cache = None
+        self._error_cache = None
+        self._lock = Lock()
+        self.hits: int = 0
+        self.misses: int = 0
+        self.errors: int = 0
+
+    def _get_caches(self):
+        """Get the lookup and failed lookup caches: return None if caching is disabled."""
+        if self._cache is None:
+            size: int = int(current_app.config.get('AUTH_ORG_CACHE_SIZE', 0))
+            if size < 1:
+                return None, None
+            self._cache = TTLCache(maxsize=size, ttl=int(current_app.config.get('AUTH_ORG_CACHE_TTL', 300)))
+            self._error_cache = TTLCache(maxsize=size, ttl=int(current_app.config.get('AUTH_ORG_CACHE_ERROR_TTL', 30)))
+        return self._cache, self._error_cache
+
+    def get(self, key: tuple, lookup):
+        """Get the value for the key, calling lookup if it is not cached: lookup returns None if the lookup failed."""
+        request_cache = request.environ.setdefault(REQUEST_CACHE_KEY, {}) if has_request_context() else {}
+        value = request_cache.get(key, _NOT_CACHED)
+        with self._lock:
+            if value is _NOT_CACHED:
+                cache, error_cache = self._get_caches()
+                if cache is not None and key in cache:
+                    value = cache[key]
+                elif error_cache is not None and key in error_cache:
+                    value = None
+            if value is not _NOT_CACHED:
+                self.hits += 1
+                request_cache[key] = value
+                return value
+            self.misses += 1
+        value = lookup()
+        with self._lock:
+            cache, error_cache = self._get_caches()
+            if value is None:
+                self.errors += 1
+                if error_cache is not None:
+                    error_cache[key] = True
+            elif cache is not None:
+                cache[key] = value
+        request_cache[key] = value
+        return value
+
+    def metrics(self) -> dict:
+        """Get the cache usage."""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'errors': self.errors,
+            'size': len(self._cache) if self._cache is not None else 0
+        }
+
+    def clear(self):
+        """Remove all the cached lookups and reset the usage counts."""
+        with self._lock:
+            self._cache = None
+            self._error_cache = None
+            self.hits = 0
+            self.misses = 0
+            self.errors = 0
+
+
+auth_org_cache = AuthOrgCache()  # pylint: disable=invalid-name
 
 
 #  def authorized(identifier: str, jwt: JwtManager, action: List[str]) -> bool:
@@ -121,19 +204,14 @@ def authorized_token(  # pylint: disable=too-many-return-statements
         token = jwt.get_token_auth_header()
         headers = {'Authorization': 'Bearer ' + token}
         try:
-            with Session() as http:
-                retries = Retry(total=5,
-                                backoff_factor=0.1,
-                                status_forcelist=[500, 502, 503, 504])
-                http.mount('http://', HTTPAdapter(max_retries=retries))
-                rv = http.get(url=auth_url, headers=headers)
+            rv = auth_client.get(url=auth_url, headers=headers)
 
-                if rv.status_code != HTTPStatus.OK \
-                        or not rv.json().get('roles'):
-                    return False
+            if rv.status_code != HTTPStatus.OK \
+                    or not rv.json().get('roles'):
+                return False
 
-                if all(elem.lower() in rv.json().get('roles') for elem in action):
-                    return True
+            if all(elem.lower() in rv.json().get('roles') for elem in action):
+                return True
 
         except (exceptions.ConnectionError,  # pylint: disable=broad-except
                 exceptions.Timeout,
@@ -162,16 +240,14 @@ def user_orgs(token: str) -> dict:
             'Content-Type': 'application/json'
         }
         # current_app.logger.debug('Auth get user orgs url=' + url)
-        with Session() as http:
-            retries = Retry(total=3,
-                            backoff_factor=0.1,
-                            status_forcelist=[500, 502, 503, 504])
-            http.mount('http://', HTTPAdapter(max_retries=retries))
-            ret_val = http.get(url=api_url, headers=headers)
-            current_app.logger.debug('Auth get user orgs response status: ' + str(ret_val.status_code))
-            # current_app.logger.debug('Auth get user orgs response data:')
-            response = ret_val.json()
-            # current_app.logger.debug(response)
+        ret_val = auth_client.get(url=api_url, headers=headers)
+        current_app.logger.debug('Auth get user orgs response status: ' + str(ret_val.status_code))
+        if not ret_val.ok:
+            current_app.logger.error(f'Auth get user orgs failed status={ret_val.status_code}: {ret_val.text}')
+            return None
+        # current_app.logger.debug('Auth get user orgs response data:')
+        response = ret_val.json()
+        # current_app.logger.debug(response)
     except (exceptions.ConnectionError,  # pylint: disable=broad-except
             exceptions.Timeout,
             ValueError,
@@ -197,16 +273,14 @@ def account_org(token: str, account_id: str) -> dict:
             'Content-Type': 'application/json'
         }
         # current_app.logger.debug('Auth get user orgs url=' + url)
-        with Session() as http:
-            retries = Retry(total=3,
-                            backoff_factor=0.1,
-                            status_forcelist=[500, 502, 503, 504])
-            http.mount('http://', HTTPAdapter(max_retries=retries))
-            ret_val = http.get(url=api_url, headers=headers)
-            current_app.logger.debug('Auth get user orgs response status: ' + str(ret_val.status_code))
-            # current_app.logger.debug('Auth get account org response data:')
-            response = ret_val.json()
-            # current_app.logger.debug(response)
+        ret_val = auth_client.get(url=api_url, headers=headers)
+        current_app.logger.debug('Auth get user orgs response status: ' + str(ret_val.status_code))
+        if not ret_val.ok:
+            current_app.logger.error(f'Auth get account org failed status={ret_val.status_code}: {ret_val.text}')
+            return None
+        # current_app.logger.debug('Auth get account org response data:')
+        response = ret_val.json()
+        # current_app.logger.debug(response)
     except (exceptions.ConnectionError,  # pylint: disable=broad-except
             exceptions.Timeout,
             ValueError,
@@ -216,6 +290,57 @@ def account_org(token: str, account_id: str) -> dict:
     return response
 
 
+def token_subject(token: str) -> str:
+    """Get the user identifier (subject) of the already verified token, or a hash of the token if there is none."""
+    try:
+        subject = jose_jwt.get_unverified_claims(token).get('sub')
+        if subject:
+            return subject
+    except Exception:  # pylint: disable=broad-except # noqa F841;
+        pass
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+
+def account_org_type(token: str, account_id: str) -> str:
+    """Get the account organization type with a cached auth api call: empty if none, None if the lookup failed.
+
+    An error response is a failed lookup: it is cached for the short AUTH_ORG_CACHE_ERROR_TTL.
+    """
+    if not token or not account_id:
+        return None
+
+    def lookup():
+        org_info = account_org(token, account_id)
+        if org_info is None or 'orgType' not in org_info:  # Failed lookup or an error response body.
+            return None
+        return org_info.get('orgType') or ''
+
+    return auth_org_cache.get(('orgType', token_subject(token), account_id), lookup)
+
+
+def account_org_name(token: str, account_id: str = None) -> str:
+    """Get the account organization name from the user organizations with a cached auth api call.
+
+    If the account id is not a user organization id the first user organization name is returned.
+    """
+    if not token:
+        return None
+
+    def lookup():
+        orgs = user_orgs(token)
+        if orgs is None or 'orgs' not in orgs:  # Failed lookup or an error response body.
+            return None
+        if orgs['orgs']:
+            if (len(orgs['orgs']) == 1 or not account_id or not account_id.isdigit()):
+                return orgs['orgs'][0]['name']
+            for org in orgs['orgs']:
+                if org['id'] == int(account_id):
+                    return org['name']
+        return ''
+
+    return auth_org_cache.get(('orgName', token_subject(token), account_id), lookup) or None
+
+
 def is_staff(jwt: JwtManager) -> bool:  # pylint: disable=too-many-return-statements
     """Return True if the user has the BC Registries staff role."""
     if not jwt:
@@ -244,8 +369,7 @@ def is_reg_staff_account(account_id: str) -> bool:
 def is_sbc_office_account(token: str, account_id: str) -> bool:
     """Return True if the account id is an sbc office account id."""
     try:
-        org_info = account_org(token, account_id)
-        if org_info and org_info.get('orgType') and org_info['orgType'] == SBC_STAFF_ACCOUNT:
+        if account_org_type(token, account_id) == SBC_STAFF_ACCOUNT:
             return True
     except Exception as err:  # pylint: disable=broad-except # noqa F841;
         current_app.logger.error('is_sbc_office_account failed: ' + str(err))
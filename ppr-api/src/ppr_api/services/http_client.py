@@ -0,0 +1,128 @@
+# Copyright © 2019 Province of British Columbia
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""This module holds the shared, connection pooled HTTP clients for downstream service calls.
+
+Each downstream service has one keep-alive requests session for the process, so calls reuse open TCP/TLS
+connections instead of connecting on every call. The pool size, timeout and retry policy of each service client are
+set from the app config when the client is first used. When the retries are used up the last error status response
+is returned to the caller, as with a plain requests call.
+"""
+from threading import Lock
+
+from flask import current_app
+from requests import Session
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+RETRY_STATUS_LIST = [500, 502, 503, 504]
+
+
+class ServiceClient():
+    """Connection pooled HTTP client for a single downstream service."""
+
+    def __init__(self, service: str):
+        """Set the service name used to look up the client config: HTTP_POOL_SIZE_{service} for example."""
+        self.service = service
+        self.timeout = None
+        self._session = None
+        self._adapter = None
+        self._lock = Lock()
+        self.request_count: int = 0
+
+    def _get_session(self) -> Session:
+        """Create the pooled session from the app config on first use."""
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    pool_size: int = int(current_app.config.get(f'HTTP_POOL_SIZE_{self.service}', 10))
+                    retries: int = int(current_app.config.get(f'HTTP_RETRIES_{self.service}', 0))
+                    self.timeout = current_app.config.get(f'HTTP_TIMEOUT_{self.service}')
+                    self._adapter = HTTPAdapter(pool_connections=pool_size,
+                                                pool_maxsize=pool_size,
+                                                max_retries=Retry(total=retries,
+                                                                  backoff_factor=0.1,
+                                                                  status_forcelist=RETRY_STATUS_LIST,
+                                                                  raise_on_status=False))
+                    session = Session()
+                    session.mount('http://', self._adapter)
+                    session.mount('https://', self._adapter)
+                    current_app.logger.info(f'Created {self.service} http client pool size={pool_size} ' +
+                                            f'retries={retries} timeout={self.timeout}.')
+                    self._session = session
+        return self._session
+
+    def request(self, method: str, url: str, **kwargs):
+        """Make a request with the pooled session, using the service timeout if a timeout is not provided."""
+        session = self._get_session()
+        if 'timeout' not in kwargs and self.timeout:
+            kwargs['timeout'] = self.timeout
+        with self._lock:
+            self.request_count += 1
+        return session.request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs):
+        """Make a GET request with the pooled session."""
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs):
+        """Make a POST request with the pooled session."""
+        return self.request('POST', url, **kwargs)
+
+    def metrics(self) -> dict:
+        """Get the connection pool usage: the reuse rate is the share of requests that did not open a connection."""
+        metrics = {
+            'service': self.service,
+            'requestCount': self.request_count,
+            'connectionCount': 0,
+            'poolRequestCount': 0,
+            'idleConnectionCount': 0,
+            'reuseRate': 0.0
+        }
+        if self._adapter is None:
+            return metrics
+        pools = self._adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            metrics['connectionCount'] += pool.num_connections
+            metrics['poolRequestCount'] += pool.num_requests
+            metrics['idleConnectionCount'] += pool.pool.qsize() if pool.pool else 0
+        if metrics['poolRequestCount'] > 0:
+            reuse_count = max(0, metrics['poolRequestCount'] - metrics['connectionCount'])
+            metrics['reuseRate'] = round(reuse_count / metrics['poolRequestCount'], 4)
+        return metrics
+
+    def close(self):
+        """Close the pooled session connections: a new session is created on the next request."""
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+            self._session = None
+            self._adapter = None
+            self.request_count = 0
+
+
+# Auth API, pay API, report service, and document storage clients.
+auth_client = ServiceClient('AUTH')  # pylint: disable=invalid-name
+pay_client = ServiceClient('PAY')  # pylint: disable=invalid-name
+report_client = ServiceClient('REPORT')  # pylint: disable=invalid-name
+storage_client = ServiceClient('STORAGE')  # pylint: disable=invalid-name
+SERVICE_CLIENTS = [auth_client, pay_client, report_client, storage_client]
+
+
+def get_metrics() -> list:
+    """Get the connection pool usage of all the service clients."""
+    return [client.metrics() for client in SERVICE_CLIENTS]
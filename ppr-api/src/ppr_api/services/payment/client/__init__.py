@@ -20,9 +20,10 @@ import json
 from enum import Enum
 from functools import wraps
 
-import requests
 from flask import current_app
 
+from ppr_api.services.http_client import auth_client, pay_client
+from ppr_api.services.token_manager import SERVICE_ACCOUNT_TOKEN, token_manager
 from ppr_api.services.payment import TransactionTypes
 
 
@@ -239,7 +240,7 @@ class BaseClient:
             # current_app.logger.debug(method.value + ' url=' + url)
             if data:
                 # current_app.logger.debug(json.dumps(data))
-                response = requests.request(
+                response = pay_client.request(
                     method.value,
                     url,
                     params=None,
@@ -247,7 +248,7 @@ class BaseClient:
                     headers=headers
                 )
             else:
-                response = requests.request(
+                response = pay_client.request(
                     method.value,
                     url,
                     params=None,
@@ -462,7 +463,12 @@ class SBCPaymentClient(BaseClient):
 
     @staticmethod
     def get_sa_token():
-        """Refunds must be submitted with a PPR service account token. Request one from the OIDC service."""
+        """Refunds must be submitted with a PPR service account token: cached until shortly before it expires."""
+        return token_manager.get_token(SERVICE_ACCOUNT_TOKEN, SBCPaymentClient.request_sa_token)
+
+    @staticmethod
+    def request_sa_token():
+        """Request a new PPR service account token from the OIDC service: return the token and seconds until expiry."""
         oidc_token_url = current_app.config.get('JWT_OIDC_TOKEN_URL')
         client_id = current_app.config.get('ACCOUNT_SVC_CLIENT_ID')
         client_secret = current_app.config.get('ACCOUNT_SVC_CLIENT_SECRET')
@@ -473,7 +479,7 @@ class SBCPaymentClient(BaseClient):
                 'Content-Type': 'application/x-www-form-urlencoded'
             }
             data = f'grant_type=client_credentials&scope=openid&client_id={client_id}&client_secret={client_secret}'
-            response = requests.request(
+            response = auth_client.request(
                 HttpVerbs.POST.value,
                 oidc_token_url,
                 data=data,
@@ -487,7 +493,7 @@ class SBCPaymentClient(BaseClient):
             response_json = json.loads(response.text)
             token = response_json['access_token']
             current_app.logger.info('Have new sa token from OIDC.')
-            return token
+            return token, response_json.get('expires_in', 0)
 
         except (ApiRequestError) as err:
             current_app.logger.error(err.message)
@@ -11,15 +11,86 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-"""This class enqueues messages for the PPR API asynchronous events."""
+"""This class enqueues messages for the PPR API asynchronous events.
+
+The process shares one Pub/Sub publisher client with batching settings, so credentials and connections are set up
+once. Publishing does not wait for the message to be sent: it returns the publish future, and failures are reported
+to an optional error callback. Callers that publish several messages can wait for all of the futures at once.
+"""
 import json
+from concurrent import futures
+from threading import Lock
 
-from flask import current_app
+from flask import current_app, has_app_context
 from google.cloud import pubsub_v1
 
 from ppr_api.callback.auth.token_service import GoogleStorageTokenService
 
 
+_publisher = None  # pylint: disable=invalid-name
+_publisher_lock = Lock()
+
+
+class LocalPublisher():
+    """In memory stand-in for the Pub/Sub publisher client, used for unit testing and local development.
+
+    Published messages are saved in the messages list as (topic name, data) tuples. If error is set publishing fails
+    with the error.
+    """
+
+    def __init__(self, error: Exception = None):
+        """Create the publisher with no messages."""
+        self.messages = []
+        self.error = error
+
+    def publish(self, topic: str, data: bytes, **attrs):  # pylint: disable=unused-argument
+        """Save the message and return a completed future with the message id."""
+        future = futures.Future()
+        if self.error:
+            future.set_exception(self.error)
+        else:
+            self.messages.append((topic, data))
+            future.set_result(str(len(self.messages)))
+        return future
+
+
+def get_publisher():
+    """Get the process publisher, creating it from the app config on first use."""
+    global _publisher  # pylint: disable=global-statement,invalid-name
+    if _publisher is None:
+        with _publisher_lock:
+            if _publisher is None:
+                if current_app.config.get('GCP_PS_LOCAL_PUBLISHER'):
+                    _publisher = LocalPublisher()
+                    current_app.logger.info('Created local in memory pubsub publisher.')
+                else:
+                    max_messages: int = int(current_app.config.get('GCP_PS_BATCH_MAX_MESSAGES', 100))
+                    max_latency: float = float(current_app.config.get('GCP_PS_BATCH_MAX_LATENCY', 0.01))
+                    batch_settings = pubsub_v1.types.BatchSettings(max_messages=max_messages,
+                                                                   max_latency=max_latency)
+                    _publisher = pubsub_v1.PublisherClient(batch_settings=batch_settings,
+                                                           credentials=GoogleStorageTokenService.get_credentials())
+                    current_app.logger.info(f'Created pubsub publisher max_messages={max_messages} ' +
+                                            f'max_latency={max_latency}.')
+    return _publisher
+
+
+def set_publisher(publisher):
+    """Replace the process publisher: None creates a new publisher from the app config on next use."""
+    global _publisher  # pylint: disable=global-statement,invalid-name
+    with _publisher_lock:
+        _publisher = publisher
+
+
+def wait(publish_futures: list, timeout: float = None) -> int:
+    """Wait for the publish futures to complete: return the number of messages that failed or did not complete."""
+    publish_futures = [future for future in publish_futures if future is not None] if publish_futures else []
+    if not publish_futures:
+        return 0
+    done, not_done = futures.wait(publish_futures, timeout=timeout)
+    return len(not_done) + len([future for future in done if future.exception() is not None])
+
+
 class GoogleQueueService():
     """Google Pub/Sub implementation to publish/enqueue events.
 
@@ -28,8 +99,7 @@ class GoogleQueueService():
 
     def __init__(self):
         """Initialize the publisher."""
-        credentials = GoogleStorageTokenService.get_credentials()
-        self.publisher = pubsub_v1.PublisherClient(credentials=credentials)
+        self.publisher = get_publisher()
         self.project_id = str(current_app.config.get('GCP_PS_PROJECT_ID'))
         self.search_report_topic = str(current_app.config.get('GCP_PS_SEARCH_REPORT_TOPIC'))
         self.notification_topic = str(current_app.config.get('GCP_PS_NOTIFICATION_TOPIC'))
@@ -40,41 +110,62 @@ class GoogleQueueService():
         self.verification_report_topic_name = f'projects/{self.project_id}/topics/{self.verification_report_topic}'
         self.registration_report_topic_name = f'projects/{self.project_id}/topics/{self.registration_report_topic}'
 
-    def publish_search_report(self, payload):
+    def publish_search_report(self, payload, on_error=None):
         """Publish the search report request json payload to the Queue Service."""
         try:
-            self.publish(self.search_report_topic_name, payload)
+            return self.publish(self.search_report_topic_name, payload, on_error)
         except Exception as err:  # pylint: disable=broad-except # noqa F841;
             current_app.logger.error('Error publish_search_report: ' + str(err))
             raise err
 
-    def publish_notification(self, payload):
+    def publish_notification(self, payload, on_error=None):
         """Publish the api notification request json payload to the Queue Service."""
         try:
-            self.publish(self.notification_topic_name, payload)
+            return self.publish(self.notification_topic_name, payload, on_error)
         except Exception as err:  # pylint: disable=broad-except # noqa F841;
             current_app.logger.error('Erro publish_notification: ' + str(err))
             raise err
 
-    def publish_verification_report(self, payload):
+    def publish_verification_report(self, payload, on_error=None):
         """Publish the BCMail+ registration verification request json payload to the Queue Service."""
         try:
-            self.publish(self.verification_report_topic_name, payload)
+            return self.publish(self.verification_report_topic_name, payload, on_error)
         except Exception as err:  # pylint: disable=broad-except # noqa F841;
             current_app.logger.error('Error publish_verification_report: ' + str(err))
             raise err
 
-    def publish_registration_report(self, payload):
+    def publish_registration_report(self, payload, on_error=None):
         """Publish the API registration verification request json payload to the Queue Service."""
         try:
-            self.publish(self.registration_report_topic_name, payload)
+            return self.publish(self.registration_report_topic_name, payload, on_error)
         except Exception as err:  # pylint: disable=broad-except # noqa F841;
             current_app.logger.error('Error publish_registration_report: ' + str(err))
             raise err
 
-    def publish(self, topic_name, payload_json):
-        """Publish the payload to the specified topic."""
+    def publish(self, topic_name, payload_json, on_error=None):
+        """Publish the payload to the specified topic without waiting for it to be sent: return the publish future.
+
+        If publishing fails on_error is called with the exception within an app context: the publisher batch thread
+        completes the future.
+        """
         payload = json.dumps(payload_json).encode('utf-8')
         # current_app.logger.info('Publishing topic=' + topic_name + ', payload=' + json.dumps(payload_json))
         future = self.publisher.publish(topic_name, payload)
-        future.result()
+        if on_error is not None:
+            app = current_app._get_current_object()  # pylint: disable=protected-access
+
+            def publish_done(completed_future):
+                err = completed_future.exception()
+                if err is None:
+                    return
+                try:
+                    if has_app_context():
+                        on_error(err)
+                    else:
+                        with app.app_context():
+                            on_error(err)
+                except Exception as callback_err:  # pylint: disable=broad-except # noqa F841;
+                    app.logger.error(f'Error publish {topic_name} error callback: ' + str(callback_err))
+
+            future.add_done_callback(publish_done)
+        return future
@@ -0,0 +1,27 @@
+-- Create the debtor search index rows of the test registrations.
+INSERT INTO debtor_search_index (party_id, financing_id, party_type, registration_type, base_registration_num,
+                                 base_registration_ts, business_name, business_srch_key, bus_name_base,
+                                 bus_name_key_char1, last_name, first_name, middle_initial, birth_date, last_name_key,
+                                 first_name_key, first_name_key_char1, first_name_char1, first_name_char2,
+                                 first_name_split1, first_name_split2, last_name_split1, last_name_split2,
+                                 last_name_split3, nickname_ids, searchable_until)
+SELECT p.id, fs.id, p.party_type, r.registration_type, r.registration_number, r.registration_ts,
+       p.business_name, p.business_srch_key, p.bus_name_base, p.bus_name_key_char1, p.last_name, p.first_name,
+       p.middle_initial, p.birth_date, p.last_name_key, p.first_name_key, p.first_name_key_char1, p.first_name_char1,
+       p.first_name_char2, p.first_name_split1, p.first_name_split2, p.last_name_split1, p.last_name_split2,
+       p.last_name_split3,
+       CASE WHEN p.party_type = 'DI' THEN ARRAY(SELECT n.name_id FROM nicknames n WHERE n.name = p.first_name) END,
+       LEAST(fs.expire_date, (SELECT MIN(r3.registration_ts)
+                                FROM registrations r3
+                               WHERE r3.financing_id = fs.id
+                                 AND r3.registration_type_cl = 'DISCHARGE')) + interval '30 days'
+  FROM registrations r, financing_statements fs, parties p
+ WHERE r.financing_id = fs.id
+   AND r.registration_type_cl IN ('PPSALIEN', 'MISCLIEN', 'CROWNLIEN')
+   AND r.base_reg_number IS NULL
+   AND p.financing_id = fs.id
+   AND p.registration_id_end IS NULL
+   AND p.party_type IN ('DB', 'DI')
+   AND fs.id >= 200000000
+   AND NOT EXISTS (SELECT di.party_id FROM debtor_search_index di WHERE di.party_id = p.id)
+;
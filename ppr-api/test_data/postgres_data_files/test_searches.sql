@@ -600,3 +600,28 @@ INSERT INTO event_tracking(id, key_id, event_ts, event_tracking_type, status, me
   VALUES(200000016, 200000030, CURRENT_TIMESTAMP  at time zone 'utc' + interval '4 minutes', 'SURFACE_MAIL', 500, 'some error 3 9999999', null);
 INSERT INTO event_tracking(id, key_id, event_ts, event_tracking_type, status, message, email_address)
   VALUES(200000017, 200000030, CURRENT_TIMESTAMP  at time zone 'utc' + interval '6 minutes', 'SURFACE_MAIL', 500, 'max retries 9999999', null);
+-- Search history summaries of the test searches.
+INSERT INTO search_history_summaries (search_id, username, selected_match_count, exact_match_count,
+                                      selection_match_count, selection_exact_count, selection_pending,
+                                      report_pending, report_stored)
+SELECT sc.id,
+       CASE WHEN sc.user_id IS NULL THEN ''
+            ELSE (SELECT u.firstname || ' ' || u.lastname FROM users u WHERE u.username = sc.user_id
+                  FETCH FIRST 1 ROWS ONLY) END,
+       CASE WHEN json_typeof(sr.api_result) = 'array' THEN json_array_length(sr.api_result) END,
+       CASE WHEN json_typeof(sr.api_result) = 'array'
+            THEN (SELECT COUNT(*) FROM json_array_elements(sr.api_result) sr2 WHERE sr2 ->> 'matchType' = 'EXACT')
+            ELSE 0 END,
+       CASE WHEN json_typeof(sc.updated_selection) = 'array' THEN json_array_length(sc.updated_selection) END,
+       CASE WHEN json_typeof(sc.updated_selection) = 'array'
+            THEN (SELECT COUNT(*) FROM json_array_elements(sc.updated_selection) sc2
+                   WHERE sc2 ->> 'matchType' = 'EXACT')
+            ELSE 0 END,
+       sr.api_result IS NULL,
+       sr.callback_url IS NOT NULL AND sr.doc_storage_url IS NULL,
+       sr.doc_storage_url IS NOT NULL AND sr.doc_storage_url != ''
+  FROM search_requests sc, search_results sr
+ WHERE sc.id = sr.search_id
+   AND sc.id >= 200000000
+   AND NOT EXISTS (SELECT sh.search_id FROM search_history_summaries sh WHERE sh.search_id = sc.id)
+;
@@ -0,0 +1,19 @@
+-- Create the serial search index rows of the test registrations.
+INSERT INTO serial_search_index (vehicle_id, financing_id, registration_type, base_registration_num,
+                                 base_registration_ts, serial_type, serial_number, year, make, model, mhr_number,
+                                 srch_vin, searchable_until)
+SELECT sc.id, fs.id, r.registration_type, r.registration_number, r.registration_ts,
+       sc.serial_type, sc.serial_number, sc.year, sc.make, sc.model, sc.mhr_number, sc.srch_vin,
+       LEAST(fs.expire_date, (SELECT MIN(r3.registration_ts)
+                                FROM registrations r3
+                               WHERE r3.financing_id = fs.id
+                                 AND r3.registration_type_cl = 'DISCHARGE')) + interval '30 days'
+  FROM registrations r, financing_statements fs, serial_collateral sc
+ WHERE r.financing_id = fs.id
+   AND r.registration_type_cl IN ('PPSALIEN', 'MISCLIEN', 'CROWNLIEN')
+   AND r.base_reg_number IS NULL
+   AND sc.financing_id = fs.id
+   AND sc.registration_id_end IS NULL
+   AND fs.id >= 200000000
+   AND NOT EXISTS (SELECT si.vehicle_id FROM serial_search_index si WHERE si.vehicle_id = sc.id)
+;
@@ -3,10 +3,16 @@ DELETE FROM verification_reports
   WHERE id >= 200000000;
 DELETE FROM mail_reports
   WHERE party_id >= 200000000;
+DELETE FROM search_history_summaries
+  WHERE search_id >= 200000000;
 DELETE FROM search_results
   WHERE search_id >= 200000000;
 DELETE FROM search_requests
   WHERE id >= 200000000;
+DELETE FROM debtor_search_index
+  WHERE financing_id >= 200000000;
+DELETE FROM serial_search_index
+  WHERE financing_id >= 200000000;
 DELETE FROM serial_collateral
   WHERE financing_id >= 200000000;
 DELETE FROM general_collateral
@@ -21,8 +21,9 @@ from http import HTTPStatus
 
 import pytest
 from flask import current_app
+from sqlalchemy.sql import text
 
-from ppr_api.models import FinancingStatement, Registration
+from ppr_api.models import FinancingStatement, Registration, db, search_utils
 from ppr_api.resources.utils import get_payment_details, get_payment_details_financing, \
      get_payment_type_financing
 from ppr_api.services.authz import COLIN_ROLE, PPR_ROLE, STAFF_ROLE, BCOL_HELP, GOV_ACCOUNT_ROLE
@@ -51,6 +52,12 @@ TEST_MAIL_LIST_DATA = [
     ('Unauthorized', HTTPStatus.UNAUTHORIZED, None, None)
 ]
 
+# testdata pattern is ({desc}, {status})
+TEST_SEARCH_INDEX_DATA = [
+    ('Valid', HTTPStatus.OK),
+    ('Unauthorized', HTTPStatus.UNAUTHORIZED)
+]
+
 
 @pytest.mark.parametrize('desc,status,reg_id,party_id', TEST_MAIL_CALLBACK_DATA)
 def test_callback_mail_report(session, client, jwt, desc, status, reg_id, party_id):
@@ -112,3 +119,29 @@ def test_list_mail_report(session, client, jwt, desc, status, start_ts, end_ts):
             assert result.get('id')
             assert result.get('dateTime')
             assert result.get('docStorageRef')
+
+
+@pytest.mark.parametrize('desc,status', TEST_SEARCH_INDEX_DATA)
+def test_callback_search_index(session, client, jwt, desc, status):
+    """Assert that a search index reconcile request returns the expected status."""
+    # setup: add the serial search index rows of TEST0013 (expired more than 30 days ago).
+    db.session.execute(text(search_utils.SERIAL_INDEX_FINANCING_UPSERT), {'financing_id': 200000007})
+    headers = None
+    if status != HTTPStatus.UNAUTHORIZED:
+        apikey = current_app.config.get('SUBSCRIPTION_API_KEY')
+        if apikey:
+            headers = {
+                'x-apikey': apikey
+            }
+
+    # test
+    rv = client.post('/api/v1/callbacks/search-index',
+                     headers=headers,
+                     content_type='application/json')
+    # check
+    assert rv.status_code == status
+    if rv.status_code == HTTPStatus.OK:
+        assert rv.json['serial']['deletedCount'] > 0
+        assert rv.json['debtor']['deletedCount'] >= 0
+        query = text("SELECT COUNT(*) FROM serial_search_index WHERE base_registration_num = 'TEST0013'")
+        assert db.session.execute(query).scalar() == 0
@@ -656,6 +656,19 @@ def test_get_account_registrations_collapsed(session, client, jwt):
                 assert change['registrationClass'] not in ('PPSALIEN', 'MISCLIEN', 'CROWNLIEN')
 
 
+def test_get_account_registrations_cursor_invalid(session, client, jwt):
+    """Assert that a request to get account registrations with an invalid page cursor is a bad request."""
+    # setup
+    path = '/api/v1/financing-statements/registrations?collapse=true&fromUI=true' + \
+        '&sortCriteriaName=registrationNumber&sortDirection=asc&pageCursor=invalid'
+
+    # test
+    response = client.get(path, headers=create_header_account(jwt, [PPR_ROLE]))
+
+    # check
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
 @pytest.mark.parametrize('desc,reg_number,current_state,param_value', TEST_CURRENT_STATE)
 def test_get_registration_current(session, client, jwt, desc, reg_number, current_state, param_value):
     """Assert that a request to get the current data for a registration works as expected."""
@@ -27,3 +27,20 @@ def test_health_check(session, client, jwt):
     rv = client.get('/ops/healthz')
     # check
     assert rv.status_code == HTTPStatus.OK
+
+
+def test_metrics(session, client, jwt):
+    """Assert that the service metrics include the http client connection pool usage."""
+    # no setup
+
+    # test
+    rv = client.get('/ops/metricz')
+    # check
+    assert rv.status_code == HTTPStatus.OK
+    assert rv.json['httpClients']
+    for metrics in rv.json['httpClients']:
+        assert metrics['service'] in ('AUTH', 'PAY', 'REPORT', 'STORAGE')
+        assert 'reuseRate' in metrics
+    assert 'hits' in rv.json['authOrgCache']
+    assert 'misses' in rv.json['authOrgCache']
+    assert 'tokenRefreshes' in rv.json
@@ -24,7 +24,7 @@ from flask import current_app
 # prep sample post search data
 from registry_schemas.example_data.ppr import SEARCH_SUMMARY
 
-from ppr_api.callback.document_storage.storage_service import GoogleStorageService
+from ppr_api.callback.document_storage.storage_service import GoogleStorageService, LocalStorageService
 from ppr_api.models import SearchResult, SearchRequest
 from ppr_api.services.authz import COLIN_ROLE, PPR_ROLE, STAFF_ROLE, BCOL_HELP, GOV_ACCOUNT_ROLE
 from tests.unit.services.utils import create_header, create_header_account, create_header_account_report
@@ -46,6 +46,18 @@ TEST_GET_DATA = [
     ('Report pending request', [PPR_ROLE], HTTPStatus.BAD_REQUEST, True, 200000007, True),
     ('Report valid request', [PPR_ROLE], HTTPStatus.OK, True, 200000008, True)
 ]
+TEST_REPORT_DOC_NAME = 'search-results-report-200000008.pdf'
+TEST_REPORT_SIZE = 1000
+# testdata pattern is ({desc}, {range}, {status}, {start}, {end}, {content_range})
+TEST_REPORT_RANGE_DATA = [
+    ('No range', None, HTTPStatus.OK, 0, 999, None),
+    ('First bytes', 'bytes=0-99', HTTPStatus.PARTIAL_CONTENT, 0, 99, 'bytes 0-99/1000'),
+    ('Open ended', 'bytes=900-', HTTPStatus.PARTIAL_CONTENT, 900, 999, 'bytes 900-999/1000'),
+    ('Suffix', 'bytes=-100', HTTPStatus.PARTIAL_CONTENT, 900, 999, 'bytes 900-999/1000'),
+    ('End past size', 'bytes=500-5000', HTTPStatus.PARTIAL_CONTENT, 500, 999, 'bytes 500-999/1000'),
+    ('Start past size', 'bytes=2000-2100', HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE, None, None, 'bytes */1000'),
+    ('Multiple ranges', 'bytes=0-9,20-29', HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE, None, None, 'bytes */1000')
+]
 # testdata pattern is ({desc}, {status}, {search_id})
 TEST_CALLBACK_DATA = [
     ('Invalid id', HTTPStatus.NOT_FOUND, 300000005),
@@ -263,6 +275,35 @@ def test_get_search_detail(session, client, jwt, desc, roles, status, has_accoun
     assert rv.status_code == status
 
 
+@pytest.mark.parametrize('desc,byte_range,status,start,end,content_range', TEST_REPORT_RANGE_DATA)
+def test_get_search_report_range(session, client, jwt, tmp_path, desc, byte_range, status, start, end,
+                                 content_range):
+    """Assert that a stored search report is streamed in full or by the requested byte range."""
+    # setup
+    current_app.config.update(AUTH_SVC_URL=MOCK_URL_NO_KEY)
+    current_app.config['DOC_STORAGE_LOCAL_PATH'] = str(tmp_path)
+    raw_data = bytes(index % 256 for index in range(TEST_REPORT_SIZE))
+    headers = create_header_account_report(jwt, [PPR_ROLE])
+    if byte_range:
+        headers['Range'] = byte_range
+    # test
+    try:
+        LocalStorageService.save_document(TEST_REPORT_DOC_NAME, raw_data)
+        rv = client.get('/api/v1/search-results/200000008', headers=headers)
+    finally:
+        current_app.config['DOC_STORAGE_LOCAL_PATH'] = None
+    # check
+    assert rv.status_code == status
+    assert rv.headers.get('Content-Range') == content_range
+    if status == HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE:
+        assert not rv.data
+    else:
+        assert rv.headers['Accept-Ranges'] == 'bytes'
+        assert rv.headers['Content-Type'] == 'application/pdf'
+        assert int(rv.headers['Content-Length']) == end - start + 1
+        assert rv.data == raw_data[start:end + 1]
+
+
 @pytest.mark.parametrize('desc,status,search_id', TEST_CALLBACK_DATA)
 def test_callback_search_report(session, client, jwt, desc, status, search_id):
     """Assert that a callback request returns the expected status."""
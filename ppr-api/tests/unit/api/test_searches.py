@@ -19,6 +19,7 @@ Test-Suite to ensure that the /searches endpoint is working as expected.
 
 import copy
 from http import HTTPStatus
+import json
 
 import pytest
 from flask import current_app
@@ -122,6 +123,35 @@ def test_search_valid(session, client, jwt, search_type, json_data):
     assert 'certified' not in rv.json['searchQuery']
 
 
+@pytest.mark.parametrize('search_type,json_data', TEST_VALID_DATA)
+def test_search_stream(session, client, jwt, search_type, json_data):
+    """Assert that a search request accepting NDJSON streams the search summary, results, and result counts."""
+    current_app.config.update(PAYMENT_SVC_URL=MOCK_PAY_URL)
+    headers = create_header_account(jwt, [PPR_ROLE])
+    headers['Accept'] = 'application/x-ndjson'
+    rv = client.post('/api/v1/searches',
+                     json=json_data,
+                     headers=headers,
+                     content_type='application/json')
+    # check
+    assert rv.status_code == HTTPStatus.CREATED
+    assert rv.mimetype == 'application/x-ndjson'
+    lines = [json.loads(line) for line in rv.get_data(as_text=True).splitlines()]
+    summary = lines[0]
+    counts = lines[-1]
+    assert summary['searchId']
+    assert summary['searchQuery']
+    assert 'results' not in summary
+    assert counts['searchId'] == summary['searchId']
+    assert counts['returnedResultsSize'] == len(lines) - 2
+    for result in lines[1:-1]:
+        assert result['baseRegistrationNumber']
+        assert result['matchType']
+    query = SearchRequest.find_by_id(int(summary['searchId']))
+    assert query.returned_results_size == counts['returnedResultsSize']
+    assert query.search_result
+
+
 @pytest.mark.parametrize('search_type,json_data', TEST_VALID_DATA)
 def test_staff_search_certified(session, client, jwt, search_type, json_data):
     """Assert that valid staff certified search criteria returns a 201 status."""
@@ -12,7 +12,15 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 """Google Storage token tests."""
-from ppr_api.callback.document_storage.storage_service import DocumentTypes, GoogleStorageService
+from flask import current_app
+import pytest
+
+from ppr_api.callback.document_storage.storage_service import (
+    DocumentTypes,
+    GoogleStorageService,
+    LocalStorageService,
+    get_storage_service
+)
 
 
 TEST_DOC_NAME = 'financing-statements_100348B.pdf'
@@ -26,6 +34,16 @@ TEST_VERIFICATION_SAVE_DOC_NAME = 'PPRVER.999999.111111.04.01.2022.PDF'
 TEST_REGISTRATION_DOC_NAME = '2022/02/financing-200000000-TEST0001.pdf'
 TEST_REGISTRATION_DATAFILE = 'tests/unit/callback/ut-financing-200000000-TEST0001.pdf'
 TEST_REGISTRATION_SAVE_DOC_NAME = '2022/02/16/ut-verification-financing.pdf'
+TEST_STREAM_DATAFILE = 'tests/unit/callback/test-get-search-report.pdf'
+
+# testdata pattern is ($description, $start, $end, $chunk_size)
+TEST_LOCAL_STREAM_DATA = [
+    ('Full document', 0, None, 10000),
+    ('Full document single chunk', 0, None, None),
+    ('First byte', 0, 0, 1024),
+    ('Range', 100, 50000, 1024),
+    ('Last bytes', -500, -1, 128)
+]
 
 
 def test_cs_get_document(session):
@@ -116,3 +134,30 @@ def test_cs_save_registration_document(session):
     print(response)
     assert response
     assert response['name'] == TEST_REGISTRATION_SAVE_DOC_NAME
+
+
+@pytest.mark.parametrize('desc,start,end,chunk_size', TEST_LOCAL_STREAM_DATA)
+def test_local_stream_document(session, tmp_path, desc, start, end, chunk_size):
+    """Assert that streaming all or a byte range of a document from local storage works as expected."""
+    raw_data = None
+    with open(TEST_STREAM_DATAFILE, 'rb') as data_file:
+        raw_data = data_file.read()
+    current_app.config['DOC_STORAGE_LOCAL_PATH'] = str(tmp_path)
+    try:
+        assert get_storage_service() == LocalStorageService
+        response = LocalStorageService.save_document(TEST_SAVE_DOC_NAME, raw_data)
+        assert response['name'] == TEST_SAVE_DOC_NAME
+        size = LocalStorageService.get_document_size(TEST_SAVE_DOC_NAME)
+        assert size == len(raw_data)
+        assert LocalStorageService.get_document(TEST_SAVE_DOC_NAME, DocumentTypes.SEARCH_RESULTS) == raw_data
+        if start < 0:
+            start += size
+            end += size
+        chunks = list(LocalStorageService.stream_document(TEST_SAVE_DOC_NAME, None, start, end, chunk_size))
+        expected = raw_data[start:] if end is None else raw_data[start:end + 1]
+        assert b''.join(chunks) == expected
+        if chunk_size:
+            assert max(len(chunk) for chunk in chunks) <= chunk_size
+    finally:
+        current_app.config['DOC_STORAGE_LOCAL_PATH'] = None
+    assert get_storage_service() == GoogleStorageService
@@ -16,12 +16,18 @@
 
 Test-Suite to ensure that the Financing Statement Model is working as expected.
 """
+from datetime import timedelta
 from http import HTTPStatus
 import copy
+import time
 
 import pytest
+from flask import current_app
 from registry_schemas.example_data.ppr import FINANCING_STATEMENT, DISCHARGE_STATEMENT, DRAFT_FINANCING_STATEMENT
-from ppr_api.models import FinancingStatement, Draft, utils as model_utils
+from ppr_api.models import FinancingStatement, Draft, GeneralCollateral, GeneralCollateralLegacy, Party, Registration
+from ppr_api.models import RegistrationType
+from ppr_api.models import utils as model_utils
+from ppr_api.models.json_cache import financing_json_cache
 
 from ppr_api.exceptions import BusinessException
 
@@ -48,6 +54,13 @@ TEST_REGISTRATION_NUMBER_DATA = [
     ('Discharged staff not create', 'TEST0014', 'PS12345', HTTPStatus.OK, True, False),
     ('Discharged staff create', 'TEST0014', 'PS12345', HTTPStatus.BAD_REQUEST, True, True),
 ]
+# testdata pattern is ({description}, {registration numbers}, {results size})
+TEST_BULK_LOAD_DATA = [
+    ('Multiple', ['TEST0001', 'TEST0002', 'TEST0013'], 3),
+    ('Duplicates', ['TEST0001', 'TEST0001'], 1),
+    ('Not found', ['TEST0001', 'TESTXXXX'], 1),
+    ('Empty', [], 0)
+]
 # testdata pattern is ({description}, {registration number}, {type}, {debtor name}, {is valid})
 TEST_DEBTOR_NAME_DATA = [
     ('Valid Individual', 'TEST0001', 'DI', 'Debtor', True),
@@ -231,6 +244,20 @@ def test_find_by_registration_number(session, desc, reg_number, account_id, stat
         assert request_err.value.status_code == status
 
 
+@pytest.mark.parametrize('desc,reg_nums,results_size', TEST_BULK_LOAD_DATA)
+def test_find_all_by_registration_numbers(session, desc, reg_nums, results_size):
+    """Assert that bulk loading financing statements by registration number works as expected."""
+    statements = FinancingStatement.find_all_by_registration_numbers(reg_nums)
+    assert len(statements) == results_size
+    for reg_num, statement in statements.items():
+        assert reg_num in reg_nums
+        expected = FinancingStatement.find_by_registration_number(reg_num, None, True, False)
+        assert statement.id == expected.id
+        statement.include_changes_json = True
+        expected.include_changes_json = True
+        assert statement.json == expected.json
+
+
 @pytest.mark.parametrize('desc,reg_number,type,debtor_name,valid', TEST_DEBTOR_NAME_DATA)
 def test_validate_debtor_name(session, desc, reg_number, type, debtor_name, valid):
     """Assert that base debtor check on an existing registration works as expected."""
@@ -394,3 +421,97 @@ def test_verification_expiry(session, reg_num, reg_type, current_view, expiry_ts
     if life:
         assert 'lifeYears' in json_data
         assert json_data['lifeYears'] == life
+
+
+def test_json_snapshot_cache(session):
+    """Assert that the financing statement json snapshot cache works as expected."""
+    financing_json_cache.clear()
+    statement = FinancingStatement.find_by_registration_number('TEST0001', None, True, False)
+    statement.include_changes_json = True
+    key = statement.json_snapshot_key()
+    assert key[0] == statement.id
+    assert key[1] == max(reg.id for reg in statement.registration)
+    json_data = statement.json
+    assert financing_json_cache.misses == 1
+    cached_json = statement.json
+    assert financing_json_cache.hits == 1
+    assert cached_json == json_data
+    assert cached_json == statement.build_json()
+    # Changing the view settings uses a different snapshot.
+    statement.include_changes_json = False
+    assert 'changes' not in statement.json
+    assert financing_json_cache.misses == 2
+    # Snapshots are copies.
+    cached_json['statusType'] = 'XX'
+    statement.include_changes_json = True
+    assert statement.json['statusType'] != 'XX'
+    financing_json_cache.invalidate(statement.id)
+    assert financing_json_cache.get(key) is None
+
+
+def build_amended_statement(amendment_count: int) -> FinancingStatement:
+    """Build a synthetic financing statement where every amendment adds a secured party and edits the collateral."""
+    base_ts = model_utils.now_ts()
+    statement = FinancingStatement(id=1, state_type=model_utils.STATE_ACTIVE, life=5)
+    statement.current_view_json = True
+    base_reg = Registration(id=1, registration_num='BENCH01', registration_ts=base_ts, registration_type='SA',
+                            registration_type_cl=model_utils.REG_CLASS_PPSA)
+    base_reg.reg_type = RegistrationType(registration_type='SA', registration_type_cl=model_utils.REG_CLASS_PPSA,
+                                         registration_desc='PPSA SECURITY AGREEMENT', registration_act='PPSA')
+    statement.registration = [base_reg]
+    statement.parties = [Party(id=1, party_type=model_utils.PARTY_REGISTERING, registration_id=1, business_name='RG'),
+                         Party(id=2, party_type=model_utils.PARTY_DEBTOR_BUS, registration_id=1, business_name='DB'),
+                         Party(id=3, party_type=model_utils.PARTY_SECURED, registration_id=1, business_name='SP')]
+    statement.general_collateral = [GeneralCollateral(id=1, registration_id=1, description='BASE GC')]
+    statement.trust_indenture = []
+    statement.vehicle_collateral = []
+    statement.general_collateral_legacy = []
+    statement.previous_statement = []
+    for index in range(amendment_count):
+        reg_id = index + 2
+        amendment = Registration(id=reg_id, registration_num='BENCH' + str(reg_id).zfill(3),
+                                 registration_ts=base_ts + timedelta(minutes=reg_id), registration_type='AM',
+                                 registration_type_cl=model_utils.REG_CLASS_AMEND)
+        statement.registration.append(amendment)
+        statement.parties.append(Party(id=reg_id * 10, party_type=model_utils.PARTY_REGISTERING,
+                                       registration_id=reg_id, business_name='RG ' + str(reg_id)))
+        statement.parties.append(Party(id=reg_id * 10 + 1, party_type=model_utils.PARTY_SECURED,
+                                       registration_id=reg_id, business_name='SP ' + str(reg_id)))
+        for offset, status in enumerate((GeneralCollateralLegacy.StatusTypes.ADDED,
+                                         GeneralCollateralLegacy.StatusTypes.DELETED), start=2):
+            collateral = GeneralCollateral(id=reg_id * 10 + offset, registration_id=reg_id, status=status,
+                                           description='GC ' + str(reg_id))
+            collateral.registration = amendment
+            statement.general_collateral.append(collateral)
+    return statement
+
+
+def count_json_reads(monkeypatch, amendment_count: int) -> int:
+    """Return the number of party and collateral registration id reads building the current view json."""
+    statement = build_amended_statement(amendment_count)
+    reads = []
+
+    def counting_getattribute(self, name):
+        if name == 'registration_id':
+            reads.append(name)
+        return object.__getattribute__(self, name)
+
+    with monkeypatch.context() as patch:
+        patch.setattr(Party, '__getattribute__', counting_getattribute)
+        patch.setattr(GeneralCollateral, '__getattribute__', counting_getattribute)
+        start = time.perf_counter()
+        json_data = statement.build_json()
+        elapsed = time.perf_counter() - start
+    current_app.logger.info(f'Financing statement json {amendment_count} amendments={elapsed}s.')
+    assert len(json_data['securedParties']) == amendment_count + 1
+    # Each amendment edit combines the add and the delete into one item.
+    assert len(json_data['generalCollateral']) == amendment_count + 1
+    return len(reads)
+
+
+def test_json_scaling(session, monkeypatch):
+    """Assert that building the json for a heavily amended statement reads the parties and collateral linearly."""
+    reads_small = count_json_reads(monkeypatch, 100)
+    reads_max = count_json_reads(monkeypatch, 500)
+    # 5 times the amendments: rescanning the parties and collateral (quadratic) reads about 25 times more.
+    assert reads_max <= reads_small * 5
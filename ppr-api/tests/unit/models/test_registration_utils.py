@@ -18,9 +18,14 @@ Test-Suite to ensure that the Registration Model is working as expected.
 """
 # from flask import current_app
 
+from http import HTTPStatus
+import base64
+import json
+
 import pytest
 from flask import current_app
 
+from ppr_api.exceptions import BusinessException
 from ppr_api.models import Registration, registration_utils as registration_utils, utils as model_utils
 from ppr_api.models.registration_utils import AccountRegistrationParams
 
@@ -32,15 +37,33 @@ TEST_REG_COUNT_DATA = [
 ]
 # testdata pattern is ({sort_criteria}, {sort_order}, {expected_clause})
 TEST_QUERY_ORDER_DATA = [
-    (None, None, ' ORDER BY registration_ts DESC'),
-    ('invalid', None, ' ORDER BY registration_ts DESC'),
+    (None, None, ' ORDER BY registration_ts DESC, registration_number DESC'),
+    ('invalid', None, ' ORDER BY registration_ts DESC, registration_number DESC'),
     ('registrationNumber', None, ' ORDER BY registration_number DESC'),
-    ('registrationNumber', 'asc', ' ORDER BY registration_number asc'),
-    ('registrationType', 'ascending', ' ORDER BY registration_type ascending'),
-    ('registeringName', 'descending', ' ORDER BY registering_name descending'),
-    ('clientReferenceId', 'asc', ' ORDER BY client_reference_id asc'),
-    ('startDateTime', 'ascending', ' ORDER BY registration_ts ascending'),
-    ('endDateTime', 'desc', ' ORDER BY registration_ts desc')
+    ('registrationNumber', 'asc', ' ORDER BY registration_number ASC'),
+    ('registrationType', 'ascending', ' ORDER BY registration_type ASC, registration_number ASC'),
+    ('registeringName', 'descending', " ORDER BY COALESCE(registering_name, '') DESC, registration_number DESC"),
+    ('clientReferenceId', 'asc', " ORDER BY COALESCE(client_reference_id, '') ASC, registration_number ASC"),
+    ('startDateTime', 'ascending', ' ORDER BY registration_ts ASC, registration_number ASC'),
+    ('endDateTime', 'desc', ' ORDER BY registration_ts DESC, registration_number DESC')
+]
+# testdata pattern is ({sort_criteria}, {sort_order}, {operator})
+TEST_CURSOR_DATA = [
+    (None, None, '<'),
+    ('registrationNumber', 'asc', '>'),
+    ('registrationType', 'desc', '<'),
+    ('registeringName', 'ascending', '>'),
+    ('clientReferenceId', 'descending', '<'),
+    ('startDateTime', 'asc', '>')
+]
+# testdata pattern is ({description}, {cursor_values}, {sort_criteria}, {sort_order})
+TEST_CURSOR_INVALID_DATA = [
+    ('Not encoded', None, None, None),
+    ('Old format', ['TEST0002', 'TEST0001'], 'registrationNumber', 'asc'),
+    ('Criteria mismatch', ['registrationType', 'asc', 'SA', 'TEST0001'], 'registrationNumber', 'asc'),
+    ('Direction mismatch', ['registrationNumber', 'desc', 'TEST0002', 'TEST0001'], 'registrationNumber', 'asc'),
+    ('Default order mismatch', ['', 'asc', '2021-09-02T16:00:00+00:00', 'TEST0001'], None, None),
+    ('Invalid timestamp', ['startDateTime', 'desc', 'TEST0002', 'TEST0001'], 'startDateTime', 'desc')
 ]
 
 # testdata pattern is ({reg_num}, {reg_type}, {client_ref}, {registering_name}, {status}, {start_ts}, {end_ts})
@@ -95,6 +118,96 @@ def test_account_reg_order(session, sort_criteria, sort_order, value):
     assert clause == value
 
 
+@pytest.mark.parametrize('sort_criteria,sort_order,operator', TEST_CURSOR_DATA)
+def test_account_reg_cursor_query(session, sort_criteria, sort_order, operator):
+    """Assert that the account registration keyset pagination query and parameters are as expected."""
+    params: AccountRegistrationParams = AccountRegistrationParams(account_id='PS12345',
+                                                                  collapse=True,
+                                                                  account_name='Unit Testing',
+                                                                  sbc_staff=False)
+    params.sort_criteria = sort_criteria
+    params.sort_direction = sort_order
+    params.page_number = 3
+    mapping = {
+        'registration_number': 'TEST0001',
+        'registration_type': 'SA',
+        'registering_name': None,
+        'client_reference_id': 'T-0000001',
+        'registration_ts': model_utils.now_ts()
+    }
+    params.cursor = registration_utils.build_cursor(params, mapping)
+    cursor_values = registration_utils.get_cursor_values(params.cursor)
+    assert cursor_values[1] == 'TEST0001'
+    query = registration_utils.build_account_reg_query(params, True)
+    clause = registration_utils.QUERY_ACCOUNT_REG_CURSOR_CLAUSE.format(
+        sort_key=registration_utils.get_keyset_sort_key(params), operator=operator)
+    assert query.find(clause) != -1
+    assert query.find(clause) < query.find(' ORDER BY ')
+    query_params: dict = registration_utils.build_account_query_params(params)
+    assert query_params['page_offset'] == 0
+    assert query_params['cursor_value'] == cursor_values[0]
+    assert query_params['cursor_reg_num'] == 'TEST0001'
+
+
+@pytest.mark.parametrize('desc,cursor_values,sort_criteria,sort_order', TEST_CURSOR_INVALID_DATA)
+def test_account_reg_cursor_invalid(session, desc, cursor_values, sort_criteria, sort_order):
+    """Assert that an invalid page cursor or a cursor for a different sort order is a bad request."""
+    params: AccountRegistrationParams = AccountRegistrationParams(account_id='PS12345',
+                                                                  collapse=True,
+                                                                  account_name='Unit Testing',
+                                                                  sbc_staff=False)
+    params.sort_criteria = sort_criteria
+    params.sort_direction = sort_order
+    params.page_number = 3
+    params.cursor = 'invalid'
+    if cursor_values:
+        params.cursor = base64.urlsafe_b64encode(json.dumps(cursor_values).encode('utf-8')).decode('ascii')
+    with pytest.raises(BusinessException) as bad_request_err:
+        registration_utils.build_account_reg_query(params, True)
+    assert bad_request_err.value.status_code == HTTPStatus.BAD_REQUEST
+    with pytest.raises(BusinessException) as bad_request_err:
+        registration_utils.build_account_query_params(params)
+    assert bad_request_err.value.status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_account_reg_cursor_pages(session):
+    """Assert that keyset pagination returns the same pages as offset pagination."""
+    max_results = current_app.config.get('ACCOUNT_REGISTRATIONS_MAX_RESULTS')
+    current_app.config['ACCOUNT_REGISTRATIONS_MAX_RESULTS'] = 2
+    try:
+        params: AccountRegistrationParams = AccountRegistrationParams(account_id='PS12345',
+                                                                      collapse=True,
+                                                                      account_name='Unit Testing',
+                                                                      sbc_staff=False)
+        params.page_number = 1
+        page1 = Registration.find_all_by_account_id_filter(params, True)
+        assert len(page1) == 2
+        assert page1[0]['nextPageCursor']
+        params.page_number = 2
+        page2 = Registration.find_all_by_account_id_filter(params, True)
+        params.page_number = 1
+        params.cursor = page1[0]['nextPageCursor']
+        cursor_page2 = Registration.find_all_by_account_id_filter(params, True)
+        assert [reg['registrationNumber'] for reg in cursor_page2] == [reg['registrationNumber'] for reg in page2]
+        assert cursor_page2[0]['totalRegistrationCount'] == page1[0]['totalRegistrationCount']
+    finally:
+        current_app.config['ACCOUNT_REGISTRATIONS_MAX_RESULTS'] = max_results
+
+
+def test_account_reg_count_cache(session):
+    """Assert that the cached account registration count is adjusted as expected."""
+    counts = registration_utils.AccountRegistrationCounts()
+    counts.increment('PS99999')
+    assert counts.get('PS99999') is None
+    counts.put('PS99999', 10)
+    counts.increment('PS99999')
+    assert counts.get('PS99999') == 11
+    counts.increment('PS99999', -2)
+    assert counts.get('PS99999') == 9
+    counts.clear()
+    assert counts.get('PS99999') is None
+
+
 @pytest.mark.parametrize('reg_num,reg_type,client_ref,registering,status,start_ts,end_ts', TEST_QUERY_BASE_DATA)
 def test_account_reg_base_query(session, reg_num, reg_type, client_ref, registering, status, start_ts, end_ts):
     """Assert that account registration query base is as expected."""
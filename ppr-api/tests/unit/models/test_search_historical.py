@@ -19,7 +19,9 @@ from flask import current_app
 
 import pytest
 
-from ppr_api.models import utils as model_utils, Registration, SearchRequest, search_historical, SearchResult
+from ppr_api.models import utils as model_utils, FinancingStatement, Registration, SearchRequest, search_historical
+from ppr_api.models import SearchResult
+from ppr_api.models.json_cache import financing_json_cache
 
 
 SERIAL_NUMBER_JSON = {
@@ -105,6 +107,10 @@ TEST_DATA_SEARCH_BUS_DEBTOR_QUERY = [
 TEST_DATA_SEARCH_IND_DEBTOR_QUERY = [
     ('Test search historical individual debtor query', 1821760, INDIVIDUAL_DEBTOR_JSON)
 ]
+# testdata pattern is ({desc}, {reg_num})
+TEST_DATA_HISTORICAL_JSON = [
+    ('Test historical json cached', 'TEST0001')
+]
 
 
 @pytest.mark.parametrize('desc,search_ts', TEST_DATA_HISTORICAL_ID)
@@ -341,3 +347,24 @@ def test_search_ind_debtor(session, desc, reg_id, search_criteria):
         report_json = result.json
         current_app.logger.debug(json.dumps(report_json))
         # current_app.logger.debug(report_json)
+
+
+@pytest.mark.parametrize('desc,reg_num', TEST_DATA_HISTORICAL_JSON)
+def test_historical_json_cache(session, desc, reg_num):
+    """Assert that building the same historical statement json again uses the json snapshot cache."""
+    statement = FinancingStatement.find_by_registration_number(reg_num, None, True)
+    search_reg_id = statement.registration[0].id
+    search_ts = model_utils.now_ts()
+    financing_json_cache.clear()
+    historical_json = search_historical.get_historical_json(statement, search_reg_id, search_ts)
+    assert financing_json_cache.misses == 1
+    assert financing_json_cache.hits == 0
+    assert historical_json['baseRegistrationNumber'] == reg_num
+    assert historical_json['statusType'] in (model_utils.STATE_ACTIVE, model_utils.STATE_EXPIRED)
+    assert 'payment' not in historical_json
+    assert 'dischargedDateTime' not in historical_json
+    assert historical_json == search_historical.get_historical_json(statement, search_reg_id, search_ts)
+    assert financing_json_cache.hits == 1
+    # A different point in time is a different snapshot.
+    search_historical.get_historical_json(statement, search_reg_id - 1, search_ts)
+    assert financing_json_cache.misses == 2
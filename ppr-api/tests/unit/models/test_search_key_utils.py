@@ -0,0 +1,148 @@
+# Copyright © 2019 Province of British Columbia
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests to assure the search key helper functions.
+
+Test-Suite to ensure that the search keys match the keys generated by the database searchkey_* functions.
+"""
+import pytest
+from sqlalchemy import text
+
+from ppr_api.models import db, search_key_utils
+
+
+BUSINESS_NAME_CORPUS = [
+    'TEST BUS 2 DEBTOR',
+    'TEST 18 DEBTOR INC.',
+    'THE A B C COMPANY LTD.',
+    'A B CD HOLDINGS LTD.',
+    'BRITISH COLUMBIA HYDRO AND POWER AUTHORITY',
+    '0123456 B.C. LTD.',
+    '1234 BC LTD',
+    'ACME WIDGET HOLDINGS LTD',
+    'A & W RESTAURANTS (CANADA) INC',
+    "JOE'S PIZZA DBA SLICE S",
+    'WESTERRA EQUIPMENT LTD.',
+    'WEST TERRA PROJECTS INC.',
+    'SOCIETE GENERALE DU QUEBEC LTEE',
+    'PACIFIC TRUST COMPANY',
+    'ABC LIMITED PARTNERSHIP',
+    'INCREDIBLE INVESTMENTS CORP',
+    'the little shop of wonders ltd',
+    'Brasserie Montréal Limitée',
+    'CO-OP',
+    'X'
+]
+INDIVIDUAL_NAME_CORPUS = [
+    ('SMITH', 'LISA'),
+    ('DE LA CRUZ', 'MARIE-ANNE'),
+    ("O'CONNELL JR", 'BOBBY'),
+    ('XXXXX99', 'TEST IND DEBTOR'),
+    ('MACDONALD III', 'DR JOHN'),
+    ('VAN DER BERG', 'JAN  PIETER'),
+    ('LEE', 'MA'),
+    ('Bélanger', 'Émile'),
+    ('MUELLER-SCHMIDT', 'ANNA LEE MAY'),
+    ('I', 'II')
+]
+SERIAL_NUMBER_CORPUS = [
+    '579',
+    '5C93803614479B',
+    'DT9.9C804254',
+    'PCE38163',
+    '1805289',
+    'N38KK',
+    'KM8J3CA46JU622994',
+    'VIN123434344',
+    'ZZ-9 9',
+    'abc-def',
+    'AB',
+    '$12345'
+]
+NICKNAME_INSERT = 'INSERT INTO nicknames (name_id, name) VALUES (:name_id, :name)'
+NICKNAMES = [
+    (999901, 'ZZTESTROBERT'), (999901, 'ZZTESTBOB'), (999901, 'ZZTESTBOBBIE'),
+    (999902, 'ZZTESTBARBARA'), (999902, 'ZZTESTBARB'), (999902, 'ZZTESTBOBBIE')
+]
+# testdata pattern is ({description}, {names}, {expected_ids})
+TEST_NICKNAME_DATA = [
+    ('First name', ['ZZTESTROBERT'], [999901]),
+    ('Nickname', ['ZZTESTBOB'], [999901]),
+    ('Name in 2 groups', ['ZZTESTBOBBIE'], [999901, 999902]),
+    ('First name words', ['ZZTESTROBERT ZZTESTBARB', 'ZZTESTROBERT', 'ZZTESTBARB', None], [999901, 999902]),
+    ('No nickname', ['ZZTESTNONE', ''], [])
+]
+
+
+def get_db_key(function_name: str, *args):
+    """Get the search key generated by the database function."""
+    params = {f'arg{index}': arg for index, arg in enumerate(args)}
+    bind_names = ', '.join(f':{name}' for name in params)
+    result = db.session.execute(text(f'SELECT {function_name}({bind_names}) AS search_key'), params)
+    return result.first()[0]
+
+
+@pytest.mark.parametrize('name', BUSINESS_NAME_CORPUS)
+def test_business_name_keys(session, name):
+    """Assert that the business name keys match the database function keys."""
+    common_words = search_key_utils.load_common_words(db.session)
+    assert search_key_utils.searchkey_business_name(name, common_words) == \
+        get_db_key('searchkey_business_name', name)
+    assert search_key_utils.business_name_strip_designation(name) == \
+        get_db_key('business_name_strip_designation', name)
+
+
+@pytest.mark.parametrize('last_name,first_name', INDIVIDUAL_NAME_CORPUS)
+def test_individual_name_keys(session, last_name, first_name):
+    """Assert that the individual name keys match the database function keys."""
+    assert search_key_utils.searchkey_individual(last_name, first_name) == \
+        get_db_key('searchkey_individual', last_name, first_name)
+    assert search_key_utils.searchkey_last_name(last_name) == get_db_key('searchkey_last_name', last_name)
+    assert search_key_utils.sim_number(last_name) == float(get_db_key('sim_number', last_name))
+    for name in (last_name, first_name):
+        assert search_key_utils.individual_split_1(name) == get_db_key('individual_split_1', name)
+        assert search_key_utils.individual_split_2(name) == get_db_key('individual_split_2', name)
+        assert search_key_utils.individual_split_3(name) == get_db_key('individual_split_3', name)
+
+
+@pytest.mark.parametrize('serial_number', SERIAL_NUMBER_CORPUS)
+def test_serial_number_keys(session, serial_number):
+    """Assert that the serial, aircraft, and MHR number keys match the database function keys."""
+    assert search_key_utils.searchkey_vehicle(serial_number) == get_db_key('searchkey_vehicle', serial_number)
+    assert search_key_utils.searchkey_aircraft(serial_number) == get_db_key('searchkey_aircraft', serial_number)
+    if len(serial_number) <= 6:  # The database function key variable is 6 characters.
+        assert search_key_utils.searchkey_mhr(serial_number) == get_db_key('searchkey_mhr', serial_number)
+
+
+def test_null_keys(session):
+    """Assert that a null name has a null search key like the database functions."""
+    assert search_key_utils.searchkey_business_name(None, set()) is None
+    assert search_key_utils.searchkey_individual('SMITH', None) is None
+    assert search_key_utils.searchkey_last_name(None) is None
+    assert search_key_utils.searchkey_vehicle(None) is None
+    assert search_key_utils.searchkey_mhr(None) is None
+
+
+@pytest.mark.parametrize('desc,names,expected_ids', TEST_NICKNAME_DATA)
+def test_nickname_ids(session, desc, names, expected_ids):
+    """Assert that the search names are expanded into the cached nickname group ids."""
+    for name_id, name in NICKNAMES:
+        db.session.execute(text(NICKNAME_INSERT), {'name_id': name_id, 'name': name})
+    search_key_utils.clear_nicknames()
+    assert search_key_utils.nickname_ids(db.session, names) == expected_ids
+    # Cached: the nicknames are not reloaded.
+    db.session.execute(text("DELETE FROM nicknames WHERE name LIKE 'ZZTEST%'"))
+    assert search_key_utils.nickname_ids(db.session, names) == expected_ids
+    search_key_utils.clear_nicknames()
+    assert search_key_utils.nickname_ids(db.session, names) == []
@@ -18,10 +18,14 @@ Test-Suite to ensure that the Search Model is working as expected.
 """
 from http import HTTPStatus
 import copy
+import time
 
 import pytest
+from flask import current_app
+from sqlalchemy.engine.default import CACHE_HIT
+from sqlalchemy.sql import text
 
-from ppr_api.models import SearchRequest, search_utils
+from ppr_api.models import SearchRequest, db, search_key_utils, search_utils
 from ppr_api.models.search_request import CHARACTER_SET_UNSUPPORTED
 from ppr_api.models.utils import now_ts_offset, format_ts
 from ppr_api.exceptions import BusinessException
@@ -399,6 +403,23 @@ TEST_MHR_NUMBER_DATA = [
     ('22000', '022000'),
     ('22000 ', '022000')
 ]
+# testdata pattern is ({description}, {search_select}, {callback_url}, {doc_storage_url}, {selected_count},
+#                      {exact_count}, {selection_pending}, {report_pending}, {report_stored})
+TEST_HISTORY_SUMMARY_DATA = [
+    ('Search step 1', None, None, None, None, 0, True, False, False),
+    ('No selection', [], None, None, 0, 0, False, False, False),
+    ('Selection', [{'matchType': 'EXACT'}, {'matchType': 'SIMILAR'}], None, None, 2, 1, False, False, False),
+    ('Report pending', [{'matchType': 'EXACT'}], 'PPR_UI', None, 1, 1, False, True, False),
+    ('Report stored', [{'matchType': 'EXACT'}], 'PPR_UI', 'search.pdf', 1, 1, False, False, True)
+]
+
+NICKNAME_INSERT = 'INSERT INTO nicknames (name_id, name) VALUES (:name_id, :name)'
+# testdata pattern is ({description}, {first_name}, {expected_ids})
+TEST_NICKNAME_DATA = [
+    ('Full first name', 'zztestbob', [999901]),
+    ('First name words not expanded', 'ZZTESTBOB ZZTESTBARB', []),
+    ('No nickname', 'ZZTESTNONE', [])
+]
 
 
 def test_search_no_account(session):
@@ -475,6 +496,21 @@ def test_search_valid(session, search_type, json_data):
             assert result['results'][0]['vehicleCollateral']['manufacturedHomeRegistrationNumber'] == '220000'
 
 
+@pytest.mark.parametrize('search_type,json_data', TEST_VALID_DATA)
+def test_search_stream(session, search_type, json_data):
+    """Assert that a streamed search yields and saves the same results as a search."""
+    query = SearchRequest.create_from_json(json_data, 'PS12345')
+    query.search()
+    stream_query = SearchRequest.create_from_json(json_data, 'PS12345')
+    results = list(stream_query.search_stream(2))
+    assert stream_query.id
+    assert results == (query.search_response or [])
+    assert stream_query.returned_results_size == query.returned_results_size
+    assert stream_query.total_results_size == query.total_results_size
+    saved_query = SearchRequest.find_by_id(stream_query.id)
+    assert saved_query.returned_results_size == len(results)
+
+
 @pytest.mark.parametrize('search_type,json_data', TEST_NONE_DATA)
 def test_search_no_results(session, search_type, json_data):
     """Assert that a search query with no results returns the expected result."""
@@ -528,6 +564,35 @@ def test_search_discharged(session, search_type, json_data, excluded_match):
                 assert r['vehicleCollateral']['serialNumber'] != excluded_match
 
 
+def test_reconcile_search_indexes(session):
+    """Assert that reconciling the search indexes removes the expired rows and updates the stale rows."""
+    # setup: add the rows of TEST0013 (expired more than 30 days ago) and make the TEST0001 rows stale.
+    index_queries = (('serial_search_index', search_utils.SERIAL_INDEX_FINANCING_UPSERT),
+                     ('debtor_search_index', search_utils.DEBTOR_INDEX_FINANCING_UPSERT))
+    reg_num_query = 'SELECT COUNT(*) FROM {table} WHERE base_registration_num = :reg_num'
+    stale_query = "SELECT COUNT(*) FROM {table} WHERE registration_type = 'ZZ'"
+    stale_update = "UPDATE {table} SET registration_type = 'ZZ' WHERE base_registration_num = 'TEST0001'"
+    for table, upsert_query in index_queries:
+        db.session.execute(text(upsert_query), {'financing_id': 200000007})
+        db.session.execute(text(stale_update.format(table=table)))
+        assert db.session.execute(text(reg_num_query.format(table=table)), {'reg_num': 'TEST0013'}).scalar() > 0
+        assert db.session.execute(text(stale_query.format(table=table))).scalar() > 0
+
+    # test
+    result = SearchRequest.reconcile_search_indexes()
+
+    # check
+    for index_name in ('serial', 'debtor'):
+        assert result[index_name]['deletedCount'] > 0
+        assert result[index_name]['updatedCount'] > 0
+    for table, _ in index_queries:
+        query = text(reg_num_query.format(table=table))
+        assert db.session.execute(query, {'reg_num': 'TEST0001'}).scalar() > 0
+        assert db.session.execute(query, {'reg_num': 'TEST0013'}).scalar() == 0
+        assert db.session.execute(query, {'reg_num': 'TEST0014'}).scalar() == 0
+        assert db.session.execute(text(stale_query.format(table=table))).scalar() == 0
+
+
 @pytest.mark.parametrize('desc,reg_num', TEST_REGISTRATION_TYPES)
 def test_registration_types(session, desc, reg_num):
     """Assert that a reg num searches on different registations returns the expected result."""
@@ -599,6 +664,31 @@ def test_debtor_middle_name(session):
         assert 'middle' not in match['debtor']['personName'] or match['debtor']['personName']['middle'] != 'None'
 
 
+@pytest.mark.parametrize('desc,first_name,expected_ids', TEST_NICKNAME_DATA)
+def test_individual_name_nickname_ids(session, desc, first_name, expected_ids):
+    """Assert that only the full search first name is expanded into nickname ids, like the debtor index."""
+    for name_id, name in ((999901, 'ZZTESTBOB'), (999902, 'ZZTESTBARB')):
+        db.session.execute(text(NICKNAME_INSERT), {'name_id': name_id, 'name': name})
+    search_key_utils.clear_nicknames()
+    json_data = {
+        'type': 'INDIVIDUAL_DEBTOR',
+        'criteria': {
+            'debtorName': {
+                'last': 'Debtor',
+                'first': first_name
+            }
+        }
+    }
+    search = SearchRequest(search_type=json_data['type'], request_json=json_data)
+    try:
+        query, params = search.get_individual_name_query()
+        assert query == search_utils.INDIVIDUAL_NAME_QUERY
+        assert params['query_nickname_ids'] == expected_ids
+    finally:
+        db.session.execute(text("DELETE FROM nicknames WHERE name LIKE 'ZZTEST%'"))
+        search_key_utils.clear_nicknames()
+
+
 def test_search_startdatetime_invalid(session, client, jwt):
     """Assert that validation of a search with an invalid startDateTime throws a BusinessException."""
     # setup
@@ -663,6 +753,34 @@ def test_find_by_account_id(session):
     assert len(history) >= 1
 
 
+def benchmark_history_query(account_ids, bind_account: bool) -> tuple:
+    """Return the elapsed time and statement cache hit count of running the account search history query."""
+    cache_hits = 0
+    start = time.perf_counter()
+    for account_id in account_ids:
+        if bind_account:
+            result = db.session.execute(text(search_utils.ACCOUNT_SEARCH_HISTORY_DATE_QUERY),
+                                        {'query_account': account_id})
+        else:  # Previous implementation: a unique statement for every account.
+            query = search_utils.ACCOUNT_SEARCH_HISTORY_DATE_QUERY.replace(':query_account', f"'{account_id}'")
+            result = db.session.execute(text(query))
+        result.fetchall()
+        if result.context.cache_hit == CACHE_HIT:
+            cache_hits += 1
+    return time.perf_counter() - start, cache_hits
+
+
+def test_find_by_account_id_benchmark(session):
+    """Assert that repeated account search history queries reuse the same bound statement."""
+    account_ids = ['PS12345'] + [f'BM{index:05d}' for index in range(199)]
+    literal_time, literal_hits = benchmark_history_query(account_ids, False)
+    bound_time, bound_hits = benchmark_history_query(account_ids, True)
+    current_app.logger.info(f'200 history queries literal account: {literal_time:.4f}s {literal_hits} statement ' +
+                            f'cache hits; bound account: {bound_time:.4f}s {bound_hits} statement cache hits.')
+    assert bound_hits >= len(account_ids) - 1
+    assert literal_hits < bound_hits
+
+
 def test_find_by_account_id_no_result(session):
     """Assert that the find search history by invalid account ID returns the expected result."""
     history = SearchRequest.find_all_by_account_id('XXXX345')
@@ -670,6 +788,20 @@ def test_find_by_account_id_no_result(session):
     assert len(history) == 0
 
 
+@pytest.mark.parametrize('desc,search_select,callback_url,doc_storage_url,selected_count,exact_count,pending,' +
+                         'report_pending,report_stored', TEST_HISTORY_SUMMARY_DATA)
+def test_history_result_summary(session, desc, search_select, callback_url, doc_storage_url, selected_count,
+                                exact_count, pending, report_pending, report_stored):
+    """Assert that the search history summary values of a search result are as expected."""
+    summary = search_utils.get_history_result_summary(200000000, search_select, callback_url, doc_storage_url)
+    assert summary['search_id'] == 200000000
+    assert summary['selected_match_count'] == selected_count
+    assert summary['exact_match_count'] == exact_count
+    assert summary['selection_pending'] == pending
+    assert summary['report_pending'] == report_pending
+    assert summary['report_stored'] == report_stored
+
+
 def test_create_from_json(session):
     """Assert that the search_client creates from a json format correctly."""
     json_data = {
@@ -18,11 +18,16 @@ Test-Suite to ensure that the Search Detail Model (search step 2 select search
 results) is working as expected.
 """
 from http import HTTPStatus
+import copy
+import time
 
 from flask import current_app
 import pytest
+from registry_schemas.example_data.ppr import AMENDMENT_STATEMENT, FINANCING_STATEMENT
+from sqlalchemy.sql import text
 
-from ppr_api.models import SearchResult, SearchRequest
+from ppr_api.models import FinancingStatement, Registration, SearchResult, SearchRequest, db
+from ppr_api.models import utils as model_utils
 from ppr_api.exceptions import BusinessException
 
 
@@ -424,6 +429,121 @@ def test_search_detail_full_create(session, client, jwt):
         assert detail['financingStatement']['baseRegistrationNumber'] not in ('TEST0002', 'TEST0003')
 
 
+def test_search_detail_deferred(session, client, jwt):
+    """Assert that search step 2 builds the details as of search step 1: a later amendment is excluded."""
+    # setup
+    json_data = copy.deepcopy(FINANCING_STATEMENT)
+    json_data['type'] = model_utils.REG_TYPE_SECURITY_AGREEMENT
+    del json_data['createDateTime']
+    del json_data['baseRegistrationNumber']
+    del json_data['payment']
+    del json_data['lifeInfinite']
+    del json_data['expiryDate']
+    del json_data['documentId']
+    del json_data['lienAmount']
+    del json_data['surrenderDate']
+    statement = FinancingStatement.create_from_json(json_data, 'PS12345', 'UNIT_TEST')
+    statement.save()
+    base_reg_num = statement.registration[0].registration_num
+    debtor_count = len(statement.json['debtors'])
+    search_json = {
+        'type': 'REGISTRATION_NUMBER',
+        'criteria': {
+            'value': base_reg_num
+        },
+        'clientReferenceId': 'T-SR-SS-1002'
+    }
+    search_query = SearchRequest.create_from_json(search_json, 'PS12345')
+    search_query.search()
+    search_detail = SearchResult.create_from_search_query(search_query)
+    search_detail.save()
+    assert search_detail.search_response[0]['lastRegistrationId'] == statement.registration[0].id
+
+    # Amend the registration between search step 1 and search step 2.
+    amendment_json = copy.deepcopy(AMENDMENT_STATEMENT)
+    for key in ('createDateTime', 'amendmentRegistrationNumber', 'payment', 'documentId', 'addTrustIndenture',
+                'removeTrustIndenture', 'courtOrderInformation', 'addSecuredParties', 'deleteSecuredParties',
+                'deleteDebtors', 'addGeneralCollateral', 'deleteGeneralCollateral', 'addVehicleCollateral',
+                'deleteVehicleCollateral'):
+        amendment_json.pop(key, None)
+    amendment_json['changeType'] = model_utils.REG_TYPE_AMEND
+    amendment = Registration.create_from_json(amendment_json, 'AMENDMENT', statement, base_reg_num, 'PS12345')
+    amendment.save()
+    assert len(FinancingStatement.find_by_registration_number(base_reg_num, 'PS12345', True).json['debtors']) > \
+        debtor_count
+
+    # test
+    select_json = search_query.json['results']
+    search_detail2 = SearchResult.validate_search_select(select_json, search_detail.search_id)
+    search_detail2.update_selection(select_json)
+
+    # check
+    details_json = search_detail2.json
+    assert len(details_json['details']) == 1
+    detail = details_json['details'][0]['financingStatement']
+    assert detail['baseRegistrationNumber'] == base_reg_num
+    assert len(detail['debtors']) == debtor_count
+    assert not detail.get('changes')
+
+
+def test_search_history_summary(session, client, jwt):
+    """Assert that saving the search results and selection maintains the search history summary."""
+    # setup
+    json_data = {
+        'type': 'SERIAL_NUMBER',
+        'criteria': {
+            'value': 'JU622994'
+        },
+        'clientReferenceId': 'T-SR-SS-1003'
+    }
+    search_query = SearchRequest.create_from_json(json_data, 'PS12345')
+    search_query.search()
+    query_results_json = search_query.json['results']
+    search_detail = SearchResult.create_from_search_query(search_query)
+    search_detail.save()
+    summary_query = text('SELECT * FROM search_history_summaries WHERE search_id = :search_id')
+
+    # check search step 1
+    summary = db.session.execute(summary_query, {'search_id': search_query.id}).first()._mapping
+    assert summary['selection_pending']
+    assert summary['selected_match_count'] is None
+    assert not summary['report_pending']
+    assert not summary['report_stored']
+    assert summary['username'] == ''
+
+    # test search step 2
+    select_json = [result for result in query_results_json if result['matchType'] == 'EXACT']
+    search_query.update_search_selection(select_json)
+    search_detail2 = SearchResult.validate_search_select(select_json, search_detail.search_id)
+    search_detail2.update_selection(select_json, 'account name', 'https://callback.test')
+
+    # check
+    summary = db.session.execute(summary_query, {'search_id': search_query.id}).first()._mapping
+    assert not summary['selection_pending']
+    assert summary['selected_match_count'] == len(select_json)
+    assert summary['exact_match_count'] == len(select_json)
+    assert summary['selection_match_count'] == len(select_json)
+    assert summary['selection_exact_count'] == len(select_json)
+    assert summary['report_pending']
+    assert not summary['report_stored']
+    history = SearchRequest.find_all_by_account_id('PS12345', True)
+    search_id = str(search_query.id) + '_PENDING'
+    history_search = next(search for search in history if search['searchId'] == search_id)
+    assert history_search['selectedResultsSize'] == len(select_json)
+    assert history_search['exactResultsSize'] == len(select_json)
+    assert not history_search['inProgress']
+    assert not history_search['reportAvailable']
+
+    # test report saved
+    search_detail2.doc_storage_url = 'search-results-report-' + str(search_query.id) + '.pdf'
+    search_detail2.save()
+
+    # check
+    summary = db.session.execute(summary_query, {'search_id': search_query.id}).first()._mapping
+    assert not summary['report_pending']
+    assert summary['report_stored']
+
+
 def test_search_history_sort(session, client, jwt):
     """Assert that search results history sort order works as expected."""
     # setup
@@ -530,3 +650,60 @@ def test_search_sort(session, client, jwt, desc, select_data, select_count, orig
         assert selection[1]['vehicleCollateral']['model'] == 'Sort 2'
         assert selection[2]['vehicleCollateral']['model'] == 'Sort 3'
         assert selection[3]['vehicleCollateral']['model'] == 'Sort 4'
+
+
+class CountingDict(dict):
+    """Search result dict that counts the reads of its values."""
+
+    reads: int = 0
+
+    def __getitem__(self, key):
+        """Count the read then get the value."""
+        CountingDict.reads += 1
+        return super().__getitem__(key)
+
+    def get(self, key, default=None):
+        """Count the read then get the value."""
+        CountingDict.reads += 1
+        return super().get(key, default)
+
+
+def build_scaling_search(size: int):
+    """Build a synthetic search with size matches: every second match is a duplicate similar match."""
+    matches = []
+    details = []
+    for index in range(size):
+        reg_num = 'B' + str(index // 2).zfill(6)
+        match_type = 'EXACT' if index % 4 == 0 else 'SIMILAR'
+        matches.append(CountingDict({'baseRegistrationNumber': reg_num, 'matchType': match_type,
+                                     'createDateTime': '2021-10-08T00:02:33+00:00', 'registrationType': 'SA'}))
+        if index % 2 == 0:
+            details.append(CountingDict({'matchType': match_type,
+                                         'financingStatement': CountingDict({'baseRegistrationNumber': reg_num})}))
+    search_request: SearchRequest = SearchRequest(search_response=matches,
+                                                  search_type=SearchRequest.SearchTypes.REGISTRATION_NUM.value)
+    search_result: SearchResult = SearchResult(search_response=details)
+    search_result.search = search_request
+    return search_result, matches
+
+
+def count_select_reads(size: int) -> int:
+    """Return the number of result reads setting the search selection and building the details for size matches."""
+    search_result, matches = build_scaling_search(size)
+    CountingDict.reads = 0
+    start = time.perf_counter()
+    search_result.search_select = search_result.set_search_selection(matches)
+    details = search_result.build_details()
+    current_app.logger.info(f'Search select {size} results={time.perf_counter() - start}s.')
+    assert len(details) == size / 2
+    assert [detail['financingStatement']['baseRegistrationNumber'] for detail in details[0:2]] == \
+        ['B000000', 'B000001']
+    return CountingDict.reads
+
+
+def test_search_select_scaling(session):
+    """Assert that the search selection and details build reads scale linearly up to the maximum results size."""
+    reads_small = count_select_reads(1000)
+    reads_max = count_select_reads(5000)
+    # 5 times the results: rescanning the result lists (quadratic) reads about 25 times more.
+    assert reads_max <= reads_small * 5
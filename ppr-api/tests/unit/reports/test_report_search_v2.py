@@ -17,12 +17,38 @@
 Test-Suite to ensure that the report service search results report is working as expected.
 """
 from http import HTTPStatus
+import io
 import json
+import os
+import shutil
+import tempfile
+import tracemalloc
 
 from flask import current_app
+import PyPDF2
+from PyPDF2.generic import (
+    ArrayObject,
+    DecodedStreamObject,
+    DictionaryObject,
+    NameObject,
+    NumberObject,
+    TextStringObject
+)
+import pytest
 
 from ppr_api.reports.v2.report import Report
-from ppr_api.reports.v2.report_utils import ReportTypes
+from ppr_api.reports.v2.report_utils import (
+    ReportTypes,
+    FOOTER_TOTAL_PAGES,
+    TemplateCache,
+    get_toc_anchor_pages,
+    merge_pdfs,
+    merge_toc_pdf,
+    set_footer_total_pages,
+    set_toc_page_offset,
+    spool_pdf,
+    update_toc_page_numbers
+)
 
 
 SEARCH_RESULT_RG_DATAFILE = 'tests/unit/reports/data/search-detail-reg-num-example.json'
@@ -64,7 +90,28 @@ SEARCH_RESULT_75_DATAFILE = 'tests/unit/reports/data/search-detail-75-example.js
 SEARCH_RESULT_75_PDFFILE = 'tests/unit/reports/data/search-detail-75-example.pdf'
 SEARCH_COVER_DATAFILE = 'tests/unit/reports/data/search-cover-example.json'
 SEARCH_COVER_PDFFILE = 'tests/unit/reports/data/search-cover-example.pdf'
+SEARCH_TOC_PDFFILE = 'tests/unit/callback/test-get-search-report.pdf'
 REPORT_VERSION_V2 = '2'
+MERGE_BENCHMARK_COUNT = 50
+TEMPLATE_MAIN_FILE = 'searchResultV2.html'
+TEMPLATE_PART_FILE = 'template-parts/v2/search-result/selected.html'
+MERGE_BENCHMARK_PAGES = 5
+
+# testdata pattern is ({description}, {toc_page_count}, {merged})
+TEST_TOC_MERGE_DATA = [
+    ('TOC pages line up', 2, True),
+    ('TOC render has more pages', 3, False),
+    ('TOC render has fewer pages', 1, False)
+]
+TOC_MERGE_ANCHORS = {'TEST0001': 2, 'TEST0002': 4}
+# testdata pattern is ($base_reg_num, $page_number)
+TEST_TOC_PAGE_DATA = [
+    ('TEST0004', 3),
+    ('TEST0001', 6),
+    ('107169B', 13),
+    ('102042B', 27),
+    ('TEST0005', 36)
+]
 
 
 def test_search_rg(session, client, jwt):
@@ -249,6 +296,193 @@ def test_search_cover(session, client, jwt):
         check_response(content, status, SEARCH_COVER_PDFFILE)
 
 
+@pytest.mark.parametrize('base_reg_num,page_number', TEST_TOC_PAGE_DATA)
+def test_search_toc_page_numbers(session, client, jwt, base_reg_num, page_number):
+    """Assert that search report TOC page numbers from the pdf anchors match the page text scan."""
+    with open(SEARCH_TOC_PDFFILE, 'rb') as pdf_file:
+        pdf_data = pdf_file.read()
+    for anchors in (True, False):
+        current_app.config['REPORT_TOC_PAGE_ANCHORS'] = anchors
+        json_data = {
+            'totalResultsSize': 1,
+            'pageNumOffset': 0,
+            'selected': [{'baseRegistrationNumber': base_reg_num}]
+        }
+        update_toc_page_numbers(json_data, pdf_data)
+        assert json_data['selected'][0]['pageNumber'] == page_number
+        assert json_data['totalPageCount'] == 38
+        assert json_data['pageNumOffset'] == 38
+    current_app.config['REPORT_TOC_PAGE_ANCHORS'] = True
+
+
+@pytest.mark.parametrize('desc,toc_page_count,merged', TEST_TOC_MERGE_DATA)
+def test_search_toc_merge(session, client, jwt, desc, toc_page_count, merged):
+    """Assert that the TOC only render pages replace the first render TOC pages when the page counts line up."""
+    body_pdf = build_toc_test_pdf('First render', 5, TOC_MERGE_ANCHORS, list(TOC_MERGE_ANCHORS.keys()))
+    toc_pdf = build_toc_test_pdf('TOC render', toc_page_count, {}, list(TOC_MERGE_ANCHORS.keys()))
+    merged_pdf = merge_toc_pdf(toc_pdf, body_pdf)
+    if not merged:
+        assert merged_pdf is None
+        return
+    reader = PyPDF2.PdfReader(io.BytesIO(merged_pdf))
+    assert len(reader.pages) == 5
+    for page_index, page in enumerate(reader.pages):
+        label = 'TOC render' if page_index < toc_page_count else 'First render'
+        assert page.extract_text().startswith(f'{label} page {page_index}')
+    assert get_toc_anchor_pages(reader) == TOC_MERGE_ANCHORS
+    link_names = [annot.get_object()['/Dest'] for annot in reader.pages[0]['/Annots']]
+    assert link_names == list(TOC_MERGE_ANCHORS.keys())
+    assert set_footer_total_pages(f'Page <span class="pageNumber"></span> of {FOOTER_TOTAL_PAGES}', 5) == \
+        'Page <span class="pageNumber"></span> of 5'
+
+
+def test_search_large_page_offset(session, client, jwt):
+    """Assert that large search sub-report TOC page numbers are offset by the preceding sub-report page counts."""
+    json_data = {
+        'totalPageCount': 5,
+        'pageNumOffset': 5,
+        'selected': [{'baseRegistrationNumber': 'TEST0001', 'pageNumber': 2},
+                     {'baseRegistrationNumber': 'TEST0002'}]
+    }
+    set_toc_page_offset(json_data, 0)
+    assert json_data['selected'][0]['pageNumber'] == 2
+    assert json_data['pageNumOffset'] == 5
+    set_toc_page_offset(json_data, 10)
+    assert json_data['selected'][0]['pageNumber'] == 12
+    assert 'pageNumber' not in json_data['selected'][1]
+    assert json_data['pageNumOffset'] == 15
+
+
+def test_search_large_render_order(session, client, jwt):
+    """Assert that concurrently rendered large search sub-reports are returned in sub-report order."""
+    subreports = []
+    for index in range(1, 11):
+        subreports.append(Report({'subreport': f'{index} of 10'}, 'PS12345', ReportTypes.SEARCH_DETAIL_REPORT,
+                                 'Account Name'))
+    results = Report._render_subreports(subreports, lambda report: report._report_data['subreport'])
+    assert results == [f'{index} of 10' for index in range(1, 11)]
+
+
+def test_search_large_render_error(session, client, jwt):
+    """Assert that the spooled sub-report files are closed when another sub-report render raises an error."""
+    subreports = []
+    for index in range(1, 6):
+        subreports.append(Report({'subreport': index}, 'PS12345', ReportTypes.SEARCH_DETAIL_REPORT, 'Account Name'))
+    spooled_files = []
+
+    def render(report):
+        if report._report_data['subreport'] == 3:
+            raise ValueError('Report service connection error.')
+        pdf_file = spool_pdf(b'%PDF-1.4')
+        spooled_files.append(pdf_file)
+        return pdf_file, HTTPStatus.OK, {'Content-Type': 'application/pdf'}
+
+    with pytest.raises(ValueError):
+        Report._render_subreports(subreports, render)
+    assert len(spooled_files) == 4
+    for pdf_file in spooled_files:
+        assert pdf_file.closed
+
+
+def test_template_cache(session, client, jwt, monkeypatch, tmp_path):
+    """Assert that search report templates are cached until a template part file is modified."""
+    template_path = current_app.config.get('REPORT_TEMPLATE_PATH')
+    shutil.copy(f'{template_path}/{TEMPLATE_MAIN_FILE}', tmp_path)
+    shutil.copytree(f'{template_path}/template-parts', tmp_path / 'template-parts')
+    monkeypatch.setitem(current_app.config, 'REPORT_TEMPLATE_PATH', str(tmp_path))
+    TemplateCache.clear()
+    try:
+        report = Report({}, 'PS12345', ReportTypes.SEARCH_DETAIL_REPORT, 'Account Name')
+        template_code = report._get_template()
+        assert template_code
+        assert report._get_template() is template_code
+        assert TemplateCache.get_compiled(template_code) is TemplateCache.get_compiled(template_code)
+        part_path = tmp_path / TEMPLATE_PART_FILE
+        part_stat = os.stat(part_path)
+        os.utime(part_path, ns=(part_stat.st_atime_ns, part_stat.st_mtime_ns + 1000000))
+        reloaded_code = report._get_template()
+        assert reloaded_code == template_code
+        assert reloaded_code is not template_code
+        part_path.write_text(part_path.read_text() + '<!-- modified -->')
+        assert report._get_template().find('<!-- modified -->') > 0
+    finally:
+        TemplateCache.clear()
+
+
+def test_merge_pdfs_benchmark(session, client, jwt):
+    """Assert that merging spooled sub-reports to a file has a lower peak memory than merging in memory."""
+    peak_memory = {}
+    for spool in (False, True):
+        tracemalloc.start()
+        report_files = {'cover.pdf': build_benchmark_pdf(1, 0)}
+        for index in range(1, MERGE_BENCHMARK_COUNT + 1):
+            pdf_data = build_benchmark_pdf(MERGE_BENCHMARK_PAGES, index)
+            report_files[f'pdf{index}.pdf'] = spool_pdf(pdf_data) if spool else pdf_data
+            del pdf_data
+        if spool:
+            with tempfile.TemporaryFile() as output_file:
+                merge_pdfs(report_files, output_file)
+                pdf_size = output_file.seek(0, io.SEEK_END)
+            for key, report_file in report_files.items():
+                if key != 'cover.pdf':
+                    report_file.close()
+        else:
+            pdf_size = len(merge_pdfs(report_files))
+        peak_memory[spool] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        del report_files
+        current_app.logger.info(f'Merged {MERGE_BENCHMARK_COUNT} sub-reports spool={spool} size={pdf_size} ' +
+                                f'peak memory={peak_memory[spool]}')
+        assert pdf_size > 0
+    assert peak_memory[True] < peak_memory[False]
+
+
+def build_benchmark_pdf(page_count: int, index: int) -> bytes:
+    """Build a synthetic sub-report pdf with text content on every page."""
+    writer = PyPDF2.PdfWriter()
+    for page_num in range(page_count):
+        page = writer.add_blank_page(612, 792)
+        content = DecodedStreamObject()
+        line = f'BT /F1 10 Tf 72 712 Td (Sub-report {index} page {page_num} registration detail) Tj ET\n'
+        content.set_data((line * 400).encode())
+        page[NameObject('/Contents')] = writer._add_object(content)
+    pdf_buffer = io.BytesIO()
+    writer.write(pdf_buffer)
+    return pdf_buffer.getvalue()
+
+
+def build_toc_test_pdf(label: str, page_count: int, anchors: dict, links: list) -> bytes:
+    """Build a search report pdf with a TOC link to each link name on the first page and the anchor destinations."""
+    writer = PyPDF2.PdfWriter()
+    for page_num in range(page_count):
+        page = writer.add_blank_page(612, 792)
+        content = DecodedStreamObject()
+        content.set_data(f'BT /F1 10 Tf 72 712 Td ({label} page {page_num}) Tj ET'.encode())
+        page[NameObject('/Contents')] = writer._add_object(content)
+        page[NameObject('/Resources')] = DictionaryObject({NameObject('/Font'): DictionaryObject({
+            NameObject('/F1'): DictionaryObject({
+                NameObject('/Type'): NameObject('/Font'),
+                NameObject('/Subtype'): NameObject('/Type1'),
+                NameObject('/BaseFont'): NameObject('/Helvetica')
+            })
+        })})
+    annots = ArrayObject()
+    for index, name in enumerate(links):
+        annots.append(DictionaryObject({
+            NameObject('/Type'): NameObject('/Annot'),
+            NameObject('/Subtype'): NameObject('/Link'),
+            NameObject('/Rect'): ArrayObject([NumberObject(72), NumberObject(600 - index * 20),
+                                              NumberObject(120), NumberObject(612 - index * 20)]),
+            NameObject('/Dest'): NameObject('/' + name)
+        }))
+    writer.pages[0][NameObject('/Annots')] = annots
+    for name, page_index in anchors.items():
+        writer.add_named_destination(TextStringObject(name), page_index)
+    pdf_buffer = io.BytesIO()
+    writer.write(pdf_buffer)
+    return pdf_buffer.getvalue()
+
+
 def get_json_from_file(data_file: str):
     """Get json data from report data file."""
     text_data = None
@@ -45,6 +45,21 @@ TEST_STAFF_DATA = [
     ('Invalid account id', authz.BCOL_HELP, False),
     ('Invalid account id', '2518', False)
 ]
+# testdata pattern is ({description}, {lookup value}, {cache size}, {lookup count}, {error count})
+TEST_ORG_CACHE_DATA = [
+    ('Cached lookup', 'PREMIUM', 1000, 1, 0),
+    ('Cached no org type', '', 1000, 1, 0),
+    ('Cached failed lookup', None, 1000, 1, 1),
+    ('Cache disabled request de-duplication', 'PREMIUM', 0, 1, 0),
+    ('Cache disabled failed lookup', None, 0, 1, 1)
+]
+# testdata pattern is ({description}, {status}, {response body})
+TEST_ORG_ERROR_DATA = [
+    ('Unauthorized', 401, {'message': 'Invalid token.'}),
+    ('Forbidden', 403, {'message': 'Not authorized.'}),
+    ('Service unavailable', 503, {'message': 'Service unavailable.'}),
+    ('OK error body', 200, {'message': 'Unexpected response.'})
+]
 
 
 def test_user_orgs_mock(client, session, jwt):
@@ -98,3 +113,66 @@ def test_staff_account(session, desc, account_id, valid):
     result = authz.is_staff_account(account_id)
     # check
     assert result == valid
+
+
+@pytest.mark.parametrize('desc,value,cache_size,lookup_count,error_count', TEST_ORG_CACHE_DATA)
+def test_auth_org_cache(session, jwt, desc, value, cache_size, lookup_count, error_count):
+    """Assert that the auth org cache looks up a value once per request or cache time to live."""
+    # setup
+    size = current_app.config.get('AUTH_ORG_CACHE_SIZE')
+    current_app.config.update(AUTH_ORG_CACHE_SIZE=cache_size)
+    authz.auth_org_cache.clear()
+    token = helper_create_jwt(jwt, [authz.PPR_ROLE])
+    key = ('orgType', authz.token_subject(token), '1234')
+    lookups = []
+
+    def lookup():
+        lookups.append(key)
+        return value
+
+    # test
+    try:
+        with current_app.test_request_context():
+            for _ in range(3):
+                assert authz.auth_org_cache.get(key, lookup) == value
+        if cache_size > 0:
+            with current_app.test_request_context():
+                assert authz.auth_org_cache.get(key, lookup) == value
+        metrics = authz.auth_org_cache.metrics()
+    finally:
+        current_app.config.update(AUTH_ORG_CACHE_SIZE=size)
+        authz.auth_org_cache.clear()
+    # check
+    assert authz.token_subject(token) == '43e6a245-0bf7-4ccf-9bd0-e7fb85fd18cc'
+    assert len(lookups) == lookup_count
+    assert metrics['misses'] == lookup_count
+    assert metrics['errors'] == error_count
+    assert metrics['hits'] == (3 if cache_size > 0 else 2)
+
+
+@pytest.mark.parametrize('desc,status,body', TEST_ORG_ERROR_DATA)
+def test_account_org_error(session, jwt, requests_mock, desc, status, body):
+    """Assert that an auth api error response is cached as a failed lookup, not as an account without an org."""
+    # setup
+    url = current_app.config.get('AUTH_SVC_URL')
+    current_app.config.update(AUTH_SVC_URL=MOCK_URL)
+    authz.auth_org_cache.clear()
+    requests_mock.get(f'{MOCK_URL}orgs/1234', status_code=status, json=body)
+    requests_mock.get(f'{MOCK_URL}{authz.USER_ORGS_PATH}', status_code=status, json=body)
+    token = helper_create_jwt(jwt, [authz.GOV_ACCOUNT_ROLE])
+    # test
+    try:
+        with current_app.test_request_context():
+            org_type = authz.account_org_type(token, '1234')
+            org_name = authz.account_org_name(token, '1234')
+            sbc_account = authz.is_sbc_office_account(token, '1234')
+        metrics = authz.auth_org_cache.metrics()
+    finally:
+        current_app.config.update(AUTH_SVC_URL=url)
+        authz.auth_org_cache.clear()
+    # check
+    assert org_type is None
+    assert org_name is None
+    assert not sbc_account
+    assert metrics['errors'] == 2
+    assert metrics['size'] == 0
@@ -0,0 +1,132 @@
+# Copyright © 2019 Province of British Columbia
+#
+# Licensed under the Apache License, Version 2.0 (the 'License');
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an 'AS IS' BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests to verify the pooled service http client.
+
+Test-Suite to ensure that the service http clients reuse connections.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+
+import pytest
+from flask import current_app
+
+from ppr_api.services.http_client import ServiceClient
+
+
+REQUEST_COUNT = 10
+THREAD_COUNT = 8
+# testdata pattern is ({description}, {retries}, {status})
+TEST_ERROR_STATUS_DATA = [
+    ('No retries', 0, HTTPStatus.SERVICE_UNAVAILABLE),
+    ('Retries used up', 2, HTTPStatus.SERVICE_UNAVAILABLE),
+    ('Internal server error', 1, HTTPStatus.INTERNAL_SERVER_ERROR)
+]
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    """Minimal keep-alive http handler for the client tests."""
+
+    protocol_version = 'HTTP/1.1'
+
+    error_requests = []
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Return a small JSON response: the /error/{status} path returns the error status."""
+        status = HTTPStatus.OK
+        body = b'{"status": "ok"}'
+        if self.path.startswith('/error/'):
+            status = HTTPStatus(int(self.path.split('/')[-1]))
+            body = b'{"message": "error"}'
+            KeepAliveHandler.error_requests.append(self.path)
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        """Do not log test requests."""
+
+
+def test_client_connection_reuse(session):
+    """Assert that the pooled client reuses a keep-alive connection and reports the pool usage."""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), KeepAliveHandler)
+    thread = Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    current_app.config['HTTP_TIMEOUT_TEST'] = 5
+    client = ServiceClient('TEST')
+    try:
+        url = f'http://127.0.0.1:{server.server_address[1]}/test'
+        assert client.metrics()['requestCount'] == 0
+        for _ in range(REQUEST_COUNT):
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            assert response.json()['status'] == 'ok'
+        metrics = client.metrics()
+        assert metrics['service'] == 'TEST'
+        assert metrics['requestCount'] == REQUEST_COUNT
+        assert metrics['poolRequestCount'] == REQUEST_COUNT
+        assert metrics['connectionCount'] == 1
+        assert metrics['reuseRate'] == 0.9
+        assert client.timeout == 5
+    finally:
+        client.close()
+        server.shutdown()
+        server.server_close()
+    assert client.metrics()['requestCount'] == 0
+
+
+@pytest.mark.parametrize('desc,retries,status', TEST_ERROR_STATUS_DATA)
+def test_client_error_status(session, desc, retries, status):
+    """Assert that a server error status response is returned to the caller after any retries."""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), KeepAliveHandler)
+    thread = Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    current_app.config['HTTP_RETRIES_TEST'] = retries
+    KeepAliveHandler.error_requests = []
+    client = ServiceClient('TEST')
+    try:
+        response = client.get(f'http://127.0.0.1:{server.server_address[1]}/error/{status.value}')
+        assert response.status_code == status
+        assert response.json()['message'] == 'error'
+        assert len(KeepAliveHandler.error_requests) == retries + 1
+    finally:
+        current_app.config.pop('HTTP_RETRIES_TEST', None)
+        client.close()
+        server.shutdown()
+        server.server_close()
+
+
+def test_client_concurrent_request_count(session):
+    """Assert that the request count of a client shared by several threads includes every request."""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), KeepAliveHandler)
+    thread = Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    current_app.config['HTTP_POOL_SIZE_TEST'] = THREAD_COUNT
+    client = ServiceClient('TEST')
+    try:
+        url = f'http://127.0.0.1:{server.server_address[1]}/test'
+        # The pooled session is created from the app config by the first request.
+        assert client.get(url).status_code == HTTPStatus.OK
+        with ThreadPoolExecutor(max_workers=THREAD_COUNT) as executor:
+            statuses = list(executor.map(lambda _: client.get(url).status_code, range(THREAD_COUNT * REQUEST_COUNT)))
+        assert statuses == [HTTPStatus.OK] * (THREAD_COUNT * REQUEST_COUNT)
+        assert client.metrics()['requestCount'] == THREAD_COUNT * REQUEST_COUNT + 1
+    finally:
+        current_app.config.pop('HTTP_POOL_SIZE_TEST', None)
+        client.close()
+        server.shutdown()
+        server.server_close()
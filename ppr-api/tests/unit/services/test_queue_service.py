@@ -12,12 +12,16 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 """Google queue service publish tests."""
+import pytest
 from flask import current_app
 
-from ppr_api.services.queue_service import GoogleQueueService
+from ppr_api.services import queue_service
+from ppr_api.services.queue_service import GoogleQueueService, LocalPublisher
 
 
 SUB_URL = 'https://bcregistry-dev.apigee.net/ppr-sub/api/v1/'
+# Seconds to wait for a published message to be sent.
+PUBLISH_TIMEOUT = 30
 TEST_PAYLOAD = {
     'searchId': 999999999
 }
@@ -29,6 +33,12 @@ TEST_PAYLOAD_REGISTRATION = {
     'registrationId': 9999999,
     'partyId': 9999999
 }
+# testdata pattern is ({description}, {message_count}, {error})
+TEST_LOCAL_PUBLISH_DATA = [
+    ('Single message', 1, None),
+    ('Multiple messages', 5, None),
+    ('Publish error', 3, Exception('Publish failed'))
+]
 
 
 def test_publish_search_report(session):
@@ -37,7 +47,8 @@ def test_publish_search_report(session):
     apikey = current_app.config.get('SUBSCRIPTION_API_KEY')
     if apikey:
         payload['apikey'] = apikey
-    GoogleQueueService().publish_search_report(payload)
+    future = GoogleQueueService().publish_search_report(payload)
+    assert queue_service.wait([future], PUBLISH_TIMEOUT) == 0
 
 
 def test_publish_api_notification(session):
@@ -46,7 +57,8 @@ def test_publish_api_notification(session):
     apikey = current_app.config.get('SUBSCRIPTION_API_KEY')
     if apikey:
         payload['apikey'] = apikey
-    GoogleQueueService().publish_notification(payload)
+    future = GoogleQueueService().publish_notification(payload)
+    assert queue_service.wait([future], PUBLISH_TIMEOUT) == 0
 
 
 def test_publish_verification_mail(session):
@@ -55,7 +67,8 @@ def test_publish_verification_mail(session):
     apikey = current_app.config.get('SUBSCRIPTION_API_KEY')
     if apikey:
         payload['apikey'] = apikey
-    GoogleQueueService().publish_verification_report(payload)
+    future = GoogleQueueService().publish_verification_report(payload)
+    assert queue_service.wait([future], PUBLISH_TIMEOUT) == 0
 
 
 def test_publish_registration_report(session):
@@ -64,4 +77,33 @@ def test_publish_registration_report(session):
     apikey = current_app.config.get('SUBSCRIPTION_API_KEY')
     if apikey:
         payload['apikey'] = apikey
-    GoogleQueueService().publish_registration_report(payload)
+    future = GoogleQueueService().publish_registration_report(payload)
+    assert queue_service.wait([future], PUBLISH_TIMEOUT) == 0
+
+
+@pytest.mark.parametrize('desc,message_count,error', TEST_LOCAL_PUBLISH_DATA)
+def test_publish_local(session, desc, message_count, error):
+    """Assert that publishing with the process publisher does not block and tracks failures with the callback."""
+    publisher = LocalPublisher(error)
+    queue_service.set_publisher(publisher)
+    errors = []
+    try:
+        publish_futures = []
+        for index in range(message_count):
+            payload = {'registrationId': index, 'partyId': index}
+            future = GoogleQueueService().publish_verification_report(payload, errors.append)
+            assert future
+            publish_futures.append(future)
+        failed_count = queue_service.wait(publish_futures, 1)
+        if error:
+            assert failed_count == message_count
+            assert len(errors) == message_count
+            assert not publisher.messages
+        else:
+            assert failed_count == 0
+            assert not errors
+            assert len(publisher.messages) == message_count
+            assert publisher.messages[0][0].endswith(str(current_app.config.get('GCP_PS_VERIFICATION_REPORT_TOPIC')))
+        assert GoogleQueueService().publisher == publisher
+    finally:
+        queue_service.set_publisher(None)
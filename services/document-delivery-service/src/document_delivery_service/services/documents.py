@@ -18,7 +18,8 @@ import datetime
 import json
 from http import HTTPStatus
 from io import BytesIO
-from typing import Final, List, Tuple
+from tempfile import TemporaryFile
+from typing import BinaryIO, Final, List, Optional, Tuple
 
 import pytz
 import requests
@@ -75,27 +76,30 @@ def deliver_verification_document(data: dict,
     if status not in (HTTPStatus.OK, HTTPStatus.CREATED):
         return status
 
-    # merge pdfs
-    document_pdf = _append_pdfs([cover_letter, verification_document])
-
     # create a filename
     file_name = get_filename(registration_id=data['registrationId'], party_id=data['partyId'])
 
-    # save document to storage
-    storage_service.connect()
-    storage_filepath = file_name
-    if hasattr(config, 'STORAGE_FILEPATH') and config.STORAGE_FILEPATH:
-        storage_filepath = f'{config.STORAGE_FILEPATH}/{file_name}'
-    storage_service.save_document(bucket_name=config.STORAGE_BUCKET_NAME,
-                                  filename=storage_filepath,
-                                  raw_data=document_pdf,
-                                  doc_type=StorageDocumentTypes.BINARY.value)
-
-    # upload document to sftp
-    sftp_service.connect()
-    remote_path = f'{config.SFTP_STORAGE_DIRECTORY}/{file_name}'
-    sftp_service.put_buffer(document_pdf, remote_path)
-    sftp_service.close()
+    # merge pdfs to a temporary file, streamed to storage and sftp
+    with TemporaryFile() as document_file:
+        _append_pdfs([cover_letter, verification_document], document_file)
+        del cover_letter, verification_document
+
+        # save document to storage
+        storage_service.connect()
+        storage_filepath = file_name
+        if hasattr(config, 'STORAGE_FILEPATH') and config.STORAGE_FILEPATH:
+            storage_filepath = f'{config.STORAGE_FILEPATH}/{file_name}'
+        storage_service.save_document(bucket_name=config.STORAGE_BUCKET_NAME,
+                                      filename=storage_filepath,
+                                      raw_data=document_file,
+                                      doc_type=StorageDocumentTypes.BINARY.value)
+
+        # upload document to sftp
+        document_file.seek(0)
+        sftp_service.connect()
+        remote_path = f'{config.SFTP_STORAGE_DIRECTORY}/{file_name}'
+        sftp_service.put_file(document_file, remote_path)
+        sftp_service.close()
 
     return HTTPStatus.CREATED
 
@@ -176,20 +180,27 @@ def _get_document_pdf(data: dict, data_key: str, token: str, config: BaseConfig)
     return None, HTTPStatus.BAD_REQUEST
 
 
-def _append_pdfs(pdf_list: List[bytes]) -> bytes:
+def _append_pdfs(pdf_list: List[bytes], output_file: BinaryIO = None) -> Optional[bytes]:
     """Append pdfs.
 
     Args:
         pdf_list: The list of pdfs to append.
+        output_file: The optional writable file the merged pdf is written to.
 
     Returns:
-        The merged pdf.
+        The merged pdf, or None if the merged pdf is written to the output file.
     """
     merger = PdfFileMerger()
 
     for pdf in pdf_list:
         merger.append(BytesIO(pdf))
 
+    if output_file:
+        merger.write(output_file)
+        merger.close()
+        output_file.seek(0)
+        return None
+
     out_final = BytesIO()
 
     merger.write(out_final)
@@ -15,7 +15,7 @@
 from __future__ import annotations
 
 import io
-from typing import Callable
+from typing import BinaryIO, Callable
 
 import paramiko
 
@@ -118,6 +118,17 @@ class SftpConnection:
                     file.write(buffer)
                     file.close()
 
+    def put_file(self, file: BinaryIO, remote_path: str, **kwargs) -> None:
+        """Upload the contents of an open binary file to the SFTP server in chunks.
+
+        Args:
+            file (BinaryIO): The file to upload, read from its current position.
+            remote_path (str): The remote path of the file to upload.
+            **kwargs: Additional keyword arguments.
+        """
+        if self.sftp_handler:
+            self.sftp_handler.putfo(file, remote_path)
+
     def put_buffer(self, buffer: bytes, remote_path: str, **kwargs) -> None:
         """Upload a buffer of bytes to the SFTP server.
 
@@ -13,7 +13,7 @@
 # limitations under the License.
 """This module containes the signature of the StorageService."""
 from abc import ABC, abstractmethod
-from typing import Optional, Union
+from typing import BinaryIO, Optional, Union
 
 from document_delivery_service.common.enum import BaseEnum, auto
 
@@ -50,6 +50,6 @@ class AbstractStorageService(ABC):
     def save_document(self,
                       bucket_name: str,
                       filename: str,
-                      raw_data: Union[str, bytes],
+                      raw_data: Union[str, bytes, BinaryIO],
                       doc_type: str = StorageDocumentTypes.BINARY.value) -> None:
-        """Save or replace the named document in storage with the binary data as the file contents."""
+        """Save or replace the named document in storage with the binary data or file as the file contents."""
@@ -14,7 +14,8 @@
 """This is the concrete implementation of the StorageService, using Google Cloud Storage."""
 import base64
 import json
-from typing import Callable, Optional, Union
+import shutil
+from typing import BinaryIO, Callable, Optional, Union
 
 from google.cloud import storage
 
@@ -62,9 +63,9 @@ class GoogleCloudStorage(AbstractStorageService):
     def save_document(self,
                       bucket_name: str,
                       filename: str,
-                      raw_data: Union[bytes, str],
+                      raw_data: Union[bytes, str, BinaryIO],
                       doc_type: str = StorageDocumentTypes.BINARY.value) -> None:
-        """Save or replace the named document in storage with the binary data as the file contents."""
+        """Save or replace the named document in storage with the binary data or file as the file contents."""
         try:
             gcs = self.connect()
             bucket = gcs.bucket(bucket_name)
@@ -76,7 +77,10 @@ class GoogleCloudStorage(AbstractStorageService):
             else:
                 raise StorageServiceError('Unsupported document type: {}'.format(doc_type))
 
-            gcs_file.write(raw_data)
+            if hasattr(raw_data, 'read'):
+                shutil.copyfileobj(raw_data, gcs_file)
+            else:
+                gcs_file.write(raw_data)
             gcs_file.close()
         except Exception as err:  # noqa: B902
             logging.error('GoogleCloudStorage.save_document() failed: {}'.format(err))